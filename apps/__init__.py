@@ -1,2 +1,2 @@
-# Apps package
-
+# Apps package
+
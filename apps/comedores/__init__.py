@@ -1,3 +1,3 @@
-# Comedores app
-default_app_config = 'apps.comedores.apps.ComedoresConfig'
-
+# Comedores app
+default_app_config = 'apps.comedores.apps.ComedoresConfig'
+
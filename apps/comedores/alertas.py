@@ -0,0 +1,385 @@
+"""
+Despacho de alertas a suscriptores
+
+Flujo:
+1. Un cambio en los datos (cupos que bajan, comedor nuevo, menú del día,
+   apertura) se convierte en un `Evento`.
+2. `encolar(evento)` cruza el evento contra el padrón de suscriptores
+   activos con NumPy (tipo de alerta, barrio de interés según la tabla
+   BarrioInteres y radio desde la ubicación del suscriptor) y escribe un MensajeAlerta por destinatario
+   con un solo bulk_create. La clave del evento evita duplicados.
+3. `drenar(backend)` toma lotes de la bandeja de salida, los envía en
+   paralelo con asyncio a través del backend de canal configurado y
+   actualiza estados y `ultima_notificacion` en bloque.
+
+El padrón se construye una vez por proceso y se reconstruye cuando cambia
+la marca de versión ALERTAS (ver signals.py).
+"""
+import asyncio
+import json
+import logging
+import threading
+import unicodedata
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import horarios, versiones
+from .geo import distancias_desde
+
+logger = logging.getLogger(__name__)
+
+# Cupos por debajo de los cuales se avisa (mismo umbral de estado_cupos)
+UMBRAL_CUPOS_BAJOS = 30
+
+TEXTOS = {
+    'CUPOS_BAJOS': 'Quedan pocos cupos en {nombre} ({cupos} disponibles). {direccion}',
+    'NUEVO_COMEDOR': 'Nuevo comedor cerca de ti: {nombre}, {direccion}.',
+    'MENU_DIA': 'Menú de hoy en {nombre}: {menu}',
+    'APERTURA': '{nombre} está abierto ahora, hasta las {cierre}. {direccion}',
+}
+
+_lock = threading.Lock()
+_padron = None
+
+
+def normalizar_barrio(nombre):
+    """Minúsculas, sin tildes ni espacios sobrantes"""
+    sin_tildes = unicodedata.normalize('NFKD', nombre or '').encode('ascii', 'ignore').decode()
+    return ' '.join(sin_tildes.lower().split())
+
+
+def nombres_barrios(texto):
+    """{barrio normalizado: nombre como se escribió} de un texto separado por comas"""
+    barrios = {}
+    for nombre in (texto or '').split(','):
+        nombre = ' '.join(nombre.split())
+        clave = normalizar_barrio(nombre)
+        if clave:
+            barrios.setdefault(clave, nombre[:100])
+    return barrios
+
+
+class Evento:
+    """Algo que ocurrió en un comedor y puede interesar a los suscriptores"""
+
+    __slots__ = ('tipo', 'comedor', 'clave', 'texto')
+
+    def __init__(self, tipo, comedor, clave, **datos):
+        self.tipo = tipo
+        self.comedor = comedor
+        self.clave = f'{tipo}:{comedor.pk}:{clave}'
+        self.texto = TEXTOS[tipo].format(
+            nombre=comedor.nombre, direccion=comedor.direccion, **datos
+        ).strip()
+
+
+def evento_cupos_bajos(comedor):
+    """Una vez al día por comedor, cuando los cupos cruzan el umbral"""
+    return Evento(
+        'CUPOS_BAJOS', comedor, timezone.localdate().isoformat(),
+        cupos=comedor.cupos_disponibles
+    )
+
+
+def evento_nuevo_comedor(comedor):
+    return Evento('NUEVO_COMEDOR', comedor, 'alta')
+
+
+def evento_menu_dia(menu):
+    return Evento('MENU_DIA', menu.comedor, str(menu.fecha), menu=menu.almuerzo)
+
+
+def evento_apertura(comedor, apertura, cierre):
+    """Una vez por franja: un día CUSTOM puede abrir varias veces"""
+    return Evento(
+        'APERTURA', comedor, timezone.localtime(apertura).strftime('%Y-%m-%d %H:%M'),
+        cierre=timezone.localtime(cierre).strftime('%H:%M')
+    )
+
+
+class PadronSuscriptores:
+    """
+    Suscripciones activas en arreglos NumPy, agrupadas por tipo de alerta
+    Para cada tipo guarda las posiciones de sus filas, un índice
+    barrio → posiciones y las filas sin filtro geográfico (reciben todo)
+    """
+
+    def __init__(self, filas, barrios_interes):
+        ids, tipos, canales, destinos = [], [], [], []
+        lats, lngs, radios = [], [], []
+        posiciones = {}
+
+        for pk, tipo, canal, telefono, email, radio, lat, lng in filas:
+            destino = email if canal == 'EMAIL' else telefono
+            if not destino:
+                continue
+            posiciones[pk] = len(ids)
+            ids.append(pk)
+            tipos.append(tipo)
+            canales.append(canal)
+            destinos.append(destino)
+            lats.append(np.nan if lat is None else lat)
+            lngs.append(np.nan if lng is None else lng)
+            radios.append(radio)
+
+        # (suscripcion_id, barrio) de la tabla BarrioInteres
+        barrios_por_tipo = defaultdict(lambda: defaultdict(list))
+        con_barrios = set()
+        for suscripcion_id, barrio in barrios_interes:
+            posicion = posiciones.get(suscripcion_id)
+            if posicion is not None:
+                barrios_por_tipo[tipos[posicion]][barrio].append(posicion)
+                con_barrios.add(posicion)
+
+        sin_filtro_por_tipo = defaultdict(list)
+        for posicion, tipo in enumerate(tipos):
+            if posicion not in con_barrios and np.isnan(lats[posicion] + lngs[posicion]):
+                sin_filtro_por_tipo[tipo].append(posicion)
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.canales = canales
+        self.destinos = destinos
+        self.lats = np.array(lats, dtype=np.float64)
+        self.lngs = np.array(lngs, dtype=np.float64)
+        self.radios = np.array(radios, dtype=np.float64)
+
+        tipos = np.array(tipos, dtype=object)
+        self.por_tipo = {
+            tipo: np.flatnonzero(tipos == tipo) for tipo in set(tipos.tolist())
+        }
+        self.barrios = {
+            tipo: {
+                barrio: np.array(posiciones, dtype=np.int64)
+                for barrio, posiciones in barrios.items()
+            }
+            for tipo, barrios in barrios_por_tipo.items()
+        }
+        self.sin_filtro = {
+            tipo: np.array(posiciones, dtype=np.int64)
+            for tipo, posiciones in sin_filtro_por_tipo.items()
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def destinatarios(self, tipo, lat, lng, barrio):
+        """
+        Posiciones de los suscriptores de `tipo` interesados en un punto
+        Coincide el barrio, o el punto cae dentro de su radio, o no tienen
+        filtro geográfico
+        """
+        candidatos = self.por_tipo.get(tipo)
+        if candidatos is None or not len(candidatos):
+            return np.empty(0, dtype=np.int64)
+
+        distancias = distancias_desde(lat, lng, self.lats[candidatos], self.lngs[candidatos])
+        dentro = candidatos[distancias <= self.radios[candidatos]]
+
+        partes = [dentro]
+        por_barrio = self.barrios.get(tipo, {}).get(normalizar_barrio(barrio))
+        if por_barrio is not None:
+            partes.append(por_barrio)
+        if tipo in self.sin_filtro:
+            partes.append(self.sin_filtro[tipo])
+        return np.unique(np.concatenate(partes))
+
+
+def invalidar():
+    """Marca el padrón como obsoleto en todos los procesos"""
+    versiones.invalidar(versiones.ALERTAS)
+
+
+def obtener_padron():
+    """Retorna el padrón vigente, reconstruyéndolo si está obsoleto"""
+    global _padron
+    from .models import AlertaSuscripcion, BarrioInteres
+
+    version = versiones.version_actual(versiones.ALERTAS)
+    padron = _padron
+    if padron is not None and padron.version == version:
+        return padron
+
+    with _lock:
+        padron = _padron
+        if padron is not None and padron.version == version:
+            return padron
+
+        filas = AlertaSuscripcion.objects.filter(activa=True).values_list(
+            'id', 'tipo_alerta', 'canal_preferido', 'telefono', 'email',
+            'radio_km', 'latitud', 'longitud'
+        ).order_by()
+        barrios_interes = BarrioInteres.objects.filter(suscripcion__activa=True).values_list(
+            'suscripcion_id', 'barrio'
+        ).order_by()
+        padron = PadronSuscriptores(filas.iterator(), barrios_interes.iterator())
+        padron.version = version
+        _padron = padron
+        return padron
+
+
+def encolar(evento):
+    """
+    Escribe en la bandeja de salida un mensaje por suscriptor interesado
+    Retorna la cantidad de destinatarios encontrados
+    """
+    from .models import MensajeAlerta
+
+    padron = obtener_padron()
+    comedor = evento.comedor
+    posiciones = padron.destinatarios(
+        evento.tipo, comedor.latitud, comedor.longitud, comedor.barrio
+    )
+    MensajeAlerta.objects.bulk_create(
+        [
+            MensajeAlerta(
+                suscripcion_id=int(padron.ids[posicion]),
+                comedor_id=comedor.pk,
+                tipo_alerta=evento.tipo,
+                canal=padron.canales[posicion],
+                destino=padron.destinos[posicion],
+                texto=evento.texto,
+                clave_evento=evento.clave,
+            )
+            for posicion in posiciones
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(posiciones)
+
+
+def encolar_al_confirmar(evento):
+    """Encola el evento cuando se confirme la transacción en curso"""
+    transaction.on_commit(lambda: encolar(evento))
+
+
+def encolar_aperturas(desde, hasta):
+    """
+    Eventos APERTURA de los comedores activos que abren en [desde, hasta)
+    Pensado para ejecutarse periódicamente (ver despachar_alertas)
+    """
+    from .models import Comedor
+
+    # El índice de horarios cubre los CUSTOM y los que abren de noche
+    ids = horarios.obtener_indice().abren_entre(desde, hasta).tolist()
+    if not ids:
+        return 0
+    encolados = 0
+    for comedor in Comedor.objects.filter(pk__in=ids, estado_activo=True):
+        # Apertura y cierre salen de la misma máscara (franjas CUSTOM incluidas)
+        bits = comedor.mascara_horario()
+        apertura = horarios.proxima_apertura(bits, desde - timedelta(microseconds=1))
+        encolados += encolar(evento_apertura(comedor, apertura, horarios.fin_de_franja(bits, apertura)))
+    return encolados
+
+
+class BackendConsola:
+    """Escribe los mensajes en el log en lugar de enviarlos"""
+
+    async def enviar(self, mensaje):
+        logger.info('[%s → %s] %s', mensaje['canal'], mensaje['destino'], mensaje['texto'])
+
+
+class BackendArchivo:
+    """
+    Agrega cada mensaje como una línea JSON a un archivo
+    Sustituto local de WhatsApp/SMS/email para desarrollo y pruebas
+    """
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or getattr(settings, 'ALERTAS_ARCHIVO', 'alertas_enviadas.jsonl')
+        self._lock = asyncio.Lock()
+
+    async def enviar(self, mensaje):
+        linea = json.dumps(mensaje, ensure_ascii=False) + '\n'
+        async with self._lock:
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(linea)
+
+
+def obtener_backend():
+    """Instancia el backend configurado en ALERTAS_BACKEND"""
+    ruta = getattr(settings, 'ALERTAS_BACKEND', 'apps.comedores.alertas.BackendConsola')
+    return import_string(ruta)()
+
+
+def _tomar_lote(tamano):
+    """Marca como ENVIANDO un lote de mensajes pendientes y lo retorna"""
+    from .models import MensajeAlerta
+
+    with transaction.atomic():
+        mensajes = list(
+            MensajeAlerta.objects.filter(estado='PENDIENTE').select_for_update(
+                skip_locked=True
+            ).values('id', 'suscripcion_id', 'canal', 'destino', 'texto')[:tamano]
+        )
+        if mensajes:
+            MensajeAlerta.objects.filter(id__in=[m['id'] for m in mensajes]).update(
+                estado='ENVIANDO', intentos=F('intentos') + 1
+            )
+    return mensajes
+
+
+def _cerrar_lote(enviados, fallidos):
+    """Guarda el resultado del lote con pocas sentencias UPDATE"""
+    from .models import AlertaSuscripcion, MensajeAlerta
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        if enviados:
+            MensajeAlerta.objects.filter(id__in=[m['id'] for m in enviados]).update(
+                estado='ENVIADO', fecha_envio=ahora
+            )
+            AlertaSuscripcion.objects.filter(
+                id__in={m['suscripcion_id'] for m in enviados}
+            ).update(ultima_notificacion=ahora)
+        if fallidos:
+            MensajeAlerta.objects.bulk_update(
+                [
+                    MensajeAlerta(id=m['id'], estado='ERROR', error=error[:500])
+                    for m, error in fallidos
+                ],
+                ['estado', 'error'],
+                batch_size=500,
+            )
+
+
+async def drenar(backend=None, lote=500, concurrencia=50):
+    """
+    Envía todos los mensajes pendientes de la bandeja de salida
+    Retorna (enviados, fallidos)
+    """
+    backend = backend or obtener_backend()
+    semaforo = asyncio.Semaphore(concurrencia)
+    total_enviados = total_fallidos = 0
+
+    async def enviar(mensaje):
+        async with semaforo:
+            try:
+                await backend.enviar(mensaje)
+            except Exception as exc:
+                return mensaje, str(exc) or exc.__class__.__name__
+            return mensaje, None
+
+    while True:
+        mensajes = await sync_to_async(_tomar_lote)(lote)
+        if not mensajes:
+            break
+
+        resultados = await asyncio.gather(*(enviar(mensaje) for mensaje in mensajes))
+        enviados = [mensaje for mensaje, error in resultados if error is None]
+        fallidos = [(mensaje, error) for mensaje, error in resultados if error is not None]
+        await sync_to_async(_cerrar_lote)(enviados, fallidos)
+
+        total_enviados += len(enviados)
+        total_fallidos += len(fallidos)
+
+    return total_enviados, total_fallidos
@@ -1,8 +1,11 @@
-from django.apps import AppConfig
-
-
-class ComedoresConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.comedores'
-    verbose_name = 'Comedores Comunitarios'
-
+from django.apps import AppConfig
+
+
+class ComedoresConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.comedores'
+    verbose_name = 'Comedores Comunitarios'
+
+    def ready(self):
+        # Registrar señales de invalidación de datos precalculados
+        from . import signals  # noqa: F401
@@ -0,0 +1,207 @@
+"""
+Asignación en bloque de donaciones pendientes a comedores
+
+Carga una sola vez las donaciones pendientes con coordenadas y los comedores
+activos, calcula las distancias con NumPy y resuelve la asignación de forma
+voraz: los pares (donación, comedor) se recorren del más cercano al más
+lejano y cada donación va al primer comedor que aún tenga cupo de recepción.
+
+El cupo de recepción de un comedor es la cantidad de donaciones que puede
+tener en curso (asignadas o en tránsito) según las personas que atiende.
+Cuando los comedores más cercanos de una donación se llenan, se repite la
+búsqueda solo entre los comedores con cupo restante.
+
+Antes de guardar se bloquean los comedores elegidos y se vuelven a contar
+sus donaciones en curso: una asignación concurrente pudo ocupar su cupo
+después de la primera lectura.
+"""
+from math import ceil
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import geo
+
+# Una donación en curso por cada tantas personas de capacidad
+PERSONAS_POR_DONACION = getattr(settings, 'DONACIONES_PERSONAS_POR_DONACION', 10)
+
+# Candidatos más cercanos que se consideran por donación en cada ronda
+CANDIDATOS_POR_DONACION = 8
+
+ESTADOS_EN_CURSO = ('ASIGNADA', 'EN_TRANSITO')
+
+
+def cupo_recepcion(capacidad_personas, en_curso):
+    """Donaciones adicionales que puede recibir un comedor"""
+    maximo = max(1, ceil(capacidad_personas / PERSONAS_POR_DONACION))
+    return max(0, maximo - en_curso)
+
+
+def resolver(lats_donaciones, lngs_donaciones, lats_comedores, lngs_comedores, cupos,
+             candidatos=CANDIDATOS_POR_DONACION, bloque=2048):
+    """
+    Resuelve la asignación sin tocar la base de datos
+    Retorna (indices, distancias): para cada donación, el índice del comedor
+    asignado (-1 si ninguno tiene cupo) y la distancia en km
+    """
+    lats_donaciones = np.asarray(lats_donaciones, dtype=np.float64)
+    lngs_donaciones = np.asarray(lngs_donaciones, dtype=np.float64)
+    lats_comedores = np.asarray(lats_comedores, dtype=np.float64)
+    lngs_comedores = np.asarray(lngs_comedores, dtype=np.float64)
+    restante = np.array(cupos, dtype=np.int64)
+
+    n = len(lats_donaciones)
+    indices = np.full(n, -1, dtype=np.int64)
+    distancias = np.full(n, np.inf, dtype=np.float64)
+
+    pendientes = np.arange(n)
+    while len(pendientes):
+        disponibles = np.flatnonzero(restante > 0)
+        if not len(disponibles):
+            break
+        k = min(candidatos, len(disponibles))
+
+        # Los k comedores con cupo más cercanos a cada donación pendiente
+        filas, columnas, valores = [], [], []
+        for inicio in range(0, len(pendientes), bloque):
+            bloque_pendientes = pendientes[inicio:inicio + bloque]
+            matriz = geo.matriz_distancias(
+                lats_donaciones[bloque_pendientes], lngs_donaciones[bloque_pendientes],
+                lats_comedores[disponibles], lngs_comedores[disponibles]
+            )
+            if k < len(disponibles):
+                mejores = np.argpartition(matriz, k - 1, axis=1)[:, :k]
+            else:
+                mejores = np.broadcast_to(np.arange(k), matriz.shape)
+            filas.append(np.repeat(bloque_pendientes, k))
+            columnas.append(disponibles[mejores].ravel())
+            valores.append(np.take_along_axis(matriz, mejores, axis=1).ravel())
+
+        filas = np.concatenate(filas)
+        columnas = np.concatenate(columnas)
+        valores = np.concatenate(valores)
+
+        # Recorrido voraz de los pares, del más cercano al más lejano
+        for par in np.argsort(valores, kind='stable'):
+            donacion, comedor = filas[par], columnas[par]
+            if indices[donacion] != -1 or restante[comedor] == 0:
+                continue
+            indices[donacion] = comedor
+            distancias[donacion] = valores[par]
+            restante[comedor] -= 1
+
+        # El par más cercano de la ronda siempre se asigna, así que termina
+        pendientes = pendientes[indices[pendientes] == -1]
+
+    return indices, distancias
+
+
+def _recortar_a_cupo(asignaciones, distancias):
+    """
+    Bloquea los comedores elegidos y verifica su cupo con el conteo actual
+    Las donaciones más lejanas que ya no caben quedan pendientes
+    """
+    from .models import Comedor, Donacion
+
+    elegidos = set(asignaciones.values())
+    # Orden por id: dos asignaciones concurrentes bloquean en el mismo orden
+    capacidades = dict(
+        Comedor.objects.filter(id__in=elegidos, estado_activo=True).select_for_update()
+        .order_by('id').values_list('id', 'capacidad_personas')
+    )
+    # Conteo en una consulta aparte, después del bloqueo: en READ COMMITTED un
+    # conteo dentro del SELECT ... FOR UPDATE usa la foto tomada antes de esperar
+    # el bloqueo y no vería la asignación concurrente que se esperó
+    en_curso = dict(
+        Donacion.objects.filter(comedor_asignado_id__in=elegidos, estado__in=ESTADOS_EN_CURSO)
+        .values_list('comedor_asignado_id').annotate(total=Count('id')).order_by()
+    )
+    restante = {
+        comedor_id: cupo_recepcion(capacidad, en_curso.get(comedor_id, 0))
+        for comedor_id, capacidad in capacidades.items()
+    }
+
+    confirmadas = {}
+    for donacion_id in sorted(asignaciones, key=distancias.get):
+        comedor_id = asignaciones[donacion_id]
+        if restante.get(comedor_id, 0) > 0:
+            restante[comedor_id] -= 1
+            confirmadas[donacion_id] = comedor_id
+    return confirmadas
+
+
+def asignar_donaciones(donaciones=None, guardar=True):
+    """
+    Asigna en bloque las donaciones pendientes con coordenadas
+    `donaciones` limita el lote (queryset de Donacion); por defecto todas
+    Retorna un resumen con los conteos y las asignaciones {donacion_id: comedor_id}
+    """
+    from .models import Comedor, Donacion
+
+    if donaciones is None:
+        donaciones = Donacion.objects.all()
+
+    with transaction.atomic():
+        pendientes = list(
+            donaciones.filter(
+                estado='PENDIENTE',
+                latitud_donante__isnull=False,
+                longitud_donante__isnull=False,
+            ).select_for_update().values_list(
+                'id', 'latitud_donante', 'longitud_donante'
+            ).order_by('fecha_creacion', 'id')
+        )
+        comedores = list(
+            Comedor.objects.filter(estado_activo=True).annotate(
+                en_curso=Count(
+                    'donaciones', filter=Q(donaciones__estado__in=ESTADOS_EN_CURSO)
+                )
+            ).values_list(
+                'id', 'latitud', 'longitud', 'capacidad_personas', 'en_curso'
+            ).order_by('id')
+        )
+
+        asignaciones = {}
+        if pendientes and comedores:
+            donacion_ids, lats, lngs = zip(*pendientes)
+            comedor_ids, latitudes, longitudes, capacidades, en_curso = zip(*comedores)
+            cupos = [
+                cupo_recepcion(capacidad, actuales)
+                for capacidad, actuales in zip(capacidades, en_curso)
+            ]
+            indices, distancias = resolver(lats, lngs, latitudes, longitudes, cupos)
+            asignaciones = {
+                donacion_ids[i]: comedor_ids[indice]
+                for i, indice in enumerate(indices) if indice != -1
+            }
+
+        if guardar and asignaciones:
+            asignaciones = _recortar_a_cupo(
+                asignaciones, dict(zip(donacion_ids, distancias.tolist()))
+            )
+
+        if guardar and asignaciones:
+            ahora = timezone.now()
+            Donacion.objects.bulk_update(
+                [
+                    Donacion(
+                        id=donacion_id,
+                        comedor_asignado_id=comedor_id,
+                        estado='ASIGNADA',
+                        fecha_asignacion=ahora,
+                    )
+                    for donacion_id, comedor_id in asignaciones.items()
+                ],
+                ['comedor_asignado', 'estado', 'fecha_asignacion'],
+                batch_size=500,
+            )
+
+    return {
+        'pendientes': len(pendientes),
+        'asignadas': len(asignaciones),
+        'sin_cupo': len(pendientes) - len(asignaciones),
+        'asignaciones': asignaciones,
+    }
@@ -0,0 +1,164 @@
+"""
+Benchmark de la API en proceso
+
+Llama a los endpoints públicos con el cliente de pruebas de Django sobre
+datos sintéticos fijos (ver sinteticos.py) y registra por endpoint:
+
+- ms_frio / consultas_frio / ms_bd_frio: primera llamada con el cache vacío
+- ms_p50 / ms_p95 / consultas: llamadas siguientes (caches ya calientes)
+- memoria_kb: pico de memoria asignada en Python durante una llamada fría
+
+Las mediciones vacían el cache entre llamadas, así que corren sobre un
+LocMemCache propio (CACHE_PRIVADO) y nunca sobre el cache configurado.
+
+`comparar` verifica los resultados contra un archivo de presupuestos con
+la forma {escala: {endpoint: {métrica: máximo}}} (ver el comando
+benchmark_api y benchmarks/presupuestos.json).
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from apps.core.telemetria import ContadorConsultas
+
+from .models import Comedor
+
+# Cache del benchmark: cache.clear() no debe tocar el cache de producción
+CACHE_PRIVADO = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-api',
+    },
+}
+
+# Datasets fijos por escala (cantidades para generar_datos)
+ESCALAS = {
+    'pequena': {
+        'comedores': 200, 'metricas': 5_000, 'comentarios': 1_000,
+        'donaciones': 500, 'suscripciones': 300,
+    },
+    'mediana': {
+        'comedores': 2_000, 'metricas': 100_000, 'comentarios': 20_000,
+        'donaciones': 5_000, 'suscripciones': 3_000,
+    },
+    'grande': {
+        'comedores': 20_000, 'metricas': 1_000_000, 'comentarios': 200_000,
+        'donaciones': 50_000, 'suscripciones': 30_000,
+    },
+}
+
+DONACION = {
+    'nombre_donante': 'Benchmark',
+    'telefono_donante': '+57 300 000 0000',
+    'tipo_donacion': 'ALIMENTOS',
+    'descripcion': '10 kg de arroz',
+    'cantidad_estimada_kg': '10',
+    'direccion_recoleccion': 'Calle 5 # 10-20',
+    'latitud_donante': settings.CALI_CENTER['lat'],
+    'longitud_donante': settings.CALI_CENTER['lng'],
+}
+
+# (nombre, método, ruta, cuerpo); la ruta admite {comedor}, {lat} y {lng}
+ENDPOINTS = [
+    ('geojson', 'get', '/api/comedores/geojson/', None),
+    ('geojson_filtrado', 'get', '/api/comedores/geojson/?tipo_comida=CASERA', None),
+    ('geojson_min', 'get', '/api/comedores/geojson/?perfil=min', None),
+    ('geojson_bbox', 'get', '/api/comedores/geojson/?perfil=min&bbox=-76.55,3.40,-76.50,3.46', None),
+    ('cercanos', 'get', '/api/comedores/cercanos/?lat={lat}&lng={lng}&radio=2', None),
+    ('clusters', 'get', '/api/comedores/clusters/?bbox=-76.60,3.33,-76.45,3.50&zoom=13', None),
+    ('network_graph', 'get', '/api/comedores/network_graph/', None),
+    ('comedores_lista', 'get', '/api/comedores/', None),
+    ('comedor_detalle', 'get', '/api/comedores/{comedor}/', None),
+    ('metricas_estadisticas', 'get', '/api/metricas/estadisticas/', None),
+    ('donaciones_estadisticas', 'get', '/api/donaciones/estadisticas/', None),
+    ('dashboard_resumen', 'get', '/api/dashboard/resumen/', None),
+    ('alertas_por_barrio', 'get', '/api/alertas/por_barrio/', None),
+    ('donacion_crear', 'post', '/api/donaciones/', DONACION),
+]
+
+
+def _llamar(cliente, metodo, ruta, cuerpo):
+    """Ejecuta una petición. Retorna (segundos, ContadorConsultas)"""
+    medidor = ContadorConsultas()
+    inicio = time.perf_counter()
+    with connection.execute_wrapper(medidor):
+        if metodo == 'post':
+            respuesta = cliente.post(ruta, cuerpo, content_type='application/json')
+        else:
+            respuesta = cliente.get(ruta)
+    segundos = time.perf_counter() - inicio
+    if respuesta.status_code >= 400:
+        raise AssertionError(f'{metodo.upper()} {ruta} respondió {respuesta.status_code}')
+    return segundos, medidor
+
+
+def medir(cliente, metodo, ruta, cuerpo=None, repeticiones=5):
+    """Mide un endpoint en frío y en caliente"""
+    cache.clear()
+    segundos, medidor = _llamar(cliente, metodo, ruta, cuerpo)
+    resultado = {
+        'ms_frio': round(segundos * 1000, 2),
+        'ms_bd_frio': round(medidor.segundos * 1000, 2),
+        'consultas_frio': medidor.consultas,
+    }
+
+    tiempos, consultas = [], []
+    for _ in range(repeticiones):
+        segundos, medidor = _llamar(cliente, metodo, ruta, cuerpo)
+        tiempos.append(segundos * 1000)
+        consultas.append(medidor.consultas)
+    if tiempos:
+        tiempos.sort()
+        resultado['ms_p50'] = round(statistics.median(tiempos), 2)
+        resultado['ms_p95'] = round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 2)
+        resultado['consultas'] = max(consultas)
+
+    # tracemalloc hace más lenta la petición: la memoria se mide aparte
+    cache.clear()
+    tracemalloc.start()
+    try:
+        _llamar(cliente, metodo, ruta, cuerpo)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    resultado['memoria_kb'] = round(pico / 1024)
+    return resultado
+
+
+def ejecutar(repeticiones=5, endpoints=None):
+    """Mide los endpoints sobre los datos actuales. Retorna {endpoint: resultado}"""
+    comedor = Comedor.objects.filter(estado_activo=True).order_by('id').values_list('id', flat=True).first()
+    valores = {
+        'comedor': comedor,
+        'lat': settings.CALI_CENTER['lat'],
+        'lng': settings.CALI_CENTER['lng'],
+    }
+    cliente = Client()
+    with override_settings(CACHES=CACHE_PRIVADO):
+        return {
+            nombre: medir(cliente, metodo, ruta.format(**valores), cuerpo, repeticiones)
+            for nombre, metodo, ruta, cuerpo in ENDPOINTS
+            if endpoints is None or nombre in endpoints
+        }
+
+
+def comparar(resultados, presupuestos):
+    """
+    Lista de textos con cada métrica que supera su presupuesto
+    resultados y presupuestos tienen la forma {escala: {endpoint: {métrica: valor}}}
+    """
+    excedidos = []
+    for escala, por_endpoint in resultados.items():
+        for endpoint, metricas in por_endpoint.items():
+            limites = presupuestos.get(escala, {}).get(endpoint, {})
+            for metrica, maximo in limites.items():
+                valor = metricas.get(metrica)
+                if valor is not None and valor > maximo:
+                    excedidos.append(f'{escala}/{endpoint}: {metrica} = {valor} (presupuesto {maximo})')
+    return excedidos
@@ -0,0 +1,214 @@
+"""
+Clusters de comedores precalculados por nivel de zoom
+
+El mapa agrupaba los marcadores en el navegador con L.markerClusterGroup,
+lo que obliga a descargar y agrupar la ciudad completa en cada dispositivo.
+Este módulo agrupa los comedores activos una sola vez por proceso sobre una
+grilla jerárquica en coordenadas Web Mercator: en el zoom z cada celda mide
+TAMANO_CELDA_PX píxeles de pantalla y contiene exactamente a cuatro celdas
+del zoom z + 1, de modo que cada nivel se obtiene sumando los agregados del
+nivel inferior. Por encima de ZOOM_MAX se sirven los comedores uno por uno.
+
+Cada cluster lleva cantidad de comedores, cupos disponibles sumados,
+cuántos están abiertos ahora y la caja que cubre a sus miembros. Se
+reconstruye con la misma marca de versión y el mismo TTL que el snapshot
+GeoJSON, porque depende de los mismos datos y de la hora actual.
+"""
+import threading
+import time
+from math import pi
+
+import numpy as np
+from django.utils import timezone
+
+from apps.core.telemetria import registrar_cache
+
+from . import horarios, snapshot, versiones
+
+ZOOM_MIN = 10
+ZOOM_MAX = 16
+
+# Lado de la celda en píxeles (potencia de dos para que las celdas se aniden)
+TAMANO_CELDA_PX = 64
+# log2 de celdas por lado de una tesela de 256 px
+_BITS_CELDA = (256 // TAMANO_CELDA_PX).bit_length() - 1
+
+_lock = threading.Lock()
+_indice = None
+
+
+def proyectar(lat, lng):
+    """Web Mercator normalizado a [0, 1) en ambos ejes (arreglos NumPy)"""
+    seno = np.sin(np.radians(lat))
+    x = (np.asarray(lng, dtype=np.float64) + 180) / 360
+    y = 0.5 - np.log((1 + seno) / (1 - seno)) / (4 * pi)
+    return x, y
+
+
+class Nivel:
+    """
+    Agregados de todas las celdas ocupadas en un zoom
+    `lat` y `lng` guardan sumas (el centro es suma / cantidad); `miembro`
+    es la posición de un comedor del cluster, usada cuando tiene uno solo
+    """
+
+    __slots__ = (
+        'columnas', 'filas', 'cantidad', 'cupos', 'abiertos', 'lat', 'lng',
+        'lat_min', 'lat_max', 'lng_min', 'lng_max', 'miembro',
+        'centro_lat', 'centro_lng',
+    )
+
+    def __init__(self, **columnas):
+        for nombre, valores in columnas.items():
+            setattr(self, nombre, valores)
+        self.centro_lat = self.lat / self.cantidad
+        self.centro_lng = self.lng / self.cantidad
+
+    def __len__(self):
+        return len(self.cantidad)
+
+    def superior(self):
+        """Nivel del zoom anterior: cada celda agrupa hasta cuatro de este"""
+        columnas, filas = self.columnas >> 1, self.filas >> 1
+        claves = (columnas << 32) | filas
+        _, primero, grupo = np.unique(claves, return_index=True, return_inverse=True)
+        n = len(primero)
+
+        def sumar(valores):
+            return np.bincount(grupo, weights=valores, minlength=n)
+
+        def extremo(funcion, inicial, valores):
+            resultado = np.full(n, inicial)
+            funcion.at(resultado, grupo, valores)
+            return resultado
+
+        return Nivel(
+            columnas=columnas[primero],
+            filas=filas[primero],
+            cantidad=sumar(self.cantidad).astype(np.int64),
+            cupos=sumar(self.cupos).astype(np.int64),
+            abiertos=sumar(self.abiertos).astype(np.int64),
+            lat=sumar(self.lat),
+            lng=sumar(self.lng),
+            lat_min=extremo(np.minimum, np.inf, self.lat_min),
+            lat_max=extremo(np.maximum, -np.inf, self.lat_max),
+            lng_min=extremo(np.minimum, np.inf, self.lng_min),
+            lng_max=extremo(np.maximum, -np.inf, self.lng_max),
+            miembro=self.miembro[primero],
+        )
+
+    def en_caja(self, oeste, sur, este, norte):
+        """Posiciones de los clusters cuyo centro cae dentro de la caja"""
+        return np.flatnonzero(
+            (self.centro_lat >= sur) & (self.centro_lat <= norte)
+            & (self.centro_lng >= oeste) & (self.centro_lng <= este)
+        )
+
+
+class IndiceClusters:
+    """Niveles de clusters de ZOOM_MIN a ZOOM_MAX más los comedores sueltos"""
+
+    def __init__(self, comedores):
+        cuarto = horarios.cuarto(timezone.now())
+        self.puntos = [snapshot.construir_feature_min(comedor, cuarto) for comedor in comedores]
+        n = len(self.puntos)
+        lat = np.array([p['geometry']['coordinates'][1] for p in self.puntos], dtype=np.float64)
+        lng = np.array([p['geometry']['coordinates'][0] for p in self.puntos], dtype=np.float64)
+
+        # Nivel base: cada comedor es un cluster de uno en la grilla de ZOOM_MAX + 1
+        escala = 2 ** (ZOOM_MAX + 1 + _BITS_CELDA)
+        x, y = proyectar(lat, lng)
+        nivel = Nivel(
+            columnas=np.floor(x * escala).astype(np.int64),
+            filas=np.floor(y * escala).astype(np.int64),
+            cantidad=np.ones(n, dtype=np.int64),
+            cupos=np.array([p['properties']['cupos_disponibles'] for p in self.puntos], dtype=np.int64),
+            abiertos=np.array([p['properties']['esta_abierto'] for p in self.puntos], dtype=np.int64),
+            lat=lat, lng=lng,
+            lat_min=lat, lat_max=lat, lng_min=lng, lng_max=lng,
+            miembro=np.arange(n, dtype=np.int64),
+        )
+        self.base = nivel
+
+        self.niveles = {}
+        for zoom in range(ZOOM_MAX, ZOOM_MIN - 1, -1):
+            nivel = nivel.superior()
+            self.niveles[zoom] = nivel
+
+        self.version = None
+        self.generado_en = time.monotonic()
+
+    def __len__(self):
+        return len(self.puntos)
+
+    def vigente(self, version):
+        return (
+            self.version == version
+            and time.monotonic() - self.generado_en < snapshot.TTL_SEGUNDOS
+        )
+
+    def consultar(self, oeste, sur, este, norte, zoom):
+        """
+        FeatureCollection con los clusters (o comedores) visibles en la caja
+        Zooms menores que ZOOM_MIN usan los clusters de ZOOM_MIN
+        """
+        if zoom > ZOOM_MAX:
+            posiciones = self.base.en_caja(oeste, sur, este, norte)
+            features = [self.puntos[i] for i in posiciones]
+        else:
+            zoom = max(zoom, ZOOM_MIN)
+            nivel = self.niveles[zoom]
+            features = [
+                self.puntos[nivel.miembro[i]] if nivel.cantidad[i] == 1
+                else _feature_cluster(nivel, i, zoom)
+                for i in nivel.en_caja(oeste, sur, este, norte)
+            ]
+        return {'type': 'FeatureCollection', 'features': features}
+
+
+def _feature_cluster(nivel, i, zoom):
+    return {
+        'type': 'Feature',
+        'id': f'{zoom}/{nivel.columnas[i]}/{nivel.filas[i]}',
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [float(nivel.centro_lng[i]), float(nivel.centro_lat[i])]
+        },
+        'properties': {
+            'cluster': True,
+            'cantidad': int(nivel.cantidad[i]),
+            'cupos': int(nivel.cupos[i]),
+            'abiertos': int(nivel.abiertos[i]),
+            'bbox': [
+                float(nivel.lng_min[i]), float(nivel.lat_min[i]),
+                float(nivel.lng_max[i]), float(nivel.lat_max[i]),
+            ],
+        }
+    }
+
+
+def obtener_indice():
+    """Retorna el índice de clusters vigente, reconstruyéndolo si está obsoleto"""
+    global _indice
+    from .models import Comedor
+
+    version = versiones.version_actual(versiones.GEOJSON)
+    indice = _indice
+    if indice is not None and indice.vigente(version):
+        registrar_cache('clusters', 'acierto')
+        return indice
+
+    with _lock:
+        indice = _indice
+        if indice is not None and indice.vigente(version):
+            registrar_cache('clusters', 'acierto')
+            return indice
+
+        registrar_cache('clusters', 'fallo')
+        comedores = Comedor.objects.filter(estado_activo=True).only(
+            *snapshot.CAMPOS_MIN
+        ).order_by()
+        indice = IndiceClusters(comedores.iterator())
+        indice.version = version
+        _indice = indice
+        return indice
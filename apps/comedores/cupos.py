@@ -0,0 +1,168 @@
+"""
+Reserva y liberación atómica de cupos
+
+Los voluntarios de un mismo comedor reportan cupos al tiempo. Leer el
+comedor, restar y guardar pierde escrituras, y save() además reescribe la
+fila completa. Aquí cada operación es un único UPDATE condicional:
+
+    cupos_disponibles = cupos_disponibles + delta
+    WHERE id = ... AND estado_activo AND 0 <= cupos_disponibles + delta <= capacidad_personas
+
+con RETURNING para obtener el valor nuevo y los datos que necesitan la
+alerta CUPOS_BAJOS y el evento en vivo, sin un SELECT previo. La base de
+datos serializa las escrituras sobre la fila, así que ninguna se pierde y
+los cupos nunca quedan negativos ni superan la capacidad del comedor.
+
+Como update() no dispara señales, aquí se emiten a mano la alerta y el
+evento de ocupación del stream en vivo (ver eventos.py), que llevan el
+valor exacto que dejó cada operación. Los cupos también aparecen en el
+GeoJSON y los clusters: al confirmar se invalida su versión, a lo sumo una
+vez cada CUPOS_INVALIDACION_SEGUNDOS por proceso para que una ráfaga de
+reservas no reconstruya el snapshot en cada una. Las reservas dentro de
+esa ventana se reflejan al vencer (ver `_invalidar_mapa`).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import alertas, eventos, snapshot
+
+# Tope por operación: una reserva más grande es un error de captura
+CANTIDAD_MAXIMA = 500
+
+# Columnas retornadas por el UPDATE
+_COLUMNAS = (
+    'cupos_disponibles', 'cola_estimada', 'nombre', 'direccion', 'latitud', 'longitud', 'barrio',
+)
+
+
+# Estado de la invalidación del mapa en este proceso
+_lock = threading.Lock()
+_ultima_invalidacion = None
+_pendiente = None
+
+
+class ConflictoCupos(Exception):
+    """La operación dejaría los cupos fuera de [0, capacidad]"""
+
+    def __init__(self, disponibles, mensaje):
+        super().__init__(mensaje)
+        self.disponibles = disponibles
+
+
+class CuposInsuficientes(ConflictoCupos):
+    """El comedor no tiene cupos suficientes para la reserva"""
+
+    def __init__(self, disponibles):
+        super().__init__(disponibles, f'Solo hay {disponibles} cupos disponibles')
+
+
+class CapacidadExcedida(ConflictoCupos):
+    """Liberar dejaría más cupos que la capacidad del comedor"""
+
+    def __init__(self, disponibles, capacidad):
+        super().__init__(
+            disponibles, f'Hay {disponibles} cupos disponibles y la capacidad es {capacidad}'
+        )
+        self.capacidad = capacidad
+
+
+def _actualizar(comedor_id, delta):
+    """
+    Suma `delta` a los cupos de un comedor activo si quedan entre 0 y su capacidad
+    Retorna el comedor (sin guardar) con los valores nuevos, o None
+    """
+    from .models import Comedor
+
+    ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+    tabla = connection.ops.quote_name(Comedor._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {tabla} SET cupos_disponibles = cupos_disponibles + %s, '
+            f'ultima_actualizacion_cupos = %s, fecha_modificacion = %s '
+            f'WHERE id = %s AND estado_activo = %s '
+            f'AND cupos_disponibles + %s >= 0 AND cupos_disponibles + %s <= capacidad_personas '
+            f'RETURNING {", ".join(_COLUMNAS)}',
+            [delta, ahora, ahora, comedor_id, True, delta, delta],
+        )
+        fila = cursor.fetchone()
+    if fila is None:
+        return None
+    return Comedor(id=comedor_id, estado_activo=True, **dict(zip(_COLUMNAS, fila)))
+
+
+def _invalidar_mapa():
+    """
+    Invalida el GeoJSON (y con él clusters e índice de horarios)
+    Si ya se invalidó hace menos de CUPOS_INVALIDACION_SEGUNDOS, programa
+    una sola invalidación al vencer la ventana en lugar de repetirla
+    """
+    global _ultima_invalidacion, _pendiente
+
+    intervalo = getattr(settings, 'CUPOS_INVALIDACION_SEGUNDOS', 1.0)
+    with _lock:
+        if _pendiente is not None:
+            return
+        ahora = time.monotonic()
+        espera = 0 if _ultima_invalidacion is None else _ultima_invalidacion + intervalo - ahora
+        if espera <= 0:
+            _ultima_invalidacion = ahora
+        else:
+            _pendiente = threading.Timer(espera, _invalidar_pendiente)
+            _pendiente.daemon = True
+            _pendiente.start()
+            return
+    snapshot.invalidar()
+
+
+def _invalidar_pendiente():
+    global _ultima_invalidacion, _pendiente
+
+    with _lock:
+        _ultima_invalidacion = time.monotonic()
+        _pendiente = None
+    snapshot.invalidar()
+
+
+def _mover(comedor_id, delta):
+    from .models import Comedor
+
+    # Un solo UPDATE es atómico por sí mismo: sin transaction.atomic() ni SAVEPOINT
+    comedor = _actualizar(comedor_id, delta)
+    if comedor is None:
+        # Camino raro: distinguir comedor inexistente de cupos fuera de rango
+        fila = Comedor.objects.filter(
+            pk=comedor_id, estado_activo=True
+        ).values_list('cupos_disponibles', 'capacidad_personas').first()
+        if fila is None:
+            raise Comedor.DoesNotExist(f'No existe el comedor activo {comedor_id}')
+        disponibles, capacidad = fila
+        if delta > 0:
+            raise CapacidadExcedida(disponibles, capacidad)
+        raise CuposInsuficientes(disponibles)
+
+    anteriores = comedor.cupos_disponibles - delta
+    if anteriores >= alertas.UMBRAL_CUPOS_BAJOS > comedor.cupos_disponibles:
+        alertas.encolar_al_confirmar(alertas.evento_cupos_bajos(comedor))
+    eventos.publicar_al_confirmar([eventos.evento_comedor(comedor)])
+    transaction.on_commit(_invalidar_mapa)
+    return comedor.cupos_disponibles
+
+
+def reservar(comedor_id, cantidad=1):
+    """
+    Descuenta `cantidad` cupos y retorna los que quedan
+    Lanza CuposInsuficientes o Comedor.DoesNotExist
+    """
+    return _mover(comedor_id, -cantidad)
+
+
+def liberar(comedor_id, cantidad=1):
+    """
+    Devuelve `cantidad` cupos y retorna los disponibles
+    Lanza CapacidadExcedida o Comedor.DoesNotExist
+    """
+    return _mover(comedor_id, cantidad)
@@ -0,0 +1,198 @@
+"""
+Cálculo y cache del resumen del dashboard
+
+El dashboard necesita métricas destacadas, la evolución de 7 días, el
+ranking de comedores y el desglose de donaciones. `calcular_resumen` los
+obtiene con agregaciones condicionales (una consulta por tabla) y
+`obtener_resumen` guarda el resultado ya codificado en el cache de Django.
+
+El cache usa dos plazos: pasado DASHBOARD_TTL el resumen se considera
+viejo y un solo proceso lo recalcula, mientras los demás siguen sirviendo
+la copia vieja en lugar de recalcular todos a la vez.
+
+El candado de recálculo (`_candado`) debe ser atómico entre workers. En
+PostgreSQL es un advisory lock de transacción: lo toma un solo worker de
+cualquier servidor y se libera solo si el proceso muere. En otras bases se
+usa cache.add, que es atómico en LocMem, Memcached y Redis pero no en
+FileBasedCache (lee y luego escribe); con SQLite y FileBasedCache varios
+workers pueden recalcular a la vez.
+"""
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.core.telemetria import registrar_cache
+
+from .models import Donacion, MetricaDiaria, MetricaMensual
+from .snapshot import calcular_etag, codificar
+
+TTL_SEGUNDOS = getattr(settings, 'DASHBOARD_TTL', 30)
+
+CLAVE_CACHE = 'comedores:dashboard:resumen'
+CLAVE_CANDADO = 'comedores:dashboard:resumen:calculando'
+
+# Clave del advisory lock de PostgreSQL (entero de 64 bits arbitrario y fijo)
+CANDADO_POSTGRESQL = 7_351_204_918_001
+
+# Tiempo máximo que un proceso espera a que otro termine el cálculo
+ESPERA_MAXIMA_SEGUNDOS = 5
+
+TIPOS_HOY = ['COMIDAS_SERVIDAS', 'CUPOS_OCUPADOS', 'USUARIOS_ATENDIDOS']
+TIPOS_PERIODO = TIPOS_HOY + ['DONACIONES_RECIBIDAS']
+
+
+def estadisticas_metricas(hoy):
+    """Totales de hoy, últimos 7 y últimos 30 días en una sola consulta"""
+    ventanas = {
+        'hoy': (Q(periodo=hoy), TIPOS_HOY),
+        'semana': (Q(periodo__gte=hoy - timedelta(days=7)), TIPOS_PERIODO),
+        'mes': (Q(periodo__gte=hoy - timedelta(days=30)), TIPOS_PERIODO),
+    }
+    sumas = MetricaDiaria.objects.filter(
+        periodo__gte=hoy - timedelta(days=30), periodo__lte=hoy
+    ).aggregate(**{
+        f'{ventana}:{tipo}': Sum('total', filter=filtro & Q(tipo_metrica=tipo))
+        for ventana, (filtro, tipos) in ventanas.items()
+        for tipo in tipos
+    })
+    return {
+        ventana: {tipo.lower(): sumas[f'{ventana}:{tipo}'] or 0 for tipo in tipos}
+        for ventana, (_, tipos) in ventanas.items()
+    }
+
+
+def evolucion_metricas(hoy, dias=7):
+    """{tipo_metrica: [{fecha, valor}, ...]} de los últimos `dias` días"""
+    metricas = MetricaDiaria.objects.filter(
+        periodo__gte=hoy - timedelta(days=dias), periodo__lte=hoy
+    ).values('periodo', 'tipo_metrica').annotate(
+        total=Sum('total')
+    ).order_by('periodo')
+
+    datos_por_tipo = {}
+    for metrica in metricas:
+        datos_por_tipo.setdefault(metrica['tipo_metrica'], []).append({
+            'fecha': metrica['periodo'],
+            'valor': metrica['total']
+        })
+    return datos_por_tipo
+
+
+def ranking_comedores(tipo_metrica='COMIDAS_SERVIDAS', limite=10):
+    """Comedores con mayor total histórico de un tipo de métrica"""
+    return list(
+        MetricaMensual.objects.filter(
+            tipo_metrica=tipo_metrica, comedor__isnull=False
+        ).values('comedor__id', 'comedor__nombre').annotate(
+            total=Sum('total')
+        ).order_by('-total')[:limite]
+    )
+
+
+def estadisticas_donaciones(hoy):
+    """Totales de donaciones con una consulta condicional y otra por tipo"""
+    inicio_mes = timezone.make_aware(datetime.combine(hoy - timedelta(days=30), datetime.min.time()))
+    totales = Donacion.objects.aggregate(
+        total_donaciones=Count('id'),
+        total_entregadas=Count('id', filter=Q(estado='ENTREGADA')),
+        total_pendientes=Count('id', filter=Q(estado='PENDIENTE')),
+        donaciones_mes=Count('id', filter=Q(fecha_creacion__gte=inicio_mes)),
+        valor_monetario_total=Sum('valor_monetario'),
+        peso_total_kg=Sum('cantidad_estimada_kg'),
+    )
+    por_tipo = Donacion.objects.values('tipo_donacion').annotate(
+        total=Count('id')
+    ).order_by('-total')
+
+    return {
+        'total_donaciones': totales['total_donaciones'],
+        'total_entregadas': totales['total_entregadas'],
+        'total_pendientes': totales['total_pendientes'],
+        'donaciones_mes': totales['donaciones_mes'],
+        'por_tipo': list(por_tipo),
+        'valor_monetario_total': float(totales['valor_monetario_total'] or 0),
+        'peso_total_kg': float(totales['peso_total_kg'] or 0),
+    }
+
+
+def calcular_resumen():
+    """Todos los datos del dashboard en un diccionario"""
+    hoy = timezone.now().date()
+    return {
+        'metricas': estadisticas_metricas(hoy),
+        'evolucion': evolucion_metricas(hoy),
+        'top_comedores': ranking_comedores(),
+        'donaciones': estadisticas_donaciones(hoy),
+        'generado_en': timezone.now(),
+    }
+
+
+def _recalcular():
+    contenido = codificar(calcular_resumen())
+    entrada = {
+        'contenido': contenido,
+        'etag': calcular_etag(contenido),
+        'vence': time.time() + TTL_SEGUNDOS,
+    }
+    # La copia vieja sigue disponible un rato para servirla durante recálculos
+    cache.set(CLAVE_CACHE, entrada, TTL_SEGUNDOS * 10)
+    return entrada
+
+
+@contextmanager
+def _candado():
+    """Candado de recálculo entre procesos; produce True si se obtuvo"""
+    if connection.vendor == 'postgresql':
+        # Se libera al terminar la transacción, también si el cálculo falla
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [CANDADO_POSTGRESQL])
+            yield cursor.fetchone()[0]
+        return
+
+    if not cache.add(CLAVE_CANDADO, True, ESPERA_MAXIMA_SEGUNDOS * 2):
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        cache.delete(CLAVE_CANDADO)
+
+
+def obtener_resumen():
+    """
+    Retorna {'contenido': bytes, 'etag': str} con el resumen vigente
+    Solo un proceso recalcula a la vez; los demás sirven la copia vieja
+    o esperan a que termine si no hay ninguna
+    """
+    entrada = cache.get(CLAVE_CACHE)
+    if entrada is not None and entrada['vence'] > time.time():
+        registrar_cache('dashboard', 'acierto')
+        return entrada
+
+    limite = time.monotonic() + ESPERA_MAXIMA_SEGUNDOS
+    while True:
+        with _candado() as obtenido:
+            if obtenido:
+                registrar_cache('dashboard', 'fallo')
+                return _recalcular()
+
+        if entrada is not None:
+            registrar_cache('dashboard', 'viejo')
+            return entrada
+
+        if time.monotonic() > limite:
+            # El proceso que calculaba no terminó a tiempo
+            registrar_cache('dashboard', 'fallo')
+            return _recalcular()
+
+        time.sleep(0.05)
+        entrada = cache.get(CLAVE_CACHE)
+        if entrada is not None:
+            registrar_cache('dashboard', 'acierto')
+            return entrada
@@ -0,0 +1,303 @@
+"""
+Eventos en vivo de comedores por Server-Sent Events
+
+El mapa y el dashboard se enteraban de los cambios consultando la API cada
+cierto tiempo. Este módulo publica un evento compacto cada vez que cambian
+los cupos, la cola estimada o el estado activo de un comedor, y lo entrega
+a los navegadores conectados a RUTA (ver comedores_cali/asgi.py).
+
+Flujo:
+1. `publicar_al_confirmar(eventos)` escribe los eventos en el backend
+   configurado en EVENTOS_BACKEND cuando se confirma la transacción.
+2. En cada worker ASGI, `Hub` sondea el backend una vez por intervalo
+   mientras tenga clientes, sin importar cuántos sean, codifica cada
+   evento una sola vez y encola los mismos bytes a todos sus clientes.
+3. `aplicacion` atiende cada conexión: un cliente inactivo es solo una
+   cola de asyncio esperando, con un latido cada EVENTOS_LATIDO segundos.
+
+Los ids de los eventos sirven de Last-Event-ID: al reconectarse, el
+navegador recibe los eventos que se perdió, o `resincronizar` si fueron
+demasiados (el cliente pide entonces /api/comedores/cambios/).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+RUTA = '/api/comedores/eventos/'
+
+INTERVALO = getattr(settings, 'EVENTOS_INTERVALO', 0.5)
+LATIDO = getattr(settings, 'EVENTOS_LATIDO', 20)
+RETENCION = timedelta(minutes=getattr(settings, 'EVENTOS_RETENCION_MINUTOS', 60))
+
+# Eventos por leer en un sondeo y pendientes por cliente; un cliente que se
+# atrasa más se desconecta y al reconectarse retoma con Last-Event-ID
+LIMITE_LECTURA = 500
+COLA_MAXIMA = 256
+
+# Milisegundos que espera EventSource antes de reconectarse
+REINTENTO_MS = 3000
+
+_lock = threading.Lock()
+_backend = None
+_hub = None
+
+
+def evento_comedor(comedor):
+    """Estado en vivo de un comedor, con claves cortas"""
+    return {
+        'id': comedor.pk,
+        'cupos': comedor.cupos_disponibles,
+        'estado_cupos': comedor.estado_cupos,
+        'cola': comedor.cola_estimada,
+        'activo': comedor.estado_activo,
+    }
+
+
+def publicar(eventos):
+    """Publica una lista de eventos para todos los workers"""
+    if eventos:
+        obtener_backend().publicar(eventos)
+
+
+def publicar_al_confirmar(eventos):
+    """Publica los eventos cuando se confirme la transacción en curso"""
+    transaction.on_commit(lambda: publicar(eventos))
+
+
+def codificar(pk, datos, tipo='comedor'):
+    """Bloque SSE de un evento"""
+    contenido = json.dumps(datos, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {pk}\nevent: {tipo}\ndata: {contenido}\n\n'.encode('utf-8')
+
+
+class BackendMemoria:
+    """
+    Eventos en memoria del proceso actual
+    Para desarrollo con un solo proceso y para pruebas: no comunica workers
+    """
+
+    def __init__(self, capacidad=1000):
+        self._eventos = deque(maxlen=capacidad)
+        self._ultimo = 0
+        self._lock = threading.Lock()
+
+    def publicar(self, eventos):
+        with self._lock:
+            for datos in eventos:
+                self._ultimo += 1
+                self._eventos.append((self._ultimo, datos))
+
+    def ultimo_id(self):
+        return self._ultimo
+
+    def leer(self, despues_de):
+        with self._lock:
+            return [(pk, datos) for pk, datos in self._eventos if pk > despues_de][:LIMITE_LECTURA]
+
+
+class BackendBaseDatos:
+    """
+    Eventos en la tabla EventoComedor, compartida por todos los workers
+    Sustituto local de un canal pub/sub (p. ej. LISTEN/NOTIFY o Redis); las
+    filas se purgan pasada la retención
+    """
+
+    def __init__(self):
+        self._ultima_purga = 0.0
+
+    def publicar(self, eventos):
+        from .models import EventoComedor
+
+        EventoComedor.objects.bulk_create([EventoComedor(datos=datos) for datos in eventos])
+        if time.monotonic() - self._ultima_purga > 60:
+            self._ultima_purga = time.monotonic()
+            EventoComedor.objects.filter(fecha__lt=timezone.now() - RETENCION).delete()
+
+    def ultimo_id(self):
+        from .models import EventoComedor
+
+        return EventoComedor.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    def leer(self, despues_de):
+        from .models import EventoComedor
+
+        return list(
+            EventoComedor.objects.filter(id__gt=despues_de).order_by('id').values_list(
+                'id', 'datos'
+            )[:LIMITE_LECTURA]
+        )
+
+
+def obtener_backend():
+    """Backend configurado en EVENTOS_BACKEND (una instancia por proceso)"""
+    global _backend
+    ruta = getattr(settings, 'EVENTOS_BACKEND', 'apps.comedores.eventos.BackendBaseDatos')
+    with _lock:
+        if _backend is None or _backend[0] != ruta:
+            _backend = (ruta, import_string(ruta)())
+        return _backend[1]
+
+
+class Hub:
+    """
+    Reparte los eventos del backend entre los clientes de este proceso
+    Una sola tarea sondea el backend mientras haya clientes conectados
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.clientes = set()
+        self.ultimo_id = None
+        self._tarea = None
+
+    async def suscribir(self, ultimo_id=None):
+        """
+        Cola de bloques SSE para un cliente nuevo
+        Si el cliente trae Last-Event-ID, la cola empieza con lo que se perdió
+        """
+        if not self.clientes:
+            # Sin clientes no se sondeó: empezar desde el último evento publicado
+            self.ultimo_id = await sync_to_async(self.backend.ultimo_id)()
+
+        cola = asyncio.Queue(COLA_MAXIMA)
+        if ultimo_id is not None and ultimo_id < self.ultimo_id:
+            # Se lee desde el último evento que recibió el cliente: si ya no
+            # está, pudo purgarse también alguno de los que se perdió
+            perdidos = [
+                (pk, datos) for pk, datos in await sync_to_async(self.backend.leer)(ultimo_id - 1)
+                if pk <= self.ultimo_id
+            ]
+            if (
+                not perdidos or perdidos[0][0] != ultimo_id
+                or perdidos[-1][0] < self.ultimo_id or len(perdidos) > COLA_MAXIMA
+            ):
+                # Ya se purgaron o son demasiados: mejor una sincronización incremental
+                cola.put_nowait(codificar(self.ultimo_id, {}, 'resincronizar'))
+            else:
+                for pk, datos in perdidos[1:]:
+                    cola.put_nowait(codificar(pk, datos))
+
+        self.clientes.add(cola)
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.ensure_future(self._sondear())
+        return cola
+
+    def cancelar(self, cola):
+        self.clientes.discard(cola)
+
+    def difundir(self, bloque):
+        """Encola el mismo bloque a todos los clientes; desconecta a los atrasados"""
+        for cola in list(self.clientes):
+            try:
+                cola.put_nowait(bloque)
+            except asyncio.QueueFull:
+                self.clientes.discard(cola)
+                cola.get_nowait()
+                cola.put_nowait(None)
+
+    async def _sondear(self):
+        leer = sync_to_async(self.backend.leer)
+        while self.clientes:
+            try:
+                eventos = await leer(self.ultimo_id)
+            except Exception:
+                logger.exception('Error al leer eventos de comedores')
+                await sync_to_async(connection.close)()
+                eventos = []
+
+            for pk, datos in eventos:
+                self.difundir(codificar(pk, datos))
+                self.ultimo_id = pk
+
+            if len(eventos) < LIMITE_LECTURA:
+                await asyncio.sleep(INTERVALO)
+
+
+def obtener_hub():
+    """Hub del proceso para el backend configurado"""
+    global _hub
+    backend = obtener_backend()
+    if _hub is None or _hub.backend is not backend:
+        _hub = Hub(backend)
+    return _hub
+
+
+def _ultimo_id(scope):
+    for nombre, valor in scope.get('headers', ()):
+        if nombre == b'last-event-id':
+            try:
+                return int(valor)
+            except ValueError:
+                return None
+    return None
+
+
+async def _esperar_desconexion(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def aplicacion(scope, receive, send):
+    """Aplicación ASGI del stream de eventos"""
+    if scope['method'] != 'GET':
+        await send({
+            'type': 'http.response.start',
+            'status': 405,
+            'headers': [(b'allow', b'GET'), (b'content-type', b'text/plain; charset=utf-8')],
+        })
+        await send({'type': 'http.response.body', 'body': 'Método no permitido'.encode('utf-8')})
+        return
+
+    hub = obtener_hub()
+    cola = await hub.suscribir(_ultimo_id(scope))
+    desconexion = asyncio.ensure_future(_esperar_desconexion(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),  # Sin buffer en nginx
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {REINTENTO_MS}\n\n'.encode(),
+            'more_body': True,
+        })
+
+        while True:
+            lectura = asyncio.ensure_future(cola.get())
+            listos, _ = await asyncio.wait(
+                {lectura, desconexion}, timeout=LATIDO, return_when=asyncio.FIRST_COMPLETED
+            )
+            if desconexion in listos:
+                lectura.cancel()
+                return
+            if lectura in listos:
+                bloque = lectura.result()
+                if bloque is None:
+                    break  # Cliente atrasado: EventSource se reconectará
+            else:
+                lectura.cancel()
+                bloque = b': latido\n\n'
+            await send({'type': 'http.response.body', 'body': bloque, 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        hub.cancelar(cola)
+        desconexion.cancel()
@@ -0,0 +1,150 @@
+"""
+Exportación en streaming de métricas y donaciones (NDJSON o CSV)
+
+Las filas se leen con values_list().iterator(chunk_size), sin instanciar
+modelos ni pasar por serializers de DRF, y se escriben por bloques: la
+memoria usada no depende del número de filas exportadas. Lo usan las
+acciones /export/ de MetricaViewSet y DonacionViewSet y el comando
+exportar_datos (archivos gzip).
+
+Bajo ASGI el handler de Django lee completo un iterador síncrono antes de
+enviar nada; ahí la respuesta usa un generador asíncrono que pide cada
+bloque con sync_to_async.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, QueryDict, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import urlencode
+from rest_framework.request import Request
+
+# Columnas exportadas por tabla: (nombre, es_json)
+COLUMNAS = {
+    'metricas': [
+        ('id', False), ('comedor_id', False), ('tipo_metrica', False), ('valor', False),
+        ('fecha', False), ('fecha_registro', False), ('metadata', True),
+    ],
+    'donaciones': [
+        ('id', False), ('nombre_donante', False), ('telefono_donante', False),
+        ('email_donante', False), ('tipo_donacion', False), ('descripcion', False),
+        ('cantidad_estimada_kg', False), ('valor_monetario', False),
+        ('direccion_recoleccion', False), ('barrio_donante', False),
+        ('latitud_donante', False), ('longitud_donante', False),
+        ('comedor_asignado_id', False), ('estado', False), ('fecha_asignacion', False),
+        ('fecha_entrega_estimada', False), ('fecha_entrega_real', False),
+        ('fecha_creacion', False), ('notas_admin', False),
+    ],
+}
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Filas leídas por viaje a la base de datos y filas por bloque escrito
+FILAS_POR_CONSULTA = 5000
+FILAS_POR_BLOQUE = 1000
+
+
+def _bloques(filas, progreso=None):
+    while True:
+        bloque = list(islice(filas, FILAS_POR_BLOQUE))
+        if not bloque:
+            return
+        if progreso is not None:
+            progreso(len(bloque))
+        yield bloque
+
+
+def _csv(filas, columnas, progreso):
+    nombres = [nombre for nombre, _ in columnas]
+    indices_json = [i for i, (_, es_json) in enumerate(columnas) if es_json]
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(nombres)
+    for bloque in _bloques(filas, progreso):
+        for i in indices_json:
+            # Solo se copian las filas que traen JSON; el resto va tal cual
+            bloque = [
+                fila if fila[i] is None
+                else fila[:i] + (json.dumps(fila[i], ensure_ascii=False),) + fila[i + 1:]
+                for fila in bloque
+            ]
+        escritor.writerows(bloque)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')  # Solo el encabezado: no hubo filas
+
+
+def _ndjson(filas, columnas, progreso):
+    nombres = [nombre for nombre, _ in columnas]
+    codificar = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for bloque in _bloques(filas, progreso):
+        yield ''.join(
+            codificar(dict(zip(nombres, fila))) + '\n' for fila in bloque
+        ).encode('utf-8')
+
+
+def generar(queryset, tabla, formato, progreso=None):
+    """
+    Genera bloques de bytes con las filas del queryset en el formato dado
+    `progreso` recibe el número de filas de cada bloque
+    """
+    columnas = COLUMNAS[tabla]
+    filas = queryset.values_list(*(nombre for nombre, _ in columnas)).iterator(
+        chunk_size=FILAS_POR_CONSULTA
+    )
+    if formato == 'csv':
+        return _csv(filas, columnas, progreso)
+    return _ndjson(filas, columnas, progreso)
+
+
+async def _asincrono(bloques):
+    """Entrega los bloques de a uno; thread_sensitive mantiene el cursor en su hilo"""
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    fin = object()
+    while True:
+        bloque = await siguiente(bloques, fin)
+        if bloque is fin:
+            return
+        yield bloque
+
+
+def nombre_archivo(tabla, formato):
+    return f'{tabla}-{timezone.localdate():%Y%m%d}.{formato}'
+
+
+def respuesta(queryset, tabla, formato, request=None):
+    """
+    StreamingHttpResponse con la exportación como archivo adjunto
+    Con una petición ASGI el contenido es un iterador asíncrono
+    """
+    contenido = generar(queryset, tabla, formato)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        contenido = _asincrono(contenido)
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo(tabla, formato)}"'
+    return response
+
+
+def queryset_filtrado(viewset_class, parametros):
+    """
+    Queryset de un ViewSet con los mismos filtros que aplicaría a una
+    petición GET con esos parámetros (para exportar fuera de una petición)
+    """
+    solicitud = HttpRequest()
+    solicitud.method = 'GET'
+    solicitud.GET = QueryDict(urlencode(parametros, doseq=True))
+    vista = viewset_class(
+        request=Request(solicitud),
+        action='export', format_kwarg=None, args=(), kwargs={},
+    )
+    return vista.filter_queryset(vista.get_queryset())
@@ -0,0 +1,151 @@
+"""
+Utilidades geográficas compartidas por la aplicación de Comedores
+
+Incluye la fórmula de Haversine en tres versiones:
+- Escalar en Python, para un par de puntos
+- Vectorizada con NumPy, para uno-a-muchos y muchos-a-muchos puntos
+- Como expresión SQL, para filtrar y ordenar por distancia en la base de
+  datos. En SQLite se usa una función registrada en cada conexión; en
+  PostgreSQL se genera la fórmula con funciones matemáticas estándar.
+"""
+from math import radians, cos, sin, asin, sqrt
+
+import numpy as np
+from django.db.models import FloatField, Func, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+# Radio de la Tierra en kilómetros
+RADIO_TIERRA_KM = 6371
+
+# Kilómetros por grado de latitud (aprox. constante)
+KM_POR_GRADO = 111.32
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Calcular la distancia entre dos puntos en la Tierra usando la fórmula de Haversine
+    Retorna la distancia en kilómetros
+    """
+    # Convertir grados a radianes
+    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+
+    # Fórmula de Haversine
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * asin(sqrt(min(a, 1.0)))
+
+    return c * RADIO_TIERRA_KM
+
+
+def distancias_desde(lat, lng, lats, lngs):
+    """
+    Distancias en km desde un punto hasta cada punto de (lats, lngs)
+    Retorna un arreglo NumPy con la misma forma que `lats`
+    """
+    lat0, lng0 = radians(lat), radians(lng)
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+
+    a = (
+        np.sin((lats - lat0) / 2) ** 2
+        + cos(lat0) * np.cos(lats) * np.sin((lngs - lng0) / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def matriz_distancias(lats1, lngs1, lats2, lngs2):
+    """
+    Distancias en km entre todos los pares de dos conjuntos de puntos
+    Retorna una matriz (n, m) para n orígenes y m destinos
+    """
+    lats1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, np.newaxis]
+    lngs1 = np.radians(np.asarray(lngs1, dtype=np.float64))[:, np.newaxis]
+    lats2 = np.radians(np.asarray(lats2, dtype=np.float64))[np.newaxis, :]
+    lngs2 = np.radians(np.asarray(lngs2, dtype=np.float64))[np.newaxis, :]
+
+    a = (
+        np.sin((lats2 - lats1) / 2) ** 2
+        + np.cos(lats1) * np.cos(lats2) * np.sin((lngs2 - lngs1) / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def mas_cercanos(lats1, lngs1, lats2, lngs2, bloque=2048):
+    """
+    Para cada origen, índice y distancia del destino más cercano
+    Procesa los orígenes por bloques para acotar la memoria de la matriz
+    Retorna (indices, distancias) como arreglos NumPy de largo n
+    """
+    lats1 = np.asarray(lats1, dtype=np.float64)
+    lngs1 = np.asarray(lngs1, dtype=np.float64)
+    n = len(lats1)
+    indices = np.empty(n, dtype=np.int64)
+    distancias = np.empty(n, dtype=np.float64)
+    if n == 0 or len(lats2) == 0:
+        indices.fill(-1)
+        distancias.fill(np.inf)
+        return indices, distancias
+
+    for inicio in range(0, n, bloque):
+        fin = min(inicio + bloque, n)
+        matriz = matriz_distancias(lats1[inicio:fin], lngs1[inicio:fin], lats2, lngs2)
+        indices[inicio:fin] = matriz.argmin(axis=1)
+        distancias[inicio:fin] = matriz[np.arange(fin - inicio), indices[inicio:fin]]
+
+    return indices, distancias
+
+
+def caja_envolvente(lat, lng, radio_km):
+    """
+    Rectángulo (lat_min, lat_max, lng_min, lng_max) que contiene el círculo
+    de `radio_km` alrededor del punto. Sirve de prefiltro indexable.
+    """
+    delta_lat = radio_km / KM_POR_GRADO
+    delta_lng = radio_km / (KM_POR_GRADO * max(cos(radians(lat)), 0.01))
+    return (lat - delta_lat, lat + delta_lat, lng - delta_lng, lng + delta_lng)
+
+
+def _sqlite_haversine_km(lat1, lon1, lat2, lon2):
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine(lat1, lon1, lat2, lon2)
+
+
+def registrar_funciones_sqlite(sender, connection, **kwargs):
+    """Registra HAVERSINE_KM en cada conexión SQLite nueva"""
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(
+            'HAVERSINE_KM', 4, _sqlite_haversine_km, deterministic=True
+        )
+
+
+class DistanciaKm(Func):
+    """
+    Distancia en km desde un punto fijo hasta las columnas de coordenadas
+    Uso: Comedor.objects.annotate(distancia_km=DistanciaKm(lat, lng))
+    """
+    function = 'HAVERSINE_KM'
+    arity = 4
+    output_field = FloatField()
+
+    def __init__(self, lat, lng, campo_lat='latitud', campo_lng='longitud', **extra):
+        super().__init__(
+            Value(float(lat)), Value(float(lng)), campo_lat, campo_lng, **extra
+        )
+
+    def formula_sql(self):
+        """Haversine con funciones matemáticas estándar de SQL"""
+        lat1, lng1, lat2, lng2 = self.get_source_expressions()
+        a = (
+            Power(Sin((Radians(lat2) - Radians(lat1)) / Value(2.0)), 2)
+            + Cos(Radians(lat1)) * Cos(Radians(lat2))
+            * Power(Sin((Radians(lng2) - Radians(lng1)) / Value(2.0)), 2)
+        )
+        return Value(2.0 * RADIO_TIERRA_KM) * ASin(Sqrt(Least(a, Value(1.0))))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return compiler.compile(self.formula_sql())
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, **extra_context)
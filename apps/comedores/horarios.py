@@ -0,0 +1,286 @@
+"""
+Horario semanal de los comedores como máscara de bits
+
+Cada comedor abre en un conjunto de cuartos de hora de la semana: bit q
+de un entero de 7 × 96 = 672 bits, con q = día * 96 + hora * 4 + minuto // 15
+(0 = lunes 00:00) en la zona horaria de la aplicación (America/Bogota, sin
+horario de verano). Con esa representación:
+
+- `abierto(mascara, q)` es un desplazamiento, y q se calcula una sola vez
+  por petición con `cuarto(momento)`
+- Los horarios que cruzan la medianoche y los horarios CUSTOM (varias
+  franjas por día en horario_personalizado) son solo más bits encendidos
+- La próxima apertura es el siguiente bit encendido precedido de uno apagado,
+  y su cierre el primer bit apagado después de ella
+
+Las máscaras dependen solo de los campos de horario y se memorizan: los
+comedores comparten unos pocos horarios. `IndiceHorario` guarda una por
+horario distinto en un arreglo NumPy para responder "¿quiénes están
+abiertos en T?" con una sola operación vectorizada, y la API filtra por
+los horarios abiertos en lugar de enviar los ids a la base de datos. Se
+reconstruye con la marca de versión del GeoJSON, pero no expira por tiempo.
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.telemetria import registrar_cache
+
+from . import versiones
+
+CUARTOS_POR_DIA = 96
+CUARTOS_SEMANA = 7 * CUARTOS_POR_DIA
+SEMANA_COMPLETA = (1 << CUARTOS_SEMANA) - 1
+
+# Códigos de día de horario_personalizado (0=Lunes)
+CODIGOS_DIA = ('LU', 'MA', 'MI', 'JU', 'VI', 'SA', 'DO')
+
+# Días de la semana (0=Lunes) de cada opción de dias_atencion
+# CUSTOM define sus días en horario_personalizado
+DIAS_POR_CODIGO = {
+    'LU-VI': range(0, 5),
+    'LU-SA': range(0, 6),
+    'LU-DO': range(0, 7),
+    'MA-SA': range(1, 6),
+    'TODOS': range(0, 7),
+}
+
+# Columnas necesarias para calcular la máscara de un comedor
+CAMPOS = ('horario_apertura', 'horario_cierre', 'dias_atencion', 'horario_personalizado')
+
+_lock = threading.Lock()
+_indice = None
+
+
+def cuarto(momento, redondear_arriba=False):
+    """Cuarto de hora de la semana (0-671) de un instante, en hora local"""
+    local = timezone.localtime(momento)
+    minutos = local.hour * 60 + local.minute
+    q = local.weekday() * CUARTOS_POR_DIA + minutos // 15
+    if redondear_arriba and (minutos % 15 or local.second or local.microsecond):
+        q += 1
+    return q % CUARTOS_SEMANA
+
+
+def inicio_de_cuarto(momento):
+    """Instante local en que empieza el cuarto de hora de `momento`"""
+    local = timezone.localtime(momento)
+    return local.replace(minute=local.minute - local.minute % 15, second=0, microsecond=0)
+
+
+def _leer_hora(texto):
+    hora = datetime.strptime(texto, '%H:%M').time()
+    return hora.hour * 60 + hora.minute
+
+
+def _franja(dia, apertura, cierre):
+    """
+    Bits de una franja que abre el día `dia` entre dos horas (en minutos)
+    Si el cierre no es posterior a la apertura, cierra al día siguiente
+    (apertura == cierre se interpreta como 24 horas)
+    """
+    inicio = apertura // 15
+    fin = -(-cierre // 15)  # El cuarto en curso al cerrar no cuenta
+    if fin <= inicio:
+        fin += CUARTOS_POR_DIA
+    bits = ((1 << (fin - inicio)) - 1) << (dia * CUARTOS_POR_DIA + inicio)
+    # Un horario nocturno del domingo termina el lunes: rotar al inicio
+    return (bits | bits >> CUARTOS_SEMANA) & SEMANA_COMPLETA
+
+
+def validar_personalizado(valor):
+    """Valida horario_personalizado: {"LU": [["08:00", "14:00"], ...], ...}"""
+    if valor in (None, {}):
+        return
+    if not isinstance(valor, dict):
+        raise ValidationError('El horario personalizado debe ser un objeto por día')
+    for dia, franjas in valor.items():
+        if dia not in CODIGOS_DIA:
+            raise ValidationError(f'Día inválido: {dia} (use {", ".join(CODIGOS_DIA)})')
+        if not isinstance(franjas, list):
+            raise ValidationError(f'{dia}: se esperaba una lista de franjas')
+        for franja in franjas:
+            try:
+                apertura, cierre = franja
+                _leer_hora(apertura), _leer_hora(cierre)
+            except (TypeError, ValueError):
+                raise ValidationError(f'{dia}: franja inválida {franja!r}, use ["HH:MM", "HH:MM"]')
+
+
+@lru_cache(maxsize=1024)
+def _mascara(apertura, cierre, dias_atencion, personalizado):
+    bits = 0
+    if dias_atencion == 'CUSTOM':
+        for dia, franjas in json.loads(personalizado or '{}').items():
+            for inicio, fin in franjas:
+                bits |= _franja(CODIGOS_DIA.index(dia), _leer_hora(inicio), _leer_hora(fin))
+        return bits
+
+    minutos_apertura = apertura.hour * 60 + apertura.minute
+    minutos_cierre = cierre.hour * 60 + cierre.minute
+    for dia in DIAS_POR_CODIGO.get(dias_atencion, ()):
+        bits |= _franja(dia, minutos_apertura, minutos_cierre)
+    return bits
+
+
+def _clave(apertura, cierre, dias_atencion, personalizado=None):
+    """Horario normalizado y hashable: horario_personalizado solo cuenta en CUSTOM"""
+    if dias_atencion != 'CUSTOM':
+        personalizado = None
+    elif personalizado is not None:
+        personalizado = json.dumps(personalizado, sort_keys=True)
+    return apertura, cierre, dias_atencion, personalizado
+
+
+def mascara(apertura, cierre, dias_atencion, personalizado=None):
+    """Máscara semanal de un horario (memorizada)"""
+    return _mascara(*_clave(apertura, cierre, dias_atencion, personalizado))
+
+
+def abierto(bits, q):
+    return bool(bits >> q & 1)
+
+
+def _rotar(bits, n):
+    """Rota la máscara n cuartos hacia atrás (el bit q pasa a q - n)"""
+    n %= CUARTOS_SEMANA
+    return (bits >> n | bits << (CUARTOS_SEMANA - n)) & SEMANA_COMPLETA
+
+
+def inicios(bits):
+    """Bits de los cuartos en que abre: encendidos con el anterior apagado"""
+    return bits & ~_rotar(bits, -1) & SEMANA_COMPLETA
+
+
+def proxima_apertura(bits, momento):
+    """
+    Siguiente instante posterior a `momento` en que el comedor abre
+    None si nunca abre o si está abierto toda la semana
+    """
+    aperturas = inicios(bits)
+    if not aperturas:
+        return None
+    q = cuarto(momento)
+    # Cuartos desde el siguiente al actual; el bit más bajo es la próxima apertura
+    siguientes = _rotar(aperturas, q + 1)
+    pasos = (siguientes & -siguientes).bit_length()
+    return inicio_de_cuarto(momento) + timedelta(minutes=15 * pasos)
+
+
+def fin_de_franja(bits, momento):
+    """
+    Instante en que termina la franja abierta que contiene a `momento`
+    (el primer cuarto apagado después de él); None si está cerrado en ese
+    cuarto o si abre toda la semana
+    """
+    q = cuarto(momento)
+    if not abierto(bits, q) or bits == SEMANA_COMPLETA:
+        return None
+    # Cuartos cerrados contados desde q; el bit más bajo es el cierre
+    cerrados = _rotar(~bits & SEMANA_COMPLETA, q)
+    pasos = (cerrados & -cerrados).bit_length() - 1
+    return inicio_de_cuarto(momento) + timedelta(minutes=15 * pasos)
+
+
+class IndiceHorario:
+    """
+    Máscaras de los comedores activos agrupados por horario distinto,
+    empaquetadas en 84 bytes por horario
+    """
+
+    def __init__(self, filas):
+        ids, grupos, claves = [], [], {}
+        mascaras, aperturas = [], []
+        self.horarios = []  # (apertura, cierre, dias_atencion, personalizado) de cada grupo
+        for pk, *campos in filas:
+            clave = _clave(*campos)
+            if clave not in claves:
+                claves[clave] = len(claves)
+                self.horarios.append(clave)
+                bits = _mascara(*clave)
+                mascaras.append(bits.to_bytes(CUARTOS_SEMANA // 8, 'little'))
+                aperturas.append(inicios(bits).to_bytes(CUARTOS_SEMANA // 8, 'little'))
+            ids.append(pk)
+            grupos.append(claves[clave])
+        self.ids = np.array(ids, dtype=np.int64)
+        self.grupos = np.array(grupos, dtype=np.intp)
+        self.mascaras = np.frombuffer(b''.join(mascaras), dtype=np.uint8).reshape(-1, CUARTOS_SEMANA // 8)
+        self.aperturas = np.frombuffer(b''.join(aperturas), dtype=np.uint8).reshape(-1, CUARTOS_SEMANA // 8)
+        self.version = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _grupos_abiertos(self, q):
+        return (self.mascaras[:, q >> 3] >> (q & 7)) & 1 == 1
+
+    def abiertos(self, q):
+        """Ids de los comedores abiertos en el cuarto q"""
+        return self.ids[self._grupos_abiertos(q)[self.grupos]]
+
+    def abiertos_en(self, momento):
+        return self.abiertos(cuarto(momento))
+
+    def filtro_abiertos_en(self, momento):
+        """
+        Q de los comedores abiertos en `momento`, por horario y no por id
+        Los parámetros crecen con los horarios distintos, no con los
+        comedores. Los CUSTOM se filtran por id: su JSON no se compara
+        igual en todas las bases de datos
+        """
+        filtro = Q(pk__in=[])
+        personalizados = []
+        for grupo in np.flatnonzero(self._grupos_abiertos(cuarto(momento))):
+            apertura, cierre, dias_atencion, _ = self.horarios[grupo]
+            if dias_atencion == 'CUSTOM':
+                personalizados.append(grupo)
+            else:
+                filtro |= Q(
+                    dias_atencion=dias_atencion, horario_apertura=apertura, horario_cierre=cierre
+                )
+        if personalizados:
+            filtro |= Q(pk__in=self.ids[np.isin(self.grupos, personalizados)].tolist())
+        return filtro
+
+    def abren_entre(self, desde, hasta):
+        """Ids de los comedores que abren en [desde, hasta)"""
+        # Cuartos cuyo inicio cae en la ventana
+        primero = cuarto(desde, redondear_arriba=True)
+        if hasta - desde >= timedelta(days=7):
+            cantidad = CUARTOS_SEMANA
+        else:
+            cantidad = (cuarto(hasta, redondear_arriba=True) - primero) % CUARTOS_SEMANA
+        rango = (primero + np.arange(cantidad)) % CUARTOS_SEMANA
+        bits = np.unpackbits(self.aperturas, axis=1, bitorder='little')[:, rango]
+        return self.ids[bits.any(axis=1)[self.grupos]]
+
+
+def obtener_indice():
+    """Retorna el índice de horarios vigente, reconstruyéndolo si está obsoleto"""
+    global _indice
+    from .models import Comedor
+
+    version = versiones.version_actual(versiones.GEOJSON)
+    indice = _indice
+    if indice is not None and indice.version == version:
+        registrar_cache('horarios', 'acierto')
+        return indice
+
+    with _lock:
+        indice = _indice
+        if indice is not None and indice.version == version:
+            registrar_cache('horarios', 'acierto')
+            return indice
+
+        registrar_cache('horarios', 'fallo')
+        filas = Comedor.objects.filter(estado_activo=True).values_list('id', *CAMPOS).order_by()
+        indice = IndiceHorario(filas.iterator())
+        indice.version = version
+        _indice = indice
+        return indice
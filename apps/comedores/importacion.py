@@ -0,0 +1,208 @@
+"""
+Importación del listado oficial de comedores (comedores_data.csv)
+
+Columnas: ITEM, NOMBRE COMEDOR, COORDENADAS, CUPOS, NICHO, NODO, COMUNA,
+COMUNA RUTA, DIA ENTREGA. COORDENADAS trae "lat, lng" en una sola columna
+y en el archivo oficial no viene entre comillas, así que esas filas llegan
+con una columna de más.
+
+El archivo se lee en streaming y se procesa por lotes: cada lote consulta
+los comedores existentes por ITEM con una sola consulta y escribe con
+bulk_create/bulk_update dentro de su propia transacción. Al final, los
+comedores del listado que ya no aparecen en el archivo se desactivan.
+"""
+import csv
+from datetime import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import eventos, indice_espacial, snapshot
+from .models import Comedor
+
+ENCABEZADO = [
+    'ITEM', 'NOMBRE COMEDOR', 'COORDENADAS', 'CUPOS', 'NICHO', 'NODO',
+    'COMUNA', 'COMUNA RUTA', 'DIA ENTREGA',
+]
+
+# Columnas del CSV que se copian tal cual a campos enteros de Comedor
+CAMPOS_ENTEROS = {
+    'NICHO': 'nicho',
+    'NODO': 'nodo',
+    'COMUNA': 'comuna',
+    'COMUNA RUTA': 'comuna_ruta',
+    'DIA ENTREGA': 'dia_entrega',
+}
+
+# Campos que el listado oficial controla en una actualización
+CAMPOS_ACTUALIZABLES = [
+    'nombre', 'latitud', 'longitud', 'capacidad_personas', 'estado_activo',
+    *CAMPOS_ENTEROS.values(),
+]
+
+# Horario asignado a los comedores nuevos (el listado no lo incluye)
+APERTURA_POR_DEFECTO = time(11, 0)
+CIERRE_POR_DEFECTO = time(14, 0)
+
+
+class ErrorFila(ValueError):
+    """Fila del CSV que no se puede importar"""
+
+
+def _entero(valor, columna):
+    try:
+        return int(valor.strip())
+    except (AttributeError, ValueError):
+        raise ErrorFila(f'{columna} debe ser un número entero')
+
+
+def _entero_opcional(valor, columna):
+    if valor is None or not valor.strip():
+        return None
+    return _entero(valor, columna)
+
+
+def leer_filas(archivo):
+    """
+    Genera (numero_linea, dict) por cada fila del CSV, o
+    (numero_linea, ErrorFila) si la fila no tiene la forma esperada
+    """
+    lector = csv.reader(archivo)
+    encabezado = [columna.strip().upper() for columna in next(lector, [])]
+    if encabezado != ENCABEZADO:
+        raise ErrorFila(f'Encabezado inesperado: {", ".join(encabezado)}')
+
+    for fila in lector:
+        numero = lector.line_num
+        if not any(campo.strip() for campo in fila):
+            continue
+        if len(fila) == len(ENCABEZADO) + 1:
+            # "lat, lng" sin comillas quedó repartido en dos columnas
+            fila = fila[:2] + [f'{fila[2]},{fila[3]}'] + fila[4:]
+        if len(fila) != len(ENCABEZADO):
+            yield numero, ErrorFila(f'Se esperaban {len(ENCABEZADO)} columnas, hay {len(fila)}')
+            continue
+        yield numero, dict(zip(ENCABEZADO, fila))
+
+
+def convertir_fila(fila, limites):
+    """Valida una fila y retorna (item, {campo: valor}) para Comedor"""
+    item = _entero(fila['ITEM'], 'ITEM')
+    nombre = ' '.join(fila['NOMBRE COMEDOR'].split())
+    if not nombre:
+        raise ErrorFila('NOMBRE COMEDOR está vacío')
+
+    try:
+        lat, lng = (float(parte) for parte in fila['COORDENADAS'].split(','))
+    except ValueError:
+        raise ErrorFila('COORDENADAS debe tener la forma "lat, lng"')
+    if not (limites['south'] <= lat <= limites['north'] and limites['west'] <= lng <= limites['east']):
+        raise ErrorFila(f'Coordenadas fuera de Cali: {lat}, {lng}')
+
+    cupos = _entero(fila['CUPOS'], 'CUPOS')
+    if cupos < 0:
+        raise ErrorFila('CUPOS no puede ser negativo')
+
+    campos = {
+        'nombre': nombre[:200],
+        'latitud': lat,
+        'longitud': lng,
+        'capacidad_personas': max(cupos, 1),
+        'estado_activo': True,
+    }
+    for columna, campo in CAMPOS_ENTEROS.items():
+        campos[campo] = _entero_opcional(fila[columna], columna)
+    return item, campos
+
+
+def _procesar_lote(lote, resumen, apertura, cierre):
+    """Crea o actualiza los comedores de un lote de (item, campos)"""
+    existentes = Comedor.objects.in_bulk(
+        [item for item, _ in lote], field_name='item_oficial'
+    )
+    ahora = timezone.now()
+    crear, actualizar = [], []
+    for item, campos in lote:
+        comedor = existentes.get(item)
+        if comedor is None:
+            crear.append(Comedor(
+                item_oficial=item,
+                direccion=f'Comuna {campos["comuna"]}' if campos['comuna'] else '',
+                horario_apertura=apertura,
+                horario_cierre=cierre,
+                cupos_disponibles=campos['capacidad_personas'],
+                **campos,
+            ))
+        elif any(getattr(comedor, campo) != valor for campo, valor in campos.items()):
+            for campo, valor in campos.items():
+                setattr(comedor, campo, valor)
+            comedor.fecha_modificacion = ahora
+            actualizar.append(comedor)
+        else:
+            resumen['sin_cambios'] += 1
+
+    with transaction.atomic():
+        Comedor.objects.bulk_create(crear, batch_size=500)
+        Comedor.objects.bulk_update(
+            actualizar, CAMPOS_ACTUALIZABLES + ['fecha_modificacion'], batch_size=500
+        )
+    resumen['creados'] += len(crear)
+    resumen['actualizados'] += len(actualizar)
+
+
+def importar_comedores(archivo, lote=500, desactivar=True,
+                       apertura=APERTURA_POR_DEFECTO, cierre=CIERRE_POR_DEFECTO):
+    """
+    Importa el listado oficial desde un archivo de texto abierto
+    Retorna {'creados', 'actualizados', 'sin_cambios', 'desactivados', 'errores'}
+    donde errores es una lista de (numero_linea, mensaje)
+    """
+    limites = settings.CALI_BOUNDS
+    resumen = {'creados': 0, 'actualizados': 0, 'sin_cambios': 0, 'desactivados': 0, 'errores': []}
+    vistos = set()
+
+    def filas_validas():
+        for numero, fila in leer_filas(archivo):
+            if isinstance(fila, ErrorFila):
+                resumen['errores'].append((numero, str(fila)))
+                continue
+            try:
+                item, campos = convertir_fila(fila, limites)
+            except ErrorFila as exc:
+                # Un comedor con datos inválidos no se desactiva por ausencia
+                try:
+                    vistos.add(_entero(fila['ITEM'], 'ITEM'))
+                except ErrorFila:
+                    pass
+                resumen['errores'].append((numero, str(exc)))
+                continue
+            if item in vistos:
+                resumen['errores'].append((numero, f'ITEM {item} repetido'))
+                continue
+            vistos.add(item)
+            yield item, campos
+
+    filas = filas_validas()
+    while True:
+        bloque = list(islice(filas, lote))
+        if not bloque:
+            break
+        _procesar_lote(bloque, resumen, apertura, cierre)
+
+    if desactivar:
+        ausentes = list(Comedor.objects.filter(
+            item_oficial__isnull=False, estado_activo=True
+        ).exclude(item_oficial__in=vistos).values_list('id', flat=True))
+        resumen['desactivados'] = Comedor.objects.filter(id__in=ausentes).update(
+            estado_activo=False, fecha_modificacion=timezone.now()
+        )
+        eventos.publicar_al_confirmar([{'id': pk, 'activo': False} for pk in ausentes])
+
+    # bulk_create/bulk_update/update no disparan las señales de Comedor
+    if resumen['creados'] or resumen['actualizados'] or resumen['desactivados']:
+        snapshot.invalidar()
+        indice_espacial.invalidar()
+
+    return resumen
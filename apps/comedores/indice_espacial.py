@@ -0,0 +1,201 @@
+"""
+Índice espacial en memoria para búsquedas de comedores cercanos
+
+Los comedores activos se reparten en una grilla uniforme de celdas de
+latitud/longitud. Una búsqueda por radio solo revisa las celdas que cubren
+el círculo pedido y una búsqueda de los k más cercanos recorre anillos de
+celdas alrededor del punto hasta que ningún anillo pendiente puede mejorar
+el resultado, en lugar de calcular la distancia a todos los comedores.
+
+El índice se construye una vez por proceso y se reconstruye cuando cambia
+la marca de versión INDICE_ESPACIAL (ver signals.py).
+"""
+import threading
+from collections import defaultdict
+from math import radians, cos, floor
+
+import numpy as np
+
+from apps.core.telemetria import registrar_cache
+
+from . import versiones
+from .geo import KM_POR_GRADO, caja_envolvente, distancias_desde
+
+# ~1.1 km de lado en Cali: pocas decenas de comedores por celda
+TAMANO_CELDA_GRADOS = 0.01
+
+_VACIO = (
+    np.empty(0, dtype=np.int64),
+    np.empty(0, dtype=np.float64),
+    np.empty(0, dtype=np.float64),
+)
+
+_lock = threading.Lock()
+_indice = None
+
+
+class IndiceEspacial:
+    """
+    Grilla uniforme sobre (latitud, longitud)
+    Cada celda guarda tres arreglos NumPy: ids, latitudes y longitudes,
+    para calcular las distancias de todos los candidatos en una sola llamada
+    """
+
+    def __init__(self, puntos, tamano_celda=TAMANO_CELDA_GRADOS):
+        self.tamano_celda = tamano_celda
+
+        agrupados = defaultdict(list)
+        for pk, lat, lng in puntos:
+            agrupados[self._celda(lat, lng)].append((pk, lat, lng))
+
+        self.celdas = {
+            celda: (
+                np.array([pk for pk, _, _ in filas], dtype=np.int64),
+                np.array([lat for _, lat, _ in filas], dtype=np.float64),
+                np.array([lng for _, _, lng in filas], dtype=np.float64),
+            )
+            for celda, filas in agrupados.items()
+        }
+        self.total = sum(len(ids) for ids, _, _ in self.celdas.values())
+
+        if self.celdas:
+            filas = [fila for fila, _ in self.celdas]
+            columnas = [columna for _, columna in self.celdas]
+            self.limites = (min(filas), max(filas), min(columnas), max(columnas))
+        else:
+            self.limites = None
+
+    def __len__(self):
+        return self.total
+
+    def _celda(self, lat, lng):
+        return (floor(lat / self.tamano_celda), floor(lng / self.tamano_celda))
+
+    def _km_por_celda(self, lat):
+        """Lado mínimo de una celda en km a la latitud dada (cota inferior)"""
+        return self.tamano_celda * KM_POR_GRADO * max(cos(radians(abs(lat) + self.tamano_celda)), 0.01)
+
+    def _candidatos(self, celdas):
+        """Concatena los puntos de las celdas dadas en tres arreglos"""
+        contenido = [self.celdas[celda] for celda in celdas if celda in self.celdas]
+        if not contenido:
+            return _VACIO
+        if len(contenido) == 1:
+            return contenido[0]
+        return tuple(np.concatenate(columna) for columna in zip(*contenido))
+
+    def en_radio(self, lat, lng, radio_km, limite=None):
+        """
+        Comedores a menos de `radio_km` del punto
+        Retorna lista de (id, distancia_km) ordenada por distancia
+        """
+        if self.limites is None or radio_km < 0:
+            return []
+
+        lat_min, lat_max, lng_min, lng_max = caja_envolvente(lat, lng, radio_km)
+        fila_min, columna_min = self._celda(lat_min, lng_min)
+        fila_max, columna_max = self._celda(lat_max, lng_max)
+
+        # Recortar a la zona ocupada para radios muy grandes
+        fila_min = max(fila_min, self.limites[0])
+        fila_max = min(fila_max, self.limites[1])
+        columna_min = max(columna_min, self.limites[2])
+        columna_max = min(columna_max, self.limites[3])
+
+        ids, lats, lngs = self._candidatos(
+            (fila, columna)
+            for fila in range(fila_min, fila_max + 1)
+            for columna in range(columna_min, columna_max + 1)
+        )
+        distancias = distancias_desde(lat, lng, lats, lngs)
+        dentro = distancias <= radio_km
+        ids, distancias = ids[dentro], distancias[dentro]
+
+        orden = np.argsort(distancias, kind='stable')
+        if limite is not None:
+            orden = orden[:limite]
+        return [(int(ids[i]), float(distancias[i])) for i in orden]
+
+    def k_cercanos(self, lat, lng, k):
+        """
+        Los `k` comedores más cercanos al punto
+        Retorna lista de (id, distancia_km) ordenada por distancia
+        """
+        if self.limites is None or k <= 0:
+            return []
+
+        fila_centro, columna_centro = self._celda(lat, lng)
+        km_celda = self._km_por_celda(lat)
+        fila_min, fila_max, columna_min, columna_max = self.limites
+        anillo_max = max(
+            abs(fila_centro - fila_min), abs(fila_centro - fila_max),
+            abs(columna_centro - columna_min), abs(columna_centro - columna_max),
+        )
+
+        # Los k mejores hasta ahora
+        mejores_ids, mejores_distancias = _VACIO[0], _VACIO[1]
+        for anillo in range(anillo_max + 1):
+            # Ningún punto de este anillo o posteriores puede mejorar el k-ésimo
+            if len(mejores_ids) == k and mejores_distancias.max() <= (anillo - 1) * km_celda:
+                break
+
+            ids, lats, lngs = self._candidatos(self._anillo(fila_centro, columna_centro, anillo))
+            if not len(ids):
+                continue
+
+            mejores_ids = np.concatenate([mejores_ids, ids])
+            mejores_distancias = np.concatenate(
+                [mejores_distancias, distancias_desde(lat, lng, lats, lngs)]
+            )
+            if len(mejores_ids) > k:
+                conservar = np.argpartition(mejores_distancias, k - 1)[:k]
+                mejores_ids = mejores_ids[conservar]
+                mejores_distancias = mejores_distancias[conservar]
+
+        orden = np.argsort(mejores_distancias, kind='stable')
+        return [(int(mejores_ids[i]), float(mejores_distancias[i])) for i in orden]
+
+    @staticmethod
+    def _anillo(fila, columna, anillo):
+        """Celdas a distancia de Chebyshev exactamente `anillo` del centro"""
+        if anillo == 0:
+            yield (fila, columna)
+            return
+        for dc in range(-anillo, anillo + 1):
+            yield (fila - anillo, columna + dc)
+            yield (fila + anillo, columna + dc)
+        for df in range(-anillo + 1, anillo):
+            yield (fila + df, columna - anillo)
+            yield (fila + df, columna + anillo)
+
+
+def invalidar():
+    """Marca el índice como obsoleto en todos los procesos"""
+    versiones.invalidar(versiones.INDICE_ESPACIAL)
+
+
+def obtener_indice():
+    """Retorna el índice vigente, reconstruyéndolo si está obsoleto"""
+    global _indice
+    from .models import Comedor
+
+    version = versiones.version_actual(versiones.INDICE_ESPACIAL)
+    indice = _indice
+    if indice is not None and indice.version == version:
+        registrar_cache('indice_espacial', 'acierto')
+        return indice
+
+    with _lock:
+        indice = _indice
+        if indice is not None and indice.version == version:
+            registrar_cache('indice_espacial', 'acierto')
+            return indice
+
+        registrar_cache('indice_espacial', 'fallo')
+        puntos = Comedor.objects.filter(estado_activo=True).values_list(
+            'id', 'latitud', 'longitud'
+        ).order_by()
+        indice = IndiceEspacial(puntos.iterator())
+        indice.version = version
+        _indice = indice
+        return indice
@@ -0,0 +1,270 @@
+"""
+Carga masiva de métricas
+
+Los comedores reportan al cierre del día comidas servidas, cupos ocupados
+y usuarios atendidos. En lugar de un POST por fila, `cargar_metricas`
+recibe miles de filas (JSON o CSV) y:
+
+- Valida por columnas: cada valor distinto de una columna se convierte una
+  sola vez (np.unique) y los comedores se verifican con una sola consulta.
+- Inserta las filas válidas con bulk_create, o con COPY en PostgreSQL.
+- Con `reemplazar`, las filas existentes con el mismo (comedor, tipo de
+  métrica, fecha) se eliminan antes de insertar (upsert).
+- Ajusta los resúmenes de métricas en bloque (ver resumenes.py), porque
+  bulk_create y COPY no disparan señales.
+
+Retorna los errores por fila para que el comedor corrija solo esas.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import resumenes
+from .models import Comedor, Metrica
+
+# Filas máximas por petición
+MAXIMO_FILAS = getattr(settings, 'METRICAS_LOTE_MAXIMO', 10000)
+
+# Reemplazar por defecto las filas con el mismo (comedor, tipo, fecha)
+REEMPLAZAR_POR_DEFECTO = getattr(settings, 'METRICAS_LOTE_REEMPLAZAR', False)
+
+# Tope de Metrica.valor (IntegerField de 32 bits en PostgreSQL): más grande
+# desborda el INSERT o el COPY y haría fallar el lote completo
+VALOR_MAXIMO = 2 ** 31 - 1
+
+# Tope de los ids de Comedor (BigAutoField)
+COMEDOR_ID_MAXIMO = 2 ** 63 - 1
+
+# Ids por DELETE al reemplazar (por debajo del límite de parámetros de SQLite)
+BORRADO_POR_CONSULTA = 500
+
+TIPOS_METRICA = {tipo for tipo, _ in Metrica.TIPO_METRICA_CHOICES}
+
+
+class LoteInvalido(Exception):
+    """El lote completo no se puede procesar (formato o tamaño)"""
+
+
+def leer_csv(texto):
+    """Filas de un CSV con encabezado comedor,tipo_metrica,valor,fecha"""
+    lector = csv.DictReader(io.StringIO(texto))
+    faltantes = {'tipo_metrica', 'valor'} - set(lector.fieldnames or [])
+    if faltantes:
+        raise LoteInvalido(f'Faltan columnas en el CSV: {", ".join(sorted(faltantes))}')
+    return list(lector)
+
+
+def _por_valores_unicos(columna, convertir):
+    """
+    Aplica `convertir` una vez por valor distinto de la columna
+    Retorna (convertidos, errores) alineados con la columna; `convertir`
+    lanza ValueError con el mensaje de error
+    """
+    texto = np.array(['' if valor is None else str(valor).strip() for valor in columna], dtype=str)
+    unicos, inverso = np.unique(texto, return_inverse=True)
+
+    convertidos_unicos = np.empty(len(unicos), dtype=object)
+    errores_unicos = np.empty(len(unicos), dtype=object)
+    for i, valor in enumerate(unicos):
+        try:
+            convertidos_unicos[i] = convertir(valor)
+        except ValueError as exc:
+            errores_unicos[i] = str(exc)
+
+    return convertidos_unicos[inverso], errores_unicos[inverso]
+
+
+def _comedor(valor):
+    if valor == '':
+        return None  # Métrica global
+    try:
+        comedor_id = int(valor)
+    except ValueError:
+        raise ValueError('Debe ser el id numérico de un comedor')
+    # Fuera del rango de la clave primaria la consulta de existencia desborda
+    if not 1 <= comedor_id <= COMEDOR_ID_MAXIMO:
+        raise ValueError('Debe ser el id numérico de un comedor')
+    return comedor_id
+
+
+def _tipo_metrica(valor):
+    if valor not in TIPOS_METRICA:
+        raise ValueError(f'"{valor}" no es un tipo de métrica válido')
+    return valor
+
+
+def _valor(valor):
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ValueError('Debe ser un número entero')
+    if numero < 0:
+        raise ValueError('Debe ser mayor o igual a 0')
+    if numero > VALOR_MAXIMO:
+        raise ValueError(f'Debe ser menor o igual a {VALOR_MAXIMO}')
+    return numero
+
+
+def _fecha(valor):
+    if valor == '':
+        return timezone.localdate()
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError('Formato de fecha inválido, use AAAA-MM-DD')
+
+
+def validar(filas):
+    """
+    Valida el lote por columnas
+    Retorna (validas, errores): validas es una lista de tuplas
+    (indice, comedor_id, tipo_metrica, valor, fecha, metadata) y errores
+    una lista de {'fila': indice, 'errores': {campo: mensaje}}
+    """
+    if not isinstance(filas, list) or not all(isinstance(fila, dict) for fila in filas):
+        raise LoteInvalido('Se esperaba una lista de objetos')
+    if len(filas) > MAXIMO_FILAS:
+        raise LoteInvalido(f'El lote supera el máximo de {MAXIMO_FILAS} filas')
+
+    columnas = {}
+    errores = {}
+    conversores = {
+        'comedor': _comedor, 'tipo_metrica': _tipo_metrica, 'valor': _valor, 'fecha': _fecha,
+    }
+    for campo, convertir in conversores.items():
+        convertidos, errores_columna = _por_valores_unicos(
+            [fila.get(campo) for fila in filas], convertir
+        )
+        columnas[campo] = convertidos
+        for indice in np.flatnonzero(errores_columna != None):  # noqa: E711
+            errores.setdefault(int(indice), {})[campo] = errores_columna[indice]
+
+    # Comedores inexistentes, verificados con una sola consulta
+    solicitados = {comedor for comedor in columnas['comedor'] if comedor is not None}
+    existentes = set(
+        Comedor.objects.filter(id__in=solicitados).values_list('id', flat=True)
+    )
+    for comedor in solicitados - existentes:
+        for indice in np.flatnonzero(columnas['comedor'] == comedor):
+            errores.setdefault(int(indice), {})['comedor'] = f'No existe el comedor {comedor}'
+
+    metadatas = [fila.get('metadata') for fila in filas]
+    for indice, metadata in enumerate(metadatas):
+        if metadata is not None and not isinstance(metadata, dict):
+            errores.setdefault(indice, {})['metadata'] = 'Debe ser un objeto JSON'
+
+    validas = [
+        (
+            indice, columnas['comedor'][indice], columnas['tipo_metrica'][indice],
+            columnas['valor'][indice], columnas['fecha'][indice], metadatas[indice],
+        )
+        for indice in range(len(filas)) if indice not in errores
+    ]
+    return validas, [
+        {'fila': indice, 'errores': errores[indice]} for indice in sorted(errores)
+    ]
+
+
+def _eliminar_existentes(validas):
+    """Elimina las métricas con el mismo (comedor, tipo, fecha). Retorna sus aportes"""
+    claves = {(comedor, tipo, fecha) for _, comedor, tipo, _, fecha, _ in validas}
+    comedores = {comedor for comedor, _, _ in claves}
+    filtro_comedor = Q(comedor_id__in=comedores - {None})
+    if None in comedores:
+        filtro_comedor |= Q(comedor__isnull=True)
+
+    existentes = [
+        fila for fila in Metrica.objects.filter(
+            filtro_comedor,
+            tipo_metrica__in={tipo for _, tipo, _ in claves},
+            fecha__in={fecha for _, _, fecha in claves},
+        ).values_list('id', 'comedor_id', 'tipo_metrica', 'fecha', 'valor')
+        if fila[1:4] in claves
+    ]
+    # DELETE directo, sin señales: los resúmenes se ajustan en bloque con los aportes
+    ids = [fila[0] for fila in existentes]
+    tabla = connection.ops.quote_name(Metrica._meta.db_table)
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(ids), BORRADO_POR_CONSULTA):
+            bloque = ids[inicio:inicio + BORRADO_POR_CONSULTA]
+            cursor.execute(
+                f'DELETE FROM {tabla} WHERE id IN ({", ".join(["%s"] * len(bloque))})', bloque
+            )
+    return [(comedor, tipo, fecha, -valor, -1) for _, comedor, tipo, fecha, valor in existentes]
+
+
+def _copiar_postgresql(validas, ahora):
+    """Inserta con COPY ... FROM STDIN (psycopg2)"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for _, comedor, tipo, valor, fecha, metadata in validas:
+        escritor.writerow([
+            '' if comedor is None else comedor, tipo, valor, fecha.isoformat(),
+            ahora.isoformat(), '' if metadata is None else json.dumps(metadata),
+        ])
+    buffer.seek(0)
+
+    tabla = connection.ops.quote_name(Metrica._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f'COPY {tabla} (comedor_id, tipo_metrica, valor, fecha, fecha_registro, metadata) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def cargar_metricas(filas, reemplazar=None):
+    """
+    Valida e inserta un lote de métricas
+    Retorna {'recibidas', 'creadas', 'reemplazadas', 'errores'}
+    """
+    if reemplazar is None:
+        reemplazar = REEMPLAZAR_POR_DEFECTO
+
+    validas, errores = validar(filas)
+    if reemplazar:
+        # Dentro del lote gana la última fila de cada (comedor, tipo, fecha)
+        ultimas = {(fila[1], fila[2], fila[4]): fila for fila in validas}
+        validas = sorted(ultimas.values(), key=lambda fila: fila[0])
+
+    reemplazadas = 0
+    if validas:
+        with transaction.atomic():
+            aportes = []
+            if reemplazar:
+                aportes = _eliminar_existentes(validas)
+                reemplazadas = len(aportes)
+
+            if connection.vendor == 'postgresql':
+                _copiar_postgresql(validas, timezone.now())
+            else:
+                Metrica.objects.bulk_create(
+                    [
+                        Metrica(
+                            comedor_id=comedor, tipo_metrica=tipo, valor=valor,
+                            fecha=fecha, metadata=metadata,
+                        )
+                        for _, comedor, tipo, valor, fecha, metadata in validas
+                    ],
+                    batch_size=1000,
+                )
+
+            aportes.extend(
+                (comedor, tipo, fecha, valor, 1)
+                for _, comedor, tipo, valor, fecha, _ in validas
+            )
+            resumenes.aplicar(aportes)
+
+    return {
+        'recibidas': len(filas),
+        'creadas': len(validas),
+        'reemplazadas': reemplazadas,
+        'errores': errores,
+    }
@@ -1,2 +1,2 @@
-# Management commands
-
+# Management commands
+
@@ -0,0 +1,30 @@
+"""
+Comando para asignar en bloque las donaciones pendientes a comedores cercanos
+"""
+from django.core.management.base import BaseCommand
+
+from apps.comedores.asignacion import asignar_donaciones
+
+
+class Command(BaseCommand):
+    help = 'Asignar las donaciones pendientes al comedor más cercano con cupo de recepción'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Calcular la asignación sin guardar cambios'
+        )
+
+    def handle(self, *args, **options):
+        resultado = asignar_donaciones(guardar=not options['simular'])
+
+        prefijo = '[simulación] ' if options['simular'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefijo}{resultado["asignadas"]} de {resultado["pendientes"]} '
+            f'donación(es) pendiente(s) asignada(s)'
+        ))
+        if resultado['sin_cupo']:
+            self.stdout.write(self.style.WARNING(
+                f'{resultado["sin_cupo"]} donación(es) sin comedor con cupo disponible'
+            ))
@@ -0,0 +1,110 @@
+"""
+Comando para medir la API en proceso contra los presupuestos versionados
+"""
+import io
+import json
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from apps.comedores import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Medir tiempo, consultas y memoria de los endpoints sobre datos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            default='pequena,mediana',
+            help=f'Escalas separadas por comas ({", ".join(benchmark.ESCALAS)})'
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=5,
+            help='Llamadas en caliente por endpoint'
+        )
+        parser.add_argument(
+            '--presupuestos',
+            default=str(settings.BASE_DIR / 'benchmarks' / 'presupuestos.json'),
+            help='Archivo JSON con los presupuestos por escala y endpoint'
+        )
+        parser.add_argument(
+            '--reporte',
+            default=str(settings.BASE_DIR / 'benchmarks' / 'reporte.json'),
+            help='Archivo donde escribir el reporte JSON'
+        )
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos para generar los datos'
+        )
+
+    def handle(self, *args, **options):
+        escalas = [escala.strip() for escala in options['escalas'].split(',') if escala.strip()]
+        desconocidas = set(escalas) - set(benchmark.ESCALAS)
+        if desconocidas:
+            raise CommandError(f'Escalas desconocidas: {", ".join(sorted(desconocidas))}')
+
+        try:
+            with open(options['presupuestos'], encoding='utf-8') as archivo:
+                presupuestos = json.load(archivo)
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING('Sin archivo de presupuestos: solo se mide'))
+            presupuestos = {}
+
+        resultados = self._medir(escalas, options)
+        excedidos = benchmark.comparar(resultados, presupuestos)
+
+        os.makedirs(os.path.dirname(os.path.abspath(options['reporte'])), exist_ok=True)
+        with open(options['reporte'], 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'generado_en': timezone.now().isoformat(),
+                'base_de_datos': connection.vendor,
+                'repeticiones': options['repeticiones'],
+                'resultados': resultados,
+                'excedidos': excedidos,
+            }, archivo, indent=2, ensure_ascii=False)
+        self.stdout.write(f'Reporte escrito en {options["reporte"]}')
+
+        if excedidos:
+            for texto in excedidos:
+                self.stdout.write(self.style.ERROR(texto))
+            raise CommandError(f'{len(excedidos)} presupuesto(s) excedido(s)')
+        self.stdout.write(self.style.SUCCESS('Todos los presupuestos se cumplen'))
+
+    def _medir(self, escalas, options):
+        """Crea una base de datos de pruebas, la llena por escala y mide"""
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        resultados = {}
+        try:
+            # generar_datos invalida versiones: también fuera del cache configurado
+            with override_settings(CACHES=benchmark.CACHE_PRIVADO):
+                for escala in escalas:
+                    self.stdout.write(f'Generando datos de la escala {escala}...')
+                    call_command(
+                        'generar_datos', limpiar=True, semilla=options['semilla'],
+                        procesos=options['procesos'], stdout=io.StringIO(),
+                        **benchmark.ESCALAS[escala],
+                    )
+                    resultados[escala] = benchmark.ejecutar(options['repeticiones'])
+                    for endpoint, metricas in resultados[escala].items():
+                        self.stdout.write(
+                            f'  {endpoint:<24} frío {metricas["ms_frio"]:>8.1f} ms '
+                            f'({metricas["consultas_frio"]} consultas)  '
+                            f'p50 {metricas.get("ms_p50", 0):>8.1f} ms  {metricas["memoria_kb"]} KB'
+                        )
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+        return resultados
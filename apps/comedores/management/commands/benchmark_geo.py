@@ -0,0 +1,64 @@
+"""
+Comando para medir el kernel geográfico vectorizado contra el cálculo escalar
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.comedores import geo
+
+
+class Command(BaseCommand):
+    help = 'Comparar el cálculo de comedor más cercano escalar vs NumPy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donaciones', type=int, default=10000,
+                            help='Número de puntos de origen (default 10000)')
+        parser.add_argument('--comedores', type=int, default=1000,
+                            help='Número de puntos de destino (default 1000)')
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['semilla'])
+        limites = settings.CALI_BOUNDS
+
+        def puntos(n):
+            return (
+                rng.uniform(limites['south'], limites['north'], n),
+                rng.uniform(limites['west'], limites['east'], n),
+            )
+
+        lats1, lngs1 = puntos(options['donaciones'])
+        lats2, lngs2 = puntos(options['comedores'])
+        self.stdout.write(
+            f"{options['donaciones']} orígenes x {options['comedores']} destinos"
+        )
+
+        # Versión escalar: un haversine por par, como el código anterior
+        inicio = time.perf_counter()
+        destinos = list(zip(lats2.tolist(), lngs2.tolist()))
+        escalar = []
+        for lat, lng in zip(lats1.tolist(), lngs1.tolist()):
+            mejor, distancia_minima = -1, float('inf')
+            for j, (c_lat, c_lng) in enumerate(destinos):
+                km = geo.haversine(lat, lng, c_lat, c_lng)
+                if km < distancia_minima:
+                    mejor, distancia_minima = j, km
+            escalar.append(mejor)
+        tiempo_escalar = time.perf_counter() - inicio
+
+        # Versión vectorizada
+        inicio = time.perf_counter()
+        indices, _ = geo.mas_cercanos(lats1, lngs1, lats2, lngs2)
+        tiempo_numpy = time.perf_counter() - inicio
+
+        coinciden = np.array_equal(indices, np.array(escalar))
+        self.stdout.write(f'Escalar: {tiempo_escalar:.3f} s')
+        self.stdout.write(f'NumPy:   {tiempo_numpy:.3f} s')
+        self.stdout.write(f'Aceleración: {tiempo_escalar / tiempo_numpy:.1f}x')
+        if coinciden:
+            self.stdout.write(self.style.SUCCESS('Resultados idénticos'))
+        else:
+            self.stdout.write(self.style.ERROR('Los resultados difieren'))
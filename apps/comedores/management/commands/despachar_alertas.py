@@ -0,0 +1,65 @@
+"""
+Comando para enviar las alertas pendientes de la bandeja de salida
+"""
+import asyncio
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.comedores import alertas
+
+
+class Command(BaseCommand):
+    help = 'Enviar las alertas pendientes a través del backend configurado en ALERTAS_BACKEND'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Seguir revisando la bandeja de salida cada --intervalo segundos'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=5,
+            help='Segundos entre revisiones en modo continuo (default: 5)'
+        )
+        parser.add_argument(
+            '--aperturas',
+            type=int,
+            metavar='MINUTOS',
+            help='Antes de enviar, encolar alertas APERTURA de los comedores que '
+                 'abrieron en los últimos MINUTOS'
+        )
+        parser.add_argument(
+            '--concurrencia',
+            type=int,
+            default=50,
+            help='Envíos simultáneos (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        backend = alertas.obtener_backend()
+
+        while True:
+            if options['aperturas']:
+                ahora = timezone.now()
+                encolados = alertas.encolar_aperturas(
+                    ahora - timedelta(minutes=options['aperturas']), ahora
+                )
+                if encolados:
+                    self.stdout.write(f'{encolados} alerta(s) de apertura encolada(s)')
+
+            enviados, fallidos = asyncio.run(
+                alertas.drenar(backend, concurrencia=options['concurrencia'])
+            )
+            if enviados or fallidos or not options['continuo']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{enviados} alerta(s) enviada(s), {fallidos} con error'
+                ))
+
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
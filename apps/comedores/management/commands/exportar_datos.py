@@ -0,0 +1,62 @@
+"""
+Comando para exportar métricas o donaciones a archivos gzip (NDJSON o CSV)
+"""
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.comedores import exportacion
+from apps.comedores.views import DonacionViewSet, MetricaViewSet
+
+VISTAS = {
+    'metricas': MetricaViewSet,
+    'donaciones': DonacionViewSet,
+}
+
+
+class Command(BaseCommand):
+    help = 'Exportar métricas o donaciones en streaming a un archivo comprimido con gzip'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tabla', choices=sorted(VISTAS))
+        parser.add_argument(
+            '--formato',
+            choices=sorted(exportacion.FORMATOS),
+            default='ndjson'
+        )
+        parser.add_argument(
+            '--salida',
+            help='Ruta del archivo (por defecto <tabla>-<fecha>.<formato>.gz)'
+        )
+        parser.add_argument(
+            '--filtro',
+            action='append',
+            default=[],
+            metavar='CLAVE=VALOR',
+            help='Filtro del listado de la API, ej. --filtro tipo_metrica=COMIDAS_SERVIDAS'
+        )
+
+    def handle(self, *args, **options):
+        parametros = {}
+        for filtro in options['filtro']:
+            clave, separador, valor = filtro.partition('=')
+            if not separador:
+                raise CommandError(f'Filtro inválido: {filtro} (use CLAVE=VALOR)')
+            parametros.setdefault(clave, []).append(valor)
+
+        tabla, formato = options['tabla'], options['formato']
+        salida = options['salida'] or f'{exportacion.nombre_archivo(tabla, formato)}.gz'
+        queryset = exportacion.queryset_filtrado(VISTAS[tabla], parametros)
+
+        inicio = time.monotonic()
+        filas = []
+        with gzip.open(salida, 'wb', compresslevel=6) as archivo:
+            for bloque in exportacion.generar(queryset, tabla, formato, filas.append):
+                archivo.write(bloque)
+        filas = sum(filas)
+
+        segundos = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{filas} fila(s) exportadas a {salida} en {segundos:.1f} s'
+        ))
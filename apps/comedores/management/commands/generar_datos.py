@@ -0,0 +1,155 @@
+"""
+Comando para generar datos sintéticos a escala de producción (pruebas de carga)
+"""
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.comedores import alertas, indice_espacial, resumenes, sinteticos, snapshot
+from apps.comedores.models import (
+    AlertaSuscripcion, BarrioInteres, Comedor, Comentario, Donacion, Favorito,
+    MensajeAlerta, MenuDiario, Metrica, MetricaDiaria, MetricaMensual, MetricaSemanal,
+)
+
+MODELOS = {
+    'comedores': Comedor,
+    'metricas': Metrica,
+    'comentarios': Comentario,
+    'donaciones': Donacion,
+    'suscripciones': AlertaSuscripcion,
+}
+
+# Orden de borrado con --limpiar (dependientes primero)
+BORRAR = [
+    MensajeAlerta, BarrioInteres, AlertaSuscripcion, Donacion, Comentario, Favorito,
+    MenuDiario, MetricaDiaria, MetricaSemanal, MetricaMensual, Metrica, Comedor,
+]
+
+
+class Command(BaseCommand):
+    help = 'Generar comedores, métricas, comentarios, donaciones y suscripciones sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--perfil',
+            choices=sorted(sinteticos.PERFILES),
+            default='demo',
+            help='Volúmenes base (demo, produccion o x10)'
+        )
+        for tabla in sinteticos.TABLAS:
+            parser.add_argument(
+                f'--{tabla}',
+                type=int,
+                help=f'Cantidad de {tabla} (sobrescribe el perfil)'
+            )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=42,
+            help='Semilla del generador; la misma semilla produce los mismos datos'
+        )
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=365,
+            help='Días hacia atrás en los que se reparten las métricas'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Filas por bloque generado y por transacción'
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos que generan bloques en paralelo (1 = sin multiprocessing)'
+        )
+        parser.add_argument(
+            '--limpiar',
+            action='store_true',
+            help='Eliminar los datos existentes antes de generar'
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1 or options['procesos'] < 1 or options['dias'] < 1:
+            raise CommandError('--lote, --procesos y --dias deben ser mayores que 0')
+
+        self.verbosity = options['verbosity']
+        cantidades = dict(sinteticos.PERFILES[options['perfil']])
+        for tabla in sinteticos.TABLAS:
+            if options[tabla] is not None:
+                cantidades[tabla] = options[tabla]
+
+        if options['limpiar']:
+            # DELETE directo, hijas primero: .delete() cargaría millones de filas para las cascadas
+            with connection.cursor() as cursor:
+                for modelo in BORRAR:
+                    cursor.execute(f'DELETE FROM {connection.ops.quote_name(modelo._meta.db_table)}')
+            self.stdout.write(self.style.WARNING('Datos anteriores eliminados'))
+
+        contexto = {
+            'limites': settings.CALI_BOUNDS,
+            'centros': sinteticos.centros_barrio(options['semilla'], settings.CALI_BOUNDS),
+            'hoy': timezone.localdate(),
+            'dias': options['dias'],
+        }
+
+        for tabla in sinteticos.TABLAS:
+            if tabla != 'comedores' and 'comedores' not in contexto:
+                contexto['comedores'] = np.fromiter(
+                    Comedor.objects.values_list('id', flat=True).iterator(), dtype=np.int64
+                )
+                if not len(contexto['comedores']):
+                    raise CommandError('No hay comedores para asociar métricas, comentarios y donaciones')
+            if cantidades[tabla] > 0:
+                self._generar(tabla, cantidades[tabla], contexto, options)
+
+        # bulk_create no dispara señales: agregados y caches se reconstruyen en bloque
+        self.stdout.write('Recalculando calificaciones y resúmenes...')
+        Comedor.objects.all().recalcular_calificaciones()
+        resumenes.reconstruir()
+        snapshot.invalidar()
+        indice_espacial.invalidar()
+        alertas.invalidar()
+
+        self.stdout.write(self.style.SUCCESS('Datos sintéticos generados'))
+
+    def _generar(self, tabla, total, contexto, options):
+        tareas = sinteticos.tareas(tabla, options['semilla'], total, options['lote'])
+        inicio = time.monotonic()
+        if options['procesos'] == 1:
+            sinteticos.inicializar(contexto)
+            self._insertar(tabla, total, map(sinteticos.generar_bloque, tareas))
+        else:
+            with Pool(options['procesos'], sinteticos.inicializar, (contexto,)) as pool:
+                self._insertar(tabla, total, pool.imap(sinteticos.generar_bloque, tareas))
+
+        segundos = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {total} {tabla} en {segundos:.1f} s ({total / max(segundos, 1e-9):,.0f} filas/s)'
+        ))
+
+    def _insertar(self, tabla, total, bloques):
+        """Inserta cada bloque generado en su propia transacción"""
+        modelo = MODELOS[tabla]
+        insertadas = 0
+        for filas in bloques:
+            with transaction.atomic():
+                objetos = modelo.objects.bulk_create([modelo(**fila) for fila in filas])
+                if tabla == 'suscripciones':
+                    BarrioInteres.objects.bulk_create([
+                        BarrioInteres(suscripcion_id=suscripcion.pk, barrio=barrio, nombre=nombre)
+                        for suscripcion in objetos
+                        for barrio, nombre in alertas.nombres_barrios(suscripcion.barrios_interes).items()
+                    ])
+            insertadas += len(filas)
+            if self.verbosity > 1:
+                self.stdout.write(f'  {tabla}: {insertadas}/{total}')
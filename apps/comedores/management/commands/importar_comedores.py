@@ -0,0 +1,90 @@
+"""
+Comando para importar el listado oficial de comedores desde un CSV
+"""
+from contextlib import nullcontext
+from datetime import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.comedores.importacion import (
+    APERTURA_POR_DEFECTO, CIERRE_POR_DEFECTO, ErrorFila, importar_comedores,
+)
+
+
+def _hora(valor):
+    try:
+        return time.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Hora inválida: {valor} (use HH:MM)')
+
+
+class Command(BaseCommand):
+    help = 'Crear, actualizar y desactivar comedores según el listado oficial (CSV)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'archivo',
+            nargs='?',
+            default=str(settings.BASE_DIR / 'comedores_data.csv'),
+            help='Ruta del CSV (por defecto comedores_data.csv)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Filas por transacción'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Calcular los cambios sin guardarlos'
+        )
+        parser.add_argument(
+            '--sin-desactivar',
+            action='store_true',
+            help='No desactivar los comedores ausentes del archivo'
+        )
+        parser.add_argument(
+            '--apertura',
+            default=APERTURA_POR_DEFECTO.strftime('%H:%M'),
+            help='Hora de apertura de los comedores nuevos'
+        )
+        parser.add_argument(
+            '--cierre',
+            default=CIERRE_POR_DEFECTO.strftime('%H:%M'),
+            help='Hora de cierre de los comedores nuevos'
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que 0')
+
+        try:
+            with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+                # Sin --simular cada lote se confirma en su propia transacción
+                with transaction.atomic() if options['simular'] else nullcontext():
+                    resumen = importar_comedores(
+                        archivo,
+                        lote=options['lote'],
+                        desactivar=not options['sin_desactivar'],
+                        apertura=_hora(options['apertura']),
+                        cierre=_hora(options['cierre']),
+                    )
+                    if options['simular']:
+                        transaction.set_rollback(True)
+        except OSError as exc:
+            raise CommandError(f'No se pudo leer el archivo: {exc}')
+        except ErrorFila as exc:
+            raise CommandError(str(exc))
+
+        for numero, mensaje in resumen['errores']:
+            self.stdout.write(self.style.WARNING(f'Línea {numero}: {mensaje}'))
+
+        prefijo = '[simulación] ' if options['simular'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefijo}{resumen["creados"]} creado(s), {resumen["actualizados"]} actualizado(s), '
+            f'{resumen["sin_cambios"]} sin cambios, {resumen["desactivados"]} desactivado(s), '
+            f'{len(resumen["errores"])} fila(s) con errores'
+        ))
@@ -0,0 +1,42 @@
+"""
+Comando para recalcular y verificar los agregados de calificación de comedores
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.comedores import snapshot
+from apps.comedores.models import Comedor
+
+
+class Command(BaseCommand):
+    help = 'Recalcular en bloque las calificaciones guardadas en Comedor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Solo reportar comedores inconsistentes, sin modificar datos'
+        )
+
+    def handle(self, *args, **options):
+        inconsistentes = Comedor.objects.inconsistentes().values_list(
+            'id', 'nombre', 'calificacion_suma', 'calificacion_cantidad',
+            'suma_real', 'cantidad_real'
+        )
+
+        if options['verificar']:
+            total = 0
+            for pk, nombre, suma, cantidad, suma_real, cantidad_real in inconsistentes.iterator():
+                total += 1
+                self.stdout.write(
+                    f'#{pk} {nombre}: guardado {suma}/{cantidad}, real {suma_real}/{cantidad_real}'
+                )
+            if total:
+                raise CommandError(f'{total} comedor(es) con calificaciones inconsistentes')
+            self.stdout.write(self.style.SUCCESS('Calificaciones consistentes'))
+            return
+
+        actualizados = Comedor.objects.all().recalcular_calificaciones()
+        snapshot.invalidar()
+        self.stdout.write(self.style.SUCCESS(
+            f'{actualizados} comedor(es) recalculados'
+        ))
@@ -0,0 +1,16 @@
+"""
+Comando para reconstruir los resúmenes diarios, semanales y mensuales de Metrica
+"""
+from django.core.management.base import BaseCommand
+
+from apps.comedores import resumenes
+
+
+class Command(BaseCommand):
+    help = 'Reconstruir desde Metrica las tablas de resúmenes usadas por el dashboard'
+
+    def handle(self, *args, **options):
+        creadas = resumenes.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'{creadas} fila(s) de resumen reconstruidas'
+        ))
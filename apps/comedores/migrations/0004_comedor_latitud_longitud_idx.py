@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0003_alertasuscripcion_metrica_donacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comedor',
+            index=models.Index(fields=['latitud', 'longitud'], name='comedores_c_latitud_b88dcd_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:43
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def calcular_calificaciones(apps, schema_editor):
+    """Inicializa los agregados con los comentarios aprobados existentes"""
+    Comedor = apps.get_model('comedores', 'Comedor')
+    Comentario = apps.get_model('comedores', 'Comentario')
+
+    agregados = Comentario.objects.filter(aprobado=True).values('comedor').annotate(
+        suma=Sum('calificacion'), cantidad=Count('id'), media=Avg('calificacion')
+    ).order_by()
+    comedores = []
+    for fila in agregados:
+        comedores.append(Comedor(
+            pk=fila['comedor'],
+            calificacion_suma=fila['suma'],
+            calificacion_cantidad=fila['cantidad'],
+            calificacion_media=fila['media'],
+        ))
+    Comedor.objects.bulk_update(
+        comedores,
+        ['calificacion_suma', 'calificacion_cantidad', 'calificacion_media'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0004_comedor_latitud_longitud_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comedor',
+            name='calificacion_cantidad',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Cantidad de Calificaciones'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='calificacion_media',
+            field=models.FloatField(default=0, editable=False, verbose_name='Calificación Media'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='calificacion_suma',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Suma de Calificaciones'),
+        ),
+        migrations.AddIndex(
+            model_name='comedor',
+            index=models.Index(fields=['estado_activo', 'calificacion_media'], name='comedores_c_estado__ed64c7_idx'),
+        ),
+        migrations.RunPython(calcular_calificaciones, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0005_comedor_calificacion_agregada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MensajeAlerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_alerta', models.CharField(choices=[('CUPOS_BAJOS', 'Cupos Bajos en mi Barrio'), ('NUEVO_COMEDOR', 'Nuevo Comedor Cercano'), ('MENU_DIA', 'Menú del Día'), ('APERTURA', 'Comedor Abierto Ahora')], max_length=30, verbose_name='Tipo de Alerta')),
+                ('canal', models.CharField(choices=[('WHATSAPP', 'WhatsApp'), ('SMS', 'SMS'), ('EMAIL', 'Email')], max_length=20, verbose_name='Canal')),
+                ('destino', models.CharField(max_length=254, verbose_name='Destino')),
+                ('texto', models.TextField(verbose_name='Texto')),
+                ('clave_evento', models.CharField(help_text='Evita enviar dos veces el mismo evento a un suscriptor', max_length=100, verbose_name='Clave del Evento')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('ENVIANDO', 'Enviando'), ('ENVIADO', 'Enviado'), ('ERROR', 'Error')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('error', models.TextField(blank=True, verbose_name='Último Error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Envío')),
+                ('comedor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mensajes_alerta', to='comedores.comedor', verbose_name='Comedor')),
+                ('suscripcion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mensajes', to='comedores.alertasuscripcion', verbose_name='Suscripción')),
+            ],
+            options={
+                'verbose_name': 'Mensaje de Alerta',
+                'verbose_name_plural': 'Mensajes de Alertas',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['estado', 'id'], name='comedores_m_estado_64adce_idx')],
+                'unique_together': {('suscripcion', 'clave_evento')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import unicodedata
+
+
+def poblar_barrios(apps, schema_editor):
+    """Separa los barrios_interes existentes en filas de BarrioInteres"""
+    AlertaSuscripcion = apps.get_model('comedores', 'AlertaSuscripcion')
+    BarrioInteres = apps.get_model('comedores', 'BarrioInteres')
+
+    filas = []
+    suscripciones = AlertaSuscripcion.objects.exclude(barrios_interes='').values_list(
+        'id', 'barrios_interes'
+    )
+    for suscripcion_id, texto in suscripciones.iterator():
+        vistos = set()
+        for nombre in (texto or '').split(','):
+            nombre = ' '.join(nombre.split())
+            barrio = unicodedata.normalize('NFKD', nombre).encode('ascii', 'ignore').decode()
+            barrio = ' '.join(barrio.lower().split())
+            if barrio and barrio not in vistos:
+                vistos.add(barrio)
+                filas.append(BarrioInteres(
+                    suscripcion_id=suscripcion_id, barrio=barrio, nombre=nombre[:100]
+                ))
+    BarrioInteres.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0006_mensajealerta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarrioInteres',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('barrio', models.CharField(help_text='En minúsculas y sin tildes', max_length=100, verbose_name='Barrio')),
+                ('nombre', models.CharField(max_length=100, verbose_name='Nombre como se escribió')),
+                ('suscripcion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='barrios', to='comedores.alertasuscripcion', verbose_name='Suscripción')),
+            ],
+            options={
+                'verbose_name': 'Barrio de Interés',
+                'verbose_name_plural': 'Barrios de Interés',
+                'indexes': [models.Index(fields=['barrio', 'suscripcion'], name='comedores_b_barrio_859299_idx')],
+                'unique_together': {('suscripcion', 'barrio')},
+            },
+        ),
+        migrations.RunPython(poblar_barrios, migrations.RunPython.noop),
+    ]
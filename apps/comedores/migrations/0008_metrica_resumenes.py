@@ -0,0 +1,115 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+
+def poblar_resumenes(apps, schema_editor):
+    """Calcula los resúmenes de las métricas existentes"""
+    Metrica = apps.get_model('comedores', 'Metrica')
+    periodos = {
+        'MetricaDiaria': F('fecha'),
+        'MetricaSemanal': TruncWeek('fecha'),
+        'MetricaMensual': TruncMonth('fecha'),
+    }
+    for nombre, periodo in periodos.items():
+        modelo = apps.get_model('comedores', nombre)
+        agregados = Metrica.objects.annotate(inicio=periodo).values(
+            'comedor_id', 'tipo_metrica', 'inicio'
+        ).annotate(total=Sum('valor'), cantidad=Count('id')).order_by()
+        modelo.objects.bulk_create(
+            [
+                modelo(
+                    comedor_id=fila['comedor_id'], tipo_metrica=fila['tipo_metrica'],
+                    periodo=fila['inicio'], total=fila['total'], cantidad=fila['cantidad'],
+                )
+                for fila in agregados.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0007_barriointeres'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_metrica', models.CharField(choices=[('COMIDAS_SERVIDAS', 'Comidas Servidas'), ('CUPOS_OCUPADOS', 'Cupos Ocupados'), ('USUARIOS_ATENDIDOS', 'Usuarios Atendidos'), ('DONACIONES_RECIBIDAS', 'Donaciones Recibidas')], max_length=30, verbose_name='Tipo de Métrica')),
+                ('periodo', models.DateField(verbose_name='Inicio del Periodo')),
+                ('total', models.BigIntegerField(default=0, verbose_name='Total')),
+                ('cantidad', models.IntegerField(default=0, verbose_name='Registros')),
+                ('comedor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='comedores.comedor', verbose_name='Comedor')),
+            ],
+            options={
+                'verbose_name': 'Resumen Mensual de Métricas',
+                'verbose_name_plural': 'Resúmenes Mensuales de Métricas',
+                'ordering': ['-periodo'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_metrica', models.CharField(choices=[('COMIDAS_SERVIDAS', 'Comidas Servidas'), ('CUPOS_OCUPADOS', 'Cupos Ocupados'), ('USUARIOS_ATENDIDOS', 'Usuarios Atendidos'), ('DONACIONES_RECIBIDAS', 'Donaciones Recibidas')], max_length=30, verbose_name='Tipo de Métrica')),
+                ('periodo', models.DateField(verbose_name='Inicio del Periodo')),
+                ('total', models.BigIntegerField(default=0, verbose_name='Total')),
+                ('cantidad', models.IntegerField(default=0, verbose_name='Registros')),
+                ('comedor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='comedores.comedor', verbose_name='Comedor')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Métricas',
+                'verbose_name_plural': 'Resúmenes Diarios de Métricas',
+                'ordering': ['-periodo'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricaSemanal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_metrica', models.CharField(choices=[('COMIDAS_SERVIDAS', 'Comidas Servidas'), ('CUPOS_OCUPADOS', 'Cupos Ocupados'), ('USUARIOS_ATENDIDOS', 'Usuarios Atendidos'), ('DONACIONES_RECIBIDAS', 'Donaciones Recibidas')], max_length=30, verbose_name='Tipo de Métrica')),
+                ('periodo', models.DateField(verbose_name='Inicio del Periodo')),
+                ('total', models.BigIntegerField(default=0, verbose_name='Total')),
+                ('cantidad', models.IntegerField(default=0, verbose_name='Registros')),
+                ('comedor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='comedores.comedor', verbose_name='Comedor')),
+            ],
+            options={
+                'verbose_name': 'Resumen Semanal de Métricas',
+                'verbose_name_plural': 'Resúmenes Semanales de Métricas',
+                'ordering': ['-periodo'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['tipo_metrica', 'periodo'], name='comedores_metricasemanal_tipo')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='metricasemanal',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('comedor', models.Value(0)), models.F('tipo_metrica'), models.F('periodo'), name='comedores_metricasemanal_unico'),
+        ),
+        migrations.AddIndex(
+            model_name='metricamensual',
+            index=models.Index(fields=['tipo_metrica', 'periodo'], name='comedores_metricamensual_tipo'),
+        ),
+        migrations.AddConstraint(
+            model_name='metricamensual',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('comedor', models.Value(0)), models.F('tipo_metrica'), models.F('periodo'), name='comedores_metricamensual_unico'),
+        ),
+        migrations.AddIndex(
+            model_name='metricadiaria',
+            index=models.Index(fields=['tipo_metrica', 'periodo'], name='comedores_metricadiaria_tipo'),
+        ),
+        migrations.AddConstraint(
+            model_name='metricadiaria',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('comedor', models.Value(0)), models.F('tipo_metrica'), models.F('periodo'), name='comedores_metricadiaria_unico'),
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0008_metrica_resumenes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comedor',
+            name='comuna',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Comuna'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='comuna_ruta',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Comuna de la ruta de entrega de insumos', null=True, verbose_name='Comuna de la Ruta'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='dia_entrega',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Día de entrega de insumos según el listado oficial', null=True, verbose_name='Día de Entrega'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='item_oficial',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True, verbose_name='ITEM del Listado Oficial'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='nicho',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Nicho'),
+        ),
+        migrations.AddField(
+            model_name='comedor',
+            name='nodo',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Nodo'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0009_comedor_listado_oficial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alertasuscripcion',
+            index=models.Index(fields=['-fecha_suscripcion', '-id'], name='comedores_a_fecha_s_63669a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donacion',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='comedores_d_fecha_c_871b6b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='metrica',
+            index=models.Index(fields=['-fecha', '-id'], name='comedores_m_fecha_11fee6_idx'),
+        ),
+    ]
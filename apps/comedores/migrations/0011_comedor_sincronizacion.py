@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 18:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0010_indices_paginacion_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComedorEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comedor_id', models.IntegerField(verbose_name='ID del Comedor')),
+                ('fecha_eliminacion', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Fecha de Eliminación')),
+            ],
+            options={
+                'verbose_name': 'Comedor Eliminado',
+                'verbose_name_plural': 'Comedores Eliminados',
+                'ordering': ['-fecha_eliminacion'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='comedor',
+            index=models.Index(fields=['fecha_modificacion'], name='comedores_c_fecha_m_2fe079_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-18 18:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0011_comedor_sincronizacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoComedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datos', models.JSONField(verbose_name='Datos')),
+                ('fecha', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Evento de Comedor',
+                'verbose_name_plural': 'Eventos de Comedores',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-18 18:27
+
+import apps.comedores.horarios
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comedores', '0012_eventocomedor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comedor',
+            name='horario_personalizado',
+            field=models.JSONField(blank=True, help_text='Solo con días CUSTOM. Ej: {"LU": [["08:00", "14:00"]], "SA": [["20:00", "02:00"]]}', null=True, validators=[apps.comedores.horarios.validar_personalizado], verbose_name='Horario Personalizado'),
+        ),
+    ]
@@ -1,706 +1,1153 @@
-"""
-Modelos para la aplicación de Comedores Comunitarios
-"""
-from django.db import models
-from django.core.validators import MinValueValidator, MaxValueValidator
-from django.contrib.auth.models import User
-from django.utils import timezone
-
-
-class Comedor(models.Model):
-    """
-    Modelo principal para representar un comedor comunitario
-    Usa campos de latitud y longitud separados (versión con SQLite)
-    """
-    DIAS_CHOICES = [
-        ('LU-VI', 'Lunes a Viernes'),
-        ('LU-SA', 'Lunes a Sábado'),
-        ('LU-DO', 'Lunes a Domingo'),
-        ('MA-SA', 'Martes a Sábado'),
-        ('TODOS', 'Todos los días'),
-        ('CUSTOM', 'Horario personalizado'),
-    ]
-    
-    TIPO_COMIDA_CHOICES = [
-        ('CASERA', 'Comida Casera'),
-        ('VEGETARIANA', 'Vegetariana'),
-        ('VEGANA', 'Vegana'),
-        ('MIXTA', 'Mixta'),
-        ('TIPICA', 'Típica Colombiana'),
-        ('INTERNACIONAL', 'Internacional'),
-    ]
-    
-    # Información básica
-    nombre = models.CharField(max_length=200, verbose_name='Nombre del Comedor')
-    descripcion = models.TextField(verbose_name='Descripción', blank=True)
-    
-    # Ubicación
-    direccion = models.CharField(max_length=300, verbose_name='Dirección')
-    barrio = models.CharField(max_length=100, verbose_name='Barrio', blank=True)
-    latitud = models.FloatField(verbose_name='Latitud', help_text='Ej: 3.4516')
-    longitud = models.FloatField(verbose_name='Longitud', help_text='Ej: -76.5320')
-    
-    # Contacto
-    telefono = models.CharField(max_length=50, verbose_name='Teléfono', blank=True)
-    celular = models.CharField(max_length=50, verbose_name='Celular', blank=True)
-    email = models.EmailField(verbose_name='Email', blank=True)
-    
-    # Operación
-    capacidad_personas = models.IntegerField(
-        verbose_name='Capacidad de Personas',
-        validators=[MinValueValidator(1)],
-        default=50
-    )
-    horario_apertura = models.TimeField(verbose_name='Horario de Apertura')
-    horario_cierre = models.TimeField(verbose_name='Horario de Cierre')
-    dias_atencion = models.CharField(
-        max_length=20,
-        choices=DIAS_CHOICES,
-        default='LU-VI',
-        verbose_name='Días de Atención'
-    )
-    
-    # Características
-    tipo_comida = models.CharField(
-        max_length=30,
-        choices=TIPO_COMIDA_CHOICES,
-        default='CASERA',
-        verbose_name='Tipo de Comida'
-    )
-    servicios_adicionales = models.TextField(
-        verbose_name='Servicios Adicionales',
-        help_text='Ej: Wifi, Parqueadero, Área infantil',
-        blank=True
-    )
-    
-    # NUEVOS CAMPOS PARA PROGRAMA SOCIAL
-    # Precios y acceso
-    es_gratuito = models.BooleanField(
-        default=True,
-        verbose_name='¿Es Gratuito?',
-        help_text='Marcar si el comedor es completamente gratuito'
-    )
-    precio_subsidiado = models.DecimalField(
-        max_digits=10,
-        decimal_places=0,
-        verbose_name='Precio Subsidiado',
-        help_text='Precio con subsidio si no es gratuito',
-        default=0,
-        blank=True,
-        null=True
-    )
-    requisitos_acceso = models.TextField(
-        verbose_name='Requisitos de Acceso',
-        help_text='Ej: Documento de identidad, Carnet de persona mayor, Sin requisitos',
-        blank=True,
-        default='Sin requisitos especiales'
-    )
-    
-    # Disponibilidad y cupos
-    cupos_disponibles = models.IntegerField(
-        verbose_name='Cupos Disponibles Hoy',
-        default=50,
-        validators=[MinValueValidator(0)],
-        help_text='Actualizar diariamente'
-    )
-    cola_estimada = models.CharField(
-        max_length=50,
-        verbose_name='Tiempo de Espera Estimado',
-        default='Sin cola',
-        blank=True,
-        help_text='Ej: 5-10 minutos, 15-20 minutos'
-    )
-    ultima_actualizacion_cupos = models.DateTimeField(
-        verbose_name='Última Actualización de Cupos',
-        auto_now=True
-    )
-    
-    # Familia y niños
-    acepta_ninos = models.BooleanField(
-        default=True,
-        verbose_name='Acepta Niños'
-    )
-    tiene_silla_bebes = models.BooleanField(
-        default=False,
-        verbose_name='Tiene Sillas para Bebés'
-    )
-    permite_llevar_comida = models.BooleanField(
-        default=False,
-        verbose_name='Permite Llevar Comida a Casa',
-        help_text='Para llevar a familiares'
-    )
-    tiene_area_infantil = models.BooleanField(
-        default=False,
-        verbose_name='Tiene Área Infantil'
-    )
-    
-    # Accesibilidad
-    accesible_silla_ruedas = models.BooleanField(
-        default=False,
-        verbose_name='Accesible en Silla de Ruedas'
-    )
-    tiene_banos = models.BooleanField(
-        default=True,
-        verbose_name='Tiene Baños'
-    )
-    tiene_rampa = models.BooleanField(
-        default=False,
-        verbose_name='Tiene Rampa de Acceso'
-    )
-    
-    # Transporte público
-    rutas_transporte_publico = models.TextField(
-        verbose_name='Rutas de Transporte Público',
-        help_text='Ej: Ruta 15, Ruta 20, MIO Estación Flora',
-        blank=True
-    )
-    parada_bus_cercana = models.CharField(
-        max_length=200,
-        verbose_name='Parada de Bus Más Cercana',
-        blank=True,
-        help_text='Nombre de la parada más cercana'
-    )
-    distancia_parada = models.CharField(
-        max_length=50,
-        verbose_name='Distancia a la Parada',
-        blank=True,
-        help_text='Ej: 50 metros, 2 cuadras'
-    )
-    
-    # Contacto adicional
-    whatsapp = models.CharField(
-        max_length=50,
-        verbose_name='WhatsApp',
-        blank=True,
-        help_text='Número de WhatsApp para contacto rápido'
-    )
-    
-    # Media
-    foto_principal = models.ImageField(
-        upload_to='comedores/',
-        verbose_name='Foto Principal',
-        blank=True,
-        null=True
-    )
-    
-    # Estado y metadata
-    estado_activo = models.BooleanField(default=True, verbose_name='Estado Activo')
-    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
-    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name='Última Modificación')
-    
-    class Meta:
-        verbose_name = 'Comedor'
-        verbose_name_plural = 'Comedores'
-        ordering = ['nombre']
-        indexes = [
-            models.Index(fields=['estado_activo', 'nombre']),
-            models.Index(fields=['barrio']),
-        ]
-    
-    def __str__(self):
-        return self.nombre
-    
-    @property
-    def esta_abierto_ahora(self):
-        """Determina si el comedor está abierto en el momento actual"""
-        if not self.estado_activo:
-            return False
-        
-        ahora = timezone.now()
-        hora_actual = ahora.time()
-        
-        # Verificar horario
-        if self.horario_apertura <= hora_actual <= self.horario_cierre:
-            # Verificar día de la semana
-            dia_semana = ahora.weekday()  # 0=Lunes, 6=Domingo
-            
-            if self.dias_atencion == 'TODOS' or self.dias_atencion == 'LU-DO':
-                return True
-            elif self.dias_atencion == 'LU-VI' and dia_semana < 5:
-                return True
-            elif self.dias_atencion == 'LU-SA' and dia_semana < 6:
-                return True
-            elif self.dias_atencion == 'MA-SA' and 1 <= dia_semana < 6:
-                return True
-        
-        return False
-    
-    def calificacion_promedio(self):
-        """Calcula la calificación promedio del comedor"""
-        comentarios = self.comentarios.all()
-        if comentarios.exists():
-            return round(sum(c.calificacion for c in comentarios) / comentarios.count(), 1)
-        return 0
-    
-    @property
-    def estado_cupos(self):
-        """Retorna el estado de disponibilidad de cupos"""
-        if self.cupos_disponibles >= 30:
-            return 'disponible'  # Verde
-        elif self.cupos_disponibles > 0:
-            return 'pocos'  # Amarillo
-        else:
-            return 'lleno'  # Rojo
-    
-    @property
-    def precio_texto(self):
-        """Retorna texto del precio para mostrar"""
-        if self.es_gratuito:
-            return '🆓 GRATIS'
-        elif self.precio_subsidiado and self.precio_subsidiado > 0:
-            return f'💰 Subsidiado ${int(self.precio_subsidiado)}'
-        else:
-            return '💵 Consultar precio'
-    
-    @property
-    def telefono_limpio(self):
-        """Retorna teléfono sin espacios ni caracteres especiales"""
-        if self.telefono:
-            return ''.join(filter(str.isdigit, self.telefono))
-        return ''
-    
-    @property
-    def whatsapp_link(self):
-        """Genera link de WhatsApp"""
-        if self.whatsapp:
-            numero = ''.join(filter(str.isdigit, self.whatsapp))
-            if not numero.startswith('57'):
-                numero = '57' + numero
-            return f'https://wa.me/{numero}'
-        return None
-
-
-class MenuDiario(models.Model):
-    """
-    Modelo para el menú diario de cada comedor
-    """
-    comedor = models.ForeignKey(
-        Comedor,
-        on_delete=models.CASCADE,
-        related_name='menus',
-        verbose_name='Comedor'
-    )
-    fecha = models.DateField(verbose_name='Fecha', default=timezone.now)
-    
-    # Comidas
-    desayuno = models.TextField(verbose_name='Desayuno', blank=True)
-    almuerzo = models.TextField(verbose_name='Almuerzo')
-    cena = models.TextField(verbose_name='Cena', blank=True)
-    
-    # Precios
-    precio_desayuno = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-        verbose_name='Precio Desayuno',
-        validators=[MinValueValidator(0)],
-        default=0,
-        blank=True,
-        null=True
-    )
-    precio_almuerzo = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-        verbose_name='Precio Almuerzo',
-        validators=[MinValueValidator(0)],
-        default=0
-    )
-    precio_cena = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-        verbose_name='Precio Cena',
-        validators=[MinValueValidator(0)],
-        default=0,
-        blank=True,
-        null=True
-    )
-    
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        verbose_name = 'Menú Diario'
-        verbose_name_plural = 'Menús Diarios'
-        ordering = ['-fecha']
-        unique_together = ['comedor', 'fecha']
-        indexes = [
-            models.Index(fields=['comedor', '-fecha']),
-        ]
-    
-    def __str__(self):
-        return f"{self.comedor.nombre} - {self.fecha}"
-
-
-class Comentario(models.Model):
-    """
-    Modelo para comentarios y calificaciones de comedores
-    """
-    comedor = models.ForeignKey(
-        Comedor,
-        on_delete=models.CASCADE,
-        related_name='comentarios',
-        verbose_name='Comedor'
-    )
-    usuario = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name='comentarios_comedores',
-        verbose_name='Usuario',
-        null=True,
-        blank=True
-    )
-    nombre_usuario = models.CharField(
-        max_length=100,
-        verbose_name='Nombre',
-        help_text='Nombre del usuario si no está registrado'
-    )
-    
-    # Calificación y comentario
-    calificacion = models.IntegerField(
-        verbose_name='Calificación',
-        validators=[MinValueValidator(1), MaxValueValidator(5)],
-        help_text='Calificación de 1 a 5 estrellas'
-    )
-    comentario = models.TextField(verbose_name='Comentario')
-    
-    # Metadata
-    fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
-    aprobado = models.BooleanField(default=True, verbose_name='Aprobado')
-    
-    class Meta:
-        verbose_name = 'Comentario'
-        verbose_name_plural = 'Comentarios'
-        ordering = ['-fecha']
-        indexes = [
-            models.Index(fields=['comedor', '-fecha']),
-        ]
-    
-    def __str__(self):
-        return f"{self.nombre_usuario} - {self.comedor.nombre} ({self.calificacion}★)"
-
-
-class Favorito(models.Model):
-    """
-    Modelo para marcar comedores como favoritos
-    """
-    usuario = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name='comedores_favoritos',
-        verbose_name='Usuario'
-    )
-    comedor = models.ForeignKey(
-        Comedor,
-        on_delete=models.CASCADE,
-        related_name='favoritos',
-        verbose_name='Comedor'
-    )
-    fecha_agregado = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        verbose_name = 'Favorito'
-        verbose_name_plural = 'Favoritos'
-        unique_together = ['usuario', 'comedor']
-        ordering = ['-fecha_agregado']
-    
-    def __str__(self):
-        return f"{self.usuario.username} - {self.comedor.nombre}"
-
-
-class AlertaSuscripcion(models.Model):
-    """
-    Modelo para suscripciones de alertas por WhatsApp/SMS
-    Usuarios pueden recibir notificaciones cuando hay cupos disponibles
-    """
-    TIPO_ALERTA_CHOICES = [
-        ('CUPOS_BAJOS', 'Cupos Bajos en mi Barrio'),
-        ('NUEVO_COMEDOR', 'Nuevo Comedor Cercano'),
-        ('MENU_DIA', 'Menú del Día'),
-        ('APERTURA', 'Comedor Abierto Ahora'),
-    ]
-
-    CANAL_CHOICES = [
-        ('WHATSAPP', 'WhatsApp'),
-        ('SMS', 'SMS'),
-        ('EMAIL', 'Email'),
-    ]
-
-    # Información del suscriptor
-    nombre = models.CharField(max_length=100, verbose_name='Nombre')
-    telefono = models.CharField(
-        max_length=50,
-        verbose_name='Teléfono/WhatsApp',
-        help_text='Formato: +57 300 123 4567'
-    )
-    email = models.EmailField(verbose_name='Email', blank=True, null=True)
-
-    # Preferencias de alerta
-    tipo_alerta = models.CharField(
-        max_length=30,
-        choices=TIPO_ALERTA_CHOICES,
-        default='CUPOS_BAJOS',
-        verbose_name='Tipo de Alerta'
-    )
-    canal_preferido = models.CharField(
-        max_length=20,
-        choices=CANAL_CHOICES,
-        default='WHATSAPP',
-        verbose_name='Canal Preferido'
-    )
-
-    # Filtros geográficos
-    barrios_interes = models.TextField(
-        verbose_name='Barrios de Interés',
-        help_text='Barrios separados por comas (ej: San Bosco, Siloé, Alfonso López)',
-        blank=True
-    )
-    radio_km = models.IntegerField(
-        verbose_name='Radio en Kilómetros',
-        default=5,
-        validators=[MinValueValidator(1), MaxValueValidator(20)],
-        help_text='Radio de búsqueda desde tu ubicación'
-    )
-
-    # Ubicación del suscriptor (opcional)
-    latitud = models.FloatField(verbose_name='Latitud', blank=True, null=True)
-    longitud = models.FloatField(verbose_name='Longitud', blank=True, null=True)
-
-    # Estado
-    activa = models.BooleanField(default=True, verbose_name='Suscripción Activa')
-    verificada = models.BooleanField(default=False, verbose_name='Número Verificado')
-
-    # Metadata
-    fecha_suscripcion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Suscripción')
-    ultima_notificacion = models.DateTimeField(
-        verbose_name='Última Notificación Enviada',
-        blank=True,
-        null=True
-    )
-
-    class Meta:
-        verbose_name = 'Suscripción de Alerta'
-        verbose_name_plural = 'Suscripciones de Alertas'
-        ordering = ['-fecha_suscripcion']
-        indexes = [
-            models.Index(fields=['telefono', 'activa']),
-            models.Index(fields=['tipo_alerta', 'activa']),
-        ]
-
-    def __str__(self):
-        return f"{self.nombre} - {self.get_tipo_alerta_display()} ({self.telefono})"
-
-    @property
-    def telefono_limpio(self):
-        """Retorna teléfono sin espacios ni caracteres especiales"""
-        return ''.join(filter(str.isdigit, self.telefono))
-
-
-class Metrica(models.Model):
-    """
-    Modelo para tracking de métricas y estadísticas del sistema
-    Permite generar dashboards con evolución temporal
-    """
-    TIPO_METRICA_CHOICES = [
-        ('COMIDAS_SERVIDAS', 'Comidas Servidas'),
-        ('CUPOS_OCUPADOS', 'Cupos Ocupados'),
-        ('USUARIOS_ATENDIDOS', 'Usuarios Atendidos'),
-        ('DONACIONES_RECIBIDAS', 'Donaciones Recibidas'),
-    ]
-
-    comedor = models.ForeignKey(
-        Comedor,
-        on_delete=models.CASCADE,
-        related_name='metricas',
-        verbose_name='Comedor',
-        null=True,
-        blank=True,
-        help_text='Dejar vacío para métricas globales'
-    )
-
-    tipo_metrica = models.CharField(
-        max_length=30,
-        choices=TIPO_METRICA_CHOICES,
-        verbose_name='Tipo de Métrica'
-    )
-
-    valor = models.IntegerField(
-        verbose_name='Valor',
-        validators=[MinValueValidator(0)]
-    )
-
-    fecha = models.DateField(verbose_name='Fecha', default=timezone.now)
-    fecha_registro = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Registro')
-
-    # Metadata adicional (JSON flexible)
-    metadata = models.JSONField(
-        verbose_name='Metadata Adicional',
-        blank=True,
-        null=True,
-        help_text='Datos adicionales en formato JSON'
-    )
-
-    class Meta:
-        verbose_name = 'Métrica'
-        verbose_name_plural = 'Métricas'
-        ordering = ['-fecha']
-        indexes = [
-            models.Index(fields=['comedor', 'tipo_metrica', '-fecha']),
-            models.Index(fields=['tipo_metrica', '-fecha']),
-        ]
-
-    def __str__(self):
-        comedor_nombre = self.comedor.nombre if self.comedor else 'Global'
-        return f"{comedor_nombre} - {self.get_tipo_metrica_display()}: {self.valor} ({self.fecha})"
-
-
-class Donacion(models.Model):
-    """
-    Modelo para gestionar donaciones de alimentos y recursos
-    Incluye sistema de matching con comedores cercanos
-    """
-    TIPO_DONACION_CHOICES = [
-        ('ALIMENTOS', 'Alimentos No Perecederos'),
-        ('PERECEDEROS', 'Alimentos Perecederos'),
-        ('DINERO', 'Dinero en Efectivo'),
-        ('INSUMOS', 'Insumos de Cocina'),
-        ('VOLUNTARIADO', 'Tiempo como Voluntario'),
-    ]
-
-    ESTADO_CHOICES = [
-        ('PENDIENTE', 'Pendiente de Asignación'),
-        ('ASIGNADA', 'Asignada a Comedor'),
-        ('EN_TRANSITO', 'En Tránsito'),
-        ('ENTREGADA', 'Entregada'),
-        ('CANCELADA', 'Cancelada'),
-    ]
-
-    # Información del donante
-    nombre_donante = models.CharField(max_length=200, verbose_name='Nombre del Donante')
-    telefono_donante = models.CharField(max_length=50, verbose_name='Teléfono')
-    email_donante = models.EmailField(verbose_name='Email', blank=True, null=True)
-
-    # Detalles de la donación
-    tipo_donacion = models.CharField(
-        max_length=30,
-        choices=TIPO_DONACION_CHOICES,
-        verbose_name='Tipo de Donación'
-    )
-    descripcion = models.TextField(
-        verbose_name='Descripción',
-        help_text='Ej: 20 kg de arroz, 10 kg de frijol, 5 litros de aceite'
-    )
-    cantidad_estimada_kg = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-        verbose_name='Cantidad Estimada (kg)',
-        validators=[MinValueValidator(0)],
-        blank=True,
-        null=True,
-        help_text='Para alimentos, peso aproximado'
-    )
-    valor_monetario = models.DecimalField(
-        max_digits=12,
-        decimal_places=2,
-        verbose_name='Valor Monetario',
-        validators=[MinValueValidator(0)],
-        blank=True,
-        null=True,
-        help_text='Valor estimado en pesos colombianos'
-    )
-
-    # Ubicación del donante
-    direccion_recoleccion = models.TextField(
-        verbose_name='Dirección de Recolección',
-        blank=True,
-        help_text='Dejar vacío si el donante llevará la donación'
-    )
-    barrio_donante = models.CharField(max_length=100, verbose_name='Barrio', blank=True)
-    latitud_donante = models.FloatField(verbose_name='Latitud Donante', blank=True, null=True)
-    longitud_donante = models.FloatField(verbose_name='Longitud Donante', blank=True, null=True)
-
-    # Matching con comedor
-    comedor_asignado = models.ForeignKey(
-        Comedor,
-        on_delete=models.SET_NULL,
-        related_name='donaciones',
-        verbose_name='Comedor Asignado',
-        null=True,
-        blank=True
-    )
-    fecha_asignacion = models.DateTimeField(
-        verbose_name='Fecha de Asignación',
-        blank=True,
-        null=True
-    )
-
-    # Estado
-    estado = models.CharField(
-        max_length=20,
-        choices=ESTADO_CHOICES,
-        default='PENDIENTE',
-        verbose_name='Estado'
-    )
-    fecha_entrega_estimada = models.DateField(
-        verbose_name='Fecha de Entrega Estimada',
-        blank=True,
-        null=True
-    )
-    fecha_entrega_real = models.DateField(
-        verbose_name='Fecha de Entrega Real',
-        blank=True,
-        null=True
-    )
-
-    # Metadata
-    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
-    notas_admin = models.TextField(
-        verbose_name='Notas del Administrador',
-        blank=True,
-        help_text='Notas internas sobre la donación'
-    )
-
-    class Meta:
-        verbose_name = 'Donación'
-        verbose_name_plural = 'Donaciones'
-        ordering = ['-fecha_creacion']
-        indexes = [
-            models.Index(fields=['estado', '-fecha_creacion']),
-            models.Index(fields=['comedor_asignado', '-fecha_creacion']),
-            models.Index(fields=['barrio_donante']),
-        ]
-
-    def __str__(self):
-        return f"{self.nombre_donante} - {self.get_tipo_donacion_display()} ({self.get_estado_display()})"
-
-    def asignar_comedor_cercano(self):
-        """
-        Algoritmo de matching automático:
-        Encuentra el comedor más cercano que necesite donaciones
-        """
-        if not self.latitud_donante or not self.longitud_donante:
-            return None
-
-        # Buscar comedores activos
-        comedores = Comedor.objects.filter(estado_activo=True)
-
-        # Calcular distancia a cada comedor (fórmula Haversine simplificada)
-        from math import radians, cos, sin, asin, sqrt
-
-        mejor_comedor = None
-        distancia_minima = float('inf')
-
-        for comedor in comedores:
-            # Haversine formula
-            lon1, lat1 = radians(self.longitud_donante), radians(self.latitud_donante)
-            lon2, lat2 = radians(comedor.longitud), radians(comedor.latitud)
-
-            dlon = lon2 - lon1
-            dlat = lat2 - lat1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * asin(sqrt(a))
-            km = 6371 * c
-
-            if km < distancia_minima:
-                distancia_minima = km
-                mejor_comedor = comedor
-
-        return mejor_comedor
-
+"""
+Modelos para la aplicación de Comedores Comunitarios
+"""
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, IntegerField, OuterRef, Prefetch, Subquery, Sum, Value, When, Window
+)
+from django.db.models.functions import Cast, Coalesce, RowNumber
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from . import horarios
+from .geo import DistanciaKm, caja_envolvente
+
+
+class ComedorQuerySet(models.QuerySet):
+    """QuerySet con consultas geográficas resueltas en la base de datos"""
+
+    def cercanos(self, lat, lng, km=None):
+        """
+        Comedores anotados con `distancia_km` y ordenados por distancia
+        Si se da `km` se aplica primero un prefiltro por rectángulo sobre
+        (latitud, longitud), que usa el índice compuesto, y luego el
+        filtro exacto por distancia.
+        """
+        queryset = self
+        if km is not None:
+            lat_min, lat_max, lng_min, lng_max = caja_envolvente(lat, lng, km)
+            queryset = queryset.filter(
+                latitud__range=(lat_min, lat_max),
+                longitud__range=(lng_min, lng_max),
+            )
+
+        queryset = queryset.annotate(distancia_km=DistanciaKm(lat, lng))
+        if km is not None:
+            queryset = queryset.filter(distancia_km__lte=km)
+
+        return queryset.order_by('distancia_km')
+
+    def en_caja(self, oeste, sur, este, norte):
+        """Comedores dentro del rectángulo dado (usa el índice (latitud, longitud))"""
+        return self.filter(latitud__range=(sur, norte), longitud__range=(oeste, este))
+
+    def con_relaciones_listado(self):
+        """
+        Precarga en bloque el menú de hoy y los 3 comentarios aprobados más
+        recientes de cada comedor (usados por ComedorSerializer), para que
+        listar N comedores cueste un número fijo de consultas
+        """
+        hoy = timezone.now().date()
+        recientes = Comentario.objects.filter(aprobado=True).annotate(
+            posicion=Window(
+                RowNumber(),
+                partition_by=F('comedor_id'),
+                order_by=[F('fecha').desc(), F('id').desc()],
+            )
+        ).filter(posicion__lte=3).select_related('usuario').order_by('-fecha', '-id')
+
+        return self.prefetch_related(
+            Prefetch('menus', queryset=MenuDiario.objects.filter(fecha=hoy), to_attr='menus_hoy'),
+            Prefetch('comentarios', queryset=recientes, to_attr='comentarios_recientes'),
+        )
+
+    def ajustar_calificacion(self, delta_suma, delta_cantidad):
+        """
+        Suma o resta aportes al agregado de calificaciones con un UPDATE
+        atómico (F expressions), sin leer la fila antes
+        """
+        if not delta_suma and not delta_cantidad:
+            return 0
+        nueva_suma = F('calificacion_suma') + delta_suma
+        nueva_cantidad = F('calificacion_cantidad') + delta_cantidad
+        return self.update(
+            calificacion_suma=nueva_suma,
+            calificacion_cantidad=nueva_cantidad,
+            calificacion_media=Case(
+                When(calificacion_cantidad__lte=-delta_cantidad, then=Value(0.0)),
+                default=Cast(nueva_suma, FloatField()) / Cast(nueva_cantidad, FloatField()),
+                output_field=FloatField(),
+            ),
+            # update() no aplica auto_now; la sincronización incremental lo necesita
+            fecha_modificacion=timezone.now(),
+        )
+
+    @staticmethod
+    def _calificacion_real():
+        """Subconsultas (suma, cantidad, media) sobre los comentarios aprobados"""
+        aprobados = Comentario.objects.filter(
+            comedor=OuterRef('pk'), aprobado=True
+        ).order_by().values('comedor')
+
+        def agregado(funcion, salida, defecto):
+            return Coalesce(
+                Subquery(aprobados.annotate(total=funcion).values('total')),
+                Value(defecto), output_field=salida
+            )
+
+        return (
+            agregado(Sum('calificacion'), IntegerField(), 0),
+            agregado(Count('id'), IntegerField(), 0),
+            agregado(Avg('calificacion'), FloatField(), 0.0),
+        )
+
+    def recalcular_calificaciones(self):
+        """Recalcula en bloque los agregados de calificación desde cero"""
+        suma, cantidad, media = self._calificacion_real()
+        return self.update(
+            calificacion_suma=suma,
+            calificacion_cantidad=cantidad,
+            calificacion_media=media,
+            fecha_modificacion=timezone.now(),
+        )
+
+    def inconsistentes(self):
+        """Comedores cuyos agregados guardados no coinciden con los comentarios"""
+        suma, cantidad, _ = self._calificacion_real()
+        return self.annotate(suma_real=suma, cantidad_real=cantidad).exclude(
+            calificacion_suma=F('suma_real'),
+            calificacion_cantidad=F('cantidad_real'),
+        )
+
+
+class Comedor(models.Model):
+    """
+    Modelo principal para representar un comedor comunitario
+    Usa campos de latitud y longitud separados (versión con SQLite)
+    """
+    DIAS_CHOICES = [
+        ('LU-VI', 'Lunes a Viernes'),
+        ('LU-SA', 'Lunes a Sábado'),
+        ('LU-DO', 'Lunes a Domingo'),
+        ('MA-SA', 'Martes a Sábado'),
+        ('TODOS', 'Todos los días'),
+        ('CUSTOM', 'Horario personalizado'),
+    ]
+    
+    TIPO_COMIDA_CHOICES = [
+        ('CASERA', 'Comida Casera'),
+        ('VEGETARIANA', 'Vegetariana'),
+        ('VEGANA', 'Vegana'),
+        ('MIXTA', 'Mixta'),
+        ('TIPICA', 'Típica Colombiana'),
+        ('INTERNACIONAL', 'Internacional'),
+    ]
+    
+    # Información básica
+    nombre = models.CharField(max_length=200, verbose_name='Nombre del Comedor')
+    descripcion = models.TextField(verbose_name='Descripción', blank=True)
+    
+    # Ubicación
+    direccion = models.CharField(max_length=300, verbose_name='Dirección')
+    barrio = models.CharField(max_length=100, verbose_name='Barrio', blank=True)
+    latitud = models.FloatField(verbose_name='Latitud', help_text='Ej: 3.4516')
+    longitud = models.FloatField(verbose_name='Longitud', help_text='Ej: -76.5320')
+    
+    # Contacto
+    telefono = models.CharField(max_length=50, verbose_name='Teléfono', blank=True)
+    celular = models.CharField(max_length=50, verbose_name='Celular', blank=True)
+    email = models.EmailField(verbose_name='Email', blank=True)
+    
+    # Operación
+    capacidad_personas = models.IntegerField(
+        verbose_name='Capacidad de Personas',
+        validators=[MinValueValidator(1)],
+        default=50
+    )
+    horario_apertura = models.TimeField(verbose_name='Horario de Apertura')
+    horario_cierre = models.TimeField(verbose_name='Horario de Cierre')
+    dias_atencion = models.CharField(
+        max_length=20,
+        choices=DIAS_CHOICES,
+        default='LU-VI',
+        verbose_name='Días de Atención'
+    )
+    horario_personalizado = models.JSONField(
+        verbose_name='Horario Personalizado',
+        blank=True,
+        null=True,
+        validators=[horarios.validar_personalizado],
+        help_text='Solo con días CUSTOM. Ej: {"LU": [["08:00", "14:00"]], "SA": [["20:00", "02:00"]]}'
+    )
+    
+    # Características
+    tipo_comida = models.CharField(
+        max_length=30,
+        choices=TIPO_COMIDA_CHOICES,
+        default='CASERA',
+        verbose_name='Tipo de Comida'
+    )
+    servicios_adicionales = models.TextField(
+        verbose_name='Servicios Adicionales',
+        help_text='Ej: Wifi, Parqueadero, Área infantil',
+        blank=True
+    )
+    
+    # NUEVOS CAMPOS PARA PROGRAMA SOCIAL
+    # Precios y acceso
+    es_gratuito = models.BooleanField(
+        default=True,
+        verbose_name='¿Es Gratuito?',
+        help_text='Marcar si el comedor es completamente gratuito'
+    )
+    precio_subsidiado = models.DecimalField(
+        max_digits=10,
+        decimal_places=0,
+        verbose_name='Precio Subsidiado',
+        help_text='Precio con subsidio si no es gratuito',
+        default=0,
+        blank=True,
+        null=True
+    )
+    requisitos_acceso = models.TextField(
+        verbose_name='Requisitos de Acceso',
+        help_text='Ej: Documento de identidad, Carnet de persona mayor, Sin requisitos',
+        blank=True,
+        default='Sin requisitos especiales'
+    )
+    
+    # Disponibilidad y cupos
+    cupos_disponibles = models.IntegerField(
+        verbose_name='Cupos Disponibles Hoy',
+        default=50,
+        validators=[MinValueValidator(0)],
+        help_text='Actualizar diariamente'
+    )
+    cola_estimada = models.CharField(
+        max_length=50,
+        verbose_name='Tiempo de Espera Estimado',
+        default='Sin cola',
+        blank=True,
+        help_text='Ej: 5-10 minutos, 15-20 minutos'
+    )
+    ultima_actualizacion_cupos = models.DateTimeField(
+        verbose_name='Última Actualización de Cupos',
+        auto_now=True
+    )
+    
+    # Familia y niños
+    acepta_ninos = models.BooleanField(
+        default=True,
+        verbose_name='Acepta Niños'
+    )
+    tiene_silla_bebes = models.BooleanField(
+        default=False,
+        verbose_name='Tiene Sillas para Bebés'
+    )
+    permite_llevar_comida = models.BooleanField(
+        default=False,
+        verbose_name='Permite Llevar Comida a Casa',
+        help_text='Para llevar a familiares'
+    )
+    tiene_area_infantil = models.BooleanField(
+        default=False,
+        verbose_name='Tiene Área Infantil'
+    )
+    
+    # Accesibilidad
+    accesible_silla_ruedas = models.BooleanField(
+        default=False,
+        verbose_name='Accesible en Silla de Ruedas'
+    )
+    tiene_banos = models.BooleanField(
+        default=True,
+        verbose_name='Tiene Baños'
+    )
+    tiene_rampa = models.BooleanField(
+        default=False,
+        verbose_name='Tiene Rampa de Acceso'
+    )
+    
+    # Transporte público
+    rutas_transporte_publico = models.TextField(
+        verbose_name='Rutas de Transporte Público',
+        help_text='Ej: Ruta 15, Ruta 20, MIO Estación Flora',
+        blank=True
+    )
+    parada_bus_cercana = models.CharField(
+        max_length=200,
+        verbose_name='Parada de Bus Más Cercana',
+        blank=True,
+        help_text='Nombre de la parada más cercana'
+    )
+    distancia_parada = models.CharField(
+        max_length=50,
+        verbose_name='Distancia a la Parada',
+        blank=True,
+        help_text='Ej: 50 metros, 2 cuadras'
+    )
+    
+    # Contacto adicional
+    whatsapp = models.CharField(
+        max_length=50,
+        verbose_name='WhatsApp',
+        blank=True,
+        help_text='Número de WhatsApp para contacto rápido'
+    )
+    
+    # Media
+    foto_principal = models.ImageField(
+        upload_to='comedores/',
+        verbose_name='Foto Principal',
+        blank=True,
+        null=True
+    )
+    
+    # Listado oficial de la Alcaldía (ver importar_comedores)
+    item_oficial = models.PositiveIntegerField(
+        verbose_name='ITEM del Listado Oficial',
+        unique=True,
+        null=True,
+        blank=True
+    )
+    comuna = models.PositiveSmallIntegerField(verbose_name='Comuna', null=True, blank=True)
+    comuna_ruta = models.PositiveSmallIntegerField(
+        verbose_name='Comuna de la Ruta',
+        null=True,
+        blank=True,
+        help_text='Comuna de la ruta de entrega de insumos'
+    )
+    nodo = models.PositiveSmallIntegerField(verbose_name='Nodo', null=True, blank=True)
+    nicho = models.PositiveSmallIntegerField(verbose_name='Nicho', null=True, blank=True)
+    dia_entrega = models.PositiveSmallIntegerField(
+        verbose_name='Día de Entrega',
+        null=True,
+        blank=True,
+        help_text='Día de entrega de insumos según el listado oficial'
+    )
+    
+    # Calificaciones (agregados de comentarios aprobados, ver signals.py)
+    calificacion_suma = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Suma de Calificaciones'
+    )
+    calificacion_cantidad = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Cantidad de Calificaciones'
+    )
+    calificacion_media = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name='Calificación Media'
+    )
+    
+    # Estado y metadata
+    estado_activo = models.BooleanField(default=True, verbose_name='Estado Activo')
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name='Última Modificación')
+    
+    objects = ComedorQuerySet.as_manager()
+    
+    # Campos que solo se escriben con UPDATE atómicos; save() no los sobrescribe
+    CAMPOS_ATOMICOS = ('calificacion_suma', 'calificacion_cantidad', 'calificacion_media')
+    
+    # Campos cuyo cambio se publica en el stream de eventos en vivo (ver eventos.py)
+    CAMPOS_EN_VIVO = ('cupos_disponibles', 'cola_estimada', 'estado_activo')
+    
+    class Meta:
+        verbose_name = 'Comedor'
+        verbose_name_plural = 'Comedores'
+        ordering = ['nombre']
+        indexes = [
+            models.Index(fields=['estado_activo', 'nombre']),
+            models.Index(fields=['barrio']),
+            models.Index(fields=['latitud', 'longitud']),
+            models.Index(fields=['estado_activo', 'calificacion_media']),
+            # Sincronización incremental (/api/comedores/cambios/)
+            models.Index(fields=['fecha_modificacion']),
+        ]
+    
+    def __str__(self):
+        return self.nombre
+    
+    def save(self, *args, **kwargs):
+        """
+        Al actualizar, no pisar los campos mantenidos con UPDATE atómicos
+        Los cupos solo se escriben si cambiaron desde que se leyó el comedor,
+        para no deshacer reservas concurrentes (ver cupos.py)
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            omitidos = set(self.CAMPOS_ATOMICOS)
+            if getattr(self, '_cupos_guardados', None) == self.cupos_disponibles:
+                omitidos.add('cupos_disponibles')
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in omitidos
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Recordar los cupos guardados para detectar cuándo bajan (alertas) y
+        los campos en vivo para publicar solo cambios reales (eventos)
+        """
+        instance = super().from_db(db, field_names, values)
+        diferidos = instance.get_deferred_fields()
+        if 'cupos_disponibles' not in diferidos:
+            instance._cupos_guardados = instance.cupos_disponibles
+        if diferidos.isdisjoint(cls.CAMPOS_EN_VIVO):
+            instance._en_vivo_guardado = instance.valores_en_vivo()
+        return instance
+    
+    def valores_en_vivo(self):
+        return tuple(getattr(self, campo) for campo in self.CAMPOS_EN_VIVO)
+    
+    @property
+    def esta_abierto_ahora(self):
+        """Determina si el comedor está abierto en el momento actual"""
+        return self.esta_abierto_en(timezone.now())
+    
+    def esta_abierto_en(self, momento):
+        """Determina si el comedor está abierto en el momento dado (hora local)"""
+        return self.abierto_en_cuarto(horarios.cuarto(momento))
+    
+    def abierto_en_cuarto(self, cuarto):
+        """Igual que esta_abierto_en con el cuarto de hora ya calculado (ver horarios.py)"""
+        return self.estado_activo and horarios.abierto(self.mascara_horario(), cuarto)
+    
+    def mascara_horario(self):
+        """Máscara semanal de cuartos de hora en que abre"""
+        return horarios.mascara(
+            self.horario_apertura, self.horario_cierre, self.dias_atencion, self.horario_personalizado
+        )
+    
+    def proxima_apertura(self, momento=None):
+        """Siguiente instante en que abre (None si no tiene horario)"""
+        return horarios.proxima_apertura(self.mascara_horario(), momento or timezone.now())
+    
+    def clean(self):
+        """Un horario CUSTOM necesita sus franjas"""
+        if self.dias_atencion == 'CUSTOM' and not self.horario_personalizado:
+            raise ValidationError({'horario_personalizado': 'Requerido con días CUSTOM'})
+    
+    def calificacion_promedio(self):
+        """Calificación promedio de los comentarios aprobados (valor guardado)"""
+        if self.calificacion_cantidad:
+            return round(self.calificacion_media, 1)
+        return 0
+    
+    @property
+    def estado_cupos(self):
+        """Retorna el estado de disponibilidad de cupos"""
+        if self.cupos_disponibles >= 30:
+            return 'disponible'  # Verde
+        elif self.cupos_disponibles > 0:
+            return 'pocos'  # Amarillo
+        else:
+            return 'lleno'  # Rojo
+    
+    @property
+    def precio_texto(self):
+        """Retorna texto del precio para mostrar"""
+        if self.es_gratuito:
+            return '🆓 GRATIS'
+        elif self.precio_subsidiado and self.precio_subsidiado > 0:
+            return f'💰 Subsidiado ${int(self.precio_subsidiado)}'
+        else:
+            return '💵 Consultar precio'
+    
+    @property
+    def telefono_limpio(self):
+        """Retorna teléfono sin espacios ni caracteres especiales"""
+        if self.telefono:
+            return ''.join(filter(str.isdigit, self.telefono))
+        return ''
+    
+    @property
+    def whatsapp_link(self):
+        """Genera link de WhatsApp"""
+        if self.whatsapp:
+            numero = ''.join(filter(str.isdigit, self.whatsapp))
+            if not numero.startswith('57'):
+                numero = '57' + numero
+            return f'https://wa.me/{numero}'
+        return None
+
+
+class MenuDiario(models.Model):
+    """
+    Modelo para el menú diario de cada comedor
+    """
+    comedor = models.ForeignKey(
+        Comedor,
+        on_delete=models.CASCADE,
+        related_name='menus',
+        verbose_name='Comedor'
+    )
+    fecha = models.DateField(verbose_name='Fecha', default=timezone.now)
+    
+    # Comidas
+    desayuno = models.TextField(verbose_name='Desayuno', blank=True)
+    almuerzo = models.TextField(verbose_name='Almuerzo')
+    cena = models.TextField(verbose_name='Cena', blank=True)
+    
+    # Precios
+    precio_desayuno = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Precio Desayuno',
+        validators=[MinValueValidator(0)],
+        default=0,
+        blank=True,
+        null=True
+    )
+    precio_almuerzo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Precio Almuerzo',
+        validators=[MinValueValidator(0)],
+        default=0
+    )
+    precio_cena = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Precio Cena',
+        validators=[MinValueValidator(0)],
+        default=0,
+        blank=True,
+        null=True
+    )
+    
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Menú Diario'
+        verbose_name_plural = 'Menús Diarios'
+        ordering = ['-fecha']
+        unique_together = ['comedor', 'fecha']
+        indexes = [
+            models.Index(fields=['comedor', '-fecha']),
+        ]
+    
+    def __str__(self):
+        return f"{self.comedor.nombre} - {self.fecha}"
+
+
+class Comentario(models.Model):
+    """
+    Modelo para comentarios y calificaciones de comedores
+    """
+    comedor = models.ForeignKey(
+        Comedor,
+        on_delete=models.CASCADE,
+        related_name='comentarios',
+        verbose_name='Comedor'
+    )
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='comentarios_comedores',
+        verbose_name='Usuario',
+        null=True,
+        blank=True
+    )
+    nombre_usuario = models.CharField(
+        max_length=100,
+        verbose_name='Nombre',
+        help_text='Nombre del usuario si no está registrado'
+    )
+    
+    # Calificación y comentario
+    calificacion = models.IntegerField(
+        verbose_name='Calificación',
+        validators=[MinValueValidator(1), MaxValueValidator(5)],
+        help_text='Calificación de 1 a 5 estrellas'
+    )
+    comentario = models.TextField(verbose_name='Comentario')
+    
+    # Metadata
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
+    aprobado = models.BooleanField(default=True, verbose_name='Aprobado')
+    
+    class Meta:
+        verbose_name = 'Comentario'
+        verbose_name_plural = 'Comentarios'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['comedor', '-fecha']),
+        ]
+    
+    def __str__(self):
+        return f"{self.nombre_usuario} - {self.comedor.nombre} ({self.calificacion}★)"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Recordar el aporte guardado para calcular diferencias al guardar"""
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & {'comedor_id', 'calificacion', 'aprobado'}:
+            instance._aporte_guardado = instance.aporte_calificacion()
+        return instance
+    
+    def aporte_calificacion(self):
+        """(comedor_id, suma, cantidad) con que el comentario aporta al promedio"""
+        if self.aprobado:
+            return (self.comedor_id, self.calificacion, 1)
+        return (self.comedor_id, 0, 0)
+
+
+class ComedorEliminado(models.Model):
+    """
+    Registro de comedores borrados de la base de datos
+    Permite que /api/comedores/cambios/ informe las bajas a los clientes
+    offline; se conserva durante sincronizacion.RETENCION
+    """
+    comedor_id = models.IntegerField(verbose_name='ID del Comedor')
+    fecha_eliminacion = models.DateTimeField(
+        default=timezone.now, db_index=True, verbose_name='Fecha de Eliminación'
+    )
+
+    class Meta:
+        verbose_name = 'Comedor Eliminado'
+        verbose_name_plural = 'Comedores Eliminados'
+        ordering = ['-fecha_eliminacion']
+
+    def __str__(self):
+        return f'Comedor {self.comedor_id} eliminado'
+
+
+class EventoComedor(models.Model):
+    """
+    Cambio en vivo de un comedor (cupos, cola estimada o estado activo)
+    Tabla de paso entre workers para el stream de eventos (ver eventos.py);
+    se purga pasados EVENTOS_RETENCION_MINUTOS
+    """
+    datos = models.JSONField(verbose_name='Datos')
+    fecha = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Fecha')
+
+    class Meta:
+        verbose_name = 'Evento de Comedor'
+        verbose_name_plural = 'Eventos de Comedores'
+
+    def __str__(self):
+        return f'Evento {self.id}'
+
+
+class Favorito(models.Model):
+    """
+    Modelo para marcar comedores como favoritos
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='comedores_favoritos',
+        verbose_name='Usuario'
+    )
+    comedor = models.ForeignKey(
+        Comedor,
+        on_delete=models.CASCADE,
+        related_name='favoritos',
+        verbose_name='Comedor'
+    )
+    fecha_agregado = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Favorito'
+        verbose_name_plural = 'Favoritos'
+        unique_together = ['usuario', 'comedor']
+        ordering = ['-fecha_agregado']
+    
+    def __str__(self):
+        return f"{self.usuario.username} - {self.comedor.nombre}"
+
+
+class AlertaSuscripcion(models.Model):
+    """
+    Modelo para suscripciones de alertas por WhatsApp/SMS
+    Usuarios pueden recibir notificaciones cuando hay cupos disponibles
+    """
+    TIPO_ALERTA_CHOICES = [
+        ('CUPOS_BAJOS', 'Cupos Bajos en mi Barrio'),
+        ('NUEVO_COMEDOR', 'Nuevo Comedor Cercano'),
+        ('MENU_DIA', 'Menú del Día'),
+        ('APERTURA', 'Comedor Abierto Ahora'),
+    ]
+
+    CANAL_CHOICES = [
+        ('WHATSAPP', 'WhatsApp'),
+        ('SMS', 'SMS'),
+        ('EMAIL', 'Email'),
+    ]
+
+    # Información del suscriptor
+    nombre = models.CharField(max_length=100, verbose_name='Nombre')
+    telefono = models.CharField(
+        max_length=50,
+        verbose_name='Teléfono/WhatsApp',
+        help_text='Formato: +57 300 123 4567'
+    )
+    email = models.EmailField(verbose_name='Email', blank=True, null=True)
+
+    # Preferencias de alerta
+    tipo_alerta = models.CharField(
+        max_length=30,
+        choices=TIPO_ALERTA_CHOICES,
+        default='CUPOS_BAJOS',
+        verbose_name='Tipo de Alerta'
+    )
+    canal_preferido = models.CharField(
+        max_length=20,
+        choices=CANAL_CHOICES,
+        default='WHATSAPP',
+        verbose_name='Canal Preferido'
+    )
+
+    # Filtros geográficos
+    barrios_interes = models.TextField(
+        verbose_name='Barrios de Interés',
+        help_text='Barrios separados por comas (ej: San Bosco, Siloé, Alfonso López)',
+        blank=True
+    )
+    radio_km = models.IntegerField(
+        verbose_name='Radio en Kilómetros',
+        default=5,
+        validators=[MinValueValidator(1), MaxValueValidator(20)],
+        help_text='Radio de búsqueda desde tu ubicación'
+    )
+
+    # Ubicación del suscriptor (opcional)
+    latitud = models.FloatField(verbose_name='Latitud', blank=True, null=True)
+    longitud = models.FloatField(verbose_name='Longitud', blank=True, null=True)
+
+    # Estado
+    activa = models.BooleanField(default=True, verbose_name='Suscripción Activa')
+    verificada = models.BooleanField(default=False, verbose_name='Número Verificado')
+
+    # Metadata
+    fecha_suscripcion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Suscripción')
+    ultima_notificacion = models.DateTimeField(
+        verbose_name='Última Notificación Enviada',
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        verbose_name = 'Suscripción de Alerta'
+        verbose_name_plural = 'Suscripciones de Alertas'
+        ordering = ['-fecha_suscripcion']
+        indexes = [
+            models.Index(fields=['telefono', 'activa']),
+            models.Index(fields=['tipo_alerta', 'activa']),
+            # Paginación por cursor (ver pagination.KeysetPagination)
+            models.Index(fields=['-fecha_suscripcion', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} - {self.get_tipo_alerta_display()} ({self.telefono})"
+
+    @property
+    def telefono_limpio(self):
+        """Retorna teléfono sin espacios ni caracteres especiales"""
+        return ''.join(filter(str.isdigit, self.telefono))
+
+    def sincronizar_barrios(self):
+        """Refleja `barrios_interes` en la tabla BarrioInteres"""
+        from .alertas import nombres_barrios
+
+        deseados = nombres_barrios(self.barrios_interes)
+        actuales = set(self.barrios.values_list('barrio', flat=True))
+        self.barrios.exclude(barrio__in=list(deseados)).delete()
+        BarrioInteres.objects.bulk_create(
+            [
+                BarrioInteres(suscripcion=self, barrio=barrio, nombre=nombre)
+                for barrio, nombre in deseados.items() if barrio not in actuales
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class BarrioInteres(models.Model):
+    """
+    Barrio de interés de una suscripción, normalizado
+    Se mantiene desde AlertaSuscripcion.barrios_interes (ver signals.py)
+    para contar y buscar suscriptores por barrio con un índice
+    """
+    suscripcion = models.ForeignKey(
+        AlertaSuscripcion,
+        on_delete=models.CASCADE,
+        related_name='barrios',
+        verbose_name='Suscripción'
+    )
+    barrio = models.CharField(
+        max_length=100,
+        verbose_name='Barrio',
+        help_text='En minúsculas y sin tildes'
+    )
+    nombre = models.CharField(max_length=100, verbose_name='Nombre como se escribió')
+
+    class Meta:
+        verbose_name = 'Barrio de Interés'
+        verbose_name_plural = 'Barrios de Interés'
+        unique_together = ['suscripcion', 'barrio']
+        indexes = [
+            models.Index(fields=['barrio', 'suscripcion']),
+        ]
+
+    def __str__(self):
+        return self.nombre
+
+
+class MensajeAlerta(models.Model):
+    """
+    Bandeja de salida de alertas
+    Cada fila es un mensaje para un suscriptor por su canal preferido;
+    el worker de despachar_alertas los envía y marca el resultado
+    """
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('ENVIANDO', 'Enviando'),
+        ('ENVIADO', 'Enviado'),
+        ('ERROR', 'Error'),
+    ]
+
+    suscripcion = models.ForeignKey(
+        AlertaSuscripcion,
+        on_delete=models.CASCADE,
+        related_name='mensajes',
+        verbose_name='Suscripción'
+    )
+    comedor = models.ForeignKey(
+        Comedor,
+        on_delete=models.SET_NULL,
+        related_name='mensajes_alerta',
+        verbose_name='Comedor',
+        null=True,
+        blank=True
+    )
+    tipo_alerta = models.CharField(
+        max_length=30,
+        choices=AlertaSuscripcion.TIPO_ALERTA_CHOICES,
+        verbose_name='Tipo de Alerta'
+    )
+    canal = models.CharField(
+        max_length=20,
+        choices=AlertaSuscripcion.CANAL_CHOICES,
+        verbose_name='Canal'
+    )
+    destino = models.CharField(max_length=254, verbose_name='Destino')
+    texto = models.TextField(verbose_name='Texto')
+    clave_evento = models.CharField(
+        max_length=100,
+        verbose_name='Clave del Evento',
+        help_text='Evita enviar dos veces el mismo evento a un suscriptor'
+    )
+
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='PENDIENTE',
+        verbose_name='Estado'
+    )
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    error = models.TextField(verbose_name='Último Error', blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    fecha_envio = models.DateTimeField(verbose_name='Fecha de Envío', blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Mensaje de Alerta'
+        verbose_name_plural = 'Mensajes de Alertas'
+        ordering = ['id']
+        unique_together = ['suscripcion', 'clave_evento']
+        indexes = [
+            models.Index(fields=['estado', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_canal_display()} a {self.destino} ({self.get_estado_display()})"
+
+
+class Metrica(models.Model):
+    """
+    Modelo para tracking de métricas y estadísticas del sistema
+    Permite generar dashboards con evolución temporal
+    """
+    TIPO_METRICA_CHOICES = [
+        ('COMIDAS_SERVIDAS', 'Comidas Servidas'),
+        ('CUPOS_OCUPADOS', 'Cupos Ocupados'),
+        ('USUARIOS_ATENDIDOS', 'Usuarios Atendidos'),
+        ('DONACIONES_RECIBIDAS', 'Donaciones Recibidas'),
+    ]
+
+    comedor = models.ForeignKey(
+        Comedor,
+        on_delete=models.CASCADE,
+        related_name='metricas',
+        verbose_name='Comedor',
+        null=True,
+        blank=True,
+        help_text='Dejar vacío para métricas globales'
+    )
+
+    tipo_metrica = models.CharField(
+        max_length=30,
+        choices=TIPO_METRICA_CHOICES,
+        verbose_name='Tipo de Métrica'
+    )
+
+    valor = models.IntegerField(
+        verbose_name='Valor',
+        validators=[MinValueValidator(0)]
+    )
+
+    fecha = models.DateField(verbose_name='Fecha', default=timezone.now)
+    fecha_registro = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Registro')
+
+    # Metadata adicional (JSON flexible)
+    metadata = models.JSONField(
+        verbose_name='Metadata Adicional',
+        blank=True,
+        null=True,
+        help_text='Datos adicionales en formato JSON'
+    )
+
+    class Meta:
+        verbose_name = 'Métrica'
+        verbose_name_plural = 'Métricas'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['comedor', 'tipo_metrica', '-fecha']),
+            models.Index(fields=['tipo_metrica', '-fecha']),
+            models.Index(fields=['-fecha', '-id']),
+        ]
+
+    def __str__(self):
+        comedor_nombre = self.comedor.nombre if self.comedor else 'Global'
+        return f"{comedor_nombre} - {self.get_tipo_metrica_display()}: {self.valor} ({self.fecha})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Recordar el aporte guardado para ajustar los resúmenes al guardar"""
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & {'comedor_id', 'tipo_metrica', 'fecha', 'valor'}:
+            instance._aporte_guardado = instance.aporte_resumen()
+        return instance
+
+    def aporte_resumen(self):
+        """(comedor_id, tipo_metrica, fecha, valor) con que la fila aporta a los resúmenes"""
+        fecha = self._meta.get_field('fecha').to_python(self.fecha)
+        return (self.comedor_id, self.tipo_metrica, fecha, self.valor)
+
+
+class MetricaResumen(models.Model):
+    """
+    Suma de métricas por (comedor, tipo de métrica, periodo)
+    Se mantiene de forma incremental al escribir Metrica (ver resumenes.py)
+    y se reconstruye con el comando recalcular_resumenes. Cada subclase
+    define inicio_periodo(fecha), el primer día de su periodo
+    """
+    comedor = models.ForeignKey(
+        Comedor,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Comedor',
+        null=True,
+        blank=True
+    )
+    tipo_metrica = models.CharField(
+        max_length=30,
+        choices=Metrica.TIPO_METRICA_CHOICES,
+        verbose_name='Tipo de Métrica'
+    )
+    periodo = models.DateField(verbose_name='Inicio del Periodo')
+    total = models.BigIntegerField(default=0, verbose_name='Total')
+    cantidad = models.IntegerField(default=0, verbose_name='Registros')
+
+    class Meta:
+        abstract = True
+        ordering = ['-periodo']
+        constraints = [
+            # Las métricas globales (sin comedor) también son únicas por periodo
+            models.UniqueConstraint(
+                Coalesce('comedor', Value(0)), 'tipo_metrica', 'periodo',
+                name='%(app_label)s_%(class)s_unico',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tipo_metrica', 'periodo'], name='%(app_label)s_%(class)s_tipo'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_metrica_display()} {self.periodo}: {self.total}"
+
+
+class MetricaDiaria(MetricaResumen):
+    class Meta(MetricaResumen.Meta):
+        verbose_name = 'Resumen Diario de Métricas'
+        verbose_name_plural = 'Resúmenes Diarios de Métricas'
+
+    @staticmethod
+    def inicio_periodo(fecha):
+        return fecha
+
+
+class MetricaSemanal(MetricaResumen):
+    class Meta(MetricaResumen.Meta):
+        verbose_name = 'Resumen Semanal de Métricas'
+        verbose_name_plural = 'Resúmenes Semanales de Métricas'
+
+    @staticmethod
+    def inicio_periodo(fecha):
+        """Lunes de la semana"""
+        return fecha - timedelta(days=fecha.weekday())
+
+
+class MetricaMensual(MetricaResumen):
+    class Meta(MetricaResumen.Meta):
+        verbose_name = 'Resumen Mensual de Métricas'
+        verbose_name_plural = 'Resúmenes Mensuales de Métricas'
+
+    @staticmethod
+    def inicio_periodo(fecha):
+        """Primer día del mes"""
+        return fecha.replace(day=1)
+
+
+class Donacion(models.Model):
+    """
+    Modelo para gestionar donaciones de alimentos y recursos
+    Incluye sistema de matching con comedores cercanos
+    """
+    TIPO_DONACION_CHOICES = [
+        ('ALIMENTOS', 'Alimentos No Perecederos'),
+        ('PERECEDEROS', 'Alimentos Perecederos'),
+        ('DINERO', 'Dinero en Efectivo'),
+        ('INSUMOS', 'Insumos de Cocina'),
+        ('VOLUNTARIADO', 'Tiempo como Voluntario'),
+    ]
+
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente de Asignación'),
+        ('ASIGNADA', 'Asignada a Comedor'),
+        ('EN_TRANSITO', 'En Tránsito'),
+        ('ENTREGADA', 'Entregada'),
+        ('CANCELADA', 'Cancelada'),
+    ]
+
+    # Información del donante
+    nombre_donante = models.CharField(max_length=200, verbose_name='Nombre del Donante')
+    telefono_donante = models.CharField(max_length=50, verbose_name='Teléfono')
+    email_donante = models.EmailField(verbose_name='Email', blank=True, null=True)
+
+    # Detalles de la donación
+    tipo_donacion = models.CharField(
+        max_length=30,
+        choices=TIPO_DONACION_CHOICES,
+        verbose_name='Tipo de Donación'
+    )
+    descripcion = models.TextField(
+        verbose_name='Descripción',
+        help_text='Ej: 20 kg de arroz, 10 kg de frijol, 5 litros de aceite'
+    )
+    cantidad_estimada_kg = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Cantidad Estimada (kg)',
+        validators=[MinValueValidator(0)],
+        blank=True,
+        null=True,
+        help_text='Para alimentos, peso aproximado'
+    )
+    valor_monetario = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name='Valor Monetario',
+        validators=[MinValueValidator(0)],
+        blank=True,
+        null=True,
+        help_text='Valor estimado en pesos colombianos'
+    )
+
+    # Ubicación del donante
+    direccion_recoleccion = models.TextField(
+        verbose_name='Dirección de Recolección',
+        blank=True,
+        help_text='Dejar vacío si el donante llevará la donación'
+    )
+    barrio_donante = models.CharField(max_length=100, verbose_name='Barrio', blank=True)
+    latitud_donante = models.FloatField(verbose_name='Latitud Donante', blank=True, null=True)
+    longitud_donante = models.FloatField(verbose_name='Longitud Donante', blank=True, null=True)
+
+    # Matching con comedor
+    comedor_asignado = models.ForeignKey(
+        Comedor,
+        on_delete=models.SET_NULL,
+        related_name='donaciones',
+        verbose_name='Comedor Asignado',
+        null=True,
+        blank=True
+    )
+    fecha_asignacion = models.DateTimeField(
+        verbose_name='Fecha de Asignación',
+        blank=True,
+        null=True
+    )
+
+    # Estado
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='PENDIENTE',
+        verbose_name='Estado'
+    )
+    fecha_entrega_estimada = models.DateField(
+        verbose_name='Fecha de Entrega Estimada',
+        blank=True,
+        null=True
+    )
+    fecha_entrega_real = models.DateField(
+        verbose_name='Fecha de Entrega Real',
+        blank=True,
+        null=True
+    )
+
+    # Metadata
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    notas_admin = models.TextField(
+        verbose_name='Notas del Administrador',
+        blank=True,
+        help_text='Notas internas sobre la donación'
+    )
+
+    class Meta:
+        verbose_name = 'Donación'
+        verbose_name_plural = 'Donaciones'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', '-fecha_creacion']),
+            models.Index(fields=['comedor_asignado', '-fecha_creacion']),
+            models.Index(fields=['barrio_donante']),
+            models.Index(fields=['-fecha_creacion', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre_donante} - {self.get_tipo_donacion_display()} ({self.get_estado_display()})"
+
+    def asignar_comedor_cercano(self):
+        """
+        Algoritmo de matching automático:
+        Encuentra el comedor más cercano que necesite donaciones
+        """
+        if not self.latitud_donante or not self.longitud_donante:
+            return None
+
+        # Distancia calculada en la base de datos (ORDER BY distancia LIMIT 1)
+        return Comedor.objects.filter(estado_activo=True).cercanos(
+            self.latitud_donante, self.longitud_donante
+        ).first()
+
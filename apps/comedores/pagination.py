@@ -0,0 +1,171 @@
+"""
+Clases de paginación para la API de Comedores
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class OrdenFijoCursorPagination(CursorPagination):
+    """
+    Cursor con orden fijo, sin tomar el ordenamiento de la vista
+    Necesario para colecciones anidadas dentro de ComedorViewSet, cuyo
+    OrderingFilter ordena por campos de Comedor
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if isinstance(self.ordering, str):
+            return (self.ordering,)
+        return tuple(self.ordering)
+
+
+class MenuCursorPagination(OrdenFijoCursorPagination):
+    """Historial de menús de un comedor, del más reciente al más antiguo"""
+    page_size = 7
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # (comedor, fecha) es único, así que la fecha basta como cursor
+    ordering = '-fecha'
+
+
+class ComentarioCursorPagination(OrdenFijoCursorPagination):
+    """Comentarios aprobados de un comedor, del más reciente al más antiguo"""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-fecha', '-id')
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por clave compuesta (campo, id), de mayor a menor
+    A diferencia de CursorPagination de DRF, que usa solo el primer campo y
+    salta con OFFSET entre filas empatadas, el cursor guarda el id de la
+    última fila: cada página es un rango del índice (campo, id) sin OFFSET
+    ni COUNT(*), aunque miles de filas compartan la misma fecha
+    """
+    campo = None
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def get_page_size(self, request):
+        try:
+            tamano = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(tamano, 1), self.max_page_size)
+
+    def decodificar_cursor(self, request, modelo):
+        """(valor, pk, hacia_atras) del cursor recibido, o None en la primera página"""
+        texto = request.query_params.get(self.cursor_query_param)
+        if not texto:
+            return None
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(texto.encode('ascii')))
+            valor = modelo._meta.get_field(self.campo).to_python(datos['v'])
+            return valor, int(datos['id']), bool(datos.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def codificar_cursor(self, fila, hacia_atras):
+        valor = getattr(fila, self.campo)
+        datos = {'v': valor.isoformat() if hasattr(valor, 'isoformat') else valor, 'id': fila.pk}
+        if hacia_atras:
+            datos['r'] = 1
+        texto = base64.urlsafe_b64encode(json.dumps(datos, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.url_base, self.cursor_query_param, texto)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.url_base = request.build_absolute_uri()
+        posicion = self.decodificar_cursor(request, queryset.model)
+        campo = self.campo
+
+        hacia_atras = bool(posicion and posicion[2])
+        if hacia_atras:
+            queryset = queryset.order_by(campo, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{campo}', '-pk')
+
+        if posicion:
+            valor, pk, _ = posicion
+            # (campo, id) < (valor, pk): el rango sobre `campo` usa el índice
+            if hacia_atras:
+                queryset = queryset.filter(**{f'{campo}__gte': valor}).filter(
+                    Q(**{f'{campo}__gt': valor}) | Q(pk__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(**{f'{campo}__lte': valor}).filter(
+                    Q(**{f'{campo}__lt': valor}) | Q(pk__lt=pk)
+                )
+
+        filas = list(queryset[:self.page_size + 1])
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if hacia_atras:
+            filas.reverse()
+
+        hay_siguiente = hay_mas if not hacia_atras else posicion is not None
+        hay_anterior = posicion is not None if not hacia_atras else hay_mas
+        self.siguiente = self.codificar_cursor(filas[-1], False) if filas and hay_siguiente else None
+        self.anterior = self.codificar_cursor(filas[0], True) if filas and hay_anterior else None
+        return filas
+
+    def get_next_link(self):
+        return self.siguiente
+
+    def get_previous_link(self):
+        return self.anterior
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.siguiente),
+            ('previous', self.anterior),
+            ('results', data),
+        ]))
+
+
+class PaginaOKeysetPagination(PageNumberPagination):
+    """
+    Páginas numeradas por defecto (formato actual de la API); con
+    ?paginacion=cursor, o al seguir un enlace con ?cursor=, usa
+    KeysetPagination sobre `campo_keyset`
+    """
+    campo_keyset = None
+    modo_query_param = 'paginacion'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if request.query_params.get(self.modo_query_param) == 'cursor' or 'cursor' in request.query_params:
+            self.keyset = KeysetPagination()
+            self.keyset.campo = self.campo_keyset
+            self.keyset.page_size = self.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class MetricaPagination(PaginaOKeysetPagination):
+    campo_keyset = 'fecha'
+
+
+class DonacionPagination(PaginaOKeysetPagination):
+    campo_keyset = 'fecha_creacion'
+
+
+class AlertaSuscripcionPagination(PaginaOKeysetPagination):
+    campo_keyset = 'fecha_suscripcion'
@@ -0,0 +1,21 @@
+"""
+Parsers adicionales para la API de Comedores
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """Entrega el cuerpo text/csv como texto; cada vista lo interpreta"""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return codecs.getreader(encoding)(stream).read()
+        except UnicodeDecodeError as exc:
+            raise ParseError(f'CSV con codificación inválida: {exc}')
@@ -0,0 +1,119 @@
+"""
+Resúmenes diarios, semanales y mensuales de Metrica
+
+Las estadísticas del dashboard suman millones de filas de Metrica. En vez
+de recorrerlas en cada consulta, cada escritura de Metrica ajusta la suma
+de su (comedor, tipo de métrica, periodo) en las tablas MetricaDiaria,
+MetricaSemanal y MetricaMensual. Así el costo de las estadísticas depende
+del número de periodos y comedores, no del número de métricas.
+
+`aplicar` recibe aportes (comedor_id, tipo_metrica, fecha, valor, cantidad)
+con signo, de modo que una edición es el aporte nuevo menos el anterior.
+`reconstruir` vuelve a calcular todo desde Metrica (ver el comando
+recalcular_resumenes).
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import Metrica, MetricaDiaria, MetricaMensual, MetricaSemanal
+
+# Expresión que lleva Metrica.fecha al inicio del periodo de cada resumen
+MODELOS = {
+    MetricaDiaria: F('fecha'),
+    MetricaSemanal: TruncWeek('fecha'),
+    MetricaMensual: TruncMonth('fecha'),
+}
+
+
+def _acumular(modelo, aportes):
+    """Suma los aportes por clave (comedor_id, tipo_metrica, periodo)"""
+    acumulado = defaultdict(lambda: [0, 0])
+    for comedor_id, tipo_metrica, fecha, valor, cantidad in aportes:
+        clave = (comedor_id, tipo_metrica, modelo.inicio_periodo(fecha))
+        acumulado[clave][0] += valor
+        acumulado[clave][1] += cantidad
+    return {clave: delta for clave, delta in acumulado.items() if delta != [0, 0]}
+
+
+def _aplicar_modelo(modelo, acumulado):
+    """Ajusta las filas existentes con un bulk_update y crea las que faltan"""
+    comedores = {comedor_id for comedor_id, _, _ in acumulado}
+    filtro_comedor = Q(comedor_id__in=comedores - {None})
+    if None in comedores:
+        filtro_comedor |= Q(comedor__isnull=True)
+
+    existentes = modelo.objects.select_for_update().filter(
+        filtro_comedor,
+        tipo_metrica__in={tipo for _, tipo, _ in acumulado},
+        periodo__in={periodo for _, _, periodo in acumulado},
+    ).order_by()
+
+    actualizar = []
+    for resumen in existentes:
+        delta = acumulado.pop((resumen.comedor_id, resumen.tipo_metrica, resumen.periodo), None)
+        if delta is not None:
+            resumen.total += delta[0]
+            resumen.cantidad += delta[1]
+            actualizar.append(resumen)
+
+    modelo.objects.bulk_update(actualizar, ['total', 'cantidad'], batch_size=1000)
+    modelo.objects.bulk_create(
+        [
+            modelo(
+                comedor_id=comedor_id, tipo_metrica=tipo_metrica, periodo=periodo,
+                total=total, cantidad=cantidad,
+            )
+            for (comedor_id, tipo_metrica, periodo), (total, cantidad) in acumulado.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def aplicar(aportes):
+    """Ajusta los tres resúmenes con los aportes dados"""
+    aportes = list(aportes)
+    if not aportes:
+        return
+
+    for modelo in MODELOS:
+        acumulado = _acumular(modelo, aportes)
+        if not acumulado:
+            continue
+        try:
+            with transaction.atomic():
+                _aplicar_modelo(modelo, dict(acumulado))
+        except IntegrityError:
+            # Otra escritura creó la misma fila en paralelo: ahora existe
+            with transaction.atomic():
+                _aplicar_modelo(modelo, dict(acumulado))
+
+
+def reconstruir():
+    """Recalcula todos los resúmenes desde Metrica. Retorna filas creadas"""
+    creadas = 0
+    with transaction.atomic():
+        for modelo, periodo in MODELOS.items():
+            modelo.objects.all().delete()
+            agregados = Metrica.objects.annotate(inicio=periodo).values(
+                'comedor_id', 'tipo_metrica', 'inicio'
+            ).annotate(
+                total=Sum('valor'), cantidad=Count('id')
+            ).order_by()
+            resumenes = modelo.objects.bulk_create(
+                (
+                    modelo(
+                        comedor_id=fila['comedor_id'],
+                        tipo_metrica=fila['tipo_metrica'],
+                        periodo=fila['inicio'],
+                        total=fila['total'],
+                        cantidad=fila['cantidad'],
+                    )
+                    for fila in agregados.iterator()
+                ),
+                batch_size=1000,
+            )
+            creadas += len(resumenes)
+    return creadas
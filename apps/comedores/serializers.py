@@ -1,266 +1,294 @@
-"""
-Serializers para la API REST de Comedores
-"""
-from rest_framework import serializers
-# from rest_framework_gis.serializers import GeoFeatureModelSerializer  # No necesario con SQLite
-from .models import Comedor, MenuDiario, Comentario, Favorito, AlertaSuscripcion, Metrica, Donacion
-
-
-class MenuDiarioSerializer(serializers.ModelSerializer):
-    """Serializer para el menú diario"""
-    
-    class Meta:
-        model = MenuDiario
-        fields = [
-            'id', 'fecha', 'desayuno', 'almuerzo', 'cena',
-            'precio_desayuno', 'precio_almuerzo', 'precio_cena'
-        ]
-
-
-class ComentarioSerializer(serializers.ModelSerializer):
-    """Serializer para comentarios"""
-    usuario_display = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = Comentario
-        fields = [
-            'id', 'nombre_usuario', 'usuario_display', 'calificacion',
-            'comentario', 'fecha', 'aprobado'
-        ]
-        read_only_fields = ['fecha']
-    
-    def get_usuario_display(self, obj):
-        """Obtener nombre del usuario registrado o el nombre manual"""
-        if obj.usuario:
-            return obj.usuario.username
-        return obj.nombre_usuario
-
-
-class ComedorSerializer(serializers.ModelSerializer):
-    """Serializer básico para Comedor"""
-    latitud = serializers.SerializerMethodField()
-    longitud = serializers.SerializerMethodField()
-    esta_abierto = serializers.SerializerMethodField()
-    calificacion_promedio = serializers.SerializerMethodField()
-    menu_hoy = serializers.SerializerMethodField()
-    comentarios_recientes = serializers.SerializerMethodField()
-    estado_cupos = serializers.SerializerMethodField()
-    precio_texto = serializers.SerializerMethodField()
-    telefono_limpio = serializers.SerializerMethodField()
-    whatsapp_link = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = Comedor
-        fields = [
-            'id', 'nombre', 'descripcion', 'direccion', 'barrio',
-            'latitud', 'longitud', 'telefono', 'celular', 'email', 'whatsapp',
-            'capacidad_personas', 'horario_apertura', 'horario_cierre',
-            'dias_atencion', 'tipo_comida', 'servicios_adicionales',
-            'foto_principal', 'estado_activo', 'esta_abierto',
-            'calificacion_promedio', 'menu_hoy', 'comentarios_recientes',
-            # Nuevos campos sociales
-            'es_gratuito', 'precio_subsidiado', 'requisitos_acceso',
-            'cupos_disponibles', 'cola_estimada', 'estado_cupos',
-            'acepta_ninos', 'tiene_silla_bebes', 'permite_llevar_comida', 'tiene_area_infantil',
-            'accesible_silla_ruedas', 'tiene_banos', 'tiene_rampa',
-            'rutas_transporte_publico', 'parada_bus_cercana', 'distancia_parada',
-            'precio_texto', 'telefono_limpio', 'whatsapp_link',
-            'fecha_creacion'
-        ]
-    
-    def get_latitud(self, obj):
-        """Obtener latitud desde Point field"""
-        return obj.latitud
-    
-    def get_longitud(self, obj):
-        """Obtener longitud desde Point field"""
-        return obj.longitud
-    
-    def get_esta_abierto(self, obj):
-        """Verificar si está abierto ahora"""
-        return obj.esta_abierto_ahora
-    
-    def get_calificacion_promedio(self, obj):
-        """Obtener calificación promedio"""
-        return obj.calificacion_promedio()
-    
-    def get_menu_hoy(self, obj):
-        """Obtener menú del día actual"""
-        from django.utils import timezone
-        menu = obj.menus.filter(fecha=timezone.now().date()).first()
-        if menu:
-            return MenuDiarioSerializer(menu).data
-        return None
-    
-    def get_comentarios_recientes(self, obj):
-        """Obtener últimos 3 comentarios aprobados"""
-        comentarios = obj.comentarios.filter(aprobado=True)[:3]
-        return ComentarioSerializer(comentarios, many=True).data
-    
-    def get_estado_cupos(self, obj):
-        """Estado de disponibilidad de cupos"""
-        return obj.estado_cupos
-    
-    def get_precio_texto(self, obj):
-        """Texto del precio formateado"""
-        return obj.precio_texto
-    
-    def get_telefono_limpio(self, obj):
-        """Teléfono sin caracteres especiales"""
-        return obj.telefono_limpio
-    
-    def get_whatsapp_link(self, obj):
-        """Link de WhatsApp"""
-        return obj.whatsapp_link
-
-
-class ComedorGeoJSONSerializer(serializers.ModelSerializer):
-    """
-    Serializer GeoJSON para usar con Leaflet
-    Formato manual de GeoJSON
-    """
-    esta_abierto = serializers.SerializerMethodField()
-    calificacion_promedio = serializers.SerializerMethodField()
-    estado_cupos = serializers.SerializerMethodField()
-    precio_texto = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = Comedor
-        fields = [
-            'id', 'nombre', 'descripcion', 'direccion', 'barrio',
-            'latitud', 'longitud',
-            'telefono', 'celular', 'email', 'whatsapp', 'capacidad_personas',
-            'horario_apertura', 'horario_cierre', 'dias_atencion',
-            'tipo_comida', 'servicios_adicionales', 'foto_principal',
-            'estado_activo', 'esta_abierto', 'calificacion_promedio',
-            'es_gratuito', 'cupos_disponibles', 'estado_cupos', 'precio_texto',
-            'acepta_ninos', 'permite_llevar_comida', 'accesible_silla_ruedas'
-        ]
-    
-    def get_esta_abierto(self, obj):
-        return obj.esta_abierto_ahora
-    
-    def get_calificacion_promedio(self, obj):
-        return obj.calificacion_promedio()
-    
-    def get_estado_cupos(self, obj):
-        return obj.estado_cupos
-    
-    def get_precio_texto(self, obj):
-        return obj.precio_texto
-
-
-class ComedorDetalleSerializer(ComedorSerializer):
-    """Serializer detallado con todos los menús y comentarios"""
-    menus = MenuDiarioSerializer(many=True, read_only=True)
-    comentarios = serializers.SerializerMethodField()
-    
-    class Meta(ComedorSerializer.Meta):
-        fields = ComedorSerializer.Meta.fields + ['menus', 'comentarios']
-    
-    def get_comentarios(self, obj):
-        """Obtener todos los comentarios aprobados"""
-        comentarios = obj.comentarios.filter(aprobado=True)
-        return ComentarioSerializer(comentarios, many=True).data
-
-
-class AlertaSuscripcionSerializer(serializers.ModelSerializer):
-    """Serializer para suscripciones de alertas"""
-    tipo_alerta_display = serializers.CharField(source='get_tipo_alerta_display', read_only=True)
-    canal_preferido_display = serializers.CharField(source='get_canal_preferido_display', read_only=True)
-    telefono_limpio = serializers.SerializerMethodField(read_only=True)
-
-    class Meta:
-        model = AlertaSuscripcion
-        fields = [
-            'id', 'nombre', 'telefono', 'email',
-            'tipo_alerta', 'tipo_alerta_display',
-            'canal_preferido', 'canal_preferido_display',
-            'barrios_interes', 'radio_km',
-            'latitud', 'longitud',
-            'activa', 'verificada',
-            'fecha_suscripcion', 'ultima_notificacion',
-            'telefono_limpio'
-        ]
-        read_only_fields = ['fecha_suscripcion', 'ultima_notificacion', 'verificada']
-
-    def get_telefono_limpio(self, obj):
-        """Retorna teléfono sin caracteres especiales"""
-        return obj.telefono_limpio
-
-
-class MetricaSerializer(serializers.ModelSerializer):
-    """Serializer para métricas"""
-    tipo_metrica_display = serializers.CharField(source='get_tipo_metrica_display', read_only=True)
-    comedor_nombre = serializers.SerializerMethodField(read_only=True)
-
-    class Meta:
-        model = Metrica
-        fields = [
-            'id', 'comedor', 'comedor_nombre',
-            'tipo_metrica', 'tipo_metrica_display',
-            'valor', 'fecha', 'fecha_registro',
-            'metadata'
-        ]
-        read_only_fields = ['fecha_registro']
-
-    def get_comedor_nombre(self, obj):
-        """Retorna nombre del comedor o 'Global'"""
-        return obj.comedor.nombre if obj.comedor else 'Global'
-
-
-class DonacionSerializer(serializers.ModelSerializer):
-    """Serializer para donaciones"""
-    tipo_donacion_display = serializers.CharField(source='get_tipo_donacion_display', read_only=True)
-    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
-    comedor_nombre = serializers.SerializerMethodField(read_only=True)
-    comedor_info = serializers.SerializerMethodField(read_only=True)
-    distancia_km = serializers.SerializerMethodField(read_only=True)
-
-    class Meta:
-        model = Donacion
-        fields = [
-            'id', 'nombre_donante', 'telefono_donante', 'email_donante',
-            'tipo_donacion', 'tipo_donacion_display',
-            'descripcion', 'cantidad_estimada_kg', 'valor_monetario',
-            'direccion_recoleccion', 'barrio_donante',
-            'latitud_donante', 'longitud_donante',
-            'comedor_asignado', 'comedor_nombre', 'comedor_info', 'distancia_km',
-            'fecha_asignacion', 'estado', 'estado_display',
-            'fecha_entrega_estimada', 'fecha_entrega_real',
-            'fecha_creacion', 'notas_admin'
-        ]
-        read_only_fields = ['fecha_creacion', 'fecha_asignacion']
-
-    def get_comedor_nombre(self, obj):
-        """Retorna nombre del comedor asignado"""
-        return obj.comedor_asignado.nombre if obj.comedor_asignado else None
-
-    def get_distancia_km(self, obj):
-        """Calcular distancia entre donante y comedor asignado"""
-        if obj.comedor_asignado and obj.latitud_donante and obj.longitud_donante:
-            from math import radians, cos, sin, asin, sqrt
-            lat1, lon1 = radians(obj.latitud_donante), radians(obj.longitud_donante)
-            lat2, lon2 = radians(obj.comedor_asignado.latitud), radians(obj.comedor_asignado.longitud)
-
-            dlon = lon2 - lon1
-            dlat = lat2 - lat1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * asin(sqrt(a))
-            return round(c * 6371, 2)  # Radio de la Tierra en km
-        return None
-
-    def get_comedor_info(self, obj):
-        """Retorna información básica del comedor asignado"""
-        if obj.comedor_asignado:
-            return {
-                'id': obj.comedor_asignado.id,
-                'nombre': obj.comedor_asignado.nombre,
-                'direccion': obj.comedor_asignado.direccion,
-                'barrio': obj.comedor_asignado.barrio,
-                'telefono': obj.comedor_asignado.telefono,
-                'latitud': obj.comedor_asignado.latitud,
-                'longitud': obj.comedor_asignado.longitud,
-            }
-        return None
-
+"""
+Serializers para la API REST de Comedores
+"""
+from django.utils import timezone
+from rest_framework import serializers
+# from rest_framework_gis.serializers import GeoFeatureModelSerializer  # No necesario con SQLite
+from .models import Comedor, MenuDiario, Comentario, Favorito, AlertaSuscripcion, Metrica, Donacion
+from . import horarios
+from .geo import haversine
+
+
+class MenuDiarioSerializer(serializers.ModelSerializer):
+    """Serializer para el menú diario"""
+    
+    class Meta:
+        model = MenuDiario
+        fields = [
+            'id', 'fecha', 'desayuno', 'almuerzo', 'cena',
+            'precio_desayuno', 'precio_almuerzo', 'precio_cena'
+        ]
+
+
+class ComentarioSerializer(serializers.ModelSerializer):
+    """Serializer para comentarios"""
+    usuario_display = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Comentario
+        fields = [
+            'id', 'nombre_usuario', 'usuario_display', 'calificacion',
+            'comentario', 'fecha', 'aprobado'
+        ]
+        read_only_fields = ['fecha']
+    
+    def get_usuario_display(self, obj):
+        """Obtener nombre del usuario registrado o el nombre manual"""
+        if obj.usuario:
+            return obj.usuario.username
+        return obj.nombre_usuario
+
+
+class ComedorSerializer(serializers.ModelSerializer):
+    """Serializer básico para Comedor"""
+    latitud = serializers.SerializerMethodField()
+    longitud = serializers.SerializerMethodField()
+    esta_abierto = serializers.SerializerMethodField()
+    calificacion_promedio = serializers.SerializerMethodField()
+    menu_hoy = serializers.SerializerMethodField()
+    comentarios_recientes = serializers.SerializerMethodField()
+    estado_cupos = serializers.SerializerMethodField()
+    precio_texto = serializers.SerializerMethodField()
+    telefono_limpio = serializers.SerializerMethodField()
+    whatsapp_link = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Comedor
+        fields = [
+            'id', 'nombre', 'descripcion', 'direccion', 'barrio',
+            'latitud', 'longitud', 'telefono', 'celular', 'email', 'whatsapp',
+            'capacidad_personas', 'horario_apertura', 'horario_cierre',
+            'dias_atencion', 'horario_personalizado', 'tipo_comida', 'servicios_adicionales',
+            'foto_principal', 'estado_activo', 'esta_abierto',
+            'calificacion_promedio', 'menu_hoy', 'comentarios_recientes',
+            # Nuevos campos sociales
+            'es_gratuito', 'precio_subsidiado', 'requisitos_acceso',
+            'cupos_disponibles', 'cola_estimada', 'estado_cupos',
+            'acepta_ninos', 'tiene_silla_bebes', 'permite_llevar_comida', 'tiene_area_infantil',
+            'accesible_silla_ruedas', 'tiene_banos', 'tiene_rampa',
+            'rutas_transporte_publico', 'parada_bus_cercana', 'distancia_parada',
+            'precio_texto', 'telefono_limpio', 'whatsapp_link',
+            'fecha_creacion'
+        ]
+    
+    def get_latitud(self, obj):
+        """Obtener latitud desde Point field"""
+        return obj.latitud
+    
+    def get_longitud(self, obj):
+        """Obtener longitud desde Point field"""
+        return obj.longitud
+    
+    def momento(self):
+        """Instante en que se evalúa el horario (abierto_en de la vista o ahora)"""
+        return self.context.setdefault('momento', timezone.now())
+    
+    def get_esta_abierto(self, obj):
+        """Verificar si está abierto; el cuarto de hora se calcula una vez por respuesta"""
+        if 'cuarto' not in self.context:
+            self.context['cuarto'] = horarios.cuarto(self.momento())
+        return obj.abierto_en_cuarto(self.context['cuarto'])
+    
+    def get_calificacion_promedio(self, obj):
+        """Obtener calificación promedio"""
+        return obj.calificacion_promedio()
+    
+    def get_menu_hoy(self, obj):
+        """Obtener menú del día actual (precargado si está disponible)"""
+        if hasattr(obj, 'menus_hoy'):
+            menu = obj.menus_hoy[0] if obj.menus_hoy else None
+        else:
+            from django.utils import timezone
+            menu = obj.menus.filter(fecha=timezone.now().date()).first()
+        if menu:
+            return MenuDiarioSerializer(menu).data
+        return None
+    
+    def get_comentarios_recientes(self, obj):
+        """Obtener últimos 3 comentarios aprobados (precargados si están disponibles)"""
+        if hasattr(obj, 'comentarios_recientes'):
+            comentarios = obj.comentarios_recientes
+        else:
+            comentarios = obj.comentarios.filter(aprobado=True).select_related('usuario')[:3]
+        return ComentarioSerializer(comentarios, many=True).data
+    
+    def get_estado_cupos(self, obj):
+        """Estado de disponibilidad de cupos"""
+        return obj.estado_cupos
+    
+    def get_precio_texto(self, obj):
+        """Texto del precio formateado"""
+        return obj.precio_texto
+    
+    def get_telefono_limpio(self, obj):
+        """Teléfono sin caracteres especiales"""
+        return obj.telefono_limpio
+    
+    def get_whatsapp_link(self, obj):
+        """Link de WhatsApp"""
+        return obj.whatsapp_link
+
+
+class ComedorGeoJSONSerializer(serializers.ModelSerializer):
+    """
+    Serializer GeoJSON para usar con Leaflet
+    Formato manual de GeoJSON
+    """
+    esta_abierto = serializers.SerializerMethodField()
+    calificacion_promedio = serializers.SerializerMethodField()
+    estado_cupos = serializers.SerializerMethodField()
+    precio_texto = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Comedor
+        fields = [
+            'id', 'nombre', 'descripcion', 'direccion', 'barrio',
+            'latitud', 'longitud',
+            'telefono', 'celular', 'email', 'whatsapp', 'capacidad_personas',
+            'horario_apertura', 'horario_cierre', 'dias_atencion',
+            'tipo_comida', 'servicios_adicionales', 'foto_principal',
+            'estado_activo', 'esta_abierto', 'calificacion_promedio',
+            'es_gratuito', 'cupos_disponibles', 'estado_cupos', 'precio_texto',
+            'acepta_ninos', 'permite_llevar_comida', 'accesible_silla_ruedas'
+        ]
+    
+    def get_esta_abierto(self, obj):
+        return obj.esta_abierto_ahora
+    
+    def get_calificacion_promedio(self, obj):
+        return obj.calificacion_promedio()
+    
+    def get_estado_cupos(self, obj):
+        return obj.estado_cupos
+    
+    def get_precio_texto(self, obj):
+        return obj.precio_texto
+
+
+class ComedorDetalleSerializer(ComedorSerializer):
+    """
+    Serializer detallado con los menús y comentarios más recientes
+    El historial completo está en /api/comedores/{id}/menus/ y /comentarios/
+    """
+    LIMITE_MENUS = 7
+    LIMITE_COMENTARIOS = 10
+    
+    menus = serializers.SerializerMethodField()
+    comentarios = serializers.SerializerMethodField()
+    proxima_apertura = serializers.SerializerMethodField()
+    
+    class Meta(ComedorSerializer.Meta):
+        fields = ComedorSerializer.Meta.fields + ['menus', 'comentarios', 'proxima_apertura']
+    
+    def get_proxima_apertura(self, obj):
+        """Siguiente apertura según el horario semanal"""
+        return obj.proxima_apertura(self.momento())
+    
+    def get_menus(self, obj):
+        """Obtener los últimos menús registrados"""
+        menus = obj.menus.order_by('-fecha')[:self.LIMITE_MENUS]
+        return MenuDiarioSerializer(menus, many=True).data
+    
+    def get_comentarios(self, obj):
+        """Obtener los últimos comentarios aprobados"""
+        comentarios = obj.comentarios.filter(aprobado=True).select_related(
+            'usuario'
+        ).order_by('-fecha', '-id')[:self.LIMITE_COMENTARIOS]
+        return ComentarioSerializer(comentarios, many=True).data
+
+
+class AlertaSuscripcionSerializer(serializers.ModelSerializer):
+    """Serializer para suscripciones de alertas"""
+    tipo_alerta_display = serializers.CharField(source='get_tipo_alerta_display', read_only=True)
+    canal_preferido_display = serializers.CharField(source='get_canal_preferido_display', read_only=True)
+    telefono_limpio = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = AlertaSuscripcion
+        fields = [
+            'id', 'nombre', 'telefono', 'email',
+            'tipo_alerta', 'tipo_alerta_display',
+            'canal_preferido', 'canal_preferido_display',
+            'barrios_interes', 'radio_km',
+            'latitud', 'longitud',
+            'activa', 'verificada',
+            'fecha_suscripcion', 'ultima_notificacion',
+            'telefono_limpio'
+        ]
+        read_only_fields = ['fecha_suscripcion', 'ultima_notificacion', 'verificada']
+
+    def get_telefono_limpio(self, obj):
+        """Retorna teléfono sin caracteres especiales"""
+        return obj.telefono_limpio
+
+
+class MetricaSerializer(serializers.ModelSerializer):
+    """Serializer para métricas"""
+    tipo_metrica_display = serializers.CharField(source='get_tipo_metrica_display', read_only=True)
+    comedor_nombre = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = Metrica
+        fields = [
+            'id', 'comedor', 'comedor_nombre',
+            'tipo_metrica', 'tipo_metrica_display',
+            'valor', 'fecha', 'fecha_registro',
+            'metadata'
+        ]
+        read_only_fields = ['fecha_registro']
+
+    def get_comedor_nombre(self, obj):
+        """Retorna nombre del comedor o 'Global'"""
+        return obj.comedor.nombre if obj.comedor else 'Global'
+
+
+class DonacionSerializer(serializers.ModelSerializer):
+    """Serializer para donaciones"""
+    tipo_donacion_display = serializers.CharField(source='get_tipo_donacion_display', read_only=True)
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    comedor_nombre = serializers.SerializerMethodField(read_only=True)
+    comedor_info = serializers.SerializerMethodField(read_only=True)
+    distancia_km = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = Donacion
+        fields = [
+            'id', 'nombre_donante', 'telefono_donante', 'email_donante',
+            'tipo_donacion', 'tipo_donacion_display',
+            'descripcion', 'cantidad_estimada_kg', 'valor_monetario',
+            'direccion_recoleccion', 'barrio_donante',
+            'latitud_donante', 'longitud_donante',
+            'comedor_asignado', 'comedor_nombre', 'comedor_info', 'distancia_km',
+            'fecha_asignacion', 'estado', 'estado_display',
+            'fecha_entrega_estimada', 'fecha_entrega_real',
+            'fecha_creacion', 'notas_admin'
+        ]
+        read_only_fields = ['fecha_creacion', 'fecha_asignacion']
+
+    def get_comedor_nombre(self, obj):
+        """Retorna nombre del comedor asignado"""
+        return obj.comedor_asignado.nombre if obj.comedor_asignado else None
+
+    def get_distancia_km(self, obj):
+        """Calcular distancia entre donante y comedor asignado"""
+        if obj.comedor_asignado and obj.latitud_donante and obj.longitud_donante:
+            return round(haversine(
+                obj.latitud_donante, obj.longitud_donante,
+                obj.comedor_asignado.latitud, obj.comedor_asignado.longitud
+            ), 2)
+        return None
+
+    def get_comedor_info(self, obj):
+        """Retorna información básica del comedor asignado"""
+        if obj.comedor_asignado:
+            return {
+                'id': obj.comedor_asignado.id,
+                'nombre': obj.comedor_asignado.nombre,
+                'direccion': obj.comedor_asignado.direccion,
+                'barrio': obj.comedor_asignado.barrio,
+                'telefono': obj.comedor_asignado.telefono,
+                'latitud': obj.comedor_asignado.latitud,
+                'longitud': obj.comedor_asignado.longitud,
+            }
+        return None
+
@@ -0,0 +1,159 @@
+"""
+Señales para mantener sincronizados los datos precalculados de Comedores
+"""
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import alertas, eventos, geo, indice_espacial, resumenes, sincronizacion, snapshot
+from .models import AlertaSuscripcion, Comedor, MenuDiario, Comentario, Metrica
+
+# Función HAVERSINE_KM disponible en cada conexión SQLite (ver geo.DistanciaKm)
+connection_created.connect(
+    geo.registrar_funciones_sqlite, dispatch_uid='comedores_funciones_sqlite'
+)
+
+
+@receiver(post_save, sender=Comedor)
+@receiver(post_delete, sender=Comedor)
+@receiver(post_save, sender=Comentario)
+@receiver(post_delete, sender=Comentario)
+@receiver(post_save, sender=MenuDiario)
+@receiver(post_delete, sender=MenuDiario)
+def invalidar_snapshot_geojson(sender, **kwargs):
+    """
+    Marca el snapshot GeoJSON como obsoleto cuando cambian sus datos
+    Al confirmar: antes, otra petición reconstruiría el snapshot con los datos viejos
+    """
+    transaction.on_commit(snapshot.invalidar)
+
+
+@receiver(post_save, sender=Comedor)
+@receiver(post_delete, sender=Comedor)
+def invalidar_indice_espacial(sender, **kwargs):
+    """Reconstruir el índice espacial cuando se confirma un cambio de comedor"""
+    transaction.on_commit(indice_espacial.invalidar)
+
+
+@receiver(post_delete, sender=Comedor)
+def registrar_baja_comedor(sender, instance, **kwargs):
+    """Guardar la baja para que los clientes offline la reciban en /cambios/"""
+    sincronizacion.registrar_baja(instance.pk)
+
+
+@receiver(post_save, sender=Comentario)
+def actualizar_calificacion_al_guardar(sender, instance, created, **kwargs):
+    """
+    Aplica al comedor la diferencia entre el aporte anterior y el actual
+    del comentario (creado, aprobado, rechazado, editado o movido)
+    """
+    actual = instance.aporte_calificacion()
+    if created:
+        anterior = (instance.comedor_id, 0, 0)
+    else:
+        anterior = getattr(instance, '_aporte_guardado', None)
+
+    if anterior is None:
+        # No se conoce el estado previo: recalcular solo este comedor
+        Comedor.objects.filter(pk=instance.comedor_id).recalcular_calificaciones()
+    elif anterior[0] == actual[0]:
+        Comedor.objects.filter(pk=actual[0]).ajustar_calificacion(
+            actual[1] - anterior[1], actual[2] - anterior[2]
+        )
+    else:
+        Comedor.objects.filter(pk=anterior[0]).ajustar_calificacion(-anterior[1], -anterior[2])
+        Comedor.objects.filter(pk=actual[0]).ajustar_calificacion(actual[1], actual[2])
+
+    instance._aporte_guardado = actual
+
+
+@receiver(post_delete, sender=Comentario)
+def actualizar_calificacion_al_borrar(sender, instance, **kwargs):
+    """Resta el aporte del comentario eliminado"""
+    comedor_id, suma, cantidad = getattr(
+        instance, '_aporte_guardado', None
+    ) or instance.aporte_calificacion()
+    Comedor.objects.filter(pk=comedor_id).ajustar_calificacion(-suma, -cantidad)
+
+
+@receiver(post_save, sender=AlertaSuscripcion)
+def sincronizar_barrios_interes(sender, instance, raw=False, **kwargs):
+    """Mantener la tabla BarrioInteres al día con barrios_interes"""
+    if not raw:
+        instance.sincronizar_barrios()
+
+
+@receiver(post_save, sender=AlertaSuscripcion)
+@receiver(post_delete, sender=AlertaSuscripcion)
+def invalidar_padron_alertas(sender, **kwargs):
+    """Reconstruir el padrón de suscriptores cuando se confirma un cambio de suscripción"""
+    transaction.on_commit(alertas.invalidar)
+
+
+@receiver(post_save, sender=Comedor)
+def alertas_de_comedor(sender, instance, created, raw=False, **kwargs):
+    """Eventos NUEVO_COMEDOR y CUPOS_BAJOS"""
+    if raw or not instance.estado_activo:
+        return
+    if created:
+        alertas.encolar_al_confirmar(alertas.evento_nuevo_comedor(instance))
+    else:
+        anteriores = getattr(instance, '_cupos_guardados', None)
+        if (
+            anteriores is not None
+            and anteriores >= alertas.UMBRAL_CUPOS_BAJOS > instance.cupos_disponibles
+        ):
+            alertas.encolar_al_confirmar(alertas.evento_cupos_bajos(instance))
+    instance._cupos_guardados = instance.cupos_disponibles
+
+
+@receiver(post_save, sender=Comedor)
+def eventos_de_comedor(sender, instance, created, raw=False, **kwargs):
+    """Publicar en el stream en vivo los cambios de cupos, cola o estado"""
+    if raw:
+        return
+    actual = instance.valores_en_vivo()
+    anterior = None if created else getattr(instance, '_en_vivo_guardado', None)
+    if actual != anterior and (instance.estado_activo or not created):
+        eventos.publicar_al_confirmar([eventos.evento_comedor(instance)])
+    instance._en_vivo_guardado = actual
+
+
+@receiver(post_save, sender=MenuDiario)
+def alertas_de_menu(sender, instance, created, raw=False, **kwargs):
+    """Evento MENU_DIA al publicar el menú de hoy"""
+    if raw or not created or instance.fecha != timezone.localdate():
+        return
+    if instance.comedor.estado_activo:
+        alertas.encolar_al_confirmar(alertas.evento_menu_dia(instance))
+
+
+@receiver(post_save, sender=Metrica)
+def actualizar_resumenes_al_guardar(sender, instance, created, raw=False, **kwargs):
+    """Ajusta los resúmenes con la diferencia entre el aporte anterior y el actual"""
+    if raw:
+        return
+    comedor_id, tipo_metrica, fecha, valor = actual = instance.aporte_resumen()
+    aportes = [(comedor_id, tipo_metrica, fecha, valor, 1)]
+
+    anterior = None if created else getattr(instance, '_aporte_guardado', None)
+    if anterior is not None:
+        comedor_id, tipo_metrica, fecha, valor = anterior
+        aportes.append((comedor_id, tipo_metrica, fecha, -valor, -1))
+    elif not created:
+        # No se conoce el estado previo: el resumen se corrige con recalcular_resumenes
+        aportes = []
+
+    resumenes.aplicar(aportes)
+    instance._aporte_guardado = actual
+
+
+@receiver(post_delete, sender=Metrica)
+def actualizar_resumenes_al_borrar(sender, instance, **kwargs):
+    """Resta el aporte de la métrica eliminada"""
+    comedor_id, tipo_metrica, fecha, valor = getattr(
+        instance, '_aporte_guardado', None
+    ) or instance.aporte_resumen()
+    resumenes.aplicar([(comedor_id, tipo_metrica, fecha, -valor, -1)])
@@ -0,0 +1,103 @@
+"""
+Sincronización incremental de comedores para clientes offline
+
+El mapa guarda la colección de comedores en localStorage. En lugar de
+descargarla completa en cada visita, el cliente envía el token de su última
+sincronización y recibe solo lo que cambió desde entonces:
+
+- Comedores creados o modificados (índice sobre fecha_modificacion)
+- Comedores que pasaron de abierto a cerrado o viceversa por horario
+- Bajas: comedores desactivados y comedores borrados (ComedorEliminado)
+
+El token codifica el instante de la consulta. Como fecha_modificacion se
+fija al guardar y la fila solo es visible al confirmar la transacción, cada
+consulta repasa además los últimos MARGEN segundos: un cambio puede llegar
+dos veces, pero no se pierde. Con un token más antiguo que RETENCION (las
+bajas ya se purgaron) se responde la colección completa.
+"""
+import base64
+import json
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import horarios, snapshot
+
+MARGEN = timedelta(seconds=getattr(settings, 'CAMBIOS_MARGEN_SEGUNDOS', 30))
+RETENCION = timedelta(days=getattr(settings, 'CAMBIOS_RETENCION_DIAS', 30))
+
+
+def codificar_token(momento):
+    datos = json.dumps({'t': momento.isoformat()}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(datos).decode()
+
+
+def decodificar_token(texto):
+    """Instante codificado en el token; lanza ValueError si es inválido"""
+    try:
+        momento = parse_datetime(json.loads(base64.urlsafe_b64decode(texto.encode('ascii')))['t'])
+    except (TypeError, KeyError, UnicodeError, ValueError):
+        raise ValueError(f'Token inválido: {texto}')
+    if momento is None or timezone.is_naive(momento):
+        raise ValueError(f'Token inválido: {texto}')
+    return momento
+
+
+def registrar_baja(comedor_id):
+    """Guarda la baja de un comedor borrado y purga las que ya expiraron"""
+    from .models import ComedorEliminado
+
+    ahora = timezone.now()
+    ComedorEliminado.objects.create(comedor_id=comedor_id, fecha_eliminacion=ahora)
+    ComedorEliminado.objects.filter(fecha_eliminacion__lt=ahora - RETENCION).delete()
+
+
+def cambios(desde=None, perfil='completo', ahora=None):
+    """
+    Cambios desde el instante `desde` (None para la colección completa)
+    Retorna un FeatureCollection con `eliminados` (ids), `completo` y el
+    `token` para la siguiente sincronización
+    """
+    from .models import Comedor, ComedorEliminado
+
+    ahora = ahora or timezone.now()
+    activos = Comedor.objects.filter(estado_activo=True)
+
+    if desde is None or ahora - desde > RETENCION:
+        return {
+            'type': 'FeatureCollection',
+            'features': snapshot.construir_geojson(activos, perfil, ahora)['features'],
+            'eliminados': [],
+            'completo': True,
+            'token': codificar_token(ahora),
+        }
+
+    limite = desde - MARGEN
+    modificados = dict(
+        Comedor.objects.filter(fecha_modificacion__gt=limite).values_list('id', 'estado_activo')
+    )
+    eliminados = {pk for pk, activo in modificados.items() if not activo}
+    eliminados.update(
+        ComedorEliminado.objects.filter(fecha_eliminacion__gt=limite).values_list('comedor_id', flat=True)
+    )
+
+    # El cliente guardó `esta_abierto` evaluado en `desde`
+    cambiados = {pk for pk, activo in modificados.items() if activo}
+    indice = horarios.obtener_indice()
+    cambiados.update(np.setxor1d(indice.abiertos_en(desde), indice.abiertos_en(ahora)).tolist())
+
+    features = []
+    if cambiados:
+        features = snapshot.construir_geojson(
+            activos.filter(pk__in=cambiados), perfil, ahora
+        )['features']
+    return {
+        'type': 'FeatureCollection',
+        'features': features,
+        'eliminados': sorted(eliminados - cambiados),
+        'completo': False,
+        'token': codificar_token(ahora),
+    }
@@ -0,0 +1,267 @@
+"""
+Generación de datos sintéticos para pruebas de carga
+
+Cada tabla se genera por bloques numerados. Un bloque depende solo de
+(semilla, tabla, número de bloque), así que el resultado es el mismo con
+uno o con varios procesos. Las funciones de este módulo no tocan la base
+de datos: producen diccionarios de campos que el comando generar_datos
+inserta con bulk_create, mientras un Pool de procesos genera los bloques
+siguientes (ver el comando).
+
+Los comedores se reparten alrededor de centros de barrio dentro de
+CALI_BOUNDS, para que las consultas espaciales vean densidades parecidas
+a las reales y no una nube uniforme.
+"""
+from datetime import time, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+# Volúmenes por perfil; los argumentos del comando los pueden sobrescribir
+PERFILES = {
+    'demo': {
+        'comedores': 1_000, 'metricas': 50_000, 'comentarios': 5_000,
+        'donaciones': 2_000, 'suscripciones': 1_000,
+    },
+    'produccion': {
+        'comedores': 100_000, 'metricas': 10_000_000, 'comentarios': 1_000_000,
+        'donaciones': 500_000, 'suscripciones': 200_000,
+    },
+    'x10': {
+        'comedores': 1_000_000, 'metricas': 100_000_000, 'comentarios': 10_000_000,
+        'donaciones': 5_000_000, 'suscripciones': 2_000_000,
+    },
+}
+
+TABLAS = ['comedores', 'metricas', 'comentarios', 'donaciones', 'suscripciones']
+
+BARRIOS = [
+    'La Flora', 'San Fernando', 'Centenario', 'Alfonso López', 'El Poblado',
+    'Siloé', 'San Antonio', 'Granada', 'La Base', 'Obrero', 'Santa Rosa',
+    'Juanchito', 'Mariano Ramos', 'La Ermita', 'Versalles', 'San Bosco',
+    'El Vallado', 'Manuela Beltrán', 'Potrero Grande', 'Los Mangos',
+    'Mojica', 'El Retiro', 'Petecuy', 'Calima', 'Meléndez', 'Ciudad Córdoba',
+    'Marroquín', 'Terrón Colorado', 'Brisas de Mayo', 'Llano Verde',
+]
+
+HORARIOS = [
+    (time(6, 0), time(10, 0)), (time(7, 0), time(14, 0)), (time(11, 0), time(14, 0)),
+    (time(11, 30), time(15, 0)), (time(8, 0), time(17, 0)), (time(17, 0), time(21, 0)),
+]
+
+DIAS = ['LU-VI', 'LU-SA', 'LU-DO', 'MA-SA', 'TODOS']
+TIPOS_COMIDA = ['CASERA', 'VEGETARIANA', 'VEGANA', 'MIXTA', 'TIPICA', 'INTERNACIONAL']
+COLAS = ['Sin cola', '5-10 min', '10-20 min', '20-30 min', '+30 min']
+TIPOS_METRICA = ['COMIDAS_SERVIDAS', 'CUPOS_OCUPADOS', 'USUARIOS_ATENDIDOS', 'DONACIONES_RECIBIDAS']
+TIPOS_DONACION = ['ALIMENTOS', 'PERECEDEROS', 'DINERO', 'INSUMOS', 'VOLUNTARIADO']
+ESTADOS_DONACION = ['PENDIENTE', 'ASIGNADA', 'EN_TRANSITO', 'ENTREGADA', 'CANCELADA']
+TIPOS_ALERTA = ['CUPOS_BAJOS', 'NUEVO_COMEDOR', 'MENU_DIA', 'APERTURA']
+CANALES = ['WHATSAPP', 'SMS', 'EMAIL']
+NOMBRES = [
+    'María', 'José', 'Luz', 'Carlos', 'Ana', 'Jhon', 'Diana', 'Andrés',
+    'Sandra', 'Luis', 'Paola', 'Jorge', 'Claudia', 'Fernando', 'Yuliana',
+]
+COMENTARIOS = [
+    'Excelente atención y comida muy rica',
+    'Buena comida, aunque la fila es larga',
+    'El personal es muy amable',
+    'Porciones generosas para los niños',
+    'Podrían mejorar la limpieza del lugar',
+    'Muy buen servicio, lo recomiendo',
+]
+
+# Centros de barrio alrededor de los cuales se agrupan los comedores
+CENTROS = 60
+
+
+def _rng(semilla, tabla, bloque):
+    return np.random.default_rng([semilla, TABLAS.index(tabla), bloque])
+
+
+def centros_barrio(semilla, limites):
+    """(lats, lngs, desviaciones) de los centros de barrio sintéticos"""
+    rng = np.random.default_rng([semilla, len(TABLAS)])
+    lats = rng.uniform(limites['south'], limites['north'], CENTROS)
+    lngs = rng.uniform(limites['west'], limites['east'], CENTROS)
+    desviaciones = rng.uniform(0.002, 0.012, CENTROS)
+    return lats, lngs, desviaciones
+
+
+def puntos(rng, cantidad, limites, centros):
+    """Puntos agrupados alrededor de los centros, recortados a los límites"""
+    lats, lngs, desviaciones = centros
+    centro = rng.integers(0, len(lats), cantidad)
+    lat = rng.normal(lats[centro], desviaciones[centro])
+    lng = rng.normal(lngs[centro], desviaciones[centro])
+    return (
+        np.clip(lat, limites['south'], limites['north']).round(6),
+        np.clip(lng, limites['west'], limites['east']).round(6),
+        centro,
+    )
+
+
+def _telefonos(rng, cantidad):
+    return [f'+57 3{numero // 10**7:02d} {numero % 10**7:07d}' for numero in rng.integers(0, 10**9, cantidad)]
+
+
+def comedores(rng, inicio, cantidad, contexto):
+    lat, lng, centro = puntos(rng, cantidad, contexto['limites'], contexto['centros'])
+    capacidad = rng.integers(20, 301, cantidad)
+    ocupacion = rng.random(cantidad)
+    horario = rng.integers(0, len(HORARIOS), cantidad)
+    booleanos = rng.random((cantidad, 9)) < [0.85, 0.9, 0.4, 0.5, 0.3, 0.4, 0.9, 0.5, 0.95]
+    filas = []
+    for i in range(cantidad):
+        numero = inicio + i + 1
+        apertura, cierre = HORARIOS[horario[i]]
+        (gratuito, ninos, silla_bebes, llevar, area_infantil,
+         silla_ruedas, banos, rampa, activo) = booleanos[i]
+        filas.append({
+            'nombre': f'Comedor Sintético {numero}',
+            'direccion': f'Calle {numero % 120 + 1} # {numero % 90 + 1}-{numero % 80 + 10}',
+            'barrio': BARRIOS[centro[i] % len(BARRIOS)],
+            'latitud': float(lat[i]),
+            'longitud': float(lng[i]),
+            'capacidad_personas': int(capacidad[i]),
+            'cupos_disponibles': int(capacidad[i] * ocupacion[i]),
+            'cola_estimada': COLAS[int(ocupacion[i] * len(COLAS))],
+            'horario_apertura': apertura,
+            'horario_cierre': cierre,
+            'dias_atencion': DIAS[numero % len(DIAS)],
+            'tipo_comida': TIPOS_COMIDA[numero % len(TIPOS_COMIDA)],
+            'es_gratuito': bool(gratuito),
+            'precio_subsidiado': Decimal(0) if gratuito else Decimal(int(capacidad[i]) * 10),
+            'acepta_ninos': bool(ninos),
+            'tiene_silla_bebes': bool(silla_bebes),
+            'permite_llevar_comida': bool(llevar),
+            'tiene_area_infantil': bool(area_infantil),
+            'accesible_silla_ruedas': bool(silla_ruedas),
+            'tiene_banos': bool(banos),
+            'tiene_rampa': bool(rampa),
+            'estado_activo': bool(activo),
+        })
+    return filas
+
+
+def metricas(rng, inicio, cantidad, contexto):
+    ids = contexto['comedores']
+    comedor = ids[rng.integers(0, len(ids), cantidad)]
+    globales = rng.random(cantidad) < 0.02
+    tipo = rng.integers(0, len(TIPOS_METRICA), cantidad)
+    valor = rng.gamma(2.0, 40.0, cantidad).astype(int)
+    dias = rng.integers(0, contexto['dias'], cantidad)
+    hoy = contexto['hoy']
+    return [
+        {
+            'comedor_id': None if globales[i] else int(comedor[i]),
+            'tipo_metrica': TIPOS_METRICA[tipo[i]],
+            'valor': int(valor[i]),
+            'fecha': hoy - timedelta(days=int(dias[i])),
+        }
+        for i in range(cantidad)
+    ]
+
+
+def comentarios(rng, inicio, cantidad, contexto):
+    ids = contexto['comedores']
+    comedor = ids[rng.integers(0, len(ids), cantidad)]
+    calificacion = rng.choice([1, 2, 3, 4, 5], cantidad, p=[0.05, 0.07, 0.18, 0.35, 0.35])
+    texto = rng.integers(0, len(COMENTARIOS), cantidad)
+    nombre = rng.integers(0, len(NOMBRES), cantidad)
+    aprobado = rng.random(cantidad) < 0.95
+    return [
+        {
+            'comedor_id': int(comedor[i]),
+            'nombre_usuario': NOMBRES[nombre[i]],
+            'calificacion': int(calificacion[i]),
+            'comentario': COMENTARIOS[texto[i]],
+            'aprobado': bool(aprobado[i]),
+        }
+        for i in range(cantidad)
+    ]
+
+
+def donaciones(rng, inicio, cantidad, contexto):
+    ids = contexto['comedores']
+    lat, lng, centro = puntos(rng, cantidad, contexto['limites'], contexto['centros'])
+    tipo = rng.integers(0, len(TIPOS_DONACION), cantidad)
+    estado = rng.choice(len(ESTADOS_DONACION), cantidad, p=[0.3, 0.2, 0.1, 0.35, 0.05])
+    comedor = ids[rng.integers(0, len(ids), cantidad)]
+    kilos = rng.gamma(2.0, 15.0, cantidad).round(2)
+    telefonos = _telefonos(rng, cantidad)
+    filas = []
+    for i in range(cantidad):
+        tipo_donacion = TIPOS_DONACION[tipo[i]]
+        estado_donacion = ESTADOS_DONACION[estado[i]]
+        filas.append({
+            'nombre_donante': f'{NOMBRES[(inicio + i) % len(NOMBRES)]} Donante {inicio + i + 1}',
+            'telefono_donante': telefonos[i],
+            'tipo_donacion': tipo_donacion,
+            'descripcion': f'Donación sintética de {tipo_donacion.lower()}',
+            'cantidad_estimada_kg': None if tipo_donacion == 'DINERO' else Decimal(str(kilos[i])),
+            'valor_monetario': Decimal(int(kilos[i] * 10_000)) if tipo_donacion == 'DINERO' else None,
+            'direccion_recoleccion': f'Carrera {(inicio + i) % 100 + 1} # {(inicio + i) % 70 + 1}-20',
+            'barrio_donante': BARRIOS[centro[i] % len(BARRIOS)],
+            'latitud_donante': float(lat[i]),
+            'longitud_donante': float(lng[i]),
+            'estado': estado_donacion,
+            'comedor_asignado_id': None if estado_donacion == 'PENDIENTE' else int(comedor[i]),
+        })
+    return filas
+
+
+def suscripciones(rng, inicio, cantidad, contexto):
+    lat, lng, _ = puntos(rng, cantidad, contexto['limites'], contexto['centros'])
+    con_ubicacion = rng.random(cantidad) < 0.7
+    tipo = rng.integers(0, len(TIPOS_ALERTA), cantidad)
+    canal = rng.choice(len(CANALES), cantidad, p=[0.7, 0.2, 0.1])
+    radio = rng.integers(1, 21, cantidad)
+    cuantos_barrios = rng.integers(0, 4, cantidad)
+    barrios = rng.integers(0, len(BARRIOS), (cantidad, 3))
+    activa = rng.random(cantidad) < 0.9
+    telefonos = _telefonos(rng, cantidad)
+    return [
+        {
+            'nombre': f'{NOMBRES[(inicio + i) % len(NOMBRES)]} {inicio + i + 1}',
+            'telefono': telefonos[i],
+            'email': f'suscriptor{inicio + i + 1}@ejemplo.com' if CANALES[canal[i]] == 'EMAIL' else None,
+            'tipo_alerta': TIPOS_ALERTA[tipo[i]],
+            'canal_preferido': CANALES[canal[i]],
+            'barrios_interes': ', '.join(BARRIOS[b] for b in barrios[i][:cuantos_barrios[i]]),
+            'radio_km': int(radio[i]),
+            'latitud': float(lat[i]) if con_ubicacion[i] else None,
+            'longitud': float(lng[i]) if con_ubicacion[i] else None,
+            'activa': bool(activa[i]),
+        }
+        for i in range(cantidad)
+    ]
+
+
+GENERADORES = {
+    'comedores': comedores,
+    'metricas': metricas,
+    'comentarios': comentarios,
+    'donaciones': donaciones,
+    'suscripciones': suscripciones,
+}
+
+# Contexto compartido con los procesos (ver inicializar)
+_contexto = {}
+
+
+def inicializar(contexto):
+    """Inicializador del Pool: recibe el contexto una vez por proceso"""
+    _contexto.clear()
+    _contexto.update(contexto)
+
+
+def generar_bloque(tarea):
+    """Genera las filas del bloque (tabla, semilla, bloque, inicio, cantidad)"""
+    tabla, semilla, bloque, inicio, cantidad = tarea
+    return GENERADORES[tabla](_rng(semilla, tabla, bloque), inicio, cantidad, _contexto)
+
+
+def tareas(tabla, semilla, total, lote):
+    """Bloques de `lote` filas que suman `total`"""
+    for bloque, inicio in enumerate(range(0, total, lote)):
+        yield tabla, semilla, bloque, inicio, min(lote, total - inicio)
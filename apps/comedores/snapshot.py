@@ -0,0 +1,195 @@
+"""
+Snapshot precalculado del GeoJSON de comedores
+
+El mapa descarga la colección completa en cada carga, pero los datos cambian
+pocas veces al día. Este módulo construye el FeatureCollection una sola vez,
+lo guarda como bytes ya codificados junto con un hash de contenido (ETag) y
+lo reconstruye solo cuando alguna señal marca el snapshot como obsoleto.
+
+Hay dos perfiles: 'completo', con todas las propiedades del comedor, y
+'min', con lo necesario para dibujar el marcador (id, coordenadas, nombre,
+cupos y si está abierto); el detalle se pide al abrir cada comedor.
+
+La marca de versión vive en el cache de Django (ver versiones.py) para que
+todos los workers de gunicorn se enteren de la invalidación; los bytes se
+guardan en memoria de cada proceso.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.core.telemetria import registrar_cache
+
+from . import horarios, versiones
+
+# Los campos `esta_abierto` dependen de la hora, por eso el snapshot
+# también expira por tiempo aunque nadie modifique los datos
+TTL_SEGUNDOS = getattr(settings, 'GEOJSON_SNAPSHOT_TTL', 60)
+
+PERFILES = ('completo', 'min')
+
+# Columnas que lee el perfil 'min' (incluye las del horario, para esta_abierto)
+CAMPOS_MIN = (
+    'id', 'nombre', 'latitud', 'longitud', 'cupos_disponibles', 'estado_activo',
+) + horarios.CAMPOS
+
+_lock = threading.Lock()
+_snapshots = {}
+
+
+def calcular_etag(contenido):
+    """ETag fuerte a partir del hash del contenido"""
+    return '"%s"' % hashlib.sha256(contenido).hexdigest()[:32]
+
+
+class GeoJSONSnapshot:
+    """Colección GeoJSON codificada y lista para servir"""
+
+    __slots__ = ('contenido', 'etag', 'version', 'generado_en')
+
+    def __init__(self, contenido, version):
+        self.contenido = contenido
+        self.etag = calcular_etag(contenido)
+        self.version = version
+        self.generado_en = time.monotonic()
+
+    def vigente(self, version):
+        """Indica si el snapshot corresponde a la versión actual y no expiró"""
+        return (
+            self.version == version
+            and time.monotonic() - self.generado_en < TTL_SEGUNDOS
+        )
+
+
+def construir_feature(comedor, cuarto, momento):
+    """Construye el Feature GeoJSON de un comedor evaluando el horario en `momento`"""
+    return {
+        'type': 'Feature',
+        'id': comedor.id,
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [comedor.longitud, comedor.latitud]
+        },
+        'properties': {
+            'id': comedor.id,
+            'nombre': comedor.nombre,
+            'descripcion': comedor.descripcion,
+            'direccion': comedor.direccion,
+            'barrio': comedor.barrio,
+            'telefono': comedor.telefono,
+            'celular': comedor.celular,
+            'email': comedor.email,
+            'whatsapp': comedor.whatsapp,
+            'capacidad_personas': comedor.capacidad_personas,
+            'horario_apertura': str(comedor.horario_apertura),
+            'horario_cierre': str(comedor.horario_cierre),
+            'dias_atencion': comedor.dias_atencion,
+            'horario_personalizado': comedor.horario_personalizado,
+            'tipo_comida': comedor.tipo_comida,
+            'servicios_adicionales': comedor.servicios_adicionales,
+            'foto_principal': comedor.foto_principal.url if comedor.foto_principal else None,
+            'estado_activo': comedor.estado_activo,
+            'esta_abierto': comedor.abierto_en_cuarto(cuarto),
+            'proxima_apertura': comedor.proxima_apertura(momento),
+            'calificacion_promedio': comedor.calificacion_promedio(),  # Valor guardado
+            # Nuevos campos sociales
+            'es_gratuito': comedor.es_gratuito,
+            'precio_texto': comedor.precio_texto,
+            'cupos_disponibles': comedor.cupos_disponibles,
+            'estado_cupos': comedor.estado_cupos,
+            'cola_estimada': comedor.cola_estimada,
+            'requisitos_acceso': comedor.requisitos_acceso,
+            'acepta_ninos': comedor.acepta_ninos,
+            'permite_llevar_comida': comedor.permite_llevar_comida,
+            'tiene_silla_bebes': comedor.tiene_silla_bebes,
+            'tiene_area_infantil': comedor.tiene_area_infantil,
+            'accesible_silla_ruedas': comedor.accesible_silla_ruedas,
+            'tiene_banos': comedor.tiene_banos,
+            'tiene_rampa': comedor.tiene_rampa,
+            'rutas_transporte_publico': comedor.rutas_transporte_publico,
+            'parada_bus_cercana': comedor.parada_bus_cercana,
+            'distancia_parada': comedor.distancia_parada,
+            'telefono_limpio': comedor.telefono_limpio,
+            'whatsapp_link': comedor.whatsapp_link,
+        }
+    }
+
+
+def construir_feature_min(comedor, cuarto):
+    """
+    Feature GeoJSON mínimo de un comedor, para dibujar su marcador
+    `cuarto` es el cuarto de hora de la semana en que se evalúa esta_abierto
+    """
+    return {
+        'type': 'Feature',
+        'id': comedor.id,
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [comedor.longitud, comedor.latitud]
+        },
+        'properties': {
+            'id': comedor.id,
+            'nombre': comedor.nombre,
+            'cupos_disponibles': comedor.cupos_disponibles,
+            'estado_cupos': comedor.estado_cupos,
+            'esta_abierto': comedor.abierto_en_cuarto(cuarto),
+        }
+    }
+
+
+def construir_geojson(queryset, perfil='completo', momento=None):
+    """
+    Construye el FeatureCollection para un queryset de comedores
+    La calificación promedio viene de los agregados guardados en Comedor;
+    el horario se evalúa en `momento` (ahora por defecto)
+    """
+    momento = momento or timezone.now()
+    cuarto = horarios.cuarto(momento)
+    if perfil == 'min':
+        features = [construir_feature_min(comedor, cuarto) for comedor in queryset.only(*CAMPOS_MIN)]
+    else:
+        features = [construir_feature(comedor, cuarto, momento) for comedor in queryset]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def codificar(geojson):
+    """Serializa el GeoJSON a bytes compactos en UTF-8"""
+    return json.dumps(
+        geojson, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def invalidar():
+    """Marca el snapshot como obsoleto en todos los procesos"""
+    versiones.invalidar(versiones.GEOJSON)
+
+
+def obtener_snapshot(perfil='completo'):
+    """
+    Retorna el snapshot vigente del perfil, reconstruyéndolo si está obsoleto
+    La versión se lee antes de construir: si otra escritura invalida el
+    snapshot durante la construcción, la siguiente petición lo rehace.
+    """
+    from .models import Comedor
+
+    version = versiones.version_actual(versiones.GEOJSON)
+    snapshot = _snapshots.get(perfil)
+    if snapshot is not None and snapshot.vigente(version):
+        registrar_cache('geojson', 'acierto')
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshots.get(perfil)
+        if snapshot is not None and snapshot.vigente(version):
+            registrar_cache('geojson', 'acierto')
+            return snapshot
+
+        registrar_cache('geojson', 'fallo')
+        geojson = construir_geojson(Comedor.objects.filter(estado_activo=True), perfil)
+        snapshot = _snapshots[perfil] = GeoJSONSnapshot(codificar(geojson), version)
+        return snapshot
@@ -1,113 +1,1910 @@
-"""
-Tests para la aplicación de Comedores
-"""
-from django.test import TestCase
-from django.contrib.gis.geos import Point
-from .models import Comedor, MenuDiario, Comentario
-from datetime import time
-
-
-class ComedorModelTest(TestCase):
-    """Tests para el modelo Comedor"""
-    
-    def setUp(self):
-        """Configuración inicial para tests"""
-        self.comedor = Comedor.objects.create(
-            nombre='Comedor Test',
-            direccion='Calle 1 # 2-3',
-            barrio='Test Barrio',
-            ubicacion=Point(-76.5320, 3.4516, srid=4326),
-            telefono='1234567',
-            horario_apertura=time(8, 0),
-            horario_cierre=time(17, 0),
-            dias_atencion='LU-VI',
-            tipo_comida='CASERA',
-            capacidad_personas=50,
-            estado_activo=True
-        )
-    
-    def test_comedor_creation(self):
-        """Test de creación de comedor"""
-        self.assertEqual(self.comedor.nombre, 'Comedor Test')
-        self.assertTrue(self.comedor.estado_activo)
-    
-    def test_latitud_longitud_properties(self):
-        """Test de propiedades de latitud y longitud"""
-        self.assertEqual(self.comedor.latitud, 3.4516)
-        self.assertEqual(self.comedor.longitud, -76.5320)
-    
-    def test_calificacion_promedio_sin_comentarios(self):
-        """Test de calificación promedio sin comentarios"""
-        self.assertEqual(self.comedor.calificacion_promedio(), 0)
-    
-    def test_str_method(self):
-        """Test del método __str__"""
-        self.assertEqual(str(self.comedor), 'Comedor Test')
-
-
-class MenuDiarioModelTest(TestCase):
-    """Tests para el modelo MenuDiario"""
-    
-    def setUp(self):
-        """Configuración inicial para tests"""
-        self.comedor = Comedor.objects.create(
-            nombre='Comedor Test',
-            direccion='Calle 1 # 2-3',
-            ubicacion=Point(-76.5320, 3.4516, srid=4326),
-            horario_apertura=time(8, 0),
-            horario_cierre=time(17, 0),
-            dias_atencion='LU-VI',
-            tipo_comida='CASERA',
-            capacidad_personas=50
-        )
-        
-        self.menu = MenuDiario.objects.create(
-            comedor=self.comedor,
-            almuerzo='Arroz, frijoles, carne',
-            precio_almuerzo=8000
-        )
-    
-    def test_menu_creation(self):
-        """Test de creación de menú"""
-        self.assertEqual(self.menu.comedor, self.comedor)
-        self.assertEqual(self.menu.precio_almuerzo, 8000)
-    
-    def test_str_method(self):
-        """Test del método __str__"""
-        self.assertIn('Comedor Test', str(self.menu))
-
-
-class ComentarioModelTest(TestCase):
-    """Tests para el modelo Comentario"""
-    
-    def setUp(self):
-        """Configuración inicial para tests"""
-        self.comedor = Comedor.objects.create(
-            nombre='Comedor Test',
-            direccion='Calle 1 # 2-3',
-            ubicacion=Point(-76.5320, 3.4516, srid=4326),
-            horario_apertura=time(8, 0),
-            horario_cierre=time(17, 0),
-            dias_atencion='LU-VI',
-            tipo_comida='CASERA',
-            capacidad_personas=50
-        )
-        
-        self.comentario = Comentario.objects.create(
-            comedor=self.comedor,
-            nombre_usuario='Usuario Test',
-            calificacion=5,
-            comentario='Excelente comedor',
-            aprobado=True
-        )
-    
-    def test_comentario_creation(self):
-        """Test de creación de comentario"""
-        self.assertEqual(self.comentario.calificacion, 5)
-        self.assertTrue(self.comentario.aprobado)
-    
-    def test_str_method(self):
-        """Test del método __str__"""
-        self.assertIn('Usuario Test', str(self.comentario))
-        self.assertIn('5★', str(self.comentario))
-
+"""
+Tests para la aplicación de Comedores
+"""
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from .models import Comedor, MenuDiario, Comentario
+from .geo import haversine
+from .indice_espacial import IndiceEspacial
+from datetime import time
+import random
+
+
+class ComedorModelTest(TestCase):
+    """Tests para el modelo Comedor"""
+    
+    def setUp(self):
+        """Configuración inicial para tests"""
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test',
+            direccion='Calle 1 # 2-3',
+            barrio='Test Barrio',
+            latitud=3.4516,
+            longitud=-76.5320,
+            telefono='1234567',
+            horario_apertura=time(8, 0),
+            horario_cierre=time(17, 0),
+            dias_atencion='LU-VI',
+            tipo_comida='CASERA',
+            capacidad_personas=50,
+            estado_activo=True
+        )
+    
+    def test_comedor_creation(self):
+        """Test de creación de comedor"""
+        self.assertEqual(self.comedor.nombre, 'Comedor Test')
+        self.assertTrue(self.comedor.estado_activo)
+    
+    def test_latitud_longitud_properties(self):
+        """Test de propiedades de latitud y longitud"""
+        self.assertEqual(self.comedor.latitud, 3.4516)
+        self.assertEqual(self.comedor.longitud, -76.5320)
+    
+    def test_calificacion_promedio_sin_comentarios(self):
+        """Test de calificación promedio sin comentarios"""
+        self.assertEqual(self.comedor.calificacion_promedio(), 0)
+    
+    def test_str_method(self):
+        """Test del método __str__"""
+        self.assertEqual(str(self.comedor), 'Comedor Test')
+
+
+class MenuDiarioModelTest(TestCase):
+    """Tests para el modelo MenuDiario"""
+    
+    def setUp(self):
+        """Configuración inicial para tests"""
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test',
+            direccion='Calle 1 # 2-3',
+            latitud=3.4516,
+            longitud=-76.5320,
+            horario_apertura=time(8, 0),
+            horario_cierre=time(17, 0),
+            dias_atencion='LU-VI',
+            tipo_comida='CASERA',
+            capacidad_personas=50
+        )
+        
+        self.menu = MenuDiario.objects.create(
+            comedor=self.comedor,
+            almuerzo='Arroz, frijoles, carne',
+            precio_almuerzo=8000
+        )
+    
+    def test_menu_creation(self):
+        """Test de creación de menú"""
+        self.assertEqual(self.menu.comedor, self.comedor)
+        self.assertEqual(self.menu.precio_almuerzo, 8000)
+    
+    def test_str_method(self):
+        """Test del método __str__"""
+        self.assertIn('Comedor Test', str(self.menu))
+
+
+class ComentarioModelTest(TestCase):
+    """Tests para el modelo Comentario"""
+    
+    def setUp(self):
+        """Configuración inicial para tests"""
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test',
+            direccion='Calle 1 # 2-3',
+            latitud=3.4516,
+            longitud=-76.5320,
+            horario_apertura=time(8, 0),
+            horario_cierre=time(17, 0),
+            dias_atencion='LU-VI',
+            tipo_comida='CASERA',
+            capacidad_personas=50
+        )
+        
+        self.comentario = Comentario.objects.create(
+            comedor=self.comedor,
+            nombre_usuario='Usuario Test',
+            calificacion=5,
+            comentario='Excelente comedor',
+            aprobado=True
+        )
+    
+    def test_comentario_creation(self):
+        """Test de creación de comentario"""
+        self.assertEqual(self.comentario.calificacion, 5)
+        self.assertTrue(self.comentario.aprobado)
+    
+    def test_str_method(self):
+        """Test del método __str__"""
+        self.assertIn('Usuario Test', str(self.comentario))
+        self.assertIn('5★', str(self.comentario))
+
+
+
+class GeoJSONSnapshotTest(TestCase):
+    """Tests para el snapshot precalculado del endpoint geojson"""
+
+    url = '/api/comedores/geojson/'
+
+    def setUp(self):
+        """Configuración inicial para tests"""
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test',
+            direccion='Calle 1 # 2-3',
+            latitud=3.4516,
+            longitud=-76.5320,
+            horario_apertura=time(8, 0),
+            horario_cierre=time(17, 0),
+        )
+
+    def test_respuesta_con_etag(self):
+        """El snapshot se sirve con ETag fuerte"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        data = response.json()
+        self.assertEqual(data['type'], 'FeatureCollection')
+        self.assertEqual(data['features'][0]['properties']['nombre'], 'Comedor Test')
+
+    def test_not_modified(self):
+        """Responde 304 si el cliente envía el mismo ETag"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_snapshot_no_consulta_db(self):
+        """Una segunda petición no ejecuta consultas sobre comedores"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_invalidacion_por_comentario(self):
+        """Un comentario nuevo cambia el contenido y el ETag"""
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks() as callbacks:
+            Comentario.objects.create(
+                comedor=self.comedor,
+                nombre_usuario='Usuario Test',
+                calificacion=4,
+                comentario='Bueno'
+            )
+        # Hasta confirmar la transacción se sirve el snapshot anterior
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        for callback in callbacks:
+            callback()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['features'][0]['properties']['calificacion_promedio'], 4)
+
+    def test_filtros_usan_consulta_directa(self):
+        """Con parámetros de filtro se consulta la base de datos"""
+        response = self.client.get(self.url, {'barrio': 'Inexistente'})
+        self.assertEqual(response.json()['features'], [])
+
+    def test_perfil_min(self):
+        """El perfil mínimo solo trae lo necesario para el marcador"""
+        response = self.client.get(self.url, {'perfil': 'min'})
+        propiedades = response.json()['features'][0]['properties']
+        self.assertEqual(
+            set(propiedades), {'id', 'nombre', 'cupos_disponibles', 'estado_cupos', 'esta_abierto'}
+        )
+        # También se sirve desde su propio snapshot
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'perfil': 'min'})
+
+        self.assertEqual(self.client.get(self.url, {'perfil': 'xl'}).status_code, 400)
+
+    def test_bbox(self):
+        """bbox=oeste,sur,este,norte limita los comedores a la vista del mapa"""
+        Comedor.objects.create(
+            nombre='Comedor Lejano', direccion='Calle 9', latitud=3.3800, longitud=-76.5200,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+        )
+        response = self.client.get(self.url, {'bbox': '-76.54,3.44,-76.52,3.46', 'perfil': 'min'})
+        nombres = [f['properties']['nombre'] for f in response.json()['features']]
+        self.assertEqual(nombres, ['Comedor Test'])
+
+        self.assertEqual(self.client.get(self.url, {'bbox': '-76.5,3.4'}).status_code, 400)
+
+
+class GeoKernelTest(TestCase):
+    """Tests para los kernels vectorizados de distancia"""
+
+    def setUp(self):
+        rnd = random.Random(3)
+        self.origenes = [(rnd.uniform(3.30, 3.55), rnd.uniform(-76.60, -76.45)) for _ in range(30)]
+        self.destinos = [(rnd.uniform(3.30, 3.55), rnd.uniform(-76.60, -76.45)) for _ in range(20)]
+
+    def test_distancias_desde(self):
+        """Uno a muchos coincide con la versión escalar"""
+        from .geo import distancias_desde
+
+        lat, lng = self.origenes[0]
+        distancias = distancias_desde(lat, lng, *zip(*self.destinos))
+        for distancia, (d_lat, d_lng) in zip(distancias, self.destinos):
+            self.assertAlmostEqual(distancia, haversine(lat, lng, d_lat, d_lng), places=9)
+
+    def test_matriz_y_mas_cercanos(self):
+        """Muchos a muchos y el más cercano coinciden con la versión escalar"""
+        from .geo import matriz_distancias, mas_cercanos
+
+        matriz = matriz_distancias(*zip(*self.origenes), *zip(*self.destinos))
+        self.assertEqual(matriz.shape, (30, 20))
+        indices, distancias = mas_cercanos(*zip(*self.origenes), *zip(*self.destinos), bloque=7)
+        for i, (lat, lng) in enumerate(self.origenes):
+            escalar = [haversine(lat, lng, d_lat, d_lng) for d_lat, d_lng in self.destinos]
+            self.assertAlmostEqual(matriz[i, 5], escalar[5], places=9)
+            self.assertEqual(indices[i], escalar.index(min(escalar)))
+            self.assertAlmostEqual(distancias[i], min(escalar), places=9)
+
+
+class IndiceEspacialTest(TestCase):
+    """Tests para el índice espacial en memoria"""
+
+    def setUp(self):
+        """Puntos aleatorios dentro de Cali"""
+        rnd = random.Random(42)
+        self.puntos = [
+            (i, rnd.uniform(3.30, 3.55), rnd.uniform(-76.60, -76.45))
+            for i in range(500)
+        ]
+        self.indice = IndiceEspacial(self.puntos)
+        self.origen = (3.4516, -76.5320)
+
+    def fuerza_bruta(self):
+        lat, lng = self.origen
+        return sorted(
+            ((pk, haversine(lat, lng, p_lat, p_lng)) for pk, p_lat, p_lng in self.puntos),
+            key=lambda r: r[1]
+        )
+
+    def test_en_radio_coincide_con_fuerza_bruta(self):
+        """La búsqueda por radio retorna los mismos comedores ordenados"""
+        esperado = [pk for pk, d in self.fuerza_bruta() if d <= 3]
+        resultado = self.indice.en_radio(*self.origen, 3)
+        self.assertEqual([pk for pk, _ in resultado], esperado)
+
+    def test_en_radio_con_limite(self):
+        """El límite conserva los más cercanos"""
+        esperado = [pk for pk, d in self.fuerza_bruta() if d <= 5][:7]
+        resultado = self.indice.en_radio(*self.origen, 5, limite=7)
+        self.assertEqual([pk for pk, _ in resultado], esperado)
+
+    def test_k_cercanos_coincide_con_fuerza_bruta(self):
+        """Los k más cercanos coinciden con el cálculo exhaustivo"""
+        for k in (1, 10, 50):
+            esperado = [pk for pk, _ in self.fuerza_bruta()[:k]]
+            resultado = self.indice.k_cercanos(*self.origen, k)
+            self.assertEqual([pk for pk, _ in resultado], esperado)
+
+    def test_indice_vacio(self):
+        """Un índice sin puntos no falla"""
+        indice = IndiceEspacial([])
+        self.assertEqual(indice.en_radio(*self.origen, 5), [])
+        self.assertEqual(indice.k_cercanos(*self.origen, 3), [])
+
+
+class ComedoresCercanosTest(TestCase):
+    """Tests para el endpoint cercanos"""
+
+    url = '/api/comedores/cercanos/'
+
+    def setUp(self):
+        """Tres comedores a distancias crecientes del centro"""
+        # El índice espacial se invalida al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            for nombre, lat in [('Lejano', 3.4900), ('Cercano', 3.4520), ('Medio', 3.4650)]:
+                Comedor.objects.create(
+                    nombre=nombre,
+                    direccion='Calle 1 # 2-3',
+                    latitud=lat,
+                    longitud=-76.5320,
+                    horario_apertura=time(8, 0),
+                    horario_cierre=time(17, 0),
+                )
+
+    def test_ordenados_por_distancia(self):
+        """Los resultados vienen ordenados e incluyen distancia_km"""
+        response = self.client.get(self.url, {'lat': 3.4516, 'lng': -76.5320, 'radio': 10})
+        data = response.json()
+        self.assertEqual([c['nombre'] for c in data], ['Cercano', 'Medio', 'Lejano'])
+        self.assertLess(data[0]['distancia_km'], data[1]['distancia_km'])
+
+    def test_radio_y_limit(self):
+        """El radio excluye comedores lejanos y limit recorta el resultado"""
+        response = self.client.get(self.url, {'lat': 3.4516, 'lng': -76.5320, 'radio': 2})
+        self.assertEqual([c['nombre'] for c in response.json()], ['Cercano', 'Medio'])
+        response = self.client.get(self.url, {'lat': 3.4516, 'lng': -76.5320, 'limit': 1})
+        self.assertEqual([c['nombre'] for c in response.json()], ['Cercano'])
+
+    def test_indice_se_actualiza(self):
+        """Un comedor desactivado deja de aparecer"""
+        comedor = Comedor.objects.get(nombre='Cercano')
+        comedor.estado_activo = False
+        with self.captureOnCommitCallbacks(execute=True):
+            comedor.save()
+        response = self.client.get(self.url, {'lat': 3.4516, 'lng': -76.5320, 'limit': 1})
+        self.assertEqual(response.json()[0]['nombre'], 'Medio')
+
+    def test_parametros_invalidos(self):
+        """Sin coordenadas retorna 400"""
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        response = self.client.get(self.url, {'lat': 3.45, 'lng': -76.53, 'limit': 0})
+        self.assertEqual(response.status_code, 400)
+        for parametros in ({'lat': 'nan', 'lng': -76.53}, {'lat': 3.45, 'lng': 'inf'},
+                           {'lat': 3.45, 'lng': -76.53, 'radio': 'nan'}):
+            self.assertEqual(self.client.get(self.url, parametros).status_code, 400, parametros)
+
+
+class ComedorCercanosQuerySetTest(TestCase):
+    """Tests para el cálculo de distancia en la base de datos"""
+
+    def setUp(self):
+        """Comedores en puntos aleatorios de Cali"""
+        rnd = random.Random(7)
+        for i in range(40):
+            Comedor.objects.create(
+                nombre=f'Comedor {i}',
+                direccion='Calle 1 # 2-3',
+                latitud=rnd.uniform(3.30, 3.55),
+                longitud=rnd.uniform(-76.60, -76.45),
+                horario_apertura=time(8, 0),
+                horario_cierre=time(17, 0),
+                tipo_comida='CASERA' if i % 2 else 'TIPICA',
+            )
+        self.origen = (3.4516, -76.5320)
+
+    def test_coincide_con_haversine(self):
+        """El filtro y el orden en SQL coinciden con el cálculo en Python"""
+        lat, lng = self.origen
+        esperado = sorted(
+            (haversine(lat, lng, c.latitud, c.longitud), c.id)
+            for c in Comedor.objects.all()
+        )
+        esperado = [pk for d, pk in esperado if d <= 6]
+        resultado = Comedor.objects.cercanos(lat, lng, 6)
+        self.assertEqual([c.id for c in resultado], esperado)
+
+    def test_formula_sql_generica(self):
+        """La fórmula en SQL estándar (PostgreSQL) da la misma distancia"""
+        from django.db.models import ExpressionWrapper, FloatField
+        from .geo import DistanciaKm
+
+        expresion = DistanciaKm(*self.origen)
+        queryset = Comedor.objects.annotate(
+            registrada=expresion,
+            generica=ExpressionWrapper(expresion.formula_sql(), output_field=FloatField()),
+        )
+        for comedor in queryset:
+            self.assertAlmostEqual(comedor.registrada, comedor.generica, places=6)
+
+    def test_asignar_comedor_cercano(self):
+        """La donación se asigna al comedor activo más cercano"""
+        from .models import Donacion
+
+        donacion = Donacion(latitud_donante=self.origen[0], longitud_donante=self.origen[1])
+        esperado = Comedor.objects.cercanos(*self.origen).first()
+        self.assertEqual(donacion.asignar_comedor_cercano(), esperado)
+
+    def test_endpoint_con_filtros(self):
+        """Con filtros, cercanos calcula la distancia en la base de datos"""
+        response = self.client.get('/api/comedores/cercanos/', {
+            'lat': self.origen[0], 'lng': self.origen[1], 'limit': 5, 'tipo_comida': 'TIPICA'
+        })
+        data = response.json()
+        self.assertEqual(len(data), 5)
+        self.assertTrue(all(c['tipo_comida'] == 'TIPICA' for c in data))
+        distancias = [c['distancia_km'] for c in data]
+        self.assertEqual(distancias, sorted(distancias))
+
+
+class CalificacionAgregadaTest(TestCase):
+    """Tests para los agregados de calificación guardados en Comedor"""
+
+    def setUp(self):
+        """Configuración inicial para tests"""
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test',
+            direccion='Calle 1 # 2-3',
+            latitud=3.4516,
+            longitud=-76.5320,
+            horario_apertura=time(8, 0),
+            horario_cierre=time(17, 0),
+        )
+
+    def comentar(self, calificacion, aprobado=True):
+        return Comentario.objects.create(
+            comedor=self.comedor,
+            nombre_usuario='Usuario Test',
+            calificacion=calificacion,
+            comentario='Comentario',
+            aprobado=aprobado,
+        )
+
+    def assertAgregado(self, suma, cantidad, promedio):
+        self.comedor.refresh_from_db()
+        self.assertEqual(self.comedor.calificacion_suma, suma)
+        self.assertEqual(self.comedor.calificacion_cantidad, cantidad)
+        self.assertEqual(self.comedor.calificacion_promedio(), promedio)
+
+    def test_crear_aprobar_rechazar_borrar(self):
+        """Los agregados siguen el ciclo de vida de los comentarios"""
+        self.comentar(5)
+        pendiente = self.comentar(2, aprobado=False)
+        self.assertAgregado(5, 1, 5.0)
+
+        pendiente = Comentario.objects.get(pk=pendiente.pk)
+        pendiente.aprobado = True
+        pendiente.save()
+        self.assertAgregado(7, 2, 3.5)
+
+        pendiente.aprobado = False
+        pendiente.save()
+        self.assertAgregado(5, 1, 5.0)
+
+        Comentario.objects.filter(aprobado=True).delete()
+        self.assertAgregado(0, 0, 0)
+
+    def test_guardar_comedor_no_pisa_agregados(self):
+        """Guardar una instancia vieja de Comedor no sobrescribe los agregados"""
+        instancia_vieja = Comedor.objects.get(pk=self.comedor.pk)
+        self.comentar(4)
+        instancia_vieja.cupos_disponibles = 10
+        instancia_vieja.save()
+        self.assertAgregado(4, 1, 4.0)
+
+    def test_recalcular_y_verificar(self):
+        """El recálculo en bloque corrige inconsistencias"""
+        self.comentar(3)
+        self.comentar(4)
+        Comedor.objects.filter(pk=self.comedor.pk).update(calificacion_suma=0)
+        self.assertEqual(Comedor.objects.inconsistentes().count(), 1)
+        Comedor.objects.all().recalcular_calificaciones()
+        self.assertEqual(Comedor.objects.inconsistentes().count(), 0)
+        self.assertAgregado(7, 2, 3.5)
+
+    def test_filtro_calificacion_min(self):
+        """El filtro calificacion_min usa el promedio guardado"""
+        self.comentar(2)
+        response = self.client.get('/api/comedores/', {'calificacion_min': 3})
+        self.assertEqual(response.json()['count'], 0)
+        response = self.client.get('/api/comedores/', {'calificacion_min': 2})
+        self.assertEqual(response.json()['count'], 1)
+
+
+class ComedorListadoConsultasTest(TestCase):
+    """El listado de comedores usa un número fijo de consultas"""
+
+    def crear_comedores(self, cantidad):
+        from django.utils import timezone
+
+        for i in range(cantidad):
+            comedor = Comedor.objects.create(
+                nombre=f'Comedor {i:03d}',
+                direccion='Calle 1 # 2-3',
+                latitud=3.4516,
+                longitud=-76.5320,
+                horario_apertura=time(8, 0),
+                horario_cierre=time(17, 0),
+            )
+            MenuDiario.objects.create(
+                comedor=comedor,
+                fecha=timezone.now().date(),
+                almuerzo='Arroz con pollo',
+                precio_almuerzo=0,
+            )
+            for j in range(5):
+                Comentario.objects.create(
+                    comedor=comedor,
+                    nombre_usuario=f'Usuario {j}',
+                    calificacion=4,
+                    comentario='Bueno',
+                )
+
+    def consultas_listado(self, page_size):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/api/comedores/')
+        self.assertEqual(len(response.json()['results']), page_size)
+        return len(contexto.captured_queries), response.json()['results']
+
+    def test_consultas_constantes(self):
+        """Listar 3 o 30 comedores ejecuta las mismas consultas"""
+        self.crear_comedores(3)
+        pocas, _ = self.consultas_listado(3)
+        self.crear_comedores(27)
+        muchas, resultados = self.consultas_listado(30)
+        self.assertEqual(pocas, muchas)
+
+        self.assertEqual(len(resultados[0]['comentarios_recientes']), 3)
+        self.assertEqual(resultados[0]['menu_hoy']['almuerzo'], 'Arroz con pollo')
+        self.assertEqual(resultados[0]['calificacion_promedio'], 4.0)
+
+
+class ComedorDetalleColeccionesTest(TestCase):
+    """Tests para las colecciones anidadas acotadas del detalle"""
+
+    def setUp(self):
+        """Comedor con 20 menús y 15 comentarios"""
+        from datetime import date, timedelta
+
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test',
+            direccion='Calle 1 # 2-3',
+            latitud=3.4516,
+            longitud=-76.5320,
+            horario_apertura=time(8, 0),
+            horario_cierre=time(17, 0),
+        )
+        for i in range(20):
+            MenuDiario.objects.create(
+                comedor=self.comedor,
+                fecha=date(2024, 1, 1) + timedelta(days=i),
+                almuerzo=f'Menú {i}',
+                precio_almuerzo=0,
+            )
+        for i in range(15):
+            Comentario.objects.create(
+                comedor=self.comedor,
+                nombre_usuario=f'Usuario {i}',
+                calificacion=5,
+                comentario='Bueno',
+            )
+
+    def test_detalle_acotado(self):
+        """El detalle solo trae los últimos 7 menús y 10 comentarios"""
+        data = self.client.get(f'/api/comedores/{self.comedor.pk}/').json()
+        self.assertEqual(len(data['menus']), 7)
+        self.assertEqual(data['menus'][0]['almuerzo'], 'Menú 19')
+        self.assertEqual(len(data['comentarios']), 10)
+
+    def test_menus_paginados_por_cursor(self):
+        """El historial de menús se recorre completo con cursores"""
+        url = f'/api/comedores/{self.comedor.pk}/menus/'
+        vistos = []
+        while url:
+            data = self.client.get(url).json()
+            vistos.extend(menu['almuerzo'] for menu in data['results'])
+            url = data['next']
+        self.assertEqual(vistos, [f'Menú {i}' for i in range(19, -1, -1)])
+
+    def test_comentarios_paginados_por_cursor(self):
+        """Los comentarios se paginan de a 10 por defecto"""
+        url = f'/api/comedores/{self.comedor.pk}/comentarios/'
+        primera = self.client.get(url).json()
+        self.assertEqual(len(primera['results']), 10)
+        segunda = self.client.get(primera['next']).json()
+        self.assertEqual(len(segunda['results']), 5)
+        self.assertIsNone(segunda['next'])
+
+
+class AsignacionDonacionesTest(TestCase):
+    """Tests para la asignación en bloque de donaciones"""
+
+    def setUp(self):
+        """Dos comedores: uno pequeño cerca del origen y otro más lejos"""
+        from .models import Donacion
+
+        self.origen = (3.4516, -76.5320)
+        self.cercano = Comedor.objects.create(
+            nombre='Cercano', direccion='Calle 1',
+            latitud=3.4520, longitud=-76.5320,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+            capacidad_personas=20,
+        )
+        self.lejano = Comedor.objects.create(
+            nombre='Lejano', direccion='Calle 2',
+            latitud=3.4700, longitud=-76.5320,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+            capacidad_personas=100,
+        )
+        self.donaciones = [
+            Donacion.objects.create(
+                nombre_donante=f'Donante {i}', telefono_donante='300',
+                tipo_donacion='ALIMENTOS', descripcion='Arroz',
+                latitud_donante=self.origen[0], longitud_donante=self.origen[1],
+            )
+            for i in range(4)
+        ]
+
+    def test_resolver_respeta_cupos(self):
+        """Cada comedor recibe como máximo su cupo"""
+        from .asignacion import resolver
+
+        random.seed(3)
+        lats = [3.40 + random.random() * 0.1 for _ in range(200)]
+        lngs = [-76.55 + random.random() * 0.1 for _ in range(200)]
+        indices, distancias = resolver(lats, lngs, [3.42, 3.45, 3.48], [-76.52] * 3, [50, 50, 50])
+        self.assertEqual(list(indices).count(-1), 50)
+        for comedor in range(3):
+            self.assertEqual(list(indices).count(comedor), 50)
+        self.assertTrue(all(d < float('inf') for d, i in zip(distancias, indices) if i != -1))
+
+    def test_desborda_al_siguiente_comedor(self):
+        """Cuando el más cercano se llena, las demás van al siguiente"""
+        from .asignacion import asignar_donaciones
+        from .models import Donacion
+
+        resultado = asignar_donaciones()
+        self.assertEqual(resultado['asignadas'], 4)
+        # capacidad 20 → 2 donaciones en curso como máximo
+        self.assertEqual(
+            Donacion.objects.filter(comedor_asignado=self.cercano, estado='ASIGNADA').count(), 2
+        )
+        self.assertEqual(Donacion.objects.filter(comedor_asignado=self.lejano).count(), 2)
+
+    def test_cuenta_donaciones_en_curso(self):
+        """Las donaciones ya asignadas ocupan cupo del comedor"""
+        from .asignacion import asignar_donaciones
+        from .models import Donacion
+
+        Donacion.objects.filter(pk=self.donaciones[0].pk).update(
+            estado='EN_TRANSITO', comedor_asignado=self.cercano
+        )
+        asignar_donaciones()
+        self.assertEqual(Donacion.objects.filter(comedor_asignado=self.cercano).count(), 2)
+
+    def test_asignacion_concurrente_no_excede_cupo(self):
+        """Si otra asignación ocupa el cupo tras la primera lectura, la donación queda pendiente"""
+        from unittest import mock
+        from . import asignacion
+        from .models import Donacion
+
+        resolver = asignacion.resolver
+
+        def resolver_concurrente(*args, **kwargs):
+            # Otra petición asigna una donación al comedor cercano mientras tanto
+            Donacion.objects.create(
+                nombre_donante='Otro', telefono_donante='300', tipo_donacion='ALIMENTOS',
+                descripcion='Arroz', estado='ASIGNADA', comedor_asignado=self.cercano,
+            )
+            return resolver(*args, **kwargs)
+
+        with mock.patch.object(asignacion, 'resolver', resolver_concurrente):
+            resultado = asignacion.asignar_donaciones()
+        self.assertEqual((resultado['asignadas'], resultado['sin_cupo']), (3, 1))
+        self.assertEqual(Donacion.objects.filter(comedor_asignado=self.cercano).count(), 2)
+
+    def test_simular_no_guarda(self):
+        """Con guardar=False no se modifica ninguna donación"""
+        from .asignacion import asignar_donaciones
+        from .models import Donacion
+
+        resultado = asignar_donaciones(guardar=False)
+        self.assertEqual(resultado['asignadas'], 4)
+        self.assertEqual(Donacion.objects.filter(estado='PENDIENTE').count(), 4)
+
+    def test_api_asignar_pendientes(self):
+        """La acción del API asigna el lote y retorna el resumen"""
+        response = self.client.post('/api/donaciones/asignar_pendientes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['asignadas'], 4)
+
+
+class DespachoAlertasTest(TestCase):
+    """Tests para el despacho de alertas a suscriptores"""
+
+    def setUp(self):
+        """Un comedor en Siloé y suscriptores con distintos filtros"""
+        from .models import AlertaSuscripcion
+
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Siloé', direccion='Calle 1', barrio='Siloé',
+            latitud=3.4250, longitud=-76.5530,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+            cupos_disponibles=40,
+        )
+
+        def suscribir(nombre, **campos):
+            campos.setdefault('tipo_alerta', 'CUPOS_BAJOS')
+            return AlertaSuscripcion.objects.create(
+                nombre=nombre, telefono='+57 300 000 0000', **campos
+            )
+
+        self.por_barrio = suscribir('Barrio', barrios_interes='San Bosco, siloe')
+        self.por_radio = suscribir('Radio', latitud=3.4260, longitud=-76.5520, radio_km=2)
+        self.sin_filtro = suscribir('Todos')
+        self.lejos = suscribir('Lejos', latitud=3.50, longitud=-76.50, radio_km=1)
+        self.otro_barrio = suscribir('Otro', barrios_interes='Silo')
+        self.otro_tipo = suscribir('Menú', tipo_alerta='MENU_DIA')
+
+    def bajar_cupos(self):
+        comedor = Comedor.objects.get(pk=self.comedor.pk)
+        comedor.cupos_disponibles = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            comedor.save()
+
+    def test_encola_solo_interesados(self):
+        """Barrio (sin tildes), radio y suscriptores sin filtro reciben el aviso"""
+        from .models import MensajeAlerta
+
+        self.bajar_cupos()
+        destinatarios = set(MensajeAlerta.objects.values_list('suscripcion_id', flat=True))
+        self.assertEqual(
+            destinatarios, {self.por_barrio.pk, self.por_radio.pk, self.sin_filtro.pk}
+        )
+
+    def test_evento_no_se_duplica(self):
+        """El mismo evento no genera dos mensajes para un suscriptor"""
+        from . import alertas
+        from .models import MensajeAlerta
+
+        evento = alertas.evento_cupos_bajos(self.comedor)
+        alertas.encolar(evento)
+        alertas.encolar(evento)
+        self.assertEqual(MensajeAlerta.objects.count(), 3)
+
+    def test_sin_cruce_de_umbral_no_avisa(self):
+        """Guardar sin que los cupos crucen el umbral no encola nada"""
+        from .models import MensajeAlerta
+
+        comedor = Comedor.objects.get(pk=self.comedor.pk)
+        comedor.cupos_disponibles = 35
+        with self.captureOnCommitCallbacks(execute=True):
+            comedor.save()
+        self.assertFalse(MensajeAlerta.objects.exists())
+
+
+class DrenarAlertasTest(TransactionTestCase):
+    """
+    Tests para el worker de la bandeja de salida
+    TransactionTestCase porque sync_to_async usa otra conexión
+    """
+
+    def setUp(self):
+        from .models import AlertaSuscripcion
+
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Siloé', direccion='Calle 1', barrio='Siloé',
+            latitud=3.4250, longitud=-76.5530,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+        )
+        self.suscripciones = [
+            AlertaSuscripcion.objects.create(
+                nombre=f'Suscriptor {i}', telefono='+57 300 000 0000',
+                tipo_alerta='CUPOS_BAJOS', barrios_interes='Siloé',
+            )
+            for i in range(3)
+        ]
+
+    def test_drenar_envia_y_marca(self):
+        """El worker envía por el backend y actualiza estados en bloque"""
+        import asyncio
+        from . import alertas
+        from .models import AlertaSuscripcion, MensajeAlerta
+
+        class BackendMemoria:
+            def __init__(self):
+                self.enviados = []
+
+            async def enviar(self, mensaje):
+                if mensaje['suscripcion_id'] == self.falla:
+                    raise RuntimeError('sin señal')
+                self.enviados.append(mensaje)
+
+        alertas.encolar(alertas.evento_cupos_bajos(self.comedor))
+        backend = BackendMemoria()
+        backend.falla = self.suscripciones[2].pk
+        enviados, fallidos = asyncio.run(alertas.drenar(backend, lote=2))
+
+        self.assertEqual((enviados, fallidos), (2, 1))
+        self.assertEqual(MensajeAlerta.objects.filter(estado='ENVIADO').count(), 2)
+        error = MensajeAlerta.objects.get(estado='ERROR')
+        self.assertEqual(error.error, 'sin señal')
+        self.assertEqual(error.intentos, 1)
+        self.assertIsNotNone(AlertaSuscripcion.objects.get(pk=self.suscripciones[0].pk).ultima_notificacion)
+        self.assertIsNone(AlertaSuscripcion.objects.get(pk=self.suscripciones[2].pk).ultima_notificacion)
+
+
+class BarrioInteresTest(TestCase):
+    """Tests para la tabla normalizada de barrios de interés"""
+
+    def setUp(self):
+        from .models import AlertaSuscripcion
+
+        def suscribir(barrios, activa=True):
+            return AlertaSuscripcion.objects.create(
+                nombre='Suscriptor', telefono='300', barrios_interes=barrios, activa=activa
+            )
+
+        self.primera = suscribir('San Bosco, Siloé')
+        self.segunda = suscribir('siloe,  Alfonso López')
+        suscribir('San Bosco', activa=False)
+
+    def test_sincroniza_al_guardar(self):
+        """Editar barrios_interes agrega y quita filas"""
+        self.assertEqual(
+            set(self.primera.barrios.values_list('barrio', flat=True)), {'san bosco', 'siloe'}
+        )
+        self.primera.barrios_interes = 'Siloé, El Poblado'
+        self.primera.save()
+        self.assertEqual(
+            set(self.primera.barrios.values_list('barrio', flat=True)), {'siloe', 'el poblado'}
+        )
+
+    def test_por_barrio_agrupa(self):
+        """Un GROUP BY de suscripciones activas, sin contar subcadenas"""
+        from .models import AlertaSuscripcion
+
+        # "Silo" es subcadena de "Siloé" pero es otro barrio
+        AlertaSuscripcion.objects.create(nombre='Otro', telefono='300', barrios_interes='Silo')
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/alertas/por_barrio/').json()
+        totales = {fila['barrio']: fila['total_suscripciones'] for fila in data}
+        self.assertEqual(totales['Siloé'], 2)
+        self.assertEqual(totales['San Bosco'], 1)
+        self.assertEqual(totales['Silo'], 1)
+
+    def test_filtrar_por_barrio(self):
+        """?barrio= busca en la tabla normalizada"""
+        data = self.client.get('/api/alertas/', {'barrio': 'SILOÉ', 'activa': 'true'}).json()
+        self.assertEqual(
+            {fila['id'] for fila in data['results']}, {self.primera.pk, self.segunda.pk}
+        )
+
+
+class MetricaResumenTest(TestCase):
+    """Tests para los resúmenes incrementales de Metrica"""
+
+    def setUp(self):
+        from datetime import date
+        from .models import Metrica
+
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test', direccion='Calle 1',
+            latitud=3.4516, longitud=-76.5320,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+        )
+        self.hoy = timezone.now().date()
+        self.metrica = Metrica.objects.create(
+            comedor=self.comedor, tipo_metrica='COMIDAS_SERVIDAS', valor=10, fecha=self.hoy
+        )
+        Metrica.objects.create(tipo_metrica='COMIDAS_SERVIDAS', valor=5, fecha=self.hoy)
+        Metrica.objects.create(
+            comedor=self.comedor, tipo_metrica='USUARIOS_ATENDIDOS', valor=7, fecha=date(2024, 1, 10)
+        )
+
+    def resumen(self, modelo, **filtros):
+        return list(modelo.objects.filter(**filtros).values_list('total', 'cantidad'))
+
+    def test_incremental_en_tres_periodos(self):
+        """Crear, editar y borrar ajusta los resúmenes diario, semanal y mensual"""
+        from datetime import date
+        from .models import MetricaDiaria, MetricaMensual, MetricaSemanal
+
+        self.assertEqual(self.resumen(MetricaSemanal, periodo=date(2024, 1, 8)), [(7, 1)])
+        self.assertEqual(self.resumen(MetricaMensual, periodo=date(2024, 1, 1)), [(7, 1)])
+
+        self.metrica.valor = 25
+        self.metrica.save()
+        self.assertEqual(
+            self.resumen(MetricaDiaria, comedor=self.comedor, tipo_metrica='COMIDAS_SERVIDAS'),
+            [(25, 1)]
+        )
+        self.assertEqual(
+            self.resumen(MetricaDiaria, comedor__isnull=True, tipo_metrica='COMIDAS_SERVIDAS'),
+            [(5, 1)]
+        )
+
+        self.metrica.delete()
+        self.assertEqual(
+            self.resumen(MetricaDiaria, comedor=self.comedor, tipo_metrica='COMIDAS_SERVIDAS'),
+            [(0, 0)]
+        )
+
+    def test_reconstruir_coincide(self):
+        """La reconstrucción produce los mismos totales que el incremental"""
+        from . import resumenes
+        from .models import MetricaDiaria, MetricaMensual, MetricaSemanal
+
+        antes = {
+            modelo: set(modelo.objects.values_list('comedor', 'tipo_metrica', 'periodo', 'total'))
+            for modelo in (MetricaDiaria, MetricaSemanal, MetricaMensual)
+        }
+        resumenes.reconstruir()
+        for modelo, filas in antes.items():
+            self.assertEqual(
+                set(modelo.objects.values_list('comedor', 'tipo_metrica', 'periodo', 'total')), filas
+            )
+
+    def test_estadisticas_una_consulta(self):
+        """estadisticas lee el resumen diario en una sola consulta"""
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/metricas/estadisticas/').json()
+        self.assertEqual(data['hoy']['comidas_servidas'], 15)
+        self.assertEqual(data['mes']['usuarios_atendidos'], 0)
+
+    def test_por_comedor_desde_resumen(self):
+        """El ranking suma el resumen mensual"""
+        data = self.client.get('/api/metricas/por_comedor/').json()
+        self.assertEqual(data, [
+            {'comedor__id': self.comedor.pk, 'comedor__nombre': 'Comedor Test', 'total': 10}
+        ])
+
+
+class DashboardResumenTest(TestCase):
+    """Tests para el resumen del dashboard en una sola petición"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .models import Donacion, Metrica
+
+        cache.clear()
+        comedor = Comedor.objects.create(
+            nombre='Comedor Test', direccion='Calle 1',
+            latitud=3.4516, longitud=-76.5320,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+        )
+        Metrica.objects.create(comedor=comedor, tipo_metrica='COMIDAS_SERVIDAS', valor=12)
+        for estado, valor in [('PENDIENTE', 1000), ('ENTREGADA', None), ('ENTREGADA', 500)]:
+            Donacion.objects.create(
+                nombre_donante='Donante', telefono_donante='300', tipo_donacion='DINERO',
+                descripcion='Aporte', estado=estado, valor_monetario=valor,
+            )
+
+    def test_resumen_completo(self):
+        """Incluye métricas, evolución, ranking y donaciones"""
+        data = self.client.get('/api/dashboard/resumen/').json()
+        self.assertEqual(data['metricas']['hoy']['comidas_servidas'], 12)
+        self.assertEqual(len(data['evolucion']['COMIDAS_SERVIDAS']), 1)
+        self.assertEqual(data['top_comedores'][0]['total'], 12)
+        self.assertEqual(data['donaciones']['total_donaciones'], 3)
+        self.assertEqual(data['donaciones']['total_entregadas'], 2)
+        self.assertEqual(data['donaciones']['valor_monetario_total'], 1500.0)
+
+    def test_cache_y_etag(self):
+        """La segunda petición no consulta la base y responde 304 con el ETag"""
+        primera = self.client.get('/api/dashboard/resumen/')
+        with self.assertNumQueries(0):
+            segunda = self.client.get(
+                '/api/dashboard/resumen/', HTTP_IF_NONE_MATCH=primera['ETag']
+            )
+        self.assertEqual(segunda.status_code, 304)
+
+    def test_sirve_copia_vieja_durante_recalculo(self):
+        """Si otro proceso está recalculando, se sirve la copia vencida"""
+        from django.core.cache import cache
+        from . import dashboard
+
+        entrada = dashboard.obtener_resumen()
+        entrada['vence'] = 0
+        cache.set(dashboard.CLAVE_CACHE, entrada)
+        cache.add(dashboard.CLAVE_CANDADO, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard.obtener_resumen()['etag'], entrada['etag'])
+        cache.delete(dashboard.CLAVE_CANDADO)
+
+    def test_candado_postgresql(self):
+        """En PostgreSQL el candado es un advisory lock y no depende de cache.add"""
+        from unittest import mock
+        from django.core.cache import cache
+        from django.db import connection
+        from . import dashboard
+
+        entrada = dashboard.obtener_resumen()
+        entrada['vence'] = 0
+        cache.set(dashboard.CLAVE_CACHE, entrada)
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.fetchone.return_value = (False,)  # Otro worker lo tiene
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(connection, 'cursor', return_value=cursor), \
+                mock.patch.object(dashboard, '_recalcular') as recalcular:
+            self.assertEqual(dashboard.obtener_resumen()['etag'], entrada['etag'])
+        recalcular.assert_not_called()
+        sentencias = [c[0][0] for c in cursor.__enter__.return_value.execute.call_args_list]
+        self.assertTrue(any('pg_try_advisory_xact_lock' in sql for sql in sentencias))
+        self.assertIsNone(cache.get(dashboard.CLAVE_CANDADO))
+
+
+class CargaMetricasTest(TestCase):
+    """Tests para la carga masiva de métricas"""
+
+    def setUp(self):
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Test', direccion='Calle 1',
+            latitud=3.4516, longitud=-76.5320,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+        )
+
+    def test_json_con_errores_por_fila(self):
+        """Las filas válidas se insertan y las inválidas se reportan"""
+        from .models import Metrica, MetricaDiaria
+
+        filas = [
+            {'comedor': self.comedor.pk, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 120, 'fecha': '2024-03-01'},
+            {'comedor': self.comedor.pk, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 80, 'fecha': '2024-03-01'},
+            {'comedor': 9999, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 1},
+            {'comedor': self.comedor.pk, 'tipo_metrica': 'OTRA', 'valor': -3, 'fecha': '01/03/2024'},
+            # Fuera del rango de la columna: error de la fila, no del lote
+            {'comedor': self.comedor.pk, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 10 ** 30},
+            {'comedor': self.comedor.pk, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 2 ** 31},
+            {'comedor': 99999999999999999999, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 1},
+            {'comedor': 0, 'tipo_metrica': 'COMIDAS_SERVIDAS', 'valor': 1},
+        ]
+        response = self.client.post('/api/metricas/lote/', filas, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['creadas'], 2)
+        self.assertEqual([error['fila'] for error in data['errores']], [2, 3, 4, 5, 6, 7])
+        self.assertEqual(set(data['errores'][4]['errores']), {'comedor'})
+        self.assertEqual(set(data['errores'][1]['errores']), {'tipo_metrica', 'valor', 'fecha'})
+        self.assertEqual(Metrica.objects.count(), 2)
+        # Los resúmenes se ajustan aunque bulk_create no dispara señales
+        self.assertEqual(MetricaDiaria.objects.get(comedor=self.comedor).total, 200)
+
+    def test_csv_reemplazar(self):
+        """Con reemplazar=true las métricas del mismo día se sustituyen"""
+        from .models import Metrica, MetricaMensual
+
+        Metrica.objects.create(
+            comedor=self.comedor, tipo_metrica='USUARIOS_ATENDIDOS', valor=50, fecha='2024-03-01'
+        )
+        csv_texto = (
+            'comedor,tipo_metrica,valor,fecha\n'
+            f'{self.comedor.pk},USUARIOS_ATENDIDOS,70,2024-03-01\n'
+            ',USUARIOS_ATENDIDOS,300,2024-03-01\n'
+        )
+        response = self.client.post(
+            '/api/metricas/lote/?reemplazar=true', csv_texto, content_type='text/csv'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['reemplazadas'], 1)
+        self.assertEqual(
+            list(Metrica.objects.filter(comedor=self.comedor).values_list('valor', flat=True)), [70]
+        )
+        self.assertTrue(Metrica.objects.filter(comedor__isnull=True, valor=300).exists())
+        self.assertEqual(MetricaMensual.objects.get(comedor=self.comedor).total, 70)
+
+    def test_lote_sin_filas_validas(self):
+        """Si ninguna fila es válida responde 400"""
+        response = self.client.post(
+            '/api/metricas/lote/', [{'tipo_metrica': 'X', 'valor': 'a'}], content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['creadas'], 0)
+
+
+class ImportarComedoresTest(TestCase):
+    """Tests para la importación del listado oficial"""
+
+    ENCABEZADO = 'ITEM,NOMBRE COMEDOR,COORDENADAS,CUPOS,NICHO,NODO,COMUNA,COMUNA RUTA,DIA ENTREGA\n'
+
+    def importar(self, filas, **opciones):
+        import io
+        from .importacion import importar_comedores
+
+        return importar_comedores(io.StringIO(self.ENCABEZADO + filas), **opciones)
+
+    def test_crear_con_coordenadas_sin_comillas(self):
+        """Las coordenadas sin comillas ocupan dos columnas y se unen"""
+        resumen = self.importar(
+            '1,Comedor Uno,3.428703, -76.507350,120,2,5,14,14,3\n'
+            '2,Comedor Dos,"3.45, -76.53",0,1,1,3,3,1\n'
+        )
+        self.assertEqual(resumen['creados'], 2)
+        self.assertEqual(resumen['errores'], [])
+
+        uno = Comedor.objects.get(item_oficial=1)
+        self.assertAlmostEqual(uno.latitud, 3.428703)
+        self.assertAlmostEqual(uno.longitud, -76.50735)
+        self.assertEqual((uno.capacidad_personas, uno.cupos_disponibles), (120, 120))
+        self.assertEqual((uno.comuna, uno.nodo, uno.dia_entrega), (14, 5, 3))
+        self.assertEqual(Comedor.objects.get(item_oficial=2).capacidad_personas, 1)
+
+    def test_reimportar_actualiza_y_desactiva(self):
+        """Una segunda importación actualiza cambios y desactiva ausentes"""
+        self.importar(
+            '1,Comedor Uno,3.42, -76.50,120,2,5,14,14,3\n'
+            '2,Comedor Dos,3.45, -76.53,80,1,1,3,3,1\n'
+            '3,Comedor Tres,3.40, -76.52,60,1,1,3,3,1\n'
+        )
+        Comedor.objects.filter(item_oficial=1).update(cupos_disponibles=7)
+
+        resumen = self.importar(
+            '1,Comedor Uno,3.42, -76.50,150,2,5,14,14,3\n'
+            '2,Comedor Dos,3.45, -76.53,80,1,1,3,3,1\n'
+        )
+        self.assertEqual(
+            (resumen['creados'], resumen['actualizados'], resumen['sin_cambios'], resumen['desactivados']),
+            (0, 1, 1, 1)
+        )
+        uno = Comedor.objects.get(item_oficial=1)
+        self.assertEqual((uno.capacidad_personas, uno.cupos_disponibles), (150, 7))
+        self.assertFalse(Comedor.objects.get(item_oficial=3).estado_activo)
+
+    def test_filas_invalidas(self):
+        """Las filas fuera de Cali se reportan y no desactivan su comedor"""
+        self.importar('1,Comedor Uno,3.42, -76.50,120,2,5,14,14,3\n')
+
+        resumen = self.importar(
+            '1,Comedor Uno,4.60, -74.08,120,2,5,14,14,3\n'
+            '2,Comedor Dos,3.45, -76.53,muchos,1,1,3,3,1\n'
+        )
+        self.assertEqual([numero for numero, _ in resumen['errores']], [2, 3])
+        self.assertEqual(resumen['desactivados'], 0)
+        self.assertTrue(Comedor.objects.get(item_oficial=1).estado_activo)
+        self.assertFalse(Comedor.objects.filter(item_oficial=2).exists())
+
+
+class GenerarDatosTest(TestCase):
+    """Tests para el generador de datos sintéticos"""
+
+    def test_generar(self):
+        """Genera las cantidades pedidas dentro de Cali y deja agregados consistentes"""
+        import io
+        from django.conf import settings
+        from django.core.management import call_command
+        from .alertas import nombres_barrios
+        from .models import AlertaSuscripcion, BarrioInteres, Donacion, Metrica, MetricaMensual
+
+        call_command(
+            'generar_datos', comedores=40, metricas=300, comentarios=120, donaciones=30,
+            suscripciones=25, lote=64, procesos=1, stdout=io.StringIO(),
+        )
+        self.assertEqual(Comedor.objects.count(), 40)
+        self.assertEqual(Metrica.objects.count(), 300)
+        self.assertEqual(Comentario.objects.count(), 120)
+        self.assertEqual(Donacion.objects.count(), 30)
+        self.assertEqual(AlertaSuscripcion.objects.count(), 25)
+
+        limites = settings.CALI_BOUNDS
+        self.assertFalse(Comedor.objects.exclude(
+            latitud__range=(limites['south'], limites['north']),
+            longitud__range=(limites['west'], limites['east']),
+        ).exists())
+        self.assertFalse(Comedor.objects.inconsistentes().exists())
+        self.assertEqual(
+            sum(MetricaMensual.objects.values_list('cantidad', flat=True)), 300
+        )
+        esperados = sum(
+            len(nombres_barrios(texto))
+            for texto in AlertaSuscripcion.objects.values_list('barrios_interes', flat=True)
+        )
+        self.assertEqual(BarrioInteres.objects.count(), esperados)
+
+    def test_bloques_deterministas(self):
+        """Un bloque depende solo de la semilla, la tabla y su número"""
+        from django.conf import settings
+        from . import sinteticos
+
+        sinteticos.inicializar({
+            'limites': settings.CALI_BOUNDS,
+            'centros': sinteticos.centros_barrio(7, settings.CALI_BOUNDS),
+        })
+        tarea = ('comedores', 7, 3, 150, 50)
+        self.assertEqual(sinteticos.generar_bloque(tarea), sinteticos.generar_bloque(tarea))
+        self.assertNotEqual(
+            sinteticos.generar_bloque(tarea),
+            sinteticos.generar_bloque(('comedores', 8, 3, 150, 50)),
+        )
+
+
+class BenchmarkApiTest(TestCase):
+    """Tests para el benchmark de la API"""
+
+    def test_ejecutar(self):
+        """Registra tiempos, consultas y memoria por endpoint"""
+        from django.core.cache import cache
+        from .benchmark import ejecutar
+
+        Comedor.objects.create(
+            nombre='Comedor Benchmark', direccion='Calle 1', latitud=3.45, longitud=-76.53,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0), capacidad_personas=50,
+        )
+        cache.set('benchmark:testigo', 1)
+        resultados = ejecutar(repeticiones=2, endpoints={'geojson', 'comedor_detalle'})
+        # El benchmark vacía su propio cache, no el configurado
+        self.assertEqual(cache.get('benchmark:testigo'), 1)
+
+        self.assertEqual(set(resultados), {'geojson', 'comedor_detalle'})
+        for metricas in resultados.values():
+            self.assertGreaterEqual(metricas['consultas_frio'], 1)
+            self.assertGreater(metricas['memoria_kb'], 0)
+            self.assertIn('ms_p95', metricas)
+        # En caliente el GeoJSON sale del snapshot sin consultas
+        self.assertEqual(resultados['geojson']['consultas'], 0)
+
+    def test_comparar(self):
+        """Solo se reportan las métricas que superan su presupuesto"""
+        from .benchmark import comparar
+
+        resultados = {'pequena': {'geojson': {'consultas_frio': 3, 'ms_frio': 10.0}}}
+        presupuestos = {'pequena': {'geojson': {'consultas_frio': 1, 'ms_frio': 50}}}
+        self.assertEqual(
+            comparar(resultados, presupuestos),
+            ['pequena/geojson: consultas_frio = 3 (presupuesto 1)']
+        )
+        self.assertEqual(comparar(resultados, {}), [])
+
+
+class TelemetriaTest(TestCase):
+    """Tests para la telemetría y el endpoint /metrics"""
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        from apps.core.telemetria import registro
+
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+        ajustes = override_settings(TELEMETRIA_DIR=self.directorio, TELEMETRIA_TOKEN='secreto')
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        registro.reiniciar()
+
+    def metricas(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_requiere_token(self):
+        """Sin token válido ni usuario staff responde 403"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(
+            self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer otro').status_code, 403
+        )
+
+    def test_registra_peticiones_por_vista(self):
+        """Latencia, consultas y caches se agrupan por nombre de vista"""
+        self.client.get('/api/comedores/geojson/')
+        self.client.get('/api/comedores/geojson/')
+        texto = self.metricas()
+
+        self.assertIn(
+            'comedores_peticiones_total{codigo="200",metodo="GET",vista="comedor-geojson"} 2', texto
+        )
+        self.assertIn(
+            'comedores_peticion_duracion_segundos_bucket{metodo="GET",vista="comedor-geojson",le="+Inf"} 2',
+            texto
+        )
+        self.assertIn('comedores_consultas_bd_total{vista="comedor-geojson"}', texto)
+        self.assertIn('comedores_cache_total{cache="geojson",resultado="acierto"}', texto)
+        self.assertIn('# TYPE comedores_peticion_duracion_segundos histogram', texto)
+
+    def test_suma_otros_procesos(self):
+        """Los archivos de otros workers se suman a los del proceso actual"""
+        import json
+        import os
+
+        with open(os.path.join(self.directorio, '99999.json'), 'w') as archivo:
+            json.dump({
+                'contadores': [['comedores_cache_total', {'cache': 'dashboard', 'resultado': 'fallo'}, 3]],
+                'histogramas': [],
+            }, archivo)
+        from apps.core.telemetria import registrar_cache
+        registrar_cache('dashboard', 'fallo')
+
+        self.assertIn('comedores_cache_total{cache="dashboard",resultado="fallo"} 4', self.metricas())
+
+
+class KeysetPaginacionTest(TestCase):
+    """Tests para la paginación por cursor opcional"""
+
+    def setUp(self):
+        from datetime import date
+        from .models import Metrica
+
+        # Muchas filas empatadas en la misma fecha, como en producción
+        fechas = [date(2024, 3, 1)] * 7 + [date(2024, 3, 2)] * 2 + [date(2024, 2, 28)] * 2
+        Metrica.objects.bulk_create([
+            Metrica(tipo_metrica='COMIDAS_SERVIDAS', valor=i, fecha=fecha)
+            for i, fecha in enumerate(fechas)
+        ])
+        self.esperados = list(
+            Metrica.objects.order_by('-fecha', '-id').values_list('id', flat=True)
+        )
+
+    def test_paginas_numeradas_por_defecto(self):
+        """Sin opt-in se mantiene el formato de PageNumberPagination"""
+        datos = self.client.get('/api/metricas/').json()
+        self.assertEqual(datos['count'], 11)
+        self.assertEqual(len(datos['results']), 11)
+
+    def test_recorrer_con_cursor(self):
+        """Las páginas cubren todas las filas una vez, con empates por fecha"""
+        url = '/api/metricas/?paginacion=cursor&page_size=3'
+        vistos, paginas = [], []
+        while url:
+            datos = self.client.get(url).json()
+            self.assertNotIn('count', datos)
+            paginas.append(url)
+            vistos.extend(fila['id'] for fila in datos['results'])
+            url = datos['next']
+        self.assertEqual(vistos, self.esperados)
+        self.assertEqual(len(paginas), 4)
+
+        # Volver desde la última página a la anterior
+        datos = self.client.get(paginas[-1]).json()
+        anterior = self.client.get(datos['previous']).json()
+        self.assertEqual([fila['id'] for fila in anterior['results']], self.esperados[6:9])
+        self.assertIsNotNone(anterior['next'])
+
+    def test_cursor_invalido(self):
+        """Un cursor que no se puede decodificar responde 404"""
+        response = self.client.get('/api/metricas/?cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_donaciones_y_alertas(self):
+        """Donaciones y suscripciones aceptan el mismo opt-in"""
+        for url in ('/api/donaciones/?paginacion=cursor', '/api/alertas/?paginacion=cursor'):
+            datos = self.client.get(url).json()
+            self.assertEqual(set(datos), {'next', 'previous', 'results'})
+
+
+class ExportacionTest(TestCase):
+    """Tests para la exportación en streaming"""
+
+    def setUp(self):
+        from datetime import date
+        from .models import Metrica
+
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Exportación', direccion='Calle 1', latitud=3.45, longitud=-76.53,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0), capacidad_personas=50,
+        )
+        Metrica.objects.bulk_create([
+            Metrica(comedor=self.comedor, tipo_metrica='COMIDAS_SERVIDAS', valor=10, fecha=date(2024, 3, 1)),
+            Metrica(comedor=self.comedor, tipo_metrica='CUPOS_OCUPADOS', valor=20, fecha=date(2024, 3, 2),
+                    metadata={'turno': 'almuerzo'}),
+            Metrica(tipo_metrica='COMIDAS_SERVIDAS', valor=30, fecha=date(2024, 3, 3)),
+        ])
+
+    def test_ndjson_con_filtros(self):
+        """Cada línea es un objeto JSON y se aplican los filtros del listado"""
+        import json
+
+        response = self.client.get('/api/metricas/export/?tipo_metrica=COMIDAS_SERVIDAS')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        filas = [json.loads(linea) for linea in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([fila['valor'] for fila in filas], [30, 10])
+        self.assertEqual(filas[1]['fecha'], '2024-03-01')
+
+    def test_csv(self):
+        """El CSV incluye encabezado y serializa las columnas JSON"""
+        import csv
+        import io
+
+        response = self.client.get('/api/metricas/export/?formato=csv&tipo_metrica=CUPOS_OCUPADOS')
+        filas = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(filas[0][:4], ['id', 'comedor_id', 'tipo_metrica', 'valor'])
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(filas[1][-1], '{"turno": "almuerzo"}')
+
+        self.assertEqual(self.client.get('/api/donaciones/export/?formato=xml').status_code, 400)
+
+    def test_comando_gzip(self):
+        """El comando escribe el archivo comprimido con los mismos filtros"""
+        import gzip
+        import io
+        import os
+        import tempfile
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as directorio:
+            salida = os.path.join(directorio, 'metricas.ndjson.gz')
+            call_command(
+                'exportar_datos', 'metricas', salida=salida,
+                filtro=[f'comedor={self.comedor.pk}'], stdout=io.StringIO(),
+            )
+            with gzip.open(salida, 'rt', encoding='utf-8') as archivo:
+                self.assertEqual(len(archivo.read().splitlines()), 2)
+
+    def test_asgi_sin_buffer(self):
+        """Por la aplicación ASGI la exportación se envía por bloques, sin leerla completa"""
+        import json
+        import warnings
+        from unittest import mock
+        from asgiref.sync import async_to_sync
+        from django.core import signals
+        from django.db import close_old_connections
+        from comedores_cali.asgi import application
+        from . import exportacion
+
+        mensajes = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(mensaje):
+            mensajes.append(mensaje)
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/api/metricas/export/',
+            'query_string': b'', 'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 1), 'scheme': 'http',
+        }
+        # Como el cliente de pruebas: no cerrar la conexión de la transacción del test
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+        try:
+            with mock.patch.object(exportacion, 'FILAS_POR_BLOQUE', 1), \
+                    warnings.catch_warnings(record=True) as avisos:
+                warnings.simplefilter('always')
+                async_to_sync(application)(scope, receive, send)
+        finally:
+            signals.request_started.connect(close_old_connections)
+            signals.request_finished.connect(close_old_connections)
+
+        self.assertEqual(mensajes[0]['status'], 200)
+        self.assertFalse([a for a in avisos if 'StreamingHttpResponse' in str(a.message)])
+        cuerpos = [m['body'] for m in mensajes[1:] if m.get('body')]
+        self.assertEqual(len(cuerpos), 3)
+        self.assertEqual([json.loads(c)['valor'] for c in cuerpos], [30, 20, 10])
+
+
+class ClustersTest(TestCase):
+    """Tests para los clusters precalculados por zoom"""
+
+    url = '/api/comedores/clusters/'
+    bbox = '-76.6,3.3,-76.4,3.5'
+
+    def setUp(self):
+        # Dos comedores a ~30 m y uno a ~5 km
+        for nombre, lat, lng, cupos in [
+            ('Norte A', 3.4500, -76.5300, 10),
+            ('Norte B', 3.4502, -76.5302, 25),
+            ('Sur', 3.4000, -76.5400, 40),
+        ]:
+            Comedor.objects.create(
+                nombre=nombre, direccion='Calle 1', latitud=lat, longitud=lng,
+                horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+                dias_atencion='TODOS', cupos_disponibles=cupos,
+            )
+
+    def test_agrupa_en_zoom_bajo(self):
+        """En zoom bajo los comedores cercanos forman un cluster con sus totales"""
+        from datetime import datetime, timezone as tz
+        from unittest import mock
+
+        mediodia = datetime(2024, 3, 1, 17, 0, tzinfo=tz.utc)  # 12:00 en Cali
+        with mock.patch('django.utils.timezone.now', return_value=mediodia):
+            features = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 12}).json()['features']
+        clusters = [f for f in features if f['properties'].get('cluster')]
+        self.assertEqual(len(clusters), 1)
+        propiedades = clusters[0]['properties']
+        self.assertEqual(propiedades['cantidad'], 2)
+        self.assertEqual(propiedades['cupos'], 35)
+        self.assertEqual(propiedades['abiertos'], 2)
+        self.assertEqual(propiedades['bbox'], [-76.5302, 3.45, -76.53, 3.4502])
+
+        sueltos = [f['properties']['nombre'] for f in features if not f['properties'].get('cluster')]
+        self.assertEqual(sueltos, ['Sur'])
+
+    def test_puntos_en_zoom_alto_y_caja(self):
+        """Sobre ZOOM_MAX se retornan comedores individuales dentro de la caja"""
+        from .clusters import ZOOM_MAX
+
+        response = self.client.get(self.url, {'bbox': '-76.54,3.44,-76.52,3.46', 'zoom': ZOOM_MAX + 1})
+        nombres = sorted(f['properties']['nombre'] for f in response.json()['features'])
+        self.assertEqual(nombres, ['Norte A', 'Norte B'])
+
+    def test_niveles_anidados(self):
+        """Cada nivel suma exactamente los comedores del nivel inferior"""
+        from .clusters import ZOOM_MAX, ZOOM_MIN, obtener_indice
+
+        indice = obtener_indice()
+        for zoom in range(ZOOM_MIN, ZOOM_MAX + 1):
+            self.assertEqual(indice.niveles[zoom].cantidad.sum(), 3)
+            self.assertLessEqual(len(indice.niveles[zoom]), len(indice.niveles.get(zoom + 1, indice.base)))
+
+    def test_parametros_invalidos(self):
+        """bbox o zoom ausentes o inválidos responden 400"""
+        self.assertEqual(self.client.get(self.url, {'zoom': 12}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'bbox': '1,2,3', 'zoom': 12}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'bbox': '-76.4,3.3,-76.6,3.5', 'zoom': 12}).status_code, 400)
+
+
+class SincronizacionCambiosTest(TestCase):
+    """Tests para la sincronización incremental /api/comedores/cambios/"""
+
+    url = '/api/comedores/cambios/'
+
+    def setUp(self):
+        self.comedores = [
+            Comedor.objects.create(
+                nombre=f'Comedor {i}', direccion='Calle 1', latitud=3.45, longitud=-76.53,
+                horario_apertura=time(8, 0), horario_cierre=time(17, 0),
+            )
+            for i in range(3)
+        ]
+
+    def sincronizar(self, token=None):
+        parametros = {'perfil': 'min'}
+        if token:
+            parametros['desde'] = token
+        return self.client.get(self.url, parametros).json()
+
+    def envejecer(self, minutos=10):
+        """Simula que la última modificación fue hace unos minutos"""
+        from datetime import timedelta
+        Comedor.objects.update(fecha_modificacion=timezone.now() - timedelta(minutes=minutos))
+
+    def test_sin_token_retorna_todo(self):
+        """La primera sincronización trae todos los comedores activos"""
+        data = self.sincronizar()
+        self.assertTrue(data['completo'])
+        self.assertEqual(len(data['features']), 3)
+        self.assertTrue(data['token'])
+
+    def test_solo_cambios(self):
+        """Con token solo llegan los comedores modificados y las bajas"""
+        from datetime import timedelta
+        from . import sincronizacion
+
+        self.envejecer()
+        token = sincronizacion.codificar_token(timezone.now() - timedelta(minutes=5))
+
+        modificado, desactivado, borrado = self.comedores
+        modificado.cupos_disponibles = 3
+        modificado.save()
+        desactivado.estado_activo = False
+        desactivado.save()
+        borrado_id = borrado.pk
+        borrado.delete()
+
+        data = self.sincronizar(token)
+        self.assertFalse(data['completo'])
+        self.assertEqual([f['id'] for f in data['features']], [modificado.pk])
+        self.assertEqual(data['features'][0]['properties']['cupos_disponibles'], 3)
+        self.assertEqual(data['eliminados'], sorted([desactivado.pk, borrado_id]))
+
+        # Una sincronización posterior (fuera del margen) ya no trae nada
+        self.envejecer()
+        token = sincronizacion.codificar_token(timezone.now() - timedelta(minutes=5))
+        from .models import ComedorEliminado
+        ComedorEliminado.objects.update(fecha_eliminacion=timezone.now() - timedelta(minutes=10))
+        data = self.sincronizar(token)
+        self.assertEqual((data['features'], data['eliminados']), ([], []))
+
+    def test_cambio_de_horario(self):
+        """Un comedor que abrió desde la última sincronización se reenvía"""
+        from datetime import datetime, timedelta
+        from . import sincronizacion
+
+        hoy = timezone.localdate()
+        antes = timezone.make_aware(datetime.combine(hoy, time(7, 0)))
+        despues = timezone.make_aware(datetime.combine(hoy, time(9, 0)))
+        Comedor.objects.filter(pk=self.comedores[0].pk).update(dias_atencion='TODOS')
+        Comedor.objects.exclude(pk=self.comedores[0].pk).update(horario_apertura=time(12, 0))
+        Comedor.objects.update(fecha_modificacion=antes - timedelta(days=1))
+
+        data = sincronizacion.cambios(antes, 'min', ahora=despues)
+        self.assertEqual([f['id'] for f in data['features']], [self.comedores[0].pk])
+
+    def test_token_invalido(self):
+        """Un token ilegible responde 400"""
+        self.assertEqual(self.client.get(self.url, {'desde': 'no-es-token'}).status_code, 400)
+
+
+class EventosEnVivoTest(TestCase):
+    """Tests para el stream de eventos en vivo (SSE)"""
+
+    def setUp(self):
+        from . import eventos
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Vivo', direccion='Calle 1', latitud=3.45, longitud=-76.53,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0), cupos_disponibles=20,
+        )
+        self.backend = eventos.BackendMemoria()
+
+    def publicados(self, funcion):
+        from unittest import mock
+        from . import eventos
+
+        with mock.patch.object(eventos, 'obtener_backend', return_value=self.backend):
+            with self.captureOnCommitCallbacks(execute=True):
+                funcion()
+        return [datos for _, datos in self.backend.leer(0)]
+
+    def test_publica_solo_cambios_en_vivo(self):
+        """Cambiar los cupos publica un evento; cambiar la descripción no"""
+        comedor = Comedor.objects.get(pk=self.comedor.pk)
+
+        def cambiar_cupos():
+            comedor.cupos_disponibles = 4
+            comedor.save()
+
+        def cambiar_descripcion():
+            comedor.descripcion = 'Otra descripción'
+            comedor.save()
+
+        eventos_cupos = self.publicados(cambiar_cupos)
+        self.assertEqual(len(eventos_cupos), 1)
+        self.assertEqual(eventos_cupos[0]['id'], comedor.pk)
+        self.assertEqual(eventos_cupos[0]['cupos'], 4)
+        self.assertEqual(eventos_cupos[0]['estado_cupos'], 'pocos')
+        self.assertEqual(len(self.publicados(cambiar_descripcion)), 1)  # Solo el anterior
+
+    def test_stream_y_desconexion(self):
+        """La aplicación ASGI entrega los eventos y termina al desconectarse"""
+        import asyncio
+        from . import eventos
+
+        hub = eventos.Hub(self.backend)
+        enviados = []
+        desconectar = asyncio.Event()
+
+        async def receive():
+            await desconectar.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(mensaje):
+            enviados.append(mensaje)
+            if b'event: comedor' in mensaje.get('body', b''):
+                desconectar.set()
+
+        async def escenario():
+            tarea = asyncio.ensure_future(eventos.aplicacion(
+                {'type': 'http', 'method': 'GET', 'path': eventos.RUTA, 'headers': []},
+                receive, send,
+            ))
+            await asyncio.sleep(0.05)
+            self.backend.publicar([{'id': self.comedor.pk, 'cupos': 7}])
+            await asyncio.wait_for(tarea, 5)
+
+        from unittest import mock
+        with mock.patch.object(eventos, 'obtener_hub', return_value=hub), \
+                mock.patch.object(eventos, 'INTERVALO', 0.01):
+            asyncio.run(escenario())
+
+        self.assertEqual(enviados[0]['status'], 200)
+        cuerpo = b''.join(m.get('body', b'') for m in enviados[1:])
+        self.assertIn(b'retry: ', cuerpo)
+        self.assertIn(b'id: 1\nevent: comedor\ndata: {"id":%d,"cupos":7}' % self.comedor.pk, cuerpo)
+        self.assertEqual(hub.clientes, set())
+
+    def test_last_event_id(self):
+        """Al reconectarse se reenvían los eventos perdidos, o resincronizar"""
+        import asyncio
+        from . import eventos
+
+        self.backend.publicar([{'id': 1}, {'id': 2}, {'id': 3}])
+
+        async def suscribir(ultimo_id):
+            hub = eventos.Hub(self.backend)
+            cola = await hub.suscribir(ultimo_id)
+            hub.cancelar(cola)
+            return [cola.get_nowait() for _ in range(cola.qsize())]
+
+        perdidos = asyncio.run(suscribir(1))
+        self.assertEqual([bloque.split(b'\n')[0] for bloque in perdidos], [b'id: 2', b'id: 3'])
+
+        # Los eventos anteriores ya no están disponibles
+        self.backend._eventos.popleft()
+        self.backend._eventos.popleft()
+        self.assertIn(b'event: resincronizar', asyncio.run(suscribir(0))[0])
+
+
+class ReservaCuposTest(TestCase):
+    """Tests para reservar/liberar cupos con UPDATE atómicos"""
+
+    def setUp(self):
+        self.comedor = Comedor.objects.create(
+            nombre='Comedor Cupos', direccion='Calle 1', latitud=3.45, longitud=-76.53,
+            horario_apertura=time(8, 0), horario_cierre=time(17, 0), cupos_disponibles=31,
+        )
+        self.url = f'/api/comedores/{self.comedor.pk}/'
+
+    def test_reservar_y_liberar(self):
+        """Las acciones retornan los cupos nuevos y los guardan"""
+        response = self.client.post(f'{self.url}reservar/', {'cantidad': 5}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cupos_disponibles'], 26)
+
+        response = self.client.post(f'{self.url}liberar/', content_type='application/json')
+        self.assertEqual(response.json()['cupos_disponibles'], 27)
+        self.comedor.refresh_from_db()
+        self.assertEqual(self.comedor.cupos_disponibles, 27)
+
+    def test_nunca_negativos(self):
+        """Sin cupos suficientes responde 409 y no modifica nada"""
+        response = self.client.post(f'{self.url}reservar/', {'cantidad': 32}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['cupos_disponibles'], 31)
+        self.assertEqual(
+            self.client.post('/api/comedores/999999/reservar/', content_type='application/json').status_code,
+            404
+        )
+        self.assertEqual(
+            self.client.post(f'{self.url}reservar/', {'cantidad': 0}, content_type='application/json').status_code,
+            400
+        )
+
+    def test_una_consulta_alerta_y_evento(self):
+        """Un solo UPDATE; al cruzar el umbral se emite CUPOS_BAJOS y siempre el evento en vivo"""
+        from unittest import mock
+        from . import alertas, cupos, eventos
+
+        with mock.patch.object(alertas, 'encolar') as encolar, \
+                mock.patch.object(eventos, 'publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(1):
+                    self.assertEqual(cupos.reservar(self.comedor.pk), 30)
+            encolar.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(cupos.reservar(self.comedor.pk), 29)
+
+        encolar.assert_called_once()
+        self.assertEqual(encolar.call_args[0][0].tipo, 'CUPOS_BAJOS')
+        self.assertEqual([c[0][0][0]['cupos'] for c in publicar.call_args_list], [30, 29])
+
+    def test_capacidad_y_entradas_invalidas(self):
+        """Liberar no supera la capacidad; cuerpos, ids y cantidades inválidas no dan 500"""
+        Comedor.objects.filter(pk=self.comedor.pk).update(capacidad_personas=35)
+        response = self.client.post(f'{self.url}liberar/', {'cantidad': 5}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['cupos_disponibles'], 31)
+        response = self.client.post(f'{self.url}liberar/', {'cantidad': 4}, content_type='application/json')
+        self.assertEqual(response.json()['cupos_disponibles'], 35)
+
+        for cuerpo in ([1], {'cantidad': 1.9}, {'cantidad': '1.9'}, {'cantidad': True}):
+            response = self.client.post(f'{self.url}reservar/', cuerpo, content_type='application/json')
+            self.assertEqual(response.status_code, 400, cuerpo)
+        response = self.client.post(f'{self.url}reservar/', {'cantidad': '2'}, content_type='application/json')
+        self.assertEqual(response.json()['cupos_disponibles'], 33)
+        self.assertEqual(self.client.post('/api/comedores/²/reservar/').status_code, 404)
+
+    def test_invalida_mapa_con_limite(self):
+        """Al confirmar se invalida el GeoJSON; una ráfaga deja una sola invalidación pendiente"""
+        from unittest import mock
+        from django.test import override_settings
+        from . import cupos, snapshot
+
+        with override_settings(CUPOS_INVALIDACION_SEGUNDOS=60), \
+                mock.patch.object(cupos, '_ultima_invalidacion', None), \
+                mock.patch.object(cupos, '_pendiente', None), \
+                mock.patch.object(snapshot, 'invalidar') as invalidar:
+            for _ in range(3):
+                with self.captureOnCommitCallbacks(execute=True):
+                    cupos.reservar(self.comedor.pk)
+            self.assertEqual(invalidar.call_count, 1)
+            cupos._pendiente.cancel()
+            cupos._invalidar_pendiente()
+            self.assertEqual(invalidar.call_count, 2)
+
+        # Sin invalidación previa en la ventana, el mapa refleja la reserva al instante
+        url = '/api/comedores/geojson/'
+        self.assertEqual(self.client.get(url).json()['features'][0]['properties']['cupos_disponibles'], 28)
+        with mock.patch.object(cupos, '_ultima_invalidacion', None):
+            with self.captureOnCommitCallbacks(execute=True):
+                cupos.reservar(self.comedor.pk)
+        self.assertEqual(self.client.get(url).json()['features'][0]['properties']['cupos_disponibles'], 27)
+
+    def test_save_no_pisa_reservas(self):
+        """Guardar un comedor leído antes de una reserva no deshace la reserva"""
+        from . import cupos
+
+        obsoleto = Comedor.objects.get(pk=self.comedor.pk)
+        cupos.reservar(self.comedor.pk, 10)
+        obsoleto.descripcion = 'Nueva descripción'
+        obsoleto.save()
+
+        self.comedor.refresh_from_db()
+        self.assertEqual(self.comedor.cupos_disponibles, 21)
+        self.assertEqual(self.comedor.descripcion, 'Nueva descripción')
+
+
+class HorarioSemanalTest(TestCase):
+    """Tests para el horario semanal en cuartos de hora (hora de Cali)"""
+
+    url = '/api/comedores/'
+
+    def setUp(self):
+        def crear(nombre, apertura, cierre, dias, personalizado=None):
+            return Comedor.objects.create(
+                nombre=nombre, direccion='Calle 1', latitud=3.45, longitud=-76.53,
+                horario_apertura=apertura, horario_cierre=cierre, dias_atencion=dias,
+                horario_personalizado=personalizado,
+            )
+
+        self.diurno = crear('Diurno', time(8, 0), time(17, 0), 'TODOS')
+        self.nocturno = crear('Nocturno', time(20, 0), time(2, 0), 'LU-VI')
+        self.custom = crear(
+            'Custom', time(0, 0), time(0, 0), 'CUSTOM',
+            {'LU': [['08:00', '10:00'], ['14:00', '16:00']], 'SA': [['20:00', '02:00']]},
+        )
+
+    def local(self, dia, hora, minuto=0):
+        """Instante en hora local; marzo de 2024 empieza en viernes (día 1)"""
+        from datetime import datetime
+        return timezone.make_aware(datetime(2024, 3, dia, hora, minuto))
+
+    def abiertos(self, momento):
+        return {
+            c.nombre for c in Comedor.objects.all() if c.esta_abierto_en(momento)
+        }
+
+    def test_hora_local_y_nocturnos(self):
+        """El horario se evalúa en hora de Cali y cruza la medianoche"""
+        from datetime import datetime, timezone as tz
+
+        # 12:00 UTC son las 07:00 en Cali: aún cerrado
+        self.assertEqual(self.abiertos(datetime(2024, 3, 1, 12, 0, tzinfo=tz.utc)), set())
+        self.assertEqual(self.abiertos(self.local(1, 12)), {'Diurno'})
+        self.assertEqual(self.abiertos(self.local(1, 23)), {'Nocturno'})
+        # Sábado 01:00 sigue abierto el turno del viernes; el domingo no hay turno
+        self.assertEqual(self.abiertos(self.local(2, 1, 45)), {'Nocturno'})
+        self.assertEqual(self.abiertos(self.local(4, 1)), set())
+
+    def test_horario_personalizado(self):
+        """CUSTOM admite varias franjas por día y franjas nocturnas"""
+        self.assertEqual(self.abiertos(self.local(4, 15)), {'Diurno', 'Custom'})
+        self.assertEqual(self.abiertos(self.local(3, 1)), {'Custom'})  # Domingo, turno del sábado
+
+        from django.core.exceptions import ValidationError
+        comedor = Comedor.objects.get(pk=self.custom.pk)
+        comedor.horario_personalizado = {'XX': [['08:00', '10:00']]}
+        with self.assertRaises(ValidationError):
+            comedor.full_clean()
+
+    def test_proxima_apertura(self):
+        """La próxima apertura salta franjas, días cerrados y el fin de semana"""
+        custom = Comedor.objects.get(pk=self.custom.pk)
+        self.assertEqual(custom.proxima_apertura(self.local(4, 11)), self.local(4, 14))
+        self.assertEqual(custom.proxima_apertura(self.local(4, 14, 5)), self.local(9, 20))
+        nocturno = Comedor.objects.get(pk=self.nocturno.pk)
+        self.assertEqual(nocturno.proxima_apertura(self.local(2, 12)), self.local(4, 20))
+
+    def test_filtro_abierto_en(self):
+        """estado=abierto y abierto_en usan el índice en memoria"""
+        response = self.client.get(self.url, {'abierto_en': '2024-03-02T01:00'})
+        self.assertEqual([c['nombre'] for c in response.json()['results']], ['Nocturno'])
+        response = self.client.get(self.url, {'abierto_en': '2024-03-04T20:00:00+00:00'})
+        self.assertEqual([c['nombre'] for c in response.json()['results']], ['Custom', 'Diurno'])
+        self.assertEqual(self.client.get(self.url, {'abierto_en': 'ayer'}).status_code, 400)
+
+        from . import horarios
+        indice = horarios.obtener_indice()
+        self.assertEqual(indice.abiertos_en(self.local(4, 9)).tolist(), [self.diurno.pk, self.custom.pk])
+
+    def test_filtro_por_horario_no_por_id(self):
+        """Los parámetros de la consulta crecen con los horarios distintos, no con los comedores"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for i in range(30):
+            Comedor.objects.create(
+                nombre=f'Diurno {i:02d}', direccion='Calle 1', latitud=3.45, longitud=-76.53,
+                horario_apertura=time(8, 0), horario_cierre=time(17, 0), dias_atencion='TODOS',
+            )
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url, {'abierto_en': '2024-03-04T12:00'})
+        self.assertEqual(response.json()['count'], 31)
+        conteo = next(c['sql'] for c in consultas if 'COUNT(' in c['sql'])
+        self.assertNotIn(' IN (', conteo)
+
+    def test_aperturas_en_ventana(self):
+        """encolar_aperturas encuentra los CUSTOM y los que abren de noche"""
+        from . import horarios
+
+        indice = horarios.obtener_indice()
+        self.assertEqual(indice.abren_entre(self.local(4, 13), self.local(4, 14)).tolist(), [])
+        self.assertEqual(
+            indice.abren_entre(self.local(4, 13, 50), self.local(4, 14, 5)).tolist(), [self.custom.pk]
+        )
+        self.assertEqual(
+            sorted(indice.abren_entre(self.local(4, 19), self.local(4, 21)).tolist()), [self.nocturno.pk]
+        )
+
+    def test_cierre_de_cada_franja(self):
+        """El aviso de apertura usa el cierre de la franja que abre, no horario_cierre"""
+        from unittest import mock
+        from . import alertas
+
+        with mock.patch.object(alertas, 'encolar', return_value=1) as encolar:
+            self.assertEqual(alertas.encolar_aperturas(self.local(4, 7, 50), self.local(4, 8, 5)), 2)
+            alertas.encolar_aperturas(self.local(4, 13, 50), self.local(4, 14, 5))
+        # La clave termina en la hora de apertura: cada franja se avisa una vez
+        textos = {
+            (evento.comedor.nombre, evento.clave[-5:]): evento.texto
+            for evento in (llamada[0][0] for llamada in encolar.call_args_list)
+        }
+        self.assertIn('hasta las 17:00', textos['Diurno', '08:00'])
+        self.assertIn('hasta las 10:00', textos['Custom', '08:00'])
+        self.assertIn('hasta las 16:00', textos['Custom', '14:00'])
@@ -0,0 +1,29 @@
+"""
+Marcas de versión compartidas para datos precalculados en memoria
+
+Cada estructura precalculada (snapshot GeoJSON, índice espacial, ...) se
+guarda en memoria de cada proceso junto con la marca de versión con la que
+se construyó. La marca vive en el cache de Django, de modo que invalidarla
+en un worker obliga a todos los demás a reconstruir su copia.
+"""
+import uuid
+
+from django.core.cache import cache
+
+GEOJSON = 'comedores:version:geojson'
+INDICE_ESPACIAL = 'comedores:version:indice_espacial'
+ALERTAS = 'comedores:version:alertas'
+
+
+def version_actual(clave):
+    """Retorna la marca de versión vigente para una clave"""
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, uuid.uuid4().hex, None)
+        version = cache.get(clave)
+    return version
+
+
+def invalidar(*claves):
+    """Marca como obsoletos los datos asociados a las claves dadas"""
+    cache.set_many({clave: uuid.uuid4().hex for clave in claves}, None)
@@ -1,804 +1,950 @@
-"""
-Views para la API REST de Comedores
-"""
-from rest_framework import viewsets, filters, status
-from rest_framework.decorators import action
-from rest_framework.response import Response
-from django.utils import timezone
-from django.db.models import Q, Avg, Count, Sum
-from django.shortcuts import render
-from math import radians, cos, sin, asin, sqrt
-from .models import Comedor, MenuDiario, Comentario, Favorito, AlertaSuscripcion, Metrica, Donacion
-from .serializers import (
-    ComedorSerializer, ComedorDetalleSerializer, ComedorGeoJSONSerializer,
-    MenuDiarioSerializer, ComentarioSerializer, AlertaSuscripcionSerializer,
-    MetricaSerializer, DonacionSerializer
-)
-
-
-class ComedorViewSet(viewsets.ModelViewSet):
-    """
-    ViewSet para operaciones CRUD de comedores
-    """
-    queryset = Comedor.objects.filter(estado_activo=True)
-    serializer_class = ComedorSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['nombre', 'descripcion', 'direccion', 'barrio']
-    ordering_fields = ['nombre', 'fecha_creacion']
-    ordering = ['nombre']
-    
-    def get_serializer_class(self):
-        """Usar serializer detallado para retrieve"""
-        if self.action == 'retrieve':
-            return ComedorDetalleSerializer
-        elif self.action == 'geojson':
-            return ComedorGeoJSONSerializer
-        return ComedorSerializer
-    
-    def get_queryset(self):
-        """
-        Filtrar comedores según parámetros de query
-        """
-        queryset = super().get_queryset()
-        
-        # Filtrar por estado (abierto/cerrado)
-        estado = self.request.query_params.get('estado', None)
-        if estado == 'abierto' or estado == 'Abiertos ahora':
-            # Filtrar comedores abiertos ahora
-            ahora = timezone.now()
-            hora_actual = ahora.time()
-            dia_semana = ahora.weekday()
-            
-            queryset = queryset.filter(
-                horario_apertura__lte=hora_actual,
-                horario_cierre__gte=hora_actual
-            )
-            
-            # Filtrar por día de la semana
-            if dia_semana < 5:  # Lunes a Viernes
-                queryset = queryset.filter(
-                    Q(dias_atencion__in=['LU-VI', 'LU-SA', 'LU-DO', 'TODOS'])
-                )
-            elif dia_semana == 5:  # Sábado
-                queryset = queryset.filter(
-                    Q(dias_atencion__in=['LU-SA', 'LU-DO', 'MA-SA', 'TODOS'])
-                )
-            else:  # Domingo
-                queryset = queryset.filter(
-                    Q(dias_atencion__in=['LU-DO', 'TODOS'])
-                )
-        
-        # Filtrar por tipo de comida
-        tipo_comida = self.request.query_params.get('tipo_comida', None)
-        if tipo_comida:
-            queryset = queryset.filter(tipo_comida=tipo_comida)
-        
-        # Filtrar por barrio
-        barrio = self.request.query_params.get('barrio', None)
-        if barrio:
-            queryset = queryset.filter(barrio__icontains=barrio)
-        
-        # Filtrar por calificación mínima
-        calificacion_min = self.request.query_params.get('calificacion_min', None)
-        if calificacion_min:
-            try:
-                cal_min = float(calificacion_min)
-                # Esto requeriría una anotación más compleja
-                # Por ahora filtramos en el serializer
-            except ValueError:
-                pass
-        
-        return queryset
-    
-    @action(detail=False, methods=['get'])
-    def geojson(self, request):
-        """
-        Endpoint que retorna todos los comedores en formato GeoJSON
-        para usar directamente con Leaflet
-        """
-        queryset = self.filter_queryset(self.get_queryset())
-
-        # OPTIMIZACIÓN: Usar annotate para calcular calificación promedio en DB
-        # Esto evita el problema N+1 de hacer una query por cada comedor
-        queryset = queryset.annotate(
-            calificacion_avg=Avg('comentarios__calificacion')
-        )
-
-        # Construir GeoJSON manualmente
-        features = []
-        for comedor in queryset:
-            # Calcular calificación: usar anotación si existe, sino 0
-            calificacion = round(comedor.calificacion_avg, 1) if comedor.calificacion_avg else 0
-
-            feature = {
-                'type': 'Feature',
-                'id': comedor.id,
-                'geometry': {
-                    'type': 'Point',
-                    'coordinates': [comedor.longitud, comedor.latitud]
-                },
-                'properties': {
-                    'id': comedor.id,
-                    'nombre': comedor.nombre,
-                    'descripcion': comedor.descripcion,
-                    'direccion': comedor.direccion,
-                    'barrio': comedor.barrio,
-                    'telefono': comedor.telefono,
-                    'celular': comedor.celular,
-                    'email': comedor.email,
-                    'whatsapp': comedor.whatsapp,
-                    'capacidad_personas': comedor.capacidad_personas,
-                    'horario_apertura': str(comedor.horario_apertura),
-                    'horario_cierre': str(comedor.horario_cierre),
-                    'dias_atencion': comedor.dias_atencion,
-                    'tipo_comida': comedor.tipo_comida,
-                    'servicios_adicionales': comedor.servicios_adicionales,
-                    'foto_principal': comedor.foto_principal.url if comedor.foto_principal else None,
-                    'estado_activo': comedor.estado_activo,
-                    'esta_abierto': comedor.esta_abierto_ahora,
-                    'calificacion_promedio': calificacion,  # Usar valor pre-calculado
-                    # Nuevos campos sociales
-                    'es_gratuito': comedor.es_gratuito,
-                    'precio_texto': comedor.precio_texto,
-                    'cupos_disponibles': comedor.cupos_disponibles,
-                    'estado_cupos': comedor.estado_cupos,
-                    'cola_estimada': comedor.cola_estimada,
-                    'requisitos_acceso': comedor.requisitos_acceso,
-                    'acepta_ninos': comedor.acepta_ninos,
-                    'permite_llevar_comida': comedor.permite_llevar_comida,
-                    'tiene_silla_bebes': comedor.tiene_silla_bebes,
-                    'tiene_area_infantil': comedor.tiene_area_infantil,
-                    'accesible_silla_ruedas': comedor.accesible_silla_ruedas,
-                    'tiene_banos': comedor.tiene_banos,
-                    'tiene_rampa': comedor.tiene_rampa,
-                    'rutas_transporte_publico': comedor.rutas_transporte_publico,
-                    'parada_bus_cercana': comedor.parada_bus_cercana,
-                    'distancia_parada': comedor.distancia_parada,
-                    'telefono_limpio': comedor.telefono_limpio,
-                    'whatsapp_link': comedor.whatsapp_link,
-                }
-            }
-            features.append(feature)
-
-        geojson = {
-            'type': 'FeatureCollection',
-            'features': features
-        }
-
-        return Response(geojson)
-    
-    @action(detail=False, methods=['get'])
-    def cercanos(self, request):
-        """
-        Obtener comedores cercanos a una ubicación
-        Query params: lat, lng, radio (en km, default 5)
-        """
-        lat = request.query_params.get('lat', None)
-        lng = request.query_params.get('lng', None)
-        radio = float(request.query_params.get('radio', 5))  # km
-        
-        if not lat or not lng:
-            return Response(
-                {'error': 'Se requieren parámetros lat y lng'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            lat = float(lat)
-            lng = float(lng)
-        except ValueError:
-            return Response(
-                {'error': 'Coordenadas inválidas'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Calcular distancia usando fórmula haversine
-        comedores_cercanos = []
-        for comedor in Comedor.objects.filter(estado_activo=True):
-            distancia = haversine(lat, lng, comedor.latitud, comedor.longitud)
-            if distancia <= radio:
-                comedores_cercanos.append(comedor)
-
-        serializer = self.get_serializer(comedores_cercanos, many=True)
-        return Response(serializer.data)
-
-    @action(detail=False, methods=['get'])
-    def network_graph(self, request):
-        """
-        Endpoint que retorna datos para el network graph
-        Agrupa comedores por barrio y genera nodos y enlaces
-        """
-        # Agrupar por barrio/comuna
-        barrios = Comedor.objects.filter(estado_activo=True).values('barrio').annotate(
-            total_comedores=Count('id'),
-            total_cupos=Sum('cupos_disponibles'),
-            total_capacidad=Sum('capacidad_personas'),
-            promedio_cupos=Avg('cupos_disponibles')
-        ).order_by('-total_cupos')
-
-        # Crear nodos (barrios)
-        nodes = []
-        node_id_map = {}
-
-        for idx, barrio in enumerate(barrios):
-            node_id = f"barrio_{idx}"
-            node_id_map[barrio['barrio']] = node_id
-
-            # Categorizar por tamaño de cupos
-            if barrio['total_cupos'] >= 3000:
-                categoria = 'muy_alto'
-                color = '#e74c3c'  # Rojo
-                size = 30
-            elif barrio['total_cupos'] >= 2000:
-                categoria = 'alto'
-                color = '#e67e22'  # Naranja
-                size = 25
-            elif barrio['total_cupos'] >= 1000:
-                categoria = 'medio'
-                color = '#f39c12'  # Amarillo
-                size = 20
-            elif barrio['total_cupos'] >= 500:
-                categoria = 'bajo'
-                color = '#3498db'  # Azul
-                size = 15
-            else:
-                categoria = 'muy_bajo'
-                color = '#95a5a6'  # Gris
-                size = 10
-
-            nodes.append({
-                'id': node_id,
-                'label': barrio['barrio'],
-                'type': 'barrio',
-                'categoria': categoria,
-                'total_comedores': barrio['total_comedores'],
-                'total_cupos': barrio['total_cupos'],
-                'total_capacidad': barrio['total_capacidad'],
-                'promedio_cupos': round(barrio['promedio_cupos'], 1),
-                'color': color,
-                'size': size,
-                'x': None,  # Se calculará en frontend
-                'y': None
-            })
-
-        # Crear enlaces entre barrios basados en proximidad de cupos
-        links = []
-        barrios_list = list(barrios)
-
-        for i, barrio1 in enumerate(barrios_list):
-            for j, barrio2 in enumerate(barrios_list):
-                if i < j:  # Evitar duplicados
-                    # Conectar barrios con cupos similares
-                    diff_cupos = abs(barrio1['total_cupos'] - barrio2['total_cupos'])
-
-                    # Si la diferencia es menor al 50% del mayor, crear enlace
-                    max_cupos = max(barrio1['total_cupos'], barrio2['total_cupos'])
-                    if diff_cupos < (max_cupos * 0.5):
-                        strength = 1 - (diff_cupos / max_cupos)
-
-                        links.append({
-                            'source': node_id_map[barrio1['barrio']],
-                            'target': node_id_map[barrio2['barrio']],
-                            'value': strength,
-                            'tipo': 'similitud_cupos'
-                        })
-
-        # Agregar nodos de comedores individuales para los top 20
-        top_comedores = Comedor.objects.filter(estado_activo=True).order_by('-cupos_disponibles')[:20]
-
-        for comedor in top_comedores:
-            node_id = f"comedor_{comedor.id}"
-
-            # Color por tipo de comida
-            color_map = {
-                'CASERA': '#2ecc71',
-                'VEGETARIANA': '#27ae60',
-                'VEGANA': '#16a085',
-                'MIXTA': '#3498db',
-                'TIPICA': '#9b59b6',
-                'INTERNACIONAL': '#34495e'
-            }
-
-            nodes.append({
-                'id': node_id,
-                'label': comedor.nombre[:30] + '...' if len(comedor.nombre) > 30 else comedor.nombre,
-                'type': 'comedor',
-                'categoria': 'destacado',
-                'cupos': comedor.cupos_disponibles,
-                'capacidad': comedor.capacidad_personas,
-                'barrio': comedor.barrio,
-                'tipo_comida': comedor.tipo_comida,
-                'color': color_map.get(comedor.tipo_comida, '#95a5a6'),
-                'size': 8 + (comedor.cupos_disponibles / 20),  # Tamaño proporcional a cupos
-                'x': None,
-                'y': None
-            })
-
-            # Conectar comedor con su barrio
-            if comedor.barrio in node_id_map:
-                links.append({
-                    'source': node_id,
-                    'target': node_id_map[comedor.barrio],
-                    'value': comedor.cupos_disponibles / 100,
-                    'tipo': 'pertenece_a'
-                })
-
-        # Estadísticas globales
-        stats = {
-            'total_barrios': len(barrios),
-            'total_comedores_activos': Comedor.objects.filter(estado_activo=True).count(),
-            'total_cupos_sistema': sum(b['total_cupos'] for b in barrios),
-            'promedio_comedores_por_barrio': round(sum(b['total_comedores'] for b in barrios) / len(barrios), 1) if barrios else 0
-        }
-
-        return Response({
-            'nodes': nodes,
-            'links': links,
-            'stats': stats,
-            'leyenda': {
-                'categorias': [
-                    {'nombre': 'Muy Alto', 'color': '#e74c3c', 'rango': '3000+ cupos'},
-                    {'nombre': 'Alto', 'color': '#e67e22', 'rango': '2000-3000 cupos'},
-                    {'nombre': 'Medio', 'color': '#f39c12', 'rango': '1000-2000 cupos'},
-                    {'nombre': 'Bajo', 'color': '#3498db', 'rango': '500-1000 cupos'},
-                    {'nombre': 'Muy Bajo', 'color': '#95a5a6', 'rango': '<500 cupos'}
-                ],
-                'tipos_comida': [
-                    {'nombre': 'Casera', 'color': '#2ecc71'},
-                    {'nombre': 'Vegetariana', 'color': '#27ae60'},
-                    {'nombre': 'Vegana', 'color': '#16a085'},
-                    {'nombre': 'Mixta', 'color': '#3498db'},
-                    {'nombre': 'Típica', 'color': '#9b59b6'},
-                    {'nombre': 'Internacional', 'color': '#34495e'}
-                ]
-            }
-        })
-
-
-def haversine(lat1, lon1, lat2, lon2):
-    """
-    Calcular la distancia entre dos puntos en la Tierra usando la fórmula de Haversine
-    Retorna la distancia en kilómetros
-    """
-    # Convertir grados a radianes
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    
-    # Fórmula de Haversine
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    
-    # Radio de la Tierra en kilómetros
-    r = 6371
-    
-    return c * r
-    
-    @action(detail=True, methods=['post'])
-    def agregar_comentario(self, request, pk=None):
-        """
-        Agregar comentario a un comedor
-        """
-        comedor = self.get_object()
-        serializer = ComentarioSerializer(data=request.data)
-        
-        if serializer.is_valid():
-            serializer.save(comedor=comedor, usuario=request.user if request.user.is_authenticated else None)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-
-class MenuDiarioViewSet(viewsets.ModelViewSet):
-    """
-    ViewSet para menús diarios
-    """
-    queryset = MenuDiario.objects.all()
-    serializer_class = MenuDiarioSerializer
-    filter_backends = [filters.OrderingFilter]
-    ordering = ['-fecha']
-    
-    def get_queryset(self):
-        """Filtrar por comedor si se especifica"""
-        queryset = super().get_queryset()
-        comedor_id = self.request.query_params.get('comedor', None)
-        
-        if comedor_id:
-            queryset = queryset.filter(comedor_id=comedor_id)
-        
-        # Filtrar por fecha
-        fecha = self.request.query_params.get('fecha', None)
-        if fecha:
-            queryset = queryset.filter(fecha=fecha)
-        
-        return queryset
-    
-    @action(detail=False, methods=['get'])
-    def hoy(self, request):
-        """Obtener menús del día actual"""
-        hoy = timezone.now().date()
-        queryset = self.get_queryset().filter(fecha=hoy)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
-
-class ComentarioViewSet(viewsets.ModelViewSet):
-    """
-    ViewSet para comentarios
-    """
-    queryset = Comentario.objects.filter(aprobado=True)
-    serializer_class = ComentarioSerializer
-    filter_backends = [filters.OrderingFilter]
-    ordering = ['-fecha']
-
-    def get_queryset(self):
-        """Filtrar por comedor si se especifica"""
-        queryset = super().get_queryset()
-        comedor_id = self.request.query_params.get('comedor', None)
-
-        if comedor_id:
-            queryset = queryset.filter(comedor_id=comedor_id)
-
-        return queryset
-
-
-class AlertaSuscripcionViewSet(viewsets.ModelViewSet):
-    """
-    ViewSet para suscripciones de alertas
-    Permite a usuarios suscribirse a notificaciones por WhatsApp/SMS
-    """
-    queryset = AlertaSuscripcion.objects.all()
-    serializer_class = AlertaSuscripcionSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['nombre', 'telefono', 'barrios_interes']
-    ordering = ['-fecha_suscripcion']
-
-    def get_queryset(self):
-        """Filtrar suscripciones"""
-        queryset = super().get_queryset()
-
-        # Filtrar por activas
-        activa = self.request.query_params.get('activa', None)
-        if activa is not None:
-            activa_bool = activa.lower() in ['true', '1', 'yes']
-            queryset = queryset.filter(activa=activa_bool)
-
-        # Filtrar por tipo de alerta
-        tipo_alerta = self.request.query_params.get('tipo_alerta', None)
-        if tipo_alerta:
-            queryset = queryset.filter(tipo_alerta=tipo_alerta)
-
-        # Filtrar por canal
-        canal = self.request.query_params.get('canal', None)
-        if canal:
-            queryset = queryset.filter(canal_preferido=canal)
-
-        return queryset
-
-    @action(detail=True, methods=['post'])
-    def activar(self, request, pk=None):
-        """Activar una suscripción"""
-        suscripcion = self.get_object()
-        suscripcion.activa = True
-        suscripcion.save()
-        serializer = self.get_serializer(suscripcion)
-        return Response(serializer.data)
-
-    @action(detail=True, methods=['post'])
-    def desactivar(self, request, pk=None):
-        """Desactivar una suscripción"""
-        suscripcion = self.get_object()
-        suscripcion.activa = False
-        suscripcion.save()
-        serializer = self.get_serializer(suscripcion)
-        return Response(serializer.data)
-
-    @action(detail=False, methods=['get'])
-    def por_barrio(self, request):
-        """Obtener suscripciones agrupadas por barrio"""
-        barrios_stats = []
-
-        # Obtener todos los barrios únicos de las suscripciones
-        suscripciones = AlertaSuscripcion.objects.filter(activa=True)
-
-        barrios_set = set()
-        for suscripcion in suscripciones:
-            if suscripcion.barrios_interes:
-                barrios = [b.strip() for b in suscripcion.barrios_interes.split(',')]
-                barrios_set.update(barrios)
-
-        for barrio in barrios_set:
-            count = suscripciones.filter(barrios_interes__icontains=barrio).count()
-            barrios_stats.append({
-                'barrio': barrio,
-                'total_suscripciones': count
-            })
-
-        return Response(sorted(barrios_stats, key=lambda x: x['total_suscripciones'], reverse=True))
-
-
-class MetricaViewSet(viewsets.ModelViewSet):
-    """
-    ViewSet para métricas y estadísticas
-    Proporciona datos para dashboards y reportes
-    """
-    queryset = Metrica.objects.all()
-    serializer_class = MetricaSerializer
-    filter_backends = [filters.OrderingFilter]
-    ordering = ['-fecha']
-
-    def get_queryset(self):
-        """Filtrar métricas por parámetros"""
-        queryset = super().get_queryset()
-
-        # Filtrar por comedor
-        comedor_id = self.request.query_params.get('comedor', None)
-        if comedor_id:
-            queryset = queryset.filter(comedor_id=comedor_id)
-
-        # Filtrar por tipo de métrica
-        tipo_metrica = self.request.query_params.get('tipo_metrica', None)
-        if tipo_metrica:
-            queryset = queryset.filter(tipo_metrica=tipo_metrica)
-
-        # Filtrar por rango de fechas
-        fecha_desde = self.request.query_params.get('fecha_desde', None)
-        fecha_hasta = self.request.query_params.get('fecha_hasta', None)
-
-        if fecha_desde:
-            queryset = queryset.filter(fecha__gte=fecha_desde)
-        if fecha_hasta:
-            queryset = queryset.filter(fecha__lte=fecha_hasta)
-
-        return queryset
-
-    @action(detail=False, methods=['get'])
-    def estadisticas(self, request):
-        """
-        Endpoint para obtener estadísticas globales
-        Usado en dashboard principal
-        """
-        from datetime import timedelta
-
-        hoy = timezone.now().date()
-        hace_7_dias = hoy - timedelta(days=7)
-        hace_30_dias = hoy - timedelta(days=30)
-
-        # Métricas del día
-        metricas_hoy = Metrica.objects.filter(fecha=hoy)
-
-        # Métricas de la semana
-        metricas_semana = Metrica.objects.filter(fecha__gte=hace_7_dias, fecha__lte=hoy)
-
-        # Métricas del mes
-        metricas_mes = Metrica.objects.filter(fecha__gte=hace_30_dias, fecha__lte=hoy)
-
-        stats = {
-            'hoy': {
-                'comidas_servidas': metricas_hoy.filter(tipo_metrica='COMIDAS_SERVIDAS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'cupos_ocupados': metricas_hoy.filter(tipo_metrica='CUPOS_OCUPADOS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'usuarios_atendidos': metricas_hoy.filter(tipo_metrica='USUARIOS_ATENDIDOS').aggregate(Sum('valor'))['valor__sum'] or 0,
-            },
-            'semana': {
-                'comidas_servidas': metricas_semana.filter(tipo_metrica='COMIDAS_SERVIDAS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'cupos_ocupados': metricas_semana.filter(tipo_metrica='CUPOS_OCUPADOS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'usuarios_atendidos': metricas_semana.filter(tipo_metrica='USUARIOS_ATENDIDOS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'donaciones_recibidas': metricas_semana.filter(tipo_metrica='DONACIONES_RECIBIDAS').aggregate(Sum('valor'))['valor__sum'] or 0,
-            },
-            'mes': {
-                'comidas_servidas': metricas_mes.filter(tipo_metrica='COMIDAS_SERVIDAS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'cupos_ocupados': metricas_mes.filter(tipo_metrica='CUPOS_OCUPADOS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'usuarios_atendidos': metricas_mes.filter(tipo_metrica='USUARIOS_ATENDIDOS').aggregate(Sum('valor'))['valor__sum'] or 0,
-                'donaciones_recibidas': metricas_mes.filter(tipo_metrica='DONACIONES_RECIBIDAS').aggregate(Sum('valor'))['valor__sum'] or 0,
-            }
-        }
-
-        return Response(stats)
-
-    @action(detail=False, methods=['get'])
-    def ultimos_7_dias(self, request):
-        """
-        Endpoint para gráficos de evolución temporal
-        Retorna datos de los últimos 7 días
-        """
-        from datetime import timedelta
-
-        hoy = timezone.now().date()
-        hace_7_dias = hoy - timedelta(days=7)
-
-        # Obtener métricas por día
-        metricas = Metrica.objects.filter(
-            fecha__gte=hace_7_dias,
-            fecha__lte=hoy
-        ).values('fecha', 'tipo_metrica').annotate(
-            total=Sum('valor')
-        ).order_by('fecha')
-
-        # Organizar por tipo de métrica
-        datos_por_tipo = {}
-        for metrica in metricas:
-            tipo = metrica['tipo_metrica']
-            if tipo not in datos_por_tipo:
-                datos_por_tipo[tipo] = []
-
-            datos_por_tipo[tipo].append({
-                'fecha': metrica['fecha'],
-                'valor': metrica['total']
-            })
-
-        return Response(datos_por_tipo)
-
-    @action(detail=False, methods=['get'])
-    def por_comedor(self, request):
-        """
-        Endpoint para ranking de comedores
-        Top 10 comedores por tipo de métrica
-        """
-        tipo_metrica = request.query_params.get('tipo_metrica', 'COMIDAS_SERVIDAS')
-        limite = int(request.query_params.get('limite', 10))
-
-        # Agregar por comedor
-        ranking = Metrica.objects.filter(
-            tipo_metrica=tipo_metrica,
-            comedor__isnull=False
-        ).values('comedor__id', 'comedor__nombre').annotate(
-            total=Sum('valor')
-        ).order_by('-total')[:limite]
-
-        return Response(list(ranking))
-
-
-class DonacionViewSet(viewsets.ModelViewSet):
-    """
-    ViewSet para donaciones
-    Gestiona el flujo completo de donaciones con matching automático
-    """
-    queryset = Donacion.objects.all()
-    serializer_class = DonacionSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['nombre_donante', 'descripcion', 'barrio_donante']
-    ordering = ['-fecha_creacion']
-
-    def get_queryset(self):
-        """Filtrar donaciones por parámetros"""
-        queryset = super().get_queryset()
-
-        # Filtrar por estado
-        estado = self.request.query_params.get('estado', None)
-        if estado:
-            queryset = queryset.filter(estado=estado)
-
-        # Filtrar por tipo
-        tipo_donacion = self.request.query_params.get('tipo_donacion', None)
-        if tipo_donacion:
-            queryset = queryset.filter(tipo_donacion=tipo_donacion)
-
-        # Filtrar por comedor asignado
-        comedor_id = self.request.query_params.get('comedor', None)
-        if comedor_id:
-            queryset = queryset.filter(comedor_asignado_id=comedor_id)
-
-        return queryset
-
-    def create(self, request, *args, **kwargs):
-        """
-        Crear donación y opcionalmente asignar comedor automáticamente
-        """
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        donacion = serializer.save()
-
-        # Si hay coordenadas, asignar automáticamente
-        if donacion.latitud_donante and donacion.longitud_donante:
-            comedor = donacion.asignar_comedor_cercano()
-            if comedor:
-                donacion.comedor_asignado = comedor
-                donacion.estado = 'ASIGNADA'
-                donacion.fecha_asignacion = timezone.now()
-                donacion.save()
-
-        headers = self.get_success_headers(serializer.data)
-        return Response(
-            self.get_serializer(donacion).data,
-            status=status.HTTP_201_CREATED,
-            headers=headers
-        )
-
-    @action(detail=True, methods=['post'])
-    def asignar_automaticamente(self, request, pk=None):
-        """
-        Asignar donación a comedor más cercano manualmente
-        """
-        donacion = self.get_object()
-
-        if donacion.estado != 'PENDIENTE':
-            return Response(
-                {'error': 'La donación ya fue asignada o entregada'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        comedor = donacion.asignar_comedor_cercano()
-
-        if not comedor:
-            return Response(
-                {'error': 'No se pudo encontrar un comedor cercano. Verifique que la donación tenga coordenadas.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        donacion.comedor_asignado = comedor
-        donacion.estado = 'ASIGNADA'
-        donacion.fecha_asignacion = timezone.now()
-        donacion.save()
-
-        serializer = self.get_serializer(donacion)
-        return Response(serializer.data)
-
-    @action(detail=True, methods=['post'])
-    def marcar_en_transito(self, request, pk=None):
-        """Marcar donación como en tránsito"""
-        donacion = self.get_object()
-        donacion.estado = 'EN_TRANSITO'
-        donacion.save()
-        serializer = self.get_serializer(donacion)
-        return Response(serializer.data)
-
-    @action(detail=True, methods=['post'])
-    def marcar_entregada(self, request, pk=None):
-        """Marcar donación como entregada"""
-        donacion = self.get_object()
-        donacion.estado = 'ENTREGADA'
-        donacion.fecha_entrega_real = timezone.now().date()
-        donacion.save()
-        serializer = self.get_serializer(donacion)
-        return Response(serializer.data)
-
-    @action(detail=False, methods=['get'])
-    def estadisticas(self, request):
-        """Estadísticas de donaciones"""
-        from datetime import timedelta
-
-        hoy = timezone.now().date()
-        hace_30_dias = hoy - timedelta(days=30)
-
-        # Totales
-        total_donaciones = Donacion.objects.count()
-        total_entregadas = Donacion.objects.filter(estado='ENTREGADA').count()
-        total_pendientes = Donacion.objects.filter(estado='PENDIENTE').count()
-
-        # Del mes actual
-        donaciones_mes = Donacion.objects.filter(fecha_creacion__gte=hace_30_dias)
-
-        # Por tipo
-        por_tipo = Donacion.objects.values('tipo_donacion').annotate(
-            total=Count('id')
-        ).order_by('-total')
-
-        # Valor monetario total
-        valor_total = Donacion.objects.filter(
-            valor_monetario__isnull=False
-        ).aggregate(Sum('valor_monetario'))['valor_monetario__sum'] or 0
-
-        # Peso total de alimentos
-        peso_total = Donacion.objects.filter(
-            cantidad_estimada_kg__isnull=False
-        ).aggregate(Sum('cantidad_estimada_kg'))['cantidad_estimada_kg__sum'] or 0
-
-        stats = {
-            'total_donaciones': total_donaciones,
-            'total_entregadas': total_entregadas,
-            'total_pendientes': total_pendientes,
-            'donaciones_mes': donaciones_mes.count(),
-            'por_tipo': list(por_tipo),
-            'valor_monetario_total': float(valor_total),
-            'peso_total_kg': float(peso_total),
-        }
-
-        return Response(stats)
-
-
-
-def dashboard_view(request):
-    """
-    Vista para renderizar el dashboard con gráficos de Chart.js
-    """
-    return render(request, 'dashboard.html')
+"""
+Views para la API REST de Comedores
+"""
+import math
+
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from django.utils import timezone
+from django.db.models import Avg, Count, Min, Sum
+from django.http import HttpResponse, HttpResponseNotModified
+from django.shortcuts import render
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from .models import (
+    Comedor, MenuDiario, Comentario, Favorito, AlertaSuscripcion, BarrioInteres, Metrica, Donacion
+)
+from .serializers import (
+    ComedorSerializer, ComedorDetalleSerializer, ComedorGeoJSONSerializer,
+    MenuDiarioSerializer, ComentarioSerializer, AlertaSuscripcionSerializer,
+    MetricaSerializer, DonacionSerializer
+)
+from . import (
+    alertas, asignacion, clusters, cupos, dashboard, exportacion, horarios, indice_espacial,
+    ingesta, sincronizacion, snapshot,
+)
+from .pagination import (
+    AlertaSuscripcionPagination, ComentarioCursorPagination, DonacionPagination,
+    MenuCursorPagination, MetricaPagination,
+)
+from .parsers import CSVParser
+
+# Parámetros propios de la búsqueda de cercanos (el resto son filtros)
+PARAMETROS_CERCANOS = {'lat', 'lng', 'radio', 'limit'}
+
+
+class ComedorViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para operaciones CRUD de comedores
+    """
+    queryset = Comedor.objects.filter(estado_activo=True)
+    serializer_class = ComedorSerializer
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['nombre', 'descripcion', 'direccion', 'barrio']
+    ordering_fields = ['nombre', 'fecha_creacion']
+    ordering = ['nombre']
+    
+    def momento_consultado(self):
+        """Instante del parámetro abierto_en (ahora si no se envía)"""
+        valor = self.request.query_params.get('abierto_en')
+        if valor is None:
+            return timezone.now()
+        try:
+            return leer_momento(valor)
+        except ValueError:
+            raise ValidationError({'abierto_en': 'Fecha inválida, use ISO 8601 (ej. 2024-03-01T12:30)'})
+
+    def get_serializer_context(self):
+        """El horario de los comedores se evalúa en abierto_en si se envía"""
+        context = super().get_serializer_context()
+        if 'abierto_en' in self.request.query_params:
+            context['momento'] = self.momento_consultado()
+        return context
+
+    def get_serializer_class(self):
+        """Usar serializer detallado para retrieve"""
+        if self.action == 'retrieve':
+            return ComedorDetalleSerializer
+        elif self.action == 'geojson':
+            return ComedorGeoJSONSerializer
+        return ComedorSerializer
+    
+    def get_queryset(self):
+        """
+        Filtrar comedores según parámetros de query
+        """
+        queryset = super().get_queryset()
+        
+        # Filtrar por estado (abierto ahora o en el momento abierto_en)
+        estado = self.request.query_params.get('estado', None)
+        momento = self.momento_consultado()
+        if estado == 'abierto' or estado == 'Abiertos ahora' or 'abierto_en' in self.request.query_params:
+            # Índice de horarios en memoria: filtra por los horarios abiertos, no por ids
+            queryset = queryset.filter(horarios.obtener_indice().filtro_abiertos_en(momento))
+        
+        # Filtrar por tipo de comida
+        tipo_comida = self.request.query_params.get('tipo_comida', None)
+        if tipo_comida:
+            queryset = queryset.filter(tipo_comida=tipo_comida)
+        
+        # Filtrar por barrio
+        barrio = self.request.query_params.get('barrio', None)
+        if barrio:
+            queryset = queryset.filter(barrio__icontains=barrio)
+        
+        # Filtrar por calificación mínima
+        calificacion_min = self.request.query_params.get('calificacion_min', None)
+        if calificacion_min:
+            try:
+                cal_min = float(calificacion_min)
+            except ValueError:
+                pass
+            else:
+                # Usa el promedio guardado en Comedor (columna indexada)
+                queryset = queryset.filter(calificacion_media__gte=cal_min)
+        
+        # Precargar menú de hoy y comentarios recientes para ComedorSerializer
+        if self.action in ('list', 'retrieve', 'cercanos'):
+            queryset = queryset.con_relaciones_listado()
+        
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def geojson(self, request):
+        """
+        Endpoint que retorna todos los comedores en formato GeoJSON
+        para usar directamente con Leaflet
+        Query params: perfil (completo o min), bbox=oeste,sur,este,norte
+        y los filtros del listado; con abierto_en=<fecha ISO> solo los
+        abiertos en ese momento, y esta_abierto se evalúa en él
+        """
+        perfil = request.query_params.get('perfil', 'completo')
+        if perfil not in snapshot.PERFILES:
+            return Response(
+                {'error': f'Perfil no soportado, use: {", ".join(snapshot.PERFILES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            bbox = leer_bbox(request.query_params['bbox']) if 'bbox' in request.query_params else None
+        except ValueError:
+            return Response(
+                {'error': 'bbox inválido, use oeste,sur,este,norte'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Sin filtros se sirve el snapshot precalculado (caso del mapa)
+        if set(request.query_params) <= {'perfil'}:
+            geojson = snapshot.obtener_snapshot(perfil)
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+            if bbox is not None:
+                queryset = queryset.en_caja(*bbox)
+            geojson = snapshot.GeoJSONSnapshot(
+                snapshot.codificar(
+                    snapshot.construir_geojson(queryset, perfil, self.momento_consultado())
+                ),
+                None
+            )
+
+        return respuesta_json_con_etag(request, geojson.contenido, geojson.etag)
+    
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Clusters de comedores precalculados para la vista del mapa
+        Query params: bbox=oeste,sur,este,norte y zoom (entero)
+        Por encima de clusters.ZOOM_MAX retorna los comedores individuales
+        """
+        try:
+            bbox = leer_bbox(request.query_params['bbox'])
+            zoom = int(request.query_params['zoom'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Se requieren bbox=oeste,sur,este,norte y zoom'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if zoom < 0:
+            return Response(
+                {'error': 'zoom inválido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        geojson = clusters.obtener_indice().consultar(*bbox, zoom)
+        contenido = snapshot.codificar(geojson)
+        return respuesta_json_con_etag(request, contenido, snapshot.calcular_etag(contenido))
+
+    @action(detail=False, methods=['get'])
+    def cambios(self, request):
+        """
+        Sincronización incremental para clientes offline
+        Query params: desde (token de la respuesta anterior), perfil (completo o min)
+        Retorna los comedores creados o modificados, los ids dados de baja en
+        `eliminados` y el `token` siguiente. Sin `desde`, o con un token
+        demasiado antiguo, retorna todos los comedores con completo=true
+        """
+        perfil = request.query_params.get('perfil', 'completo')
+        if perfil not in snapshot.PERFILES:
+            return Response(
+                {'error': f'Perfil no soportado, use: {", ".join(snapshot.PERFILES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        desde = request.query_params.get('desde')
+        if desde:
+            try:
+                desde = sincronizacion.decodificar_token(desde)
+            except ValueError:
+                return Response(
+                    {'error': 'Token de sincronización inválido'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        contenido = snapshot.codificar(sincronizacion.cambios(desde or None, perfil))
+        response = HttpResponse(contenido, content_type='application/json')
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def cercanos(self, request):
+        """
+        Obtener comedores cercanos a una ubicación, ordenados por distancia
+        Query params: lat, lng, radio (en km, default 5), limit (opcional)
+        Si se envía limit sin radio se retornan los `limit` más cercanos
+        Acepta además los filtros del listado (tipo_comida, barrio, estado, search)
+        """
+        lat = request.query_params.get('lat', None)
+        lng = request.query_params.get('lng', None)
+        radio = request.query_params.get('radio', None)
+        limite = request.query_params.get('limit', None)
+        
+        if not lat or not lng:
+            return Response(
+                {'error': 'Se requieren parámetros lat y lng'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            lat = float(lat)
+            lng = float(lng)
+            radio = float(radio) if radio is not None else None
+            limite = int(limite) if limite is not None else None
+        except ValueError:
+            return Response(
+                {'error': 'Coordenadas inválidas'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # float() acepta nan e inf, que el índice espacial no puede ubicar en una celda
+        if not all(math.isfinite(valor) for valor in (lat, lng, radio if radio is not None else 0)):
+            return Response(
+                {'error': 'Coordenadas inválidas'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if limite is not None and limite < 1:
+            return Response(
+                {'error': 'El parámetro limit debe ser mayor que cero'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Sin radio pero con limit: los `limit` más cercanos sin tope de distancia
+        if radio is None:
+            km = None if limite is not None else 5
+        else:
+            km = radio
+
+        if set(request.query_params) - PARAMETROS_CERCANOS:
+            # Con filtros adicionales (tipo_comida, barrio, estado, search)
+            # la distancia se calcula en la base de datos sobre el queryset filtrado
+            queryset = self.filter_queryset(self.get_queryset()).cercanos(lat, lng, km)
+            if limite is not None:
+                queryset = queryset[:limite]
+            comedores_cercanos = list(queryset)
+            distancias = [comedor.distancia_km for comedor in comedores_cercanos]
+        else:
+            # Búsqueda en el índice espacial en memoria (sin recorrer la tabla)
+            indice = indice_espacial.obtener_indice()
+            if km is None:
+                resultados = indice.k_cercanos(lat, lng, limite)
+            else:
+                resultados = indice.en_radio(lat, lng, km, limite)
+
+            comedores = Comedor.objects.filter(estado_activo=True).con_relaciones_listado().in_bulk(
+                [pk for pk, _ in resultados]
+            )
+            comedores_cercanos = []
+            distancias = []
+            for pk, distancia in resultados:
+                if pk in comedores:
+                    comedores_cercanos.append(comedores[pk])
+                    distancias.append(distancia)
+
+        serializer = self.get_serializer(comedores_cercanos, many=True)
+        data = serializer.data
+        for item, distancia in zip(data, distancias):
+            item['distancia_km'] = round(distancia, 2)
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def menus(self, request, pk=None):
+        """
+        Historial de menús del comedor, paginado por cursor
+        Query params: cursor, page_size
+        """
+        comedor = self.get_object()
+        return self._paginar_relacion(
+            comedor.menus.all(), MenuDiarioSerializer, MenuCursorPagination
+        )
+
+    @action(detail=True, methods=['get'])
+    def comentarios(self, request, pk=None):
+        """
+        Comentarios aprobados del comedor, paginados por cursor
+        Query params: cursor, page_size
+        """
+        comedor = self.get_object()
+        return self._paginar_relacion(
+            comedor.comentarios.filter(aprobado=True).select_related('usuario'),
+            ComentarioSerializer, ComentarioCursorPagination
+        )
+
+    @action(detail=True, methods=['post'])
+    def reservar(self, request, pk=None):
+        """
+        Descontar cupos con un UPDATE atómico
+        Body: {"cantidad": 1}. Responde 409 si no hay cupos suficientes
+        """
+        return self._mover_cupos(request, pk, cupos.reservar)
+
+    @action(detail=True, methods=['post'])
+    def liberar(self, request, pk=None):
+        """
+        Devolver cupos con un UPDATE atómico
+        Body: {"cantidad": 1}
+        """
+        return self._mover_cupos(request, pk, cupos.liberar)
+
+    def _mover_cupos(self, request, pk, operacion):
+        """Sin get_object(): la operación no lee el comedor antes de escribir"""
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Se esperaba un objeto JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        cantidad = request.data.get('cantidad', 1)
+        # Solo enteros: 1.9 o "1.9" no se truncan, y True no cuenta como 1
+        if isinstance(cantidad, str) and cantidad.isascii() and cantidad.isdigit():
+            cantidad = int(cantidad)
+        if type(cantidad) is not int or not 0 < cantidad <= cupos.CANTIDAD_MAXIMA:
+            return Response(
+                {'error': f'cantidad debe ser un entero entre 1 y {cupos.CANTIDAD_MAXIMA}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        no_encontrado = Response({'error': 'Comedor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        if not (pk.isascii() and pk.isdigit()):
+            return no_encontrado
+        try:
+            disponibles = operacion(int(pk), cantidad)
+        except Comedor.DoesNotExist:
+            return no_encontrado
+        except cupos.ConflictoCupos as exc:
+            return Response(
+                {'error': str(exc), 'cupos_disponibles': exc.disponibles},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({
+            'id': int(pk),
+            'cupos_disponibles': disponibles,
+            'estado_cupos': Comedor(cupos_disponibles=disponibles).estado_cupos,
+        })
+
+    def _paginar_relacion(self, queryset, serializer_class, pagination_class):
+        """Pagina una colección anidada con su propia clase de paginación"""
+        paginator = pagination_class()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def network_graph(self, request):
+        """
+        Endpoint que retorna datos para el network graph
+        Agrupa comedores por barrio y genera nodos y enlaces
+        """
+        # Agrupar por barrio/comuna
+        barrios = Comedor.objects.filter(estado_activo=True).values('barrio').annotate(
+            total_comedores=Count('id'),
+            total_cupos=Sum('cupos_disponibles'),
+            total_capacidad=Sum('capacidad_personas'),
+            promedio_cupos=Avg('cupos_disponibles')
+        ).order_by('-total_cupos')
+
+        # Crear nodos (barrios)
+        nodes = []
+        node_id_map = {}
+
+        for idx, barrio in enumerate(barrios):
+            node_id = f"barrio_{idx}"
+            node_id_map[barrio['barrio']] = node_id
+
+            # Categorizar por tamaño de cupos
+            if barrio['total_cupos'] >= 3000:
+                categoria = 'muy_alto'
+                color = '#e74c3c'  # Rojo
+                size = 30
+            elif barrio['total_cupos'] >= 2000:
+                categoria = 'alto'
+                color = '#e67e22'  # Naranja
+                size = 25
+            elif barrio['total_cupos'] >= 1000:
+                categoria = 'medio'
+                color = '#f39c12'  # Amarillo
+                size = 20
+            elif barrio['total_cupos'] >= 500:
+                categoria = 'bajo'
+                color = '#3498db'  # Azul
+                size = 15
+            else:
+                categoria = 'muy_bajo'
+                color = '#95a5a6'  # Gris
+                size = 10
+
+            nodes.append({
+                'id': node_id,
+                'label': barrio['barrio'],
+                'type': 'barrio',
+                'categoria': categoria,
+                'total_comedores': barrio['total_comedores'],
+                'total_cupos': barrio['total_cupos'],
+                'total_capacidad': barrio['total_capacidad'],
+                'promedio_cupos': round(barrio['promedio_cupos'], 1),
+                'color': color,
+                'size': size,
+                'x': None,  # Se calculará en frontend
+                'y': None
+            })
+
+        # Crear enlaces entre barrios basados en proximidad de cupos
+        links = []
+        barrios_list = list(barrios)
+
+        for i, barrio1 in enumerate(barrios_list):
+            for j, barrio2 in enumerate(barrios_list):
+                if i < j:  # Evitar duplicados
+                    # Conectar barrios con cupos similares
+                    diff_cupos = abs(barrio1['total_cupos'] - barrio2['total_cupos'])
+
+                    # Si la diferencia es menor al 50% del mayor, crear enlace
+                    max_cupos = max(barrio1['total_cupos'], barrio2['total_cupos'])
+                    if diff_cupos < (max_cupos * 0.5):
+                        strength = 1 - (diff_cupos / max_cupos)
+
+                        links.append({
+                            'source': node_id_map[barrio1['barrio']],
+                            'target': node_id_map[barrio2['barrio']],
+                            'value': strength,
+                            'tipo': 'similitud_cupos'
+                        })
+
+        # Agregar nodos de comedores individuales para los top 20
+        top_comedores = Comedor.objects.filter(estado_activo=True).order_by('-cupos_disponibles')[:20]
+
+        for comedor in top_comedores:
+            node_id = f"comedor_{comedor.id}"
+
+            # Color por tipo de comida
+            color_map = {
+                'CASERA': '#2ecc71',
+                'VEGETARIANA': '#27ae60',
+                'VEGANA': '#16a085',
+                'MIXTA': '#3498db',
+                'TIPICA': '#9b59b6',
+                'INTERNACIONAL': '#34495e'
+            }
+
+            nodes.append({
+                'id': node_id,
+                'label': comedor.nombre[:30] + '...' if len(comedor.nombre) > 30 else comedor.nombre,
+                'type': 'comedor',
+                'categoria': 'destacado',
+                'cupos': comedor.cupos_disponibles,
+                'capacidad': comedor.capacidad_personas,
+                'barrio': comedor.barrio,
+                'tipo_comida': comedor.tipo_comida,
+                'color': color_map.get(comedor.tipo_comida, '#95a5a6'),
+                'size': 8 + (comedor.cupos_disponibles / 20),  # Tamaño proporcional a cupos
+                'x': None,
+                'y': None
+            })
+
+            # Conectar comedor con su barrio
+            if comedor.barrio in node_id_map:
+                links.append({
+                    'source': node_id,
+                    'target': node_id_map[comedor.barrio],
+                    'value': comedor.cupos_disponibles / 100,
+                    'tipo': 'pertenece_a'
+                })
+
+        # Estadísticas globales
+        stats = {
+            'total_barrios': len(barrios),
+            'total_comedores_activos': Comedor.objects.filter(estado_activo=True).count(),
+            'total_cupos_sistema': sum(b['total_cupos'] for b in barrios),
+            'promedio_comedores_por_barrio': round(sum(b['total_comedores'] for b in barrios) / len(barrios), 1) if barrios else 0
+        }
+
+        return Response({
+            'nodes': nodes,
+            'links': links,
+            'stats': stats,
+            'leyenda': {
+                'categorias': [
+                    {'nombre': 'Muy Alto', 'color': '#e74c3c', 'rango': '3000+ cupos'},
+                    {'nombre': 'Alto', 'color': '#e67e22', 'rango': '2000-3000 cupos'},
+                    {'nombre': 'Medio', 'color': '#f39c12', 'rango': '1000-2000 cupos'},
+                    {'nombre': 'Bajo', 'color': '#3498db', 'rango': '500-1000 cupos'},
+                    {'nombre': 'Muy Bajo', 'color': '#95a5a6', 'rango': '<500 cupos'}
+                ],
+                'tipos_comida': [
+                    {'nombre': 'Casera', 'color': '#2ecc71'},
+                    {'nombre': 'Vegetariana', 'color': '#27ae60'},
+                    {'nombre': 'Vegana', 'color': '#16a085'},
+                    {'nombre': 'Mixta', 'color': '#3498db'},
+                    {'nombre': 'Típica', 'color': '#9b59b6'},
+                    {'nombre': 'Internacional', 'color': '#34495e'}
+                ]
+            }
+        })
+
+
+def respuesta_json_con_etag(request, contenido, etag):
+    """
+    Retorna bytes JSON ya codificados con ETag fuerte
+    Responde 304 si el cliente ya tiene la misma versión
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        if etag in etags or '*' in etags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = 'no-cache'
+            return response
+
+    response = HttpResponse(contenido, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def leer_bbox(valor):
+    """
+    Convierte 'oeste,sur,este,norte' en una tupla de floats
+    Lanza ValueError si el texto o la caja son inválidos
+    """
+    oeste, sur, este, norte = (float(parte) for parte in valor.split(','))
+    if oeste > este or sur > norte:
+        raise ValueError(f'bbox inválido: {valor}')
+    return oeste, sur, este, norte
+
+
+def leer_momento(valor):
+    """
+    Convierte una fecha ISO 8601 en un datetime con zona horaria
+    Sin zona se interpreta en hora local; lanza ValueError si es inválida
+    """
+    momento = parse_datetime(valor.replace(' ', '+'))  # '+' llega como espacio en la URL
+    if momento is None:
+        raise ValueError(f'Fecha inválida: {valor}')
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
+
+
+def respuesta_exportacion(vista, request, tabla):
+    """Exportación NDJSON/CSV del queryset filtrado de un ViewSet"""
+    formato = request.query_params.get('formato', 'ndjson')
+    if formato not in exportacion.FORMATOS:
+        return Response(
+            {'error': f'Formato no soportado, use: {", ".join(exportacion.FORMATOS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return exportacion.respuesta(
+        vista.filter_queryset(vista.get_queryset()), tabla, formato, request
+    )
+
+
+class MenuDiarioViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para menús diarios
+    """
+    queryset = MenuDiario.objects.all()
+    serializer_class = MenuDiarioSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering = ['-fecha']
+    
+    def get_queryset(self):
+        """Filtrar por comedor si se especifica"""
+        queryset = super().get_queryset()
+        comedor_id = self.request.query_params.get('comedor', None)
+        
+        if comedor_id:
+            queryset = queryset.filter(comedor_id=comedor_id)
+        
+        # Filtrar por fecha
+        fecha = self.request.query_params.get('fecha', None)
+        if fecha:
+            queryset = queryset.filter(fecha=fecha)
+        
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def hoy(self, request):
+        """Obtener menús del día actual"""
+        hoy = timezone.now().date()
+        queryset = self.get_queryset().filter(fecha=hoy)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class ComentarioViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para comentarios
+    """
+    queryset = Comentario.objects.filter(aprobado=True)
+    serializer_class = ComentarioSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering = ['-fecha']
+
+    def get_queryset(self):
+        """Filtrar por comedor si se especifica"""
+        queryset = super().get_queryset()
+        comedor_id = self.request.query_params.get('comedor', None)
+
+        if comedor_id:
+            queryset = queryset.filter(comedor_id=comedor_id)
+
+        return queryset
+
+
+class AlertaSuscripcionViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para suscripciones de alertas
+    Permite a usuarios suscribirse a notificaciones por WhatsApp/SMS
+    """
+    queryset = AlertaSuscripcion.objects.all()
+    serializer_class = AlertaSuscripcionSerializer
+    pagination_class = AlertaSuscripcionPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['nombre', 'telefono', 'barrios_interes']
+    ordering = ['-fecha_suscripcion']
+
+    def get_queryset(self):
+        """Filtrar suscripciones"""
+        queryset = super().get_queryset()
+
+        # Filtrar por activas
+        activa = self.request.query_params.get('activa', None)
+        if activa is not None:
+            activa_bool = activa.lower() in ['true', '1', 'yes']
+            queryset = queryset.filter(activa=activa_bool)
+
+        # Filtrar por tipo de alerta
+        tipo_alerta = self.request.query_params.get('tipo_alerta', None)
+        if tipo_alerta:
+            queryset = queryset.filter(tipo_alerta=tipo_alerta)
+
+        # Filtrar por canal
+        canal = self.request.query_params.get('canal', None)
+        if canal:
+            queryset = queryset.filter(canal_preferido=canal)
+
+        # Filtrar por barrio de interés (búsqueda indexada en BarrioInteres)
+        barrio = self.request.query_params.get('barrio', None)
+        if barrio:
+            queryset = queryset.filter(barrios__barrio=alertas.normalizar_barrio(barrio))
+
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def activar(self, request, pk=None):
+        """Activar una suscripción"""
+        suscripcion = self.get_object()
+        suscripcion.activa = True
+        suscripcion.save()
+        serializer = self.get_serializer(suscripcion)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def desactivar(self, request, pk=None):
+        """Desactivar una suscripción"""
+        suscripcion = self.get_object()
+        suscripcion.activa = False
+        suscripcion.save()
+        serializer = self.get_serializer(suscripcion)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def por_barrio(self, request):
+        """Obtener suscripciones activas agrupadas por barrio"""
+        barrios_stats = BarrioInteres.objects.filter(suscripcion__activa=True).values(
+            'barrio'
+        ).annotate(
+            nombre=Min('nombre'),
+            total_suscripciones=Count('id'),
+        ).order_by('-total_suscripciones', 'barrio')
+
+        return Response([
+            {'barrio': fila['nombre'], 'total_suscripciones': fila['total_suscripciones']}
+            for fila in barrios_stats
+        ])
+
+
+class MetricaViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para métricas y estadísticas
+    Proporciona datos para dashboards y reportes
+    """
+    queryset = Metrica.objects.all()
+    serializer_class = MetricaSerializer
+    pagination_class = MetricaPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering = ['-fecha']
+
+    def get_queryset(self):
+        """Filtrar métricas por parámetros"""
+        queryset = super().get_queryset()
+
+        # Filtrar por comedor
+        comedor_id = self.request.query_params.get('comedor', None)
+        if comedor_id:
+            queryset = queryset.filter(comedor_id=comedor_id)
+
+        # Filtrar por tipo de métrica
+        tipo_metrica = self.request.query_params.get('tipo_metrica', None)
+        if tipo_metrica:
+            queryset = queryset.filter(tipo_metrica=tipo_metrica)
+
+        # Filtrar por rango de fechas
+        fecha_desde = self.request.query_params.get('fecha_desde', None)
+        fecha_hasta = self.request.query_params.get('fecha_hasta', None)
+
+        if fecha_desde:
+            queryset = queryset.filter(fecha__gte=fecha_desde)
+        if fecha_hasta:
+            queryset = queryset.filter(fecha__lte=fecha_hasta)
+
+        return queryset
+
+    @action(
+        detail=False, methods=['post'],
+        parser_classes=[JSONParser, CSVParser],
+    )
+    def lote(self, request):
+        """
+        Carga masiva de métricas en JSON (lista de objetos) o CSV
+        Query params: reemplazar=true para sustituir las métricas existentes
+        con el mismo (comedor, tipo_metrica, fecha)
+        """
+        reemplazar = request.query_params.get('reemplazar')
+        if reemplazar is not None:
+            reemplazar = reemplazar.lower() in ['true', '1', 'yes']
+
+        try:
+            filas = request.data
+            if isinstance(filas, str):
+                filas = ingesta.leer_csv(filas)
+            resultado = ingesta.cargar_metricas(filas, reemplazar=reemplazar)
+        except ingesta.LoteInvalido as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if resultado['creadas'] or not resultado['errores']:
+            codigo = status.HTTP_201_CREATED
+        else:
+            codigo = status.HTTP_400_BAD_REQUEST
+        return Response(resultado, status=codigo)
+
+    @action(detail=False, methods=['get'])
+    def estadisticas(self, request):
+        """
+        Endpoint para obtener estadísticas globales
+        Usado en dashboard principal. Una sola consulta sobre MetricaDiaria
+        """
+        return Response(dashboard.estadisticas_metricas(timezone.now().date()))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta en streaming las métricas filtradas
+        Query params: formato (ndjson o csv) y los mismos filtros del listado
+        """
+        return respuesta_exportacion(self, request, 'metricas')
+
+    @action(detail=False, methods=['get'])
+    def ultimos_7_dias(self, request):
+        """
+        Endpoint para gráficos de evolución temporal
+        Retorna datos de los últimos 7 días
+        """
+        return Response(dashboard.evolucion_metricas(timezone.now().date()))
+
+    @action(detail=False, methods=['get'])
+    def por_comedor(self, request):
+        """
+        Endpoint para ranking de comedores
+        Top 10 comedores por tipo de métrica, sumando el resumen mensual
+        """
+        tipo_metrica = request.query_params.get('tipo_metrica', 'COMIDAS_SERVIDAS')
+        limite = int(request.query_params.get('limite', 10))
+        return Response(dashboard.ranking_comedores(tipo_metrica, limite))
+
+
+class DonacionViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para donaciones
+    Gestiona el flujo completo de donaciones con matching automático
+    """
+    queryset = Donacion.objects.all()
+    serializer_class = DonacionSerializer
+    pagination_class = DonacionPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['nombre_donante', 'descripcion', 'barrio_donante']
+    ordering = ['-fecha_creacion']
+
+    def get_queryset(self):
+        """Filtrar donaciones por parámetros"""
+        queryset = super().get_queryset()
+
+        # Filtrar por estado
+        estado = self.request.query_params.get('estado', None)
+        if estado:
+            queryset = queryset.filter(estado=estado)
+
+        # Filtrar por tipo
+        tipo_donacion = self.request.query_params.get('tipo_donacion', None)
+        if tipo_donacion:
+            queryset = queryset.filter(tipo_donacion=tipo_donacion)
+
+        # Filtrar por comedor asignado
+        comedor_id = self.request.query_params.get('comedor', None)
+        if comedor_id:
+            queryset = queryset.filter(comedor_asignado_id=comedor_id)
+
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """
+        Crear donación y opcionalmente asignar comedor automáticamente
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        donacion = serializer.save()
+
+        # Si hay coordenadas, asignar automáticamente respetando los cupos
+        if donacion.latitud_donante is not None and donacion.longitud_donante is not None:
+            resultado = asignacion.asignar_donaciones(Donacion.objects.filter(pk=donacion.pk))
+            if resultado['asignadas']:
+                donacion.refresh_from_db()
+
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            self.get_serializer(donacion).data,
+            status=status.HTTP_201_CREATED,
+            headers=headers
+        )
+
+    @action(detail=True, methods=['post'])
+    def asignar_automaticamente(self, request, pk=None):
+        """
+        Asignar donación al comedor más cercano con cupo de recepción
+        """
+        donacion = self.get_object()
+
+        if donacion.estado != 'PENDIENTE':
+            return Response(
+                {'error': 'La donación ya fue asignada o entregada'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if donacion.latitud_donante is None or donacion.longitud_donante is None:
+            return Response(
+                {'error': 'No se pudo encontrar un comedor cercano. Verifique que la donación tenga coordenadas.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        resultado = asignacion.asignar_donaciones(Donacion.objects.filter(pk=donacion.pk))
+        if not resultado['asignadas']:
+            return Response(
+                {'error': 'Ningún comedor activo tiene cupo para recibir la donación.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        donacion.refresh_from_db()
+        serializer = self.get_serializer(donacion)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def asignar_pendientes(self, request):
+        """
+        Asignar en bloque las donaciones pendientes
+        Acepta los mismos filtros del listado (estado se ignora)
+        """
+        resultado = asignacion.asignar_donaciones(self.filter_queryset(self.get_queryset()))
+        return Response(resultado)
+
+    @action(detail=True, methods=['post'])
+    def marcar_en_transito(self, request, pk=None):
+        """Marcar donación como en tránsito"""
+        donacion = self.get_object()
+        donacion.estado = 'EN_TRANSITO'
+        donacion.save()
+        serializer = self.get_serializer(donacion)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def marcar_entregada(self, request, pk=None):
+        """Marcar donación como entregada"""
+        donacion = self.get_object()
+        donacion.estado = 'ENTREGADA'
+        donacion.fecha_entrega_real = timezone.now().date()
+        donacion.save()
+        serializer = self.get_serializer(donacion)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def estadisticas(self, request):
+        """Estadísticas de donaciones"""
+        return Response(dashboard.estadisticas_donaciones(timezone.now().date()))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta en streaming las donaciones filtradas
+        Query params: formato (ndjson o csv) y los mismos filtros del listado
+        """
+        return respuesta_exportacion(self, request, 'donaciones')
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """
+    Datos agregados para el dashboard en una sola petición
+    """
+
+    @action(detail=False, methods=['get'])
+    def resumen(self, request):
+        """
+        Métricas, evolución de 7 días, top comedores y donaciones
+        Calculado cada DASHBOARD_TTL segundos como máximo; responde con ETag
+        """
+        resumen = dashboard.obtener_resumen()
+        return respuesta_json_con_etag(request, resumen['contenido'], resumen['etag'])
+
+
+def dashboard_view(request):
+    """
+    Vista para renderizar el dashboard con gráficos de Chart.js
+    """
+    return render(request, 'dashboard.html')
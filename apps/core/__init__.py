@@ -1,2 +1,2 @@
-# Core app
-
+# Core app
+
@@ -1,2 +1,2 @@
-# Core admin placeholder
-
+# Core admin placeholder
+
@@ -0,0 +1,43 @@
+"""
+Middleware de la aplicación core
+"""
+import time
+
+from django.db import connection
+
+from .telemetria import ContadorConsultas, registro
+
+
+class TelemetriaMiddleware:
+    """
+    Registra por vista la latencia, las consultas SQL y su duración y el
+    tamaño de la respuesta (ver telemetria.py)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = ContadorConsultas()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(contador):
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        # Nombre de la ruta y no la URL, para no crear una serie por cada id
+        coincidencia = request.resolver_match
+        vista = (coincidencia.view_name or coincidencia._func_path) if coincidencia else 'sin_ruta'
+        metodo = request.method
+        etiquetas = {'vista': vista}
+
+        registro.incrementar(
+            'comedores_peticiones_total',
+            {'vista': vista, 'metodo': metodo, 'codigo': str(response.status_code)},
+        )
+        registro.observar('comedores_peticion_duracion_segundos', {'vista': vista, 'metodo': metodo}, duracion)
+        registro.incrementar('comedores_consultas_bd_total', etiquetas, contador.consultas)
+        registro.incrementar('comedores_consultas_bd_segundos_total', etiquetas, contador.segundos)
+        if not response.streaming:
+            registro.incrementar('comedores_respuesta_bytes_total', etiquetas, len(response.content))
+        registro.volcar()
+        return response
@@ -1,2 +1,2 @@
-# Core models placeholder
-
+# Core models placeholder
+
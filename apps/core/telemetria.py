@@ -0,0 +1,202 @@
+"""
+Telemetría de rendimiento en formato Prometheus
+
+Cada proceso (worker de gunicorn) acumula sus contadores e histogramas en
+memoria y los vuelca cada TELEMETRIA_INTERVALO segundos a un archivo
+propio en TELEMETRIA_DIR. El endpoint /metrics suma los archivos de todos
+los procesos, así que el resultado no depende del worker que atienda la
+petición. Los archivos de procesos terminados se conservan para que los
+contadores nunca retrocedan, igual que el modo multiproceso de
+prometheus_client. Por defecto el directorio está en /tmp, que empieza
+vacío en cada despliegue.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Límites superiores (segundos) de los buckets de latencia
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DESCRIPCIONES = {
+    'comedores_peticiones_total': ('counter', 'Peticiones atendidas por vista, método y código'),
+    'comedores_peticion_duracion_segundos': ('histogram', 'Latencia de las peticiones por vista'),
+    'comedores_consultas_bd_total': ('counter', 'Consultas SQL ejecutadas por vista'),
+    'comedores_consultas_bd_segundos_total': ('counter', 'Tiempo en consultas SQL por vista'),
+    'comedores_respuesta_bytes_total': ('counter', 'Bytes de respuesta por vista'),
+    'comedores_cache_total': ('counter', 'Accesos a caches de la aplicación por resultado'),
+}
+
+
+def directorio():
+    return getattr(settings, 'TELEMETRIA_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'comedores_cali_telemetria'
+    )
+
+
+def _clave(nombre, etiquetas):
+    return nombre, tuple(sorted(etiquetas.items()))
+
+
+class Registro:
+    """Contadores e histogramas de un proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.pid = os.getpid()
+        self.contadores = defaultdict(float)
+        # clave -> [conteo por bucket..., conteo +Inf, suma]
+        self.histogramas = {}
+        self.ultimo_volcado = 0.0
+
+    def _verificar_proceso(self):
+        # Tras un fork (gunicorn --preload) el hijo empieza de cero
+        if os.getpid() != self.pid:
+            self.reiniciar()
+
+    def incrementar(self, nombre, etiquetas, valor=1):
+        with self._lock:
+            self._verificar_proceso()
+            self.contadores[_clave(nombre, etiquetas)] += valor
+
+    def observar(self, nombre, etiquetas, valor):
+        with self._lock:
+            self._verificar_proceso()
+            fila = self.histogramas.setdefault(
+                _clave(nombre, etiquetas), [0] * (len(BUCKETS_SEGUNDOS) + 2)
+            )
+            for i, limite in enumerate(BUCKETS_SEGUNDOS):
+                if valor <= limite:
+                    fila[i] += 1
+                    break
+            else:
+                fila[len(BUCKETS_SEGUNDOS)] += 1
+            fila[-1] += valor
+
+    def exportar(self):
+        with self._lock:
+            return {
+                'contadores': [
+                    [nombre, dict(etiquetas), valor]
+                    for (nombre, etiquetas), valor in self.contadores.items()
+                ],
+                'histogramas': [
+                    [nombre, dict(etiquetas), list(fila)]
+                    for (nombre, etiquetas), fila in self.histogramas.items()
+                ],
+            }
+
+    def volcar(self, forzar=False):
+        """Escribe el archivo del proceso si pasó el intervalo (o si se fuerza)"""
+        ahora = time.monotonic()
+        intervalo = getattr(settings, 'TELEMETRIA_INTERVALO', 5)
+        if not forzar and ahora - self.ultimo_volcado < intervalo:
+            return
+        self.ultimo_volcado = ahora
+
+        carpeta = directorio()
+        os.makedirs(carpeta, exist_ok=True)
+        destino = os.path.join(carpeta, f'{os.getpid()}.json')
+        temporal = f'{destino}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self.exportar(), archivo)
+        os.replace(temporal, destino)
+
+
+registro = Registro()
+
+
+class ContadorConsultas:
+    """execute_wrapper que cuenta consultas y acumula su duración"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.segundos += time.perf_counter() - inicio
+
+
+def registrar_cache(cache, resultado):
+    """Cuenta un acceso a un cache de la aplicación ('acierto', 'fallo', ...)"""
+    registro.incrementar('comedores_cache_total', {'cache': cache, 'resultado': resultado})
+
+
+def combinar():
+    """Suma los archivos de todos los procesos. Retorna (contadores, histogramas)"""
+    registro.volcar(forzar=True)
+    contadores = defaultdict(float)
+    histogramas = {}
+    carpeta = directorio()
+    for nombre_archivo in sorted(os.listdir(carpeta)):
+        if not nombre_archivo.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(carpeta, nombre_archivo), encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):
+            continue  # Archivo a medio escribir o eliminado: se toma en la próxima lectura
+        for nombre, etiquetas, valor in datos['contadores']:
+            contadores[_clave(nombre, etiquetas)] += valor
+        for nombre, etiquetas, fila in datos['histogramas']:
+            acumulada = histogramas.setdefault(_clave(nombre, etiquetas), [0] * len(fila))
+            for i, valor in enumerate(fila):
+                acumulada[i] += valor
+    return contadores, histogramas
+
+
+def _etiquetas(etiquetas, extra=()):
+    pares = list(etiquetas) + list(extra)
+    if not pares:
+        return ''
+    texto = ','.join(
+        '{}="{}"'.format(clave, str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for clave, valor in pares
+    )
+    return '{' + texto + '}'
+
+
+def _numero(valor):
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if not math.isinf(valor) else '+Inf'
+
+
+def formato_prometheus(contadores, histogramas):
+    """Texto de exposición de Prometheus (versión 0.0.4)"""
+    por_nombre = defaultdict(list)
+    for (nombre, etiquetas), valor in contadores.items():
+        por_nombre[nombre].append((etiquetas, valor))
+    for (nombre, etiquetas), fila in histogramas.items():
+        por_nombre[nombre].append((etiquetas, fila))
+
+    lineas = []
+    for nombre in sorted(por_nombre):
+        tipo, descripcion = DESCRIPCIONES.get(nombre, ('untyped', nombre))
+        lineas.append(f'# HELP {nombre} {descripcion}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        for etiquetas, valor in sorted(por_nombre[nombre]):
+            if tipo != 'histogram':
+                lineas.append(f'{nombre}{_etiquetas(etiquetas)} {_numero(valor)}')
+                continue
+            acumulado = 0
+            for limite, conteo in zip(BUCKETS_SEGUNDOS + (math.inf,), valor[:-1]):
+                acumulado += conteo
+                le = '+Inf' if math.isinf(limite) else repr(limite)
+                lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas, [("le", le)])} {acumulado}')
+            lineas.append(f'{nombre}_sum{_etiquetas(etiquetas)} {_numero(valor[-1])}')
+            lineas.append(f'{nombre}_count{_etiquetas(etiquetas)} {acumulado}')
+    return '\n'.join(lineas) + '\n'
@@ -1,28 +1,51 @@
-"""
-Views para la aplicación core
-"""
-from django.shortcuts import render
-
-
-def mapa_view(request):
-    """
-    Vista principal que muestra el mapa interactivo de comedores
-    """
-    context = {
-        'page_title': 'Comedores Comunitarios - Cali',
-        'meta_description': 'Encuentra comedores comunitarios cerca de ti en Cali, Colombia. Mapa interactivo con horarios, menús y ubicaciones.',
-    }
-    return render(request, 'mapa.html', context)
-
-
-def network_view(request):
-    """
-    Vista del network graph interactivo de comedores
-    Visualización estilo WEF Transformation Map
-    """
-    context = {
-        'page_title': 'Red de Comedores - Mapa de Transformación Social',
-        'meta_description': 'Explora la red de comedores comunitarios en Cali. Visualización interactiva por barrios y capacidad de atención.',
-    }
-    return render(request, 'network.html', context)
-
+"""
+Views para la aplicación core
+"""
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.shortcuts import render
+
+from . import telemetria
+
+
+def mapa_view(request):
+    """
+    Vista principal que muestra el mapa interactivo de comedores
+    """
+    context = {
+        'page_title': 'Comedores Comunitarios - Cali',
+        'meta_description': 'Encuentra comedores comunitarios cerca de ti en Cali, Colombia. Mapa interactivo con horarios, menús y ubicaciones.',
+    }
+    return render(request, 'mapa.html', context)
+
+
+def network_view(request):
+    """
+    Vista del network graph interactivo de comedores
+    Visualización estilo WEF Transformation Map
+    """
+    context = {
+        'page_title': 'Red de Comedores - Mapa de Transformación Social',
+        'meta_description': 'Explora la red de comedores comunitarios en Cali. Visualización interactiva por barrios y capacidad de atención.',
+    }
+    return render(request, 'network.html', context)
+
+
+def metricas_view(request):
+    """
+    Telemetría de todos los workers en formato de texto de Prometheus
+    Requiere `Authorization: Bearer <TELEMETRIA_TOKEN>` o un usuario staff
+    """
+    token = getattr(settings, 'TELEMETRIA_TOKEN', '')
+    autorizacion = request.META.get('HTTP_AUTHORIZATION', '')
+    con_token = bool(token) and hmac.compare_digest(autorizacion.encode(), f'Bearer {token}'.encode())
+    if not con_token and not request.user.is_staff:
+        return HttpResponseForbidden('No autorizado')
+
+    contadores, histogramas = telemetria.combinar()
+    return HttpResponse(
+        telemetria.formato_prometheus(contadores, histogramas),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
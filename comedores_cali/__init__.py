@@ -1,2 +1,2 @@
-# Configuración del proyecto Comedores Cali
-
+# Configuración del proyecto Comedores Cali
+
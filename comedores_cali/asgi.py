@@ -1,11 +1,25 @@
-"""
-ASGI config for comedores_cali project.
-"""
-import os
-
-from django.core.asgi import get_asgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'comedores_cali.settings.development')
-
-application = get_asgi_application()
-
+"""
+ASGI config for comedores_cali project.
+
+Las conexiones al stream de eventos en vivo (apps.comedores.eventos.RUTA)
+se atienden con una aplicación ASGI propia: son largas y casi siempre
+inactivas, así que no pasan por el ciclo de petición de Django. El resto
+de peticiones van a Django.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'comedores_cali.settings.development')
+
+django_application = get_asgi_application()
+
+# Requiere Django configurado (get_asgi_application llama a django.setup())
+from apps.comedores import eventos  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == eventos.RUTA:
+        await eventos.aplicacion(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -1,2 +1,2 @@
-# Settings package
-
+# Settings package
+
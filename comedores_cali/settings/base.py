@@ -1,202 +1,246 @@
-"""
-Configuración base de Django para el proyecto Comedores Cali
-"""
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-
-# Cargar variables de entorno desde .env
-load_dotenv()
-
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-
-# Configuración de GDAL para Windows con Conda
-if os.name == 'nt':  # Windows
-    CONDA_PREFIX = os.environ.get('CONDA_PREFIX', r'C:\Users\diego\miniconda3')
-    GDAL_LIBRARY_PATH = os.path.join(CONDA_PREFIX, 'Library', 'bin', 'gdal.dll')
-    GEOS_LIBRARY_PATH = os.path.join(CONDA_PREFIX, 'Library', 'bin', 'geos_c.dll')
-    
-    # Agregar al PATH para que Django encuentre las librerías
-    os.environ['PATH'] = os.path.join(CONDA_PREFIX, 'Library', 'bin') + os.pathsep + os.environ.get('PATH', '')
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-dev-key-change-in-production-123456789')
-
-# Application definition
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    # 'django.contrib.gis',  # PostGIS support - No necesario con SQLite
-    
-    # Third party apps
-    'rest_framework',
-    'corsheaders',
-    
-    # Local apps
-    'apps.comedores',
-    'apps.core',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Para archivos estáticos
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-ROOT_URLCONF = 'comedores_cali.urls'
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-                'django.template.context_processors.media',
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'comedores_cali.wsgi.application'
-
-# Database
-# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
-import dj_database_url
-
-# Configuración para PostgreSQL con Railway
-DATABASE_URL = os.environ.get('DATABASE_URL')
-
-if DATABASE_URL:
-    # Usar PostgreSQL (Railway)
-    DATABASES = {
-        'default': dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
-    }
-else:
-    # Fallback a SQLite para desarrollo local
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
-    }
-    import warnings
-    warnings.warn("No DATABASE_URL found - using SQLite for local development")
-
-# Password validation
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
-    },
-]
-
-# Internationalization
-LANGUAGE_CODE = 'es-co'
-TIME_ZONE = 'America/Bogota'
-USE_I18N = True
-USE_TZ = True
-
-# Static files (CSS, JavaScript, Images)
-STATIC_URL = '/static/'
-STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_DIRS = [BASE_DIR / 'static']
-
-# WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
-
-# Media files
-MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
-
-# Default primary key field type
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-# Django REST Framework
-REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 50,
-    'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
-    'DEFAULT_FILTER_BACKENDS': [
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
-    ],
-}
-
-# CORS Configuration
-CORS_ALLOW_ALL_ORIGINS = False
-CORS_ALLOWED_ORIGINS = [
-    "http://localhost:8000",
-    "http://127.0.0.1:8000",
-]
-
-# Logging
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': False,
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-        },
-    },
-    'root': {
-        'handlers': ['console'],
-        'level': 'INFO',
-    },
-    'loggers': {
-        'django': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': False,
-        },
-        'apps': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-    },
-}
-
-# Configuración de límites de Cali para validación de coordenadas
-CALI_BOUNDS = {
-    'north': 3.55,
-    'south': 3.30,
-    'east': -76.45,
-    'west': -76.60,
-}
-
-CALI_CENTER = {
-    'lat': 3.4516,
-    'lng': -76.5320,
-}
-
+"""
+Configuración base de Django para el proyecto Comedores Cali
+"""
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Cargar variables de entorno desde .env
+load_dotenv()
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Configuración de GDAL para Windows con Conda
+if os.name == 'nt':  # Windows
+    CONDA_PREFIX = os.environ.get('CONDA_PREFIX', r'C:\Users\diego\miniconda3')
+    GDAL_LIBRARY_PATH = os.path.join(CONDA_PREFIX, 'Library', 'bin', 'gdal.dll')
+    GEOS_LIBRARY_PATH = os.path.join(CONDA_PREFIX, 'Library', 'bin', 'geos_c.dll')
+    
+    # Agregar al PATH para que Django encuentre las librerías
+    os.environ['PATH'] = os.path.join(CONDA_PREFIX, 'Library', 'bin') + os.pathsep + os.environ.get('PATH', '')
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-dev-key-change-in-production-123456789')
+
+# Application definition
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    # 'django.contrib.gis',  # PostGIS support - No necesario con SQLite
+    
+    # Third party apps
+    'rest_framework',
+    'corsheaders',
+    
+    # Local apps
+    'apps.comedores',
+    'apps.core',
+]
+
+MIDDLEWARE = [
+    'apps.core.middleware.TelemetriaMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # Para archivos estáticos
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'comedores_cali.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'django.template.context_processors.media',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'comedores_cali.wsgi.application'
+
+# Database
+# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+import dj_database_url
+
+# Configuración para PostgreSQL con Railway
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+if DATABASE_URL:
+    # Usar PostgreSQL (Railway)
+    DATABASES = {
+        'default': dj_database_url.config(
+            default=DATABASE_URL,
+            conn_max_age=600,
+            conn_health_checks=True,
+        )
+    }
+else:
+    # Fallback a SQLite para desarrollo local
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+    import warnings
+    warnings.warn("No DATABASE_URL found - using SQLite for local development")
+
+# Password validation
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+# Internationalization
+LANGUAGE_CODE = 'es-co'
+TIME_ZONE = 'America/Bogota'
+USE_I18N = True
+USE_TZ = True
+
+# Static files (CSS, JavaScript, Images)
+STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# WhiteNoise configuration
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Media files
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Default primary key field type
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Django REST Framework
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 50,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'rest_framework.filters.SearchFilter',
+        'rest_framework.filters.OrderingFilter',
+    ],
+}
+
+# Cache
+# En desarrollo basta con memoria local; producción usa un cache compartido
+# entre los workers de gunicorn (ver production.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'comedores-cali',
+    }
+}
+
+# Segundos que vive el snapshot GeoJSON antes de recalcular `esta_abierto`
+GEOJSON_SNAPSHOT_TTL = int(os.environ.get('GEOJSON_SNAPSHOT_TTL', 60))
+
+# Sincronización incremental /api/comedores/cambios/ (ver apps/comedores/sincronizacion.py)
+# Cada consulta repasa los últimos CAMBIOS_MARGEN_SEGUNDOS; las bajas se guardan CAMBIOS_RETENCION_DIAS
+CAMBIOS_MARGEN_SEGUNDOS = int(os.environ.get('CAMBIOS_MARGEN_SEGUNDOS', 30))
+CAMBIOS_RETENCION_DIAS = int(os.environ.get('CAMBIOS_RETENCION_DIAS', 30))
+
+# Stream de eventos en vivo /api/comedores/eventos/ (ver apps/comedores/eventos.py)
+# BackendBaseDatos comparte los eventos entre workers; BackendMemoria sirve para un solo proceso
+EVENTOS_BACKEND = os.environ.get('EVENTOS_BACKEND', 'apps.comedores.eventos.BackendBaseDatos')
+EVENTOS_INTERVALO = float(os.environ.get('EVENTOS_INTERVALO', 0.5))
+EVENTOS_LATIDO = int(os.environ.get('EVENTOS_LATIDO', 20))
+EVENTOS_RETENCION_MINUTOS = int(os.environ.get('EVENTOS_RETENCION_MINUTOS', 60))
+
+# Reservas de cupos (ver apps/comedores/cupos.py): el GeoJSON se invalida a lo sumo
+# una vez por ventana y por proceso; es el retraso máximo de los cupos en el mapa
+CUPOS_INVALIDACION_SEGUNDOS = float(os.environ.get('CUPOS_INVALIDACION_SEGUNDOS', 1))
+
+# Segundos que vive el resumen cacheado de /api/dashboard/resumen/
+DASHBOARD_TTL = int(os.environ.get('DASHBOARD_TTL', 30))
+
+# Backend de envío de alertas (ver apps/comedores/alertas.py)
+# BackendConsola escribe en el log; BackendArchivo agrega líneas JSON a ALERTAS_ARCHIVO
+ALERTAS_BACKEND = os.environ.get('ALERTAS_BACKEND', 'apps.comedores.alertas.BackendConsola')
+ALERTAS_ARCHIVO = os.environ.get('ALERTAS_ARCHIVO', str(BASE_DIR / 'alertas_enviadas.jsonl'))
+
+# Telemetría en /metrics (ver apps/core/telemetria.py)
+# Cada worker vuelca sus contadores en TELEMETRIA_DIR cada TELEMETRIA_INTERVALO segundos
+TELEMETRIA_DIR = os.environ.get('TELEMETRIA_DIR', '')
+TELEMETRIA_INTERVALO = int(os.environ.get('TELEMETRIA_INTERVALO', 5))
+TELEMETRIA_TOKEN = os.environ.get('TELEMETRIA_TOKEN', '')
+
+# CORS Configuration
+CORS_ALLOW_ALL_ORIGINS = False
+CORS_ALLOWED_ORIGINS = [
+    "http://localhost:8000",
+    "http://127.0.0.1:8000",
+]
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'INFO',
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'apps': {
+            'handlers': ['console'],
+            'level': 'DEBUG',
+            'propagate': False,
+        },
+    },
+}
+
+# Configuración de límites de Cali para validación de coordenadas
+CALI_BOUNDS = {
+    'north': 3.55,
+    'south': 3.30,
+    'east': -76.45,
+    'west': -76.60,
+}
+
+CALI_CENTER = {
+    'lat': 3.4516,
+    'lng': -76.5320,
+}
+
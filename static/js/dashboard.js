@@ -28,35 +28,52 @@ const CHART_COLORS = [
  * Inicializar dashboard al cargar la página
  */
 document.addEventListener('DOMContentLoaded', () => {
-    cargarMetricas();
-    cargarEvolucion();
-    cargarTopComedores();
-    cargarDonacionesPorTipo();
+    cargarResumen();
 
     // Actualizar datos cada 5 minutos
-    setInterval(() => {
-        cargarMetricas();
-        cargarEvolucion();
-        cargarTopComedores();
-        cargarDonacionesPorTipo();
-    }, 300000); // 5 minutos
+    setInterval(cargarResumen, 300000); // 5 minutos
+
+    // Y antes si el servidor avisa cambios de cupos (máximo cada 30 segundos)
+    if (window.EventSource) {
+        const eventos = new EventSource('/api/comedores/eventos/');
+        let pendiente = null;
+        eventos.addEventListener('comedor', () => {
+            if (pendiente) return;
+            pendiente = setTimeout(() => {
+                pendiente = null;
+                cargarResumen();
+            }, 30000);
+        });
+    }
 });
 
 /**
- * Cargar métricas destacadas (cards superiores)
+ * Cargar todos los datos del dashboard en una sola petición
+ * El navegador revalida con ETag: si nada cambió el servidor responde 304
  */
-async function cargarMetricas() {
+async function cargarResumen() {
+    let data;
     try {
-        // Obtener estadísticas de métricas
-        const responseMetricas = await fetch('/api/metricas/estadisticas/');
-        if (!responseMetricas.ok) throw new Error('Error al cargar métricas');
-        const dataMetricas = await responseMetricas.json();
+        const response = await fetch('/api/dashboard/resumen/');
+        if (!response.ok) throw new Error('Error al cargar el resumen');
+        data = await response.json();
+    } catch (error) {
+        console.error('Error al cargar el resumen del dashboard:', error);
+        mostrarError('Error al cargar los datos del dashboard');
+        return;
+    }
 
-        // Obtener estadísticas de donaciones
-        const responseDonaciones = await fetch('/api/donaciones/estadisticas/');
-        if (!responseDonaciones.ok) throw new Error('Error al cargar donaciones');
-        const dataDonaciones = await responseDonaciones.json();
+    mostrarMetricas(data.metricas, data.donaciones);
+    mostrarEvolucion(data.evolucion);
+    mostrarTopComedores(data.top_comedores);
+    mostrarDonacionesPorTipo(data.donaciones);
+}
 
+/**
+ * Mostrar métricas destacadas (cards superiores)
+ */
+function mostrarMetricas(dataMetricas, dataDonaciones) {
+    try {
         // Actualizar valores en los cards
         document.getElementById('metric-comidas').textContent =
             formatNumber(dataMetricas.mes.comidas_servidas);
@@ -77,14 +94,10 @@ async function cargarMetricas() {
 }
 
 /**
- * Cargar gráfico de evolución de métricas (últimos 7 días)
+ * Mostrar gráfico de evolución de métricas (últimos 7 días)
  */
-async function cargarEvolucion() {
+function mostrarEvolucion(data) {
     try {
-        const response = await fetch('/api/metricas/ultimos-7-dias/');
-        if (!response.ok) throw new Error('Error al cargar evolución');
-        const data = await response.json();
-
         // Preparar datos para el gráfico
         const datasets = [];
 
@@ -192,14 +205,10 @@ async function cargarEvolucion() {
 }
 
 /**
- * Cargar gráfico de top 10 comedores
+ * Mostrar gráfico de top 10 comedores
  */
-async function cargarTopComedores() {
+function mostrarTopComedores(data) {
     try {
-        const response = await fetch('/api/metricas/por-comedor/?tipo_metrica=COMIDAS_SERVIDAS&limite=10');
-        if (!response.ok) throw new Error('Error al cargar comedores');
-        const data = await response.json();
-
         if (!data || data.length === 0) {
             console.warn('No hay datos de comedores');
             return;
@@ -271,14 +280,10 @@ async function cargarTopComedores() {
 }
 
 /**
- * Cargar gráfico de donaciones por tipo
+ * Mostrar gráfico de donaciones por tipo
  */
-async function cargarDonacionesPorTipo() {
+function mostrarDonacionesPorTipo(data) {
     try {
-        const response = await fetch('/api/donaciones/estadisticas/');
-        if (!response.ok) throw new Error('Error al cargar donaciones');
-        const data = await response.json();
-
         if (!data.por_tipo || data.por_tipo.length === 0) {
             console.warn('No hay datos de donaciones por tipo');
             return;
@@ -1,66 +1,72 @@
-// Service Worker para funcionalidad offline
-const CACHE_NAME = 'comedores-cali-v1';
-const urlsToCache = [
-    '/',
-    '/static/css/styles.css',
-    '/static/js/main.js',
-    'https://unpkg.com/leaflet@1.9.4/dist/leaflet.css',
-    'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js',
-    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
-];
-
-// Instalación del Service Worker
-self.addEventListener('install', event => {
-    event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(cache => {
-                console.log('Cache abierto');
-                return cache.addAll(urlsToCache);
-            })
-    );
-});
-
-// Activación del Service Worker
-self.addEventListener('activate', event => {
-    event.waitUntil(
-        caches.keys().then(cacheNames => {
-            return Promise.all(
-                cacheNames.map(cacheName => {
-                    if (cacheName !== CACHE_NAME) {
-                        return caches.delete(cacheName);
-                    }
-                })
-            );
-        })
-    );
-});
-
-// Intercepción de peticiones (estrategia network first, cache fallback)
-self.addEventListener('fetch', event => {
-    // Solo cachear peticiones HTTP/HTTPS
-    if (!event.request.url.startsWith('http')) {
-        return;
-    }
-
-    event.respondWith(
-        fetch(event.request)
-            .then(response => {
-                // Clonar la respuesta
-                const responseClone = response.clone();
-
-                // Guardar en cache solo si es una respuesta exitosa
-                if (response.status === 200) {
-                    caches.open(CACHE_NAME).then(cache => {
-                        cache.put(event.request, responseClone);
-                    });
-                }
-
-                return response;
-            })
-            .catch(() => {
-                // Si falla la red, buscar en cache
-                return caches.match(event.request);
-            })
-    );
-});
-
+// Service Worker para funcionalidad offline
+const CACHE_NAME = 'comedores-cali-v1';
+const urlsToCache = [
+    '/',
+    '/static/css/styles.css',
+    '/static/js/main.js',
+    'https://unpkg.com/leaflet@1.9.4/dist/leaflet.css',
+    'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+];
+
+// Instalación del Service Worker
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => {
+                console.log('Cache abierto');
+                return cache.addAll(urlsToCache);
+            })
+    );
+});
+
+// Activación del Service Worker
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys().then(cacheNames => {
+            return Promise.all(
+                cacheNames.map(cacheName => {
+                    if (cacheName !== CACHE_NAME) {
+                        return caches.delete(cacheName);
+                    }
+                })
+            );
+        })
+    );
+});
+
+// Intercepción de peticiones (estrategia network first, cache fallback)
+self.addEventListener('fetch', event => {
+    // Solo cachear peticiones HTTP/HTTPS
+    if (!event.request.url.startsWith('http')) {
+        return;
+    }
+
+    // La sincronización incremental guarda sus datos en localStorage;
+    // cachear cada token solo acumularía respuestas que no se reutilizan
+    if (event.request.url.includes('/api/comedores/cambios/')) {
+        return;
+    }
+
+    event.respondWith(
+        fetch(event.request)
+            .then(response => {
+                // Clonar la respuesta
+                const responseClone = response.clone();
+
+                // Guardar en cache solo si es una respuesta exitosa
+                if (response.status === 200) {
+                    caches.open(CACHE_NAME).then(cache => {
+                        cache.put(event.request, responseClone);
+                    });
+                }
+
+                return response;
+            })
+            .catch(() => {
+                // Si falla la red, buscar en cache
+                return caches.match(event.request);
+            })
+    );
+});
+